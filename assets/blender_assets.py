@@ -0,0 +1,132 @@
+"""
+Asset library helpers for generated scripts (runs inside Blender)
+
+The executor puts this directory on sys.path, so scripts can do:
+
+    from blender_assets import material, node_group, prop
+    
+    glass = material("Glass")
+    obj.data.materials.append(glass)
+    prop("Vase", location=(0, 0, 0.75))
+
+Datablocks are linked from library.blend by default: every scene shares
+one copy and nothing is rebuilt per script. Pass link=False to append an
+editable copy instead (e.g. to change a material's colour).
+"""
+
+import os
+import json
+import bpy
+
+LIBRARY_DIR = os.path.dirname(os.path.abspath(__file__))
+LIBRARY_PATH = os.path.join(LIBRARY_DIR, "library.blend")
+MANIFEST_PATH = os.path.join(LIBRARY_DIR, "manifest.json")
+
+# bpy.data collection holding each asset type
+DATA_COLLECTIONS = {
+    'material': 'materials',
+    'node_group': 'node_groups',
+    'prop': 'collections',
+}
+
+_manifest = None
+
+
+def manifest():
+    """Library contents as written by tools/build_asset_library.py"""
+    global _manifest
+    if _manifest is None:
+        if not os.path.exists(LIBRARY_PATH):
+            raise RuntimeError(f"Asset library not built: {LIBRARY_PATH} is missing")
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            _manifest = json.load(f)
+    return _manifest
+
+
+def names(kind):
+    """Names of the library assets of one type ('material', 'node_group' or 'prop')"""
+    return [asset['name'] for asset in manifest()['assets'] if asset['type'] == kind]
+
+
+def _from_library(block):
+    library = block.library
+    return library is not None and os.path.normpath(bpy.path.abspath(library.filepath)) == os.path.normpath(LIBRARY_PATH)
+
+
+def _load(kind, name, link):
+    blocks = getattr(bpy.data, DATA_COLLECTIONS[kind])
+    if link:
+        # Linked datablocks are shared, so load each one only once
+        for block in blocks:
+            if block.name == name and _from_library(block):
+                return block
+                
+    available = names(kind)
+    if name not in available:
+        raise KeyError(f"No {kind} named '{name}' in the asset library; available: {', '.join(available)}")
+    with bpy.data.libraries.load(LIBRARY_PATH, link=link) as (data_from, data_to):
+        setattr(data_to, DATA_COLLECTIONS[kind], [name])
+    return getattr(data_to, DATA_COLLECTIONS[kind])[0]
+
+
+def material(name, link=True):
+    """
+    Material from the library
+    
+    Args:
+        name (str): Material name, e.g. "Gold"
+        link (bool): Link the shared material; False appends an editable copy
+        
+    Returns:
+        bpy.types.Material: The material, ready for obj.data.materials.append()
+    """
+    return _load('material', name, link)
+
+
+def node_group(name, link=True):
+    """
+    Node group from the library
+    
+    Args:
+        name (str): Node group name, e.g. "Wood Grain"
+        link (bool): Link the shared group; False appends an editable copy
+        
+    Returns:
+        bpy.types.NodeTree: The group, for a group node's node_tree or a modifier's node_group
+    """
+    return _load('node_group', name, link)
+
+
+def prop(name, location=(0, 0, 0), rotation=(0, 0, 0), scale=(1, 1, 1), collection=None, link=True):
+    """
+    Place a library prop in the scene
+    
+    Linked props are collection instances: an empty that draws the shared
+    geometry, so many copies cost almost nothing. Appended props are real,
+    editable objects.
+    
+    Args:
+        name (str): Prop name, e.g. "Vase"
+        location (tuple): Location of the prop's base
+        rotation (tuple): Euler rotation in radians
+        scale (tuple): Scale
+        collection (bpy.types.Collection, optional): Target collection, defaults to the active one
+        link (bool): Instance the shared prop; False appends editable objects
+        
+    Returns:
+        bpy.types.Object: The instance empty, or the appended prop's root object
+    """
+    target = collection or bpy.context.collection
+    source = _load('prop', name, link)
+    if link:
+        placed = bpy.data.objects.new(name, None)
+        placed.instance_type = 'COLLECTION'
+        placed.instance_collection = source
+        target.objects.link(placed)
+    else:
+        target.children.link(source)
+        placed = next(obj for obj in source.objects if obj.parent is None)
+    placed.location = location
+    placed.rotation_euler = rotation
+    placed.scale = scale
+    return placed
\ No newline at end of file
@@ -0,0 +1,336 @@
+"""
+Source of the asset library (runs inside Blender)
+
+Every builder registered with @asset creates one datablock and returns
+it; tools/build_asset_library.py runs them all in an empty file, writes
+the results to library.blend and lists them in manifest.json. Curate
+the library here, then rebuild it:
+
+    python tools/build_asset_library.py
+
+Names are what scripts pass to the blender_assets helpers, so renaming
+an asset breaks code that uses it. Descriptions and tags go into the
+prompt; keep them short. Props are collections with a single root
+object whose origin sits at the base, so they stand on whatever
+location they are placed at. Written for the Blender 4.x API.
+"""
+
+import math
+import random
+
+import bpy
+import bmesh
+from mathutils import Matrix
+
+ASSETS = []
+
+
+def asset(kind, name, description, tags=()):
+    """Register a builder for a 'material', 'node_group' or 'prop'"""
+    def register(build):
+        ASSETS.append({
+            'type': kind,
+            'name': name,
+            'description': description,
+            'tags': list(tags),
+            'build': build,
+        })
+        return build
+    return register
+
+
+# ==========================================
+# MATERIALS
+# ==========================================
+
+def principled(name, inputs):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    bsdf = material.node_tree.nodes["Principled BSDF"]
+    for socket, value in inputs.items():
+        bsdf.inputs[socket].default_value = value
+    return material
+
+
+def noise_bump(material, scale, strength):
+    """Feed a noise texture into the BSDF normal"""
+    nodes = material.node_tree.nodes
+    links = material.node_tree.links
+    noise = nodes.new('ShaderNodeTexNoise')
+    noise.inputs['Scale'].default_value = scale
+    noise.inputs['Detail'].default_value = 8.0
+    bump = nodes.new('ShaderNodeBump')
+    bump.inputs['Strength'].default_value = strength
+    links.new(noise.outputs['Fac'], bump.inputs['Height'])
+    links.new(bump.outputs['Normal'], nodes["Principled BSDF"].inputs['Normal'])
+    return noise
+
+
+@asset('material', "Gold", "polished gold metal", ("metal", "gold", "golden", "jewelry"))
+def gold():
+    return principled("Gold", {'Base Color': (1.0, 0.766, 0.336, 1.0), 'Metallic': 1.0, 'Roughness': 0.2})
+
+
+@asset('material', "Silver", "polished silver metal", ("metal", "silver", "chrome", "mirror"))
+def silver():
+    return principled("Silver", {'Base Color': (0.972, 0.960, 0.915, 1.0), 'Metallic': 1.0, 'Roughness': 0.12})
+
+
+@asset('material', "Copper", "copper metal", ("metal", "copper", "bronze"))
+def copper():
+    return principled("Copper", {'Base Color': (0.955, 0.638, 0.538, 1.0), 'Metallic': 1.0, 'Roughness': 0.25})
+
+
+@asset('material', "Brushed Steel", "brushed stainless steel", ("metal", "steel", "iron", "aluminum"))
+def brushed_steel():
+    material = principled("Brushed Steel", {
+        'Base Color': (0.56, 0.57, 0.58, 1.0), 'Metallic': 1.0, 'Roughness': 0.35, 'Anisotropic': 0.6,
+    })
+    noise_bump(material, 400.0, 0.05)
+    return material
+
+
+@asset('material', "Glass", "clear glass", ("glass", "transparent", "window", "bottle"))
+def glass():
+    return principled("Glass", {'Base Color': (1.0, 1.0, 1.0, 1.0), 'Roughness': 0.0, 'IOR': 1.45, 'Transmission Weight': 1.0})
+
+
+@asset('material', "Frosted Glass", "frosted translucent glass", ("glass", "frosted", "translucent"))
+def frosted_glass():
+    return principled("Frosted Glass", {'Base Color': (1.0, 1.0, 1.0, 1.0), 'Roughness': 0.35, 'IOR': 1.45, 'Transmission Weight': 1.0})
+
+
+@asset('material', "Water", "clear water", ("water", "liquid", "pool", "ocean", "lake"))
+def water():
+    material = principled("Water", {'Base Color': (0.8, 0.92, 1.0, 1.0), 'Roughness': 0.02, 'IOR': 1.33, 'Transmission Weight': 1.0})
+    noise_bump(material, 6.0, 0.15)
+    return material
+
+
+@asset('material', "Red Plastic", "glossy red plastic", ("plastic", "red", "toy"))
+def red_plastic():
+    return principled("Red Plastic", {'Base Color': (0.8, 0.04, 0.04, 1.0), 'Roughness': 0.3})
+
+
+@asset('material', "Rubber", "matte black rubber", ("rubber", "black", "tire", "matte"))
+def rubber():
+    return principled("Rubber", {'Base Color': (0.02, 0.02, 0.02, 1.0), 'Roughness': 0.85})
+
+
+@asset('material', "Ceramic", "glazed white ceramic", ("ceramic", "porcelain", "white", "pottery", "tile"))
+def ceramic():
+    return principled("Ceramic", {'Base Color': (0.9, 0.9, 0.87, 1.0), 'Roughness': 0.3, 'Coat Weight': 0.6, 'Coat Roughness': 0.05})
+
+
+@asset('material', "White Emission", "white light-emitting surface", ("emission", "glow", "light", "neon", "lamp"))
+def white_emission():
+    return principled("White Emission", {
+        'Base Color': (1.0, 1.0, 1.0, 1.0), 'Emission Color': (1.0, 1.0, 1.0, 1.0), 'Emission Strength': 10.0,
+    })
+
+
+@asset('material', "Wood", "varnished oak wood", ("wood", "wooden", "oak", "timber", "furniture"))
+def wood():
+    material = principled("Wood", {'Roughness': 0.45, 'Coat Weight': 0.3})
+    nodes = material.node_tree.nodes
+    grain = nodes.new('ShaderNodeGroup')
+    grain.node_tree = bpy.data.node_groups.get("Wood Grain") or wood_grain()
+    material.node_tree.links.new(grain.outputs['Color'], nodes["Principled BSDF"].inputs['Base Color'])
+    return material
+
+
+@asset('material', "Marble", "polished white marble", ("marble", "stone", "white", "floor"))
+def marble():
+    material = principled("Marble", {'Roughness': 0.12})
+    nodes = material.node_tree.nodes
+    links = material.node_tree.links
+    noise = nodes.new('ShaderNodeTexNoise')
+    noise.inputs['Scale'].default_value = 3.0
+    noise.inputs['Detail'].default_value = 12.0
+    noise.inputs['Distortion'].default_value = 4.0
+    ramp = nodes.new('ShaderNodeValToRGB')
+    ramp.color_ramp.elements[0].position = 0.45
+    ramp.color_ramp.elements[0].color = (0.35, 0.35, 0.37, 1.0)
+    ramp.color_ramp.elements[1].position = 0.55
+    ramp.color_ramp.elements[1].color = (0.92, 0.92, 0.9, 1.0)
+    links.new(noise.outputs['Fac'], ramp.inputs['Fac'])
+    links.new(ramp.outputs['Color'], nodes["Principled BSDF"].inputs['Base Color'])
+    return material
+
+
+@asset('material', "Concrete", "rough grey concrete", ("concrete", "cement", "stone", "wall", "floor", "rock"))
+def concrete():
+    material = principled("Concrete", {'Base Color': (0.42, 0.41, 0.39, 1.0), 'Roughness': 0.9})
+    noise_bump(material, 25.0, 0.3)
+    return material
+
+
+# ==========================================
+# NODE GROUPS
+# ==========================================
+
+@asset('node_group', "Wood Grain", "shader group: wood ring colour from Scale, Light and Dark inputs", ("wood", "grain", "texture"))
+def wood_grain():
+    group = bpy.data.node_groups.new("Wood Grain", 'ShaderNodeTree')
+    group.interface.new_socket("Scale", in_out='INPUT', socket_type='NodeSocketFloat').default_value = 2.0
+    group.interface.new_socket("Light", in_out='INPUT', socket_type='NodeSocketColor').default_value = (0.65, 0.42, 0.22, 1.0)
+    group.interface.new_socket("Dark", in_out='INPUT', socket_type='NodeSocketColor').default_value = (0.33, 0.18, 0.08, 1.0)
+    group.interface.new_socket("Color", in_out='OUTPUT', socket_type='NodeSocketColor')
+    
+    nodes = group.nodes
+    links = group.links
+    group_in = nodes.new('NodeGroupInput')
+    group_out = nodes.new('NodeGroupOutput')
+    coordinates = nodes.new('ShaderNodeTexCoord')
+    wave = nodes.new('ShaderNodeTexWave')
+    wave.wave_type = 'RINGS'
+    wave.inputs['Distortion'].default_value = 6.0
+    wave.inputs['Detail'].default_value = 4.0
+    mix = nodes.new('ShaderNodeMix')
+    mix.data_type = 'RGBA'
+    
+    links.new(coordinates.outputs['Object'], wave.inputs['Vector'])
+    links.new(group_in.outputs['Scale'], wave.inputs['Scale'])
+    links.new(wave.outputs['Fac'], mix.inputs['Factor'])
+    links.new(group_in.outputs['Dark'], mix.inputs['A'])
+    links.new(group_in.outputs['Light'], mix.inputs['B'])
+    links.new(mix.outputs['Result'], group_out.inputs['Color'])
+    return group
+
+
+@asset('node_group', "Scatter On Surface", "geometry nodes modifier: scatters Instance object copies over the mesh by Density", ("scatter", "grass", "forest", "distribute", "instances"))
+def scatter_on_surface():
+    group = bpy.data.node_groups.new("Scatter On Surface", 'GeometryNodeTree')
+    group.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    group.interface.new_socket("Instance", in_out='INPUT', socket_type='NodeSocketObject')
+    group.interface.new_socket("Density", in_out='INPUT', socket_type='NodeSocketFloat').default_value = 10.0
+    group.interface.new_socket("Seed", in_out='INPUT', socket_type='NodeSocketInt')
+    group.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    if hasattr(group, 'is_modifier'):
+        group.is_modifier = True
+        
+    nodes = group.nodes
+    links = group.links
+    group_in = nodes.new('NodeGroupInput')
+    group_out = nodes.new('NodeGroupOutput')
+    distribute = nodes.new('GeometryNodeDistributePointsOnFaces')
+    info = nodes.new('GeometryNodeObjectInfo')
+    info.transform_space = 'RELATIVE'
+    rotation = nodes.new('FunctionNodeRandomValue')
+    rotation.data_type = 'FLOAT_VECTOR'
+    rotation.inputs['Max'].default_value = (0.0, 0.0, 2 * math.pi)
+    instance = nodes.new('GeometryNodeInstanceOnPoints')
+    join = nodes.new('GeometryNodeJoinGeometry')
+    
+    links.new(group_in.outputs['Geometry'], distribute.inputs['Mesh'])
+    links.new(group_in.outputs['Density'], distribute.inputs['Density'])
+    links.new(group_in.outputs['Seed'], distribute.inputs['Seed'])
+    links.new(group_in.outputs['Instance'], info.inputs['Object'])
+    links.new(distribute.outputs['Points'], instance.inputs['Points'])
+    links.new(info.outputs['Geometry'], instance.inputs['Instance'])
+    links.new(rotation.outputs['Value'], instance.inputs['Rotation'])
+    links.new(group_in.outputs['Geometry'], join.inputs['Geometry'])
+    links.new(instance.outputs['Instances'], join.inputs['Geometry'])
+    links.new(join.outputs['Geometry'], group_out.inputs['Geometry'])
+    return group
+
+
+# ==========================================
+# PROPS
+# ==========================================
+
+def library_material(name):
+    """Material shared between assets, built once"""
+    existing = bpy.data.materials.get(name)
+    if existing:
+        return existing
+    return next(entry['build']() for entry in ASSETS if entry['type'] == 'material' and entry['name'] == name)
+
+
+def mesh_object(name, build, material, smooth=False):
+    """Object from a bmesh built by build(bm)"""
+    bm = bmesh.new()
+    build(bm)
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    if smooth:
+        mesh.polygons.foreach_set('use_smooth', [True] * len(mesh.polygons))
+    mesh.materials.append(material)
+    return bpy.data.objects.new(name, mesh)
+
+
+def prop_collection(name, root, children=()):
+    collection = bpy.data.collections.new(name)
+    collection.objects.link(root)
+    for child in children:
+        child.parent = root
+        collection.objects.link(child)
+    return collection
+
+
+@asset('prop', "Vase", "ceramic vase, 0.3 m tall", ("vase", "pottery", "ceramic", "decoration", "flower"))
+def vase():
+    profile = [(0.0, 0.0), (0.08, 0.0), (0.12, 0.06), (0.11, 0.18), (0.05, 0.26), (0.06, 0.3), (0.055, 0.3), (0.045, 0.26), (0.1, 0.18), (0.11, 0.06), (0.0, 0.01)]
+    
+    def build(bm):
+        verts = [bm.verts.new((radius, 0.0, height)) for radius, height in profile]
+        edges = [bm.edges.new(pair) for pair in zip(verts, verts[1:])]
+        bmesh.ops.spin(bm, geom=verts + edges, axis=(0, 0, 1), cent=(0, 0, 0), steps=32, angle=2 * math.pi)
+        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=1e-5)
+        
+    root = mesh_object("Vase", build, library_material("Ceramic"), smooth=True)
+    root.modifiers.new("Subdivision", 'SUBSURF').levels = 1
+    return prop_collection("Vase", root)
+
+
+@asset('prop', "Tree", "low-poly tree, 3 m tall", ("tree", "forest", "park", "nature", "garden"))
+def tree():
+    bark = bpy.data.materials.get("Bark") or principled("Bark", {'Base Color': (0.2, 0.12, 0.06, 1.0), 'Roughness': 0.9})
+    leaves = bpy.data.materials.get("Leaves") or principled("Leaves", {'Base Color': (0.08, 0.3, 0.06, 1.0), 'Roughness': 0.7})
+    trunk = mesh_object(
+        "Tree",
+        lambda bm: bmesh.ops.create_cone(bm, cap_ends=True, segments=10, radius1=0.15, radius2=0.1, depth=1.6, matrix=Matrix.Translation((0, 0, 0.8))),
+        bark
+    )
+    
+    def crown_mesh(bm):
+        bmesh.ops.create_icosphere(bm, subdivisions=2, radius=0.9, matrix=Matrix.Translation((0, 0, 2.1)))
+        rng = random.Random(7)
+        for vert in bm.verts:
+            vert.co *= 1.0 + rng.uniform(-0.08, 0.08)
+            
+    crown = mesh_object("Tree Crown", crown_mesh, leaves)
+    return prop_collection("Tree", trunk, [crown])
+
+
+@asset('prop', "Table", "wooden table, 1.4 x 0.8 m, 0.75 m tall", ("table", "desk", "furniture", "wood", "kitchen", "dining"))
+def table():
+    wood_material = library_material("Wood")
+    top = mesh_object(
+        "Table",
+        lambda bm: bmesh.ops.create_cube(bm, size=1.0, matrix=Matrix.Translation((0, 0, 0.73)) @ Matrix.Diagonal((1.4, 0.8, 0.04, 1.0))),
+        wood_material
+    )
+    legs = []
+    for index, (x, y) in enumerate(((0.62, 0.32), (-0.62, 0.32), (0.62, -0.32), (-0.62, -0.32))):
+        legs.append(mesh_object(
+            f"Table Leg {index + 1}",
+            lambda bm, x=x, y=y: bmesh.ops.create_cube(bm, size=1.0, matrix=Matrix.Translation((x, y, 0.355)) @ Matrix.Diagonal((0.06, 0.06, 0.71, 1.0))),
+            wood_material
+        ))
+    return prop_collection("Table", top, legs)
+
+
+@asset('prop', "Rock", "rough boulder, about 1 m across", ("rock", "stone", "boulder", "nature", "landscape"))
+def rock():
+    def build(bm):
+        bmesh.ops.create_icosphere(bm, subdivisions=3, radius=0.5, matrix=Matrix.Diagonal((1.0, 0.8, 0.6, 1.0)))
+        rng = random.Random(3)
+        for vert in bm.verts:
+            vert.co *= 1.0 + rng.uniform(-0.12, 0.12)
+        lowest = min(vert.co.z for vert in bm.verts)
+        for vert in bm.verts:
+            vert.co.z -= lowest
+            
+    return prop_collection("Rock", mesh_object("Rock", build, library_material("Concrete")))
\ No newline at end of file
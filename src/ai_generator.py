@@ -1,16 +1,34 @@
 import logging
 from pathlib import Path
 from typing import Optional, Dict
-import requests
 
 from config import Config
+from provider_router import ProviderRouter, Completion
+from token_budget import TokenBudget
+from local_llm import LocalLLMManager
 
 logger = logging.getLogger(__name__)
 
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
 
 class AIGenerator:
     """Generates Blender Python code using AI"""
     
+    # Sent after a reply that was cut off, for providers that can't prefill the reply
+    CONTINUE_PROMPT = (
+        "Your previous reply was cut off. Continue it exactly where it stopped, "
+        "without repeating anything and without any introduction."
+    )
+    
     def __init__(self, provider: Optional[str] = None):
         """
         Initialize AI Generator
@@ -20,27 +38,79 @@ class AIGenerator:
                                      If None, uses Config.AI_PROVIDER
         """
         self.provider = provider or Config.AI_PROVIDER
-        self.client = None
+        self.clients = {}
+        self.budget = TokenBudget()
+        
+        # The primary provider must work; fallbacks are used when they're configured
+        self._init_client(self.provider)
+        self.router = ProviderRouter()
+        self._add_route(self.provider)
+        
+        for fallback in Config.AI_FALLBACK_PROVIDERS:
+            if fallback == self.provider or fallback in self.router.providers:
+                continue
+            try:
+                self._init_client(fallback)
+                self._add_route(fallback)
+            except (ValueError, ImportError) as e:
+                logger.warning(f"Fallback provider {fallback} unavailable: {e}")
+                
+        logger.info(f"Provider routing order: {', '.join(self.router.order)}")
+    
+    @property
+    def client(self):
+        """Client of the primary provider"""
+        return self.clients.get(self.provider)
+    
+    def _init_client(self, provider: str):
+        """
+        Create the API client for a provider
         
-        # Initialize the appropriate client
-        if self.provider == "claude":
+        Args:
+            provider (str): 'claude', 'openai' or 'local'
+            
+        Raises:
+            ValueError: If the provider is unknown or its API key is missing
+            ImportError: If the provider's SDK isn't installed
+        """
+        if provider == "claude":
             if not Config.ANTHROPIC_API_KEY:
                 raise ValueError("ANTHROPIC_API_KEY not set in .env")
-            self.client = anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+            if anthropic is None:
+                raise ImportError("anthropic package not installed (pip install anthropic)")
+            self.clients[provider] = anthropic.Anthropic(
+                api_key=Config.ANTHROPIC_API_KEY,
+                # Retries and backoff are handled by the router
+                max_retries=0
+            )
             logger.info("Initialized Claude AI client")
             
-        elif self.provider == "openai":
+        elif provider == "openai":
             if not Config.OPENAI_API_KEY:
                 raise ValueError("OPENAI_API_KEY not set in .env")
-            openai.api_key = Config.OPENAI_API_KEY
-            self.client = openai
+            if openai is None:
+                raise ImportError("openai package not installed (pip install openai)")
+            self.clients[provider] = openai.OpenAI(api_key=Config.OPENAI_API_KEY, max_retries=0)
             logger.info("Initialized OpenAI client")
             
-        elif self.provider == "local":
+        elif provider == "local":
+            self.clients[provider] = LocalLLMManager()
+            if Config.LOCAL_LLM_WARMUP:
+                self.clients[provider].start()
             logger.info(f"Using local LLM at {Config.LOCAL_LLM_URL}")
             
         else:
-            raise ValueError(f"Unknown AI provider: {self.provider}")
+            raise ValueError(f"Unknown AI provider: {provider}")
+    
+    def _add_route(self, provider: str):
+        """Register a provider's generate function and rate limits with the router"""
+        calls = {
+            'claude': self._generate_claude,
+            'openai': self._generate_openai,
+            'local': self._generate_local,
+        }
+        limits = Config.PROVIDER_RATE_LIMITS.get(provider, (0, 0))
+        self.router.add_provider(provider, calls[provider], *limits)
     
     def load_system_prompt(self, prompt_type: str = "base") -> str:
         """
@@ -92,7 +162,8 @@ import bpy
         user_prompt: str,
         prompt_type: str = "base",
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        profile: Optional[Dict[str, any]] = None
     ) -> str:
         """
         Generate Blender Python code from user prompt
@@ -101,13 +172,14 @@ import bpy
             user_prompt (str): User's natural language description
             prompt_type (str): Type of specialized prompt to use
             temperature (float, optional): Generation temperature
-            max_tokens (int, optional): Maximum tokens to generate
+            max_tokens (int, optional): Maximum tokens to generate, predicted from profile if None
+            profile (dict, optional): Processed prompt, used to budget output tokens
             
         Returns:
             str: Generated Python code
         """
         temperature = temperature or Config.TEMPERATURE
-        max_tokens = max_tokens or Config.MAX_TOKENS
+        max_tokens = max_tokens or self.budget.max_tokens(profile, provider=self.provider)
         
         # Load appropriate system prompt
         system_prompt = self.load_system_prompt(prompt_type)
@@ -115,14 +187,8 @@ import bpy
         logger.info(f"Generating code with {self.provider} for: {user_prompt[:50]}...")
         
         try:
-            if self.provider == "claude":
-                code = self._generate_claude(user_prompt, system_prompt, temperature, max_tokens)
-            elif self.provider == "openai":
-                code = self._generate_openai(user_prompt, system_prompt, temperature, max_tokens)
-            elif self.provider == "local":
-                code = self._generate_local(user_prompt, system_prompt, temperature, max_tokens)
-            else:
-                raise ValueError(f"Unknown provider: {self.provider}")
+            completion = self.router.generate(user_prompt, system_prompt, temperature, max_tokens)
+            code = self.complete(completion, user_prompt, system_prompt, temperature, max_tokens, profile)
             
             # Clean the code
             cleaned_code = self._clean_code(code)
@@ -134,86 +200,129 @@ import bpy
             logger.error(f"Code generation failed: {e}")
             raise
     
-    def _generate_claude(
+    def complete(
         self,
+        completion: Completion,
         user_prompt: str,
         system_prompt: str,
         temperature: float,
-        max_tokens: int
+        max_tokens: int,
+        profile: Optional[Dict[str, any]] = None
     ) -> str:
+        """
+        Continue a reply that was cut off, and record its token spend
+        
+        Args:
+            completion (Completion): First reply
+            user_prompt (str): Prompt the reply answers
+            system_prompt (str): System prompt used
+            temperature (float): Generation temperature
+            max_tokens (int): Output token limit per request
+            profile (dict, optional): Processed prompt the spend is recorded under
+            
+        Returns:
+            str: Full reply text
+        """
+        text = completion.text
+        output_tokens = completion.output_tokens
+        truncated = self.budget.is_truncated(text, completion.truncated)
+        continuations = 0
+        
+        while (
+            self.budget.is_truncated(text, completion.truncated)
+            and continuations < Config.TOKEN_BUDGET_MAX_CONTINUATIONS
+        ):
+            continuations += 1
+            logger.info(f"Reply cut off after {output_tokens} tokens, requesting continuation {continuations}")
+            completion = self.router.generate(user_prompt, system_prompt, temperature, max_tokens, partial=text)
+            text = self._join_continuation(text, completion.text)
+            output_tokens += completion.output_tokens
+            
+        self.budget.record(profile, output_tokens, max_tokens, truncated, continuations)
+        return text
+    
+    def _join_continuation(self, partial: str, continuation: str) -> str:
+        """Append a continuation to the text it continues"""
+        if partial.count("```") % 2 == 1 and continuation.lstrip().startswith("```"):
+            # The model re-opened the code block it was in the middle of
+            continuation = continuation.lstrip().partition('\n')[2]
+        if continuation[:1].isspace():
+            # Prefilled replies are sent without trailing whitespace
+            return partial.rstrip() + continuation
+        return partial + continuation
+    
+    def _generate_claude(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        partial: str = ''
+    ) -> Completion:
         """Generate code using Claude API"""
-        message = self.client.messages.create(
+        messages = [
+            {"role": "user", "content": user_prompt}
+        ]
+        if partial:
+            # Prefill the reply with the cut-off text so Claude carries on from it
+            messages.append({"role": "assistant", "content": partial.rstrip()})
+            
+        message = self.clients['claude'].messages.create(
             model=Config.CLAUDE_MODEL,
             max_tokens=max_tokens,
             temperature=temperature,
             system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
+            messages=messages
         )
         
-        return message.content[0].text
+        text = ''.join(block.text for block in message.content if block.type == 'text')
+        return Completion(text, message.stop_reason == 'max_tokens', message.usage.output_tokens)
     
     def _generate_openai(
         self,
         user_prompt: str,
         system_prompt: str,
         temperature: float,
-        max_tokens: int
-    ) -> str:
+        max_tokens: int,
+        partial: str = ''
+    ) -> Completion:
         """Generate code using OpenAI API"""
-        response = self.client.ChatCompletion.create(
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        if partial:
+            messages.append({"role": "assistant", "content": partial})
+            messages.append({"role": "user", "content": self.CONTINUE_PROMPT})
+            
+        response = self.clients['openai'].chat.completions.create(
             model=Config.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=messages,
             temperature=temperature,
             max_tokens=max_tokens
         )
         
-        return response.choices[0].message.content
+        choice = response.choices[0]
+        usage = response.usage
+        return Completion(choice.message.content, choice.finish_reason == 'length', usage.completion_tokens if usage else None)
     
     def _generate_local(
         self,
         user_prompt: str,
         system_prompt: str,
         temperature: float,
-        max_tokens: int
-    ) -> str:
+        max_tokens: int,
+        partial: str = ''
+    ) -> Completion:
         """Generate code using local LLM (Ollama, etc.)"""
         full_prompt = f"{system_prompt}\n\nUser request: {user_prompt}\n\nGenerate the Python code:"
+        if partial:
+            full_prompt += f"\n\n{partial}\n\n{self.CONTINUE_PROMPT}"
         
-        # Build payload with enhanced configuration
-        payload = {
-            "model": Config.LOCAL_LLM_MODEL,
-            "prompt": full_prompt,
-            "stream": False,
-            "options": {
-                "temperature": Config.LOCAL_LLM_TEMPERATURE,
-                "num_predict": Config.LOCAL_LLM_MAX_TOKENS,
-                "num_ctx": Config.LOCAL_LLM_CONTEXT_SIZE,
-            }
-        }
-        
-        # Add optional GPU/CPU settings if configured
-        if hasattr(Config, 'LOCAL_LLM_GPU_LAYERS') and Config.LOCAL_LLM_GPU_LAYERS != 0:
-            payload["options"]["num_gpu"] = Config.LOCAL_LLM_GPU_LAYERS
-        
-        if hasattr(Config, 'LOCAL_LLM_BATCH_SIZE'):
-            payload["options"]["num_batch"] = Config.LOCAL_LLM_BATCH_SIZE
-        
-        if hasattr(Config, 'LOCAL_LLM_NUM_THREADS') and Config.LOCAL_LLM_NUM_THREADS > 0:
-            payload["options"]["num_thread"] = Config.LOCAL_LLM_NUM_THREADS
-        
-        if hasattr(Config, 'LOCAL_LLM_USE_MMAP'):
-            payload["options"]["use_mmap"] = Config.LOCAL_LLM_USE_MMAP
-        
-        # Make request with timeout
-        response = requests.post(Config.LOCAL_LLM_URL, json=payload, timeout=120)
-        response.raise_for_status()
-        
-        return response.json()["response"]
+        data = self.clients['local'].generate(full_prompt, max_tokens)
+        # Older Ollama versions don't report done_reason
+        truncated = data['done_reason'] == 'length' if data.get('done_reason') else None
+        return Completion(data["response"], truncated, data.get('eval_count'))
     
     def _clean_code(self, raw_code: str) -> str:
         """
@@ -0,0 +1,440 @@
+import os
+import io
+import gzip
+import time
+import filecmp
+import shutil
+import hashlib
+import sqlite3
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List, Union, BinaryIO
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl that asks Btrfs/XFS to share extents between two files
+FICLONE = 0x40049409
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for prompts, scripts and Blender outputs
+    
+    Objects are keyed by the SHA-256 of their content and written once;
+    output files in generated/ and output/ become hardlinks (or reflinks)
+    to them, so identical artifacts take space only once. An SQLite index
+    ties each job's prompt, generated script, combined script and outputs
+    together so they can be traced and garbage collected as a group.
+    """
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS objects (
+        sha256 TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        stored_size INTEGER NOT NULL,
+        compressed INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS artifacts (
+        job_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        sha256 TEXT NOT NULL REFERENCES objects (sha256),
+        path TEXT NOT NULL DEFAULT '',
+        created_at REAL NOT NULL,
+        PRIMARY KEY (job_id, role, path)
+    );
+    CREATE INDEX IF NOT EXISTS artifacts_sha ON artifacts (sha256);
+    CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (created_at);
+    """
+    
+    # Pipeline order of the roles that make up a job's lineage
+    ROLES = ['prompt', 'generated', 'combined', 'failed', 'render', 'export', 'blend']
+    
+    def __init__(self, root: Optional[Path] = None, link_mode: Optional[str] = None):
+        """
+        Initialize Artifact Store
+        
+        Args:
+            root (Path, optional): Store directory, defaults to config
+            link_mode (str, optional): 'hardlink', 'reflink' or 'copy'
+        """
+        self.root = root or Config.ARTIFACT_STORE_DIR
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.link_mode = (link_mode or Config.ARTIFACT_LINK_MODE).lower()
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+    
+    def object_path(self, sha256: str) -> Path:
+        """Location of an object, fanned out by the first two hex digits"""
+        return self.objects_dir / sha256[:2] / sha256[2:]
+    
+    def put_bytes(
+        self,
+        data: Union[bytes, str],
+        role: str,
+        job_id: str,
+        link_to: Optional[Path] = None
+    ) -> str:
+        """
+        Store in-memory content
+        
+        Args:
+            data (bytes or str): Content; str is encoded as UTF-8
+            role (str): Artifact role ('prompt', 'generated', 'combined', ...)
+            job_id (str): Job the artifact belongs to
+            link_to (Path, optional): Also materialize the content at this path
+            
+        Returns:
+            str: SHA-256 of the content
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+        
+        if not self._has_object(sha256):
+            self._write_object(sha256, io.BytesIO(data), compress=False)
+        self._index(job_id, role, sha256, link_to)
+        
+        if link_to is not None:
+            self._materialize(sha256, Path(link_to))
+        return sha256
+    
+    def put_file(self, path: Path, role: str, job_id: str, compress: Optional[bool] = None) -> Optional[str]:
+        """
+        Move an output file into the store and leave a link in its place
+        
+        Args:
+            path (Path): Existing output file
+            role (str): Artifact role ('render', 'export', 'blend', ...)
+            job_id (str): Job the artifact belongs to
+            compress (bool, optional): Store gzip-compressed, defaults to
+                ARTIFACT_COMPRESS_BLEND for .blend files
+                
+        Returns:
+            str or None: SHA-256 of the content, None if the file is missing
+        """
+        path = Path(path)
+        if not path.is_file():
+            return None
+        if compress is None:
+            compress = Config.ARTIFACT_COMPRESS_BLEND and path.suffix == '.blend'
+            
+        sha256 = self._hash_file(path)
+        if not self._has_object(sha256):
+            with open(path, 'rb') as f:
+                magic = f.read(4)
+                # Don't compress twice if Blender already wrote a gzip/zstd .blend
+                if compress and (magic[:2] == b'\x1f\x8b' or magic == b'\x28\xb5\x2f\xfd'):
+                    compress = False
+                f.seek(0)
+                self._write_object(sha256, f, compress=compress)
+        self._index(job_id, role, sha256, path)
+        self._materialize(sha256, path)
+        return sha256
+    
+    def link_existing(self, sha256: str, role: str, job_id: str, path: Path) -> bool:
+        """
+        Attach an already stored object to another job
+        
+        Args:
+            sha256 (str): Object hash
+            role (str): Artifact role for the new job
+            job_id (str): Job to attach it to
+            path (Path): Where to materialize it
+            
+        Returns:
+            bool: False if the object is no longer in the store
+        """
+        if not self._has_object(sha256):
+            return False
+        self._index(job_id, role, sha256, path)
+        self._materialize(sha256, Path(path))
+        return True
+    
+    def detach(self, path: Path, keep_content: bool = False):
+        """
+        Make sure writing to an output path can't change a stored object
+        
+        Outputs are links to store objects shared with other jobs, and
+        Blender overwrites files in place (as root the read-only mode
+        doesn't stop it). Call this before a run writes to the path again.
+        
+        Args:
+            path (Path): Output path a run is about to write
+            keep_content (bool): Leave a private copy instead of removing it,
+                for a file the run also reads, such as a resumed .blend
+        """
+        path = Path(path)
+        if not path.is_file():
+            return
+        if not keep_content:
+            path.unlink()
+            return
+        if os.stat(path).st_nlink == 1:
+            return
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            shutil.copyfile(path, tmp_path)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
+    def lineage(self, job_id: str) -> List[Dict[str, any]]:
+        """
+        Artifacts of a job in pipeline order
+        
+        Args:
+            job_id (str): Job id
+            
+        Returns:
+            list: Rows with role, sha256, path and size
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.role, a.sha256, a.path, a.created_at, o.size, o.stored_size, o.compressed "
+                "FROM artifacts a JOIN objects o ON o.sha256 = a.sha256 WHERE a.job_id = ?",
+                (job_id,)
+            ).fetchall()
+        order = {role: index for index, role in enumerate(self.ROLES)}
+        return sorted((dict(row) for row in rows), key=lambda row: order.get(row['role'], len(order)))
+    
+    def jobs_with(self, sha256: str) -> List[str]:
+        """Jobs that produced or used the given content"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT job_id FROM artifacts WHERE sha256 = ?", (sha256,)).fetchall()
+        return [row['job_id'] for row in rows]
+    
+    def read(self, sha256: str) -> bytes:
+        """
+        Content of an object, decompressed
+        
+        Args:
+            sha256 (str): Object hash
+            
+        Returns:
+            bytes: Original content
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT compressed FROM objects WHERE sha256 = ?", (sha256,)).fetchone()
+        if row is None:
+            raise KeyError(sha256)
+        data = self.object_path(sha256).read_bytes()
+        return gzip.decompress(data) if row['compressed'] else data
+    
+    def stats(self) -> Dict[str, any]:
+        """Object count, logical size, stored size and job count"""
+        with self._lock:
+            objects = self._conn.execute(
+                "SELECT COUNT(*) AS objects, COALESCE(SUM(size), 0) AS size, "
+                "COALESCE(SUM(stored_size), 0) AS stored_size FROM objects"
+            ).fetchone()
+            jobs = self._conn.execute("SELECT COUNT(DISTINCT job_id) FROM artifacts").fetchone()[0]
+            referenced = self._conn.execute(
+                "SELECT COALESCE(SUM(o.size), 0) FROM artifacts a JOIN objects o ON o.sha256 = a.sha256"
+            ).fetchone()[0]
+        result = dict(objects)
+        result['jobs'] = jobs
+        # What the same artifacts would take without deduplication or compression
+        result['logical_size'] = referenced
+        return result
+    
+    def gc(
+        self,
+        retention_days: Optional[float] = None,
+        keep_last: Optional[int] = None,
+        max_size_mb: Optional[float] = None,
+        dry_run: bool = False
+    ) -> Dict[str, any]:
+        """
+        Drop old jobs and delete objects nothing refers to any more
+        
+        A job is kept if it is among the keep_last most recent ones;
+        otherwise it is dropped when older than retention_days, or, oldest
+        first, while the store is larger than max_size_mb. Output files
+        that are still links to a dropped object are removed as well.
+        
+        Args:
+            retention_days (float, optional): Age limit, 0 disables
+            keep_last (int, optional): Most recent jobs always kept
+            max_size_mb (float, optional): Store size budget, 0 disables
+            dry_run (bool): Report without deleting anything
+            
+        Returns:
+            dict: jobs_removed, objects_removed and bytes_freed
+        """
+        retention_days = retention_days if retention_days is not None else Config.ARTIFACT_RETENTION_DAYS
+        keep_last = keep_last if keep_last is not None else Config.ARTIFACT_KEEP_LAST
+        max_size_mb = max_size_mb if max_size_mb is not None else Config.ARTIFACT_MAX_SIZE_MB
+        
+        with self._lock:
+            jobs = self._conn.execute(
+                "SELECT job_id, MAX(created_at) AS created_at FROM artifacts GROUP BY job_id ORDER BY created_at DESC"
+            ).fetchall()
+            job_sizes = dict(self._conn.execute(
+                "SELECT a.job_id, SUM(o.stored_size) FROM artifacts a JOIN objects o ON o.sha256 = a.sha256 GROUP BY a.job_id"
+            ).fetchall())
+            total_size = self._conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM objects").fetchone()[0]
+            
+        candidates = jobs[keep_last:] if keep_last else list(jobs)
+        cutoff = time.time() - retention_days * 86400 if retention_days else None
+        budget = max_size_mb * 1024 * 1024 if max_size_mb else None
+        
+        doomed = []
+        # Oldest first, so the size budget evicts the least recent work
+        for job in reversed(candidates):
+            if cutoff is not None and job['created_at'] < cutoff:
+                doomed.append(job['job_id'])
+            elif budget is not None and total_size > budget:
+                doomed.append(job['job_id'])
+            else:
+                continue
+            # Shared objects may survive, so this is an upper bound on what's freed
+            total_size -= job_sizes.get(job['job_id'], 0)
+            
+        report = {'jobs_removed': len(doomed), 'objects_removed': 0, 'bytes_freed': 0}
+        if dry_run or not doomed:
+            return report
+            
+        with self._lock, self._conn:
+            for job_id in doomed:
+                for row in self._conn.execute("SELECT sha256, path FROM artifacts WHERE job_id = ?", (job_id,)).fetchall():
+                    self._remove_link(row['path'], row['sha256'])
+                self._conn.execute("DELETE FROM artifacts WHERE job_id = ?", (job_id,))
+                
+            orphans = self._conn.execute(
+                "SELECT sha256, stored_size FROM objects WHERE sha256 NOT IN (SELECT sha256 FROM artifacts)"
+            ).fetchall()
+            for row in orphans:
+                try:
+                    self.object_path(row['sha256']).unlink()
+                except FileNotFoundError:
+                    pass
+                self._conn.execute("DELETE FROM objects WHERE sha256 = ?", (row['sha256'],))
+                report['objects_removed'] += 1
+                report['bytes_freed'] += row['stored_size']
+                
+        logger.info(
+            f"Artifact GC removed {report['jobs_removed']} jobs, {report['objects_removed']} objects, "
+            f"{report['bytes_freed'] / (1024 * 1024):.1f} MB"
+        )
+        return report
+    
+    def _has_object(self, sha256: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM objects WHERE sha256 = ?", (sha256,)).fetchone()
+        return row is not None and self.object_path(sha256).exists()
+    
+    def _hash_file(self, path: Path) -> str:
+        """SHA-256 of a file, read in chunks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _write_object(self, sha256: str, source: BinaryIO, compress: bool):
+        """Stream an object into place atomically and make it read-only"""
+        target = self.object_path(sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                out = gzip.GzipFile(fileobj=f, mode='wb', compresslevel=Config.ARTIFACT_COMPRESS_LEVEL) if compress else f
+                for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                    out.write(chunk)
+                    size += len(chunk)
+                if compress:
+                    out.close()
+                stored_size = f.tell()
+            os.chmod(tmp_name, 0o444)
+            os.replace(tmp_name, target)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+            
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO objects (sha256, size, stored_size, compressed, created_at) VALUES (?, ?, ?, ?, ?)",
+                (sha256, size, stored_size, int(compress), time.time())
+            )
+    
+    def _index(self, job_id: str, role: str, sha256: str, path: Optional[Path]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (job_id, role, sha256, path, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, role, sha256, str(path) if path else '', time.time())
+            )
+    
+    def _materialize(self, sha256: str, path: Path):
+        """
+        Make path refer to the stored object
+        
+        Compressed objects are linked as-is (Blender reads gzip .blend
+        files), so the kept output shrinks too.
+        """
+        source = self.object_path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and os.path.samefile(source, path):
+            return
+            
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            self._link(source, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning(f"Could not link {path} to the artifact store: {e}")
+    
+    def _link(self, source: Path, target: Path):
+        """Hardlink, reflink or copy, falling back in that order"""
+        if self.link_mode == 'hardlink':
+            try:
+                os.link(source, target)
+                return
+            except OSError as e:
+                logger.debug(f"Hardlink failed ({e}), trying reflink")
+        if self.link_mode in ('hardlink', 'reflink') and fcntl is not None:
+            try:
+                with open(source, 'rb') as src, open(target, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError as e:
+                target.unlink(missing_ok=True)
+                logger.debug(f"Reflink failed ({e}), copying")
+        shutil.copyfile(source, target)
+    
+    def _remove_link(self, path: Optional[str], sha256: str):
+        """Delete an output file if it still holds the given object's content"""
+        if not path:
+            return
+        source = self.object_path(sha256)
+        try:
+            # Reflinks and copies aren't the same inode; compare bytes instead
+            if os.path.samefile(path, source) or filecmp.cmp(path, source, shallow=False):
+                os.unlink(path)
+        except OSError:
+            pass
+    
+    def close(self):
+        """Close the index connection"""
+        with self._lock:
+            self._conn.close()
\ No newline at end of file
@@ -0,0 +1,128 @@
+import re
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+MODULE_NAME = "blender_assets"
+LIBRARY_FILE = "library.blend"
+MANIFEST_FILE = "manifest.json"
+
+# Helper used to bring each asset type into the scene
+HELPERS = {
+    'material': 'material',
+    'node_group': 'node_group',
+    'prop': 'prop',
+}
+
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+class AssetLibrary:
+    """
+    Manifest of the prebuilt asset library
+    
+    The library is a .blend of materials, node groups and props built by
+    tools/build_asset_library.py; generated scripts link from it through
+    the blender_assets helper instead of rebuilding the same node trees and
+    meshes every run. The manifest lists what is in it so prompts can say
+    which assets fit the request.
+    """
+    
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Initialize Asset Library
+        
+        Args:
+            directory (Path, optional): Library directory, defaults to ASSET_LIBRARY_DIR
+        """
+        self.directory = Path(directory or Config.ASSET_LIBRARY_DIR)
+        self.library_path = self.directory / LIBRARY_FILE
+        self.manifest_path = self.directory / MANIFEST_FILE
+        self.manifest = self._load()
+    
+    def _load(self) -> Optional[Dict]:
+        if not self.manifest_path.exists() or not self.library_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable asset manifest {self.manifest_path}: {e}")
+            return None
+        if manifest.get('format') != MANIFEST_FORMAT:
+            logger.warning(f"Asset manifest {self.manifest_path} has format {manifest.get('format')}, expected {MANIFEST_FORMAT}; rebuild the library")
+            return None
+        return manifest
+    
+    @property
+    def available(self) -> bool:
+        return self.manifest is not None
+    
+    @property
+    def assets(self) -> List[Dict]:
+        return self.manifest.get('assets', []) if self.manifest else []
+    
+    @property
+    def sha256(self) -> Optional[str]:
+        """Hash of library.blend recorded when it was built"""
+        return self.manifest.get('sha256') if self.manifest else None
+    
+    @staticmethod
+    def _words(text: str) -> set:
+        # Crude singular forms so "vases" finds "Vase"
+        return {word[:-1] if len(word) > 3 and word.endswith('s') else word for word in WORD_PATTERN.findall(text.lower())}
+    
+    def match(self, prompt: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Assets whose name or tags appear in a prompt
+        
+        Args:
+            prompt (str): User prompt
+            limit (int, optional): Most assets to return, defaults to ASSET_PROMPT_LIMIT
+            
+        Returns:
+            list: Manifest entries, best match first
+        """
+        words = self._words(prompt)
+        scored = []
+        for position, asset in enumerate(self.assets):
+            name_words = self._words(asset['name'])
+            score = 2 * len(name_words & words) + len(self._words(' '.join(asset.get('tags', []))) & words)
+            if score:
+                scored.append((-score, position, asset))
+        scored.sort(key=lambda item: item[:2])
+        return [asset for _, _, asset in scored[:limit or Config.ASSET_PROMPT_LIMIT]]
+    
+    def guidance(self, prompt: str) -> str:
+        """
+        Prompt text naming the library assets that fit a request
+        
+        Args:
+            prompt (str): User prompt
+            
+        Returns:
+            str: Guidance sentence, empty when nothing matches
+        """
+        matches = self.match(prompt)
+        if not matches:
+            return ""
+        calls = ', '.join(
+            f"{HELPERS[asset['type']]}({asset['name']!r}) ({asset['description']})"
+            for asset in matches
+        )
+        helpers = ', '.join(sorted({HELPERS[asset['type']] for asset in matches}))
+        return (
+            f" Prebuilt assets are available; link them with `from {MODULE_NAME} import {helpers}` "
+            f"instead of building them: {calls}. material() and node_group() return the datablock, "
+            f"prop() places an instance and accepts location, rotation and scale."
+        )
+    
+    @staticmethod
+    def uses_library(code: str) -> bool:
+        return MODULE_NAME in code
\ No newline at end of file
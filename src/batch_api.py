@@ -0,0 +1,432 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, List, Tuple, Callable
+
+import requests
+
+from config import Config
+from provider_router import Completion
+
+logger = logging.getLogger(__name__)
+
+
+class AnthropicBatchAPI:
+    """Anthropic Message Batches over plain HTTP"""
+    
+    VERSION = "2023-06-01"
+    
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Initialize Anthropic Batch API
+        
+        Args:
+            base_url (str, optional): API root, defaults to config (point at a stand-in server for testing)
+            api_key (str, optional): API key, defaults to config
+        """
+        self.base_url = (base_url or Config.BATCH_API_ANTHROPIC_URL).rstrip('/')
+        self.session = requests.Session()
+        self.session.headers.update({
+            'x-api-key': api_key or Config.ANTHROPIC_API_KEY or '',
+            'anthropic-version': self.VERSION,
+        })
+    
+    def build_request(
+        self,
+        custom_id: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, any]:
+        """One entry of the batch's 'requests' list"""
+        return {
+            'custom_id': custom_id,
+            'params': {
+                'model': Config.CLAUDE_MODEL,
+                'max_tokens': max_tokens,
+                'temperature': temperature,
+                'system': system_prompt,
+                'messages': [{'role': 'user', 'content': user_prompt}],
+            },
+        }
+    
+    def submit(self, batch_requests: List[Dict[str, any]]) -> str:
+        """
+        Create a message batch
+        
+        Args:
+            batch_requests (list): Entries from build_request()
+            
+        Returns:
+            str: Batch id
+        """
+        response = self.session.post(
+            f"{self.base_url}/v1/messages/batches",
+            json={'requests': batch_requests},
+            timeout=Config.BATCH_API_HTTP_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()['id']
+    
+    def status(self, batch_id: str) -> Tuple[bool, Dict[str, any]]:
+        """
+        Check a batch
+        
+        Args:
+            batch_id (str): Batch id
+            
+        Returns:
+            tuple: (ended, batch object)
+        """
+        response = self.session.get(f"{self.base_url}/v1/messages/batches/{batch_id}", timeout=Config.BATCH_API_HTTP_TIMEOUT)
+        response.raise_for_status()
+        batch = response.json()
+        return batch['processing_status'] == 'ended', batch
+    
+    def results(self, batch: Dict[str, any]) -> Dict[str, Tuple[Optional[Completion], Optional[str]]]:
+        """
+        Download the results of an ended batch
+        
+        Args:
+            batch (dict): Batch object from status()
+            
+        Returns:
+            dict: custom_id -> (completion, error); completion is None when the request failed
+        """
+        url = batch.get('results_url') or f"{self.base_url}/v1/messages/batches/{batch['id']}/results"
+        response = self.session.get(url, timeout=Config.BATCH_API_HTTP_TIMEOUT)
+        response.raise_for_status()
+        
+        results = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            result = entry['result']
+            if result['type'] == 'succeeded':
+                message = result['message']
+                text = ''.join(block.get('text', '') for block in message['content'] if block.get('type') == 'text')
+                completion = Completion(
+                    text,
+                    message['stop_reason'] == 'max_tokens' if message.get('stop_reason') else None,
+                    (message.get('usage') or {}).get('output_tokens')
+                )
+                results[entry['custom_id']] = (completion, None)
+            else:
+                error = result.get('error') or {}
+                results[entry['custom_id']] = (None, error.get('message') or result['type'])
+        return results
+
+
+class OpenAIBatchAPI:
+    """OpenAI Batch API (JSONL file upload) over plain HTTP"""
+    
+    ENDPOINT = "/v1/chat/completions"
+    ENDED = {'completed', 'failed', 'expired', 'cancelled'}
+    
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Initialize OpenAI Batch API
+        
+        Args:
+            base_url (str, optional): API root, defaults to config (point at a stand-in server for testing)
+            api_key (str, optional): API key, defaults to config
+        """
+        self.base_url = (base_url or Config.BATCH_API_OPENAI_URL).rstrip('/')
+        self.session = requests.Session()
+        self.session.headers.update({'Authorization': f"Bearer {api_key or Config.OPENAI_API_KEY or ''}"})
+    
+    def build_request(
+        self,
+        custom_id: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, any]:
+        """One line of the batch input file"""
+        return {
+            'custom_id': custom_id,
+            'method': 'POST',
+            'url': self.ENDPOINT,
+            'body': {
+                'model': Config.OPENAI_MODEL,
+                'messages': [
+                    {'role': 'system', 'content': system_prompt},
+                    {'role': 'user', 'content': user_prompt},
+                ],
+                'temperature': temperature,
+                'max_tokens': max_tokens,
+            },
+        }
+    
+    def submit(self, batch_requests: List[Dict[str, any]]) -> str:
+        """
+        Upload the input file and create a batch
+        
+        Args:
+            batch_requests (list): Entries from build_request()
+            
+        Returns:
+            str: Batch id
+        """
+        data = '\n'.join(json.dumps(entry) for entry in batch_requests).encode('utf-8')
+        response = self.session.post(
+            f"{self.base_url}/v1/files",
+            data={'purpose': 'batch'},
+            files={'file': ('batch.jsonl', data, 'application/jsonl')},
+            timeout=Config.BATCH_API_HTTP_TIMEOUT
+        )
+        response.raise_for_status()
+        
+        response = self.session.post(
+            f"{self.base_url}/v1/batches",
+            json={
+                'input_file_id': response.json()['id'],
+                'endpoint': self.ENDPOINT,
+                'completion_window': '24h',
+            },
+            timeout=Config.BATCH_API_HTTP_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()['id']
+    
+    def status(self, batch_id: str) -> Tuple[bool, Dict[str, any]]:
+        """
+        Check a batch
+        
+        Args:
+            batch_id (str): Batch id
+            
+        Returns:
+            tuple: (ended, batch object)
+        """
+        response = self.session.get(f"{self.base_url}/v1/batches/{batch_id}", timeout=Config.BATCH_API_HTTP_TIMEOUT)
+        response.raise_for_status()
+        batch = response.json()
+        return batch['status'] in self.ENDED, batch
+    
+    def results(self, batch: Dict[str, any]) -> Dict[str, Tuple[Optional[Completion], Optional[str]]]:
+        """
+        Download the results of an ended batch
+        
+        Expired or cancelled batches still have output for the requests
+        that completed in time; the rest are reported in the error file or
+        not at all, and count as failed.
+        
+        Args:
+            batch (dict): Batch object from status()
+            
+        Returns:
+            dict: custom_id -> (completion, error); completion is None when the request failed
+        """
+        results = {}
+        for key in ('error_file_id', 'output_file_id'):
+            file_id = batch.get(key)
+            if not file_id:
+                continue
+            response = self.session.get(f"{self.base_url}/v1/files/{file_id}/content", timeout=Config.BATCH_API_HTTP_TIMEOUT)
+            response.raise_for_status()
+            
+            for line in response.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                reply = entry.get('response') or {}
+                if reply.get('status_code') == 200:
+                    choice = reply['body']['choices'][0]
+                    completion = Completion(
+                        choice['message']['content'],
+                        choice['finish_reason'] == 'length' if choice.get('finish_reason') else None,
+                        (reply['body'].get('usage') or {}).get('completion_tokens')
+                    )
+                    results[entry['custom_id']] = (completion, None)
+                else:
+                    error = entry.get('error') or (reply.get('body') or {}).get('error') or {}
+                    results[entry['custom_id']] = (None, error.get('message') or f"status {reply.get('status_code')}")
+        return results
+
+
+class BatchGenerator:
+    """
+    Offline code generation through provider batch APIs
+    
+    Prompts are packed into provider batches of at most
+    BATCH_API_CHUNK_SIZE requests, which are polled until they end. Each
+    batch's results are handed to the pipeline as soon as that batch ends,
+    so validation and Blender execution overlap with batches still being
+    processed. Requests that fail, and regenerations after failed
+    validation, use the regular real-time providers.
+    """
+    
+    APIS = {
+        'claude': AnthropicBatchAPI,
+        'openai': OpenAIBatchAPI,
+    }
+    
+    def __init__(
+        self,
+        ai_generator,
+        prompt_processor,
+        journal=None,
+        provider: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict[str, any]], None]] = None
+    ):
+        """
+        Initialize Batch Generator
+        
+        Args:
+            ai_generator (AIGenerator): Supplies system prompts and code cleanup
+            prompt_processor (PromptProcessor): Builds the enhanced prompts
+            journal (JobJournal, optional): Remembers submitted batches so a resumed run polls instead of resubmitting
+            provider (str, optional): 'claude' or 'openai', defaults to config
+            on_progress (callable, optional): Receives batch-level events
+            
+        Raises:
+            ValueError: If the provider has no batch API
+        """
+        self.provider = provider or Config.BATCH_API_PROVIDER or ai_generator.provider
+        if self.provider not in self.APIS:
+            raise ValueError(f"Provider {self.provider} has no batch API (use claude or openai)")
+        self.api = self.APIS[self.provider]()
+        self.ai_generator = ai_generator
+        self.prompt_processor = prompt_processor
+        self.journal = journal
+        self.on_progress = on_progress
+    
+    async def run(self, pipeline, jobs: List) -> List[Dict[str, any]]:
+        """
+        Generate code for jobs through the batch API and run them through a pipeline
+        
+        Args:
+            pipeline (Pipeline): Started pipeline
+            jobs (list): PipelineJob objects
+            
+        Returns:
+            list: Results in the same order as jobs
+        """
+        runs = {}
+        
+        def deliver(job, code: Optional[str] = None):
+            if code:
+                job.code = code
+            runs[job.job_id] = asyncio.ensure_future(pipeline.run_job(job))
+            
+        pending = []
+        resumed = {}
+        for job in jobs:
+            checkpoints = job.checkpoints
+            if 'generated' in checkpoints or 'validated' in checkpoints:
+                # Already generated in an earlier run
+                deliver(job)
+            elif checkpoints.get('batch', {}).get('content'):
+                resumed.setdefault(checkpoints['batch']['content'], []).append(job)
+            else:
+                pending.append(job)
+                
+        waits = []
+        for batch_id, batch_jobs in resumed.items():
+            self._emit('batch_resumed', batch_id=batch_id, count=len(batch_jobs))
+            waits.append(self._wait(batch_id, batch_jobs, deliver))
+            
+        size = max(1, Config.BATCH_API_CHUNK_SIZE)
+        for start in range(0, len(pending), size):
+            chunk = pending[start:start + size]
+            try:
+                batch_id = await asyncio.to_thread(self._submit, chunk)
+            except Exception as e:
+                logger.error(f"Batch submission failed, generating {len(chunk)} prompts in real time: {e}")
+                self._emit('batch_failed', batch_id=None, count=len(chunk), error=str(e))
+                for job in chunk:
+                    deliver(job)
+                continue
+            self._emit('batch_submitted', batch_id=batch_id, count=len(chunk))
+            waits.append(self._wait(batch_id, chunk, deliver))
+            
+        await asyncio.gather(*waits)
+        return await asyncio.gather(*(runs[job.job_id] for job in jobs))
+    
+    def _submit(self, jobs: List) -> str:
+        """Build and submit one provider batch, and journal its id against each job"""
+        batch_requests = []
+        for job in jobs:
+            user_prompt, system_prompt, temperature, max_tokens, _ = self._request_args(job)
+            batch_requests.append(self.api.build_request(job.job_id, system_prompt, user_prompt, temperature, max_tokens))
+            
+        batch_id = self.api.submit(batch_requests)
+        if self.journal:
+            for job in jobs:
+                self.journal.start_job(job.job_id, job.prompt, job.options, job.batch_id, job.item_index)
+                self.journal.checkpoint(job.job_id, 'batch', content=batch_id)
+        return batch_id
+    
+    async def _wait(self, batch_id: str, jobs: List, deliver: Callable):
+        """Poll a batch until it ends, then deliver its results"""
+        started = time.monotonic()
+        batch = None
+        reported = None
+        while True:
+            try:
+                ended, batch = await asyncio.to_thread(self.api.status, batch_id)
+            except Exception as e:
+                # Transient; the batch keeps running on the provider's side
+                logger.warning(f"Polling batch {batch_id} failed: {e}")
+                ended = False
+            if ended:
+                break
+            progress = batch and (batch.get('processing_status') or batch.get('status'), repr(batch.get('request_counts')))
+            if progress and progress != reported:
+                reported = progress
+                self._emit('batch_status', batch_id=batch_id, batch=batch, elapsed=time.monotonic() - started)
+            await asyncio.sleep(Config.BATCH_API_POLL_SECONDS)
+            
+        try:
+            results = await asyncio.to_thread(self.api.results, batch)
+        except Exception as e:
+            logger.error(f"Reading results of batch {batch_id} failed: {e}")
+            results = {}
+            
+        failed = 0
+        finishing = []
+        for job in jobs:
+            completion, error = results.get(job.job_id, (None, 'missing from batch results'))
+            if completion is None:
+                failed += 1
+                logger.warning(f"Batch request for job {job.job_id} failed ({error}), generating in real time")
+                deliver(job)
+            else:
+                finishing.append(self._finish(job, completion, deliver))
+        await asyncio.gather(*finishing)
+        self._emit('batch_ended', batch_id=batch_id, count=len(jobs), failed=failed, elapsed=time.monotonic() - started)
+    
+    def _request_args(self, job) -> tuple:
+        """Prompt, system prompt, temperature, budgeted max_tokens and profile of a job's request"""
+        processed = self.prompt_processor.process(job.prompt)
+        return (
+            processed['enhanced'],
+            self.ai_generator.load_system_prompt(processed['prompt_type']),
+            Config.TEMPERATURE,
+            self.ai_generator.budget.max_tokens(processed),
+            processed
+        )
+    
+    async def _finish(self, job, completion: Completion, deliver: Callable):
+        """Continue a cut-off batch reply in real time, then deliver the code"""
+        try:
+            text = await asyncio.to_thread(self.ai_generator.complete, completion, *self._request_args(job))
+        except Exception as e:
+            logger.warning(f"Continuing the batch reply for job {job.job_id} failed: {e}")
+            text = completion.text
+        deliver(job, self.ai_generator._clean_code(text))
+    
+    def _emit(self, event_type: str, **fields):
+        if not self.on_progress:
+            return
+        event = {'type': event_type, 'provider': self.provider}
+        event.update(fields)
+        try:
+            self.on_progress(event)
+        except Exception as e:
+            logger.debug(f"Progress callback failed: {e}")
\ No newline at end of file
@@ -1,17 +1,77 @@
+import asyncio
+import re
+import copy
+import json
+import shutil
+import hashlib
 import subprocess
+import threading
 import logging
+import time
+import uuid
 from pathlib import Path
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, Tuple, Union, Callable
 from datetime import datetime
 
 from config import Config
+from output_parser import BlenderOutputParser, OutputBuffer
+from resource_limits import ResourceLimits, PeakRSSMonitor
+from timing_history import TimingHistory
+from artifact_store import ArtifactStore
+from render_cache import RenderCache
+from dry_run import DryRunner
+from compat_rewriter import CompatRewriter
+from material_baker import MaterialBaker
+from lod_export import LodExporter
+from split_render import SplitRenderer
+from cpu_scheduler import CpuScheduler
 
 logger = logging.getLogger(__name__)
 
+# Bootstrap passed to --python-expr: Blender reads the assembled program from
+# stdin, so no intermediate script file has to exist on disk. The asset
+# library directory goes on sys.path for the blender_assets helper.
+STDIN_BOOTSTRAP = (
+    "import sys\n"
+    f"sys.path.insert(0, {str(Config.ASSET_LIBRARY_DIR)!r})\n"
+    "_source = sys.stdin.read()\n"
+    "exec(compile(_source, '<blender_ai>', 'exec'), {'__name__': '__main__'})\n"
+)
+
+
+def new_job_id() -> str:
+    """
+    Create a unique identifier for artifacts of one execution
+    
+    Timestamps alone collide at one-second resolution when several jobs
+    run concurrently, so a random suffix is appended.
+    
+    Returns:
+        str: Identifier like '20260208_193757_1a2b3c4d'
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{timestamp}_{uuid.uuid4().hex[:8]}"
+
 
 class BlenderExecutor:
     """Executes Python scripts in Blender"""
     
+    # Map export formats to Blender operators
+    EXPORT_OPERATORS = {
+        'obj': "bpy.ops.wm.obj_export(filepath=r'{path}')",
+        'fbx': "bpy.ops.export_scene.fbx(filepath=r'{path}')",
+        'gltf': "bpy.ops.export_scene.gltf(filepath=r'{path}')",
+        'stl': "bpy.ops.export_mesh.stl(filepath=r'{path}')",
+        'ply': "bpy.ops.export_mesh.ply(filepath=r'{path}')",
+    }
+    
+    # Rough scene-build cost in seconds by prompt complexity, used until history exists
+    BUILD_SECONDS = {
+        'simple': 20,
+        'medium': 60,
+        'complex': 180,
+    }
+    
     def __init__(self, blender_path: Optional[str] = None):
         """
         Initialize Blender Executor
@@ -20,11 +80,41 @@ class BlenderExecutor:
             blender_path (str, optional): Path to Blender executable
         """
         self.blender_path = blender_path or Config.BLENDER_PATH
+        self.blender_version = None
+        self.timing_history = TimingHistory()
+        self.artifact_store = ArtifactStore() if Config.ARTIFACT_STORE_ENABLED else None
+        
+        # Cached images live in the artifact store
+        self.render_cache = None
+        if Config.RENDER_CACHE_ENABLED:
+            if self.artifact_store:
+                self.render_cache = RenderCache(self.artifact_store)
+            else:
+                logger.warning("Render cache needs the artifact store (ARTIFACT_STORE_ENABLED); disabled")
+                
+        self.material_baker = MaterialBaker()
+        self.lod_exporter = LodExporter() if Config.EXPORT_LODS else None
+        self.split_renderer = SplitRenderer(self) if Config.SPLIT_RENDER_WORKERS > 1 else None
+        # Set by the application when background runs go to cluster agents
+        self.coordinator = None
+        self.cpu_scheduler = CpuScheduler(self.timing_history) if Config.CPU_SCHEDULER_ENABLED else None
         
         # Verify Blender is accessible
         if not self._verify_blender():
             raise ValueError(f"Blender not found or not executable at: {self.blender_path}")
+            
+        # Rewrites outdated API usage for the Blender that runs the code
+        self.compat = None
+        if Config.COMPAT_REWRITE:
+            self.compat = CompatRewriter.for_version(Config.COMPAT_BLENDER_VERSION or self.blender_version)
         
+        # Warm workers for the dry-run gate; created on first use otherwise
+        self.dry_runner = None
+        self._dry_runner_lock = threading.Lock()
+        if Config.DRY_RUN_ENABLED:
+            self.dry_runner = DryRunner(self.blender_path)
+            self.dry_runner.warm()
+            
         logger.info(f"Initialized Blender Executor with: {self.blender_path}")
     
     def _verify_blender(self) -> bool:
@@ -43,6 +133,7 @@ class BlenderExecutor:
             )
             if result.returncode == 0:
                 version_info = result.stdout.split('\n')[0]
+                self.blender_version = version_info.strip()
                 logger.info(f"Found {version_info}")
                 return True
             return False
@@ -50,67 +141,554 @@ class BlenderExecutor:
             logger.error(f"Failed to verify Blender: {e}")
             return False
     
-    def execute_script(
+    def _build_command(self, mode: str, blend_file: Optional[Path] = None, threads: Optional[int] = None) -> list:
+        """
+        Build the Blender command line for a stdin-fed execution
+        
+        Args:
+            mode (str): Execution mode ('background' or 'gui')
+            blend_file (Path, optional): .blend file to open before running the script
+            threads (int, optional): Render/compute threads, Blender's default (all CPUs) if None
+            
+        Returns:
+            list: Command arguments
+        """
+        cmd = [self.blender_path]
+        
+        if mode == "background":
+            cmd.append("--background")
+            
+        if threads:
+            cmd.extend(["--threads", str(threads)])
+            
+        if blend_file:
+            cmd.append(str(blend_file))
+            
+        # Make uncaught Python exceptions visible in the return code
+        cmd.extend(["--python-exit-code", "1", "--python-expr", STDIN_BOOTSTRAP])
+        
+        return cmd
+    
+    @staticmethod
+    def kill_on_error_default(mode: str, blend_file: Optional[Path] = None) -> bool:
+        """
+        Whether Blender is killed on the first uncaught Python error unless the caller says otherwise
+        
+        With KILL_ON_ERROR=auto, GUI runs (which stay open after the script
+        fails) and runs that open an existing .blend (whose loaded scene can
+        take a while to tear down) fail fast; background runs of a fresh
+        scene exit on their own through --python-exit-code.
+        
+        Args:
+            mode (str): Execution mode ('background' or 'gui')
+            blend_file (Path, optional): .blend file opened before the script
+            
+        Returns:
+            bool: True to kill on the first fatal traceback
+        """
+        if Config.KILL_ON_ERROR == "auto":
+            return mode == "gui" or blend_file is not None
+        return Config.KILL_ON_ERROR == "true"
+    
+    def dry_run(self, code: str, timeout: Optional[float] = None) -> Dict[str, any]:
+        """
+        Run scene-building code alone in a warm, factory-reset Blender
+        
+        Nothing is rendered, exported or saved; the result comes back as soon
+        as the script finishes or raises.
+        
+        Args:
+            code (str): Generated scene-building code
+            timeout (float, optional): Seconds to wait, defaults to DRY_RUN_TIMEOUT
+            
+        Returns:
+            dict: See DryRunWorker.run
+        """
+        with self._dry_runner_lock:
+            if self.dry_runner is None:
+                self.dry_runner = DryRunner(self.blender_path)
+        return self.dry_runner.run(code, timeout)
+    
+    def execute_code(
         self,
-        script_path: Path,
+        code: str,
         mode: Optional[str] = None,
-        timeout: int = 300
+        timeout: Optional[float] = None,
+        label: str = "<memory>"
     ) -> Tuple[bool, str, str]:
         """
-        Execute a Python script in Blender
+        Execute Python source in Blender by streaming it over stdin
         
         Args:
-            script_path (Path): Path to the Python script
+            code (str): Complete program to run inside Blender
             mode (str, optional): Execution mode ('background' or 'gui')
-            timeout (int): Maximum execution time in seconds
+            timeout (float, optional): Maximum execution time in seconds
+            label (str): Name used for logging
             
         Returns:
             Tuple[bool, str, str]: (success, stdout, stderr)
         """
+        result = asyncio.run(self.execute_code_async(code, mode=mode, timeout=timeout, label=label))
+        return result['success'], result['stdout'], result['stderr']
+    
+    async def execute_code_async(
+        self,
+        code: str,
+        mode: Optional[str] = None,
+        timeout: Optional[float] = None,
+        label: str = "<memory>",
+        on_event: Optional[Callable[[Dict[str, any]], None]] = None,
+        kill_on_error: Optional[bool] = None,
+        limits: Optional[ResourceLimits] = None,
+        blend_file: Optional[Path] = None,
+        kind: str = 'script',
+        key: Optional[str] = None,
+        threads: Optional[int] = None
+    ) -> Dict[str, any]:
+        """
+        Execute Python source in Blender while streaming its output
+        
+        stdout/stderr are read line by line, render progress and tracebacks
+        are reported through on_event as they happen, and only a bounded
+        tail of the output is retained. The process runs in its own process
+        group under the configured memory/CPU limits, and in background
+        mode with the threads and CPUs the CPU scheduler leases it.
+        
+        Args:
+            code (str): Complete program to run inside Blender
+            mode (str, optional): Execution mode ('background' or 'gui')
+            timeout (float, optional): Maximum execution time in seconds
+            label (str): Name used for logging
+            on_event (callable, optional): Called with each parsed event dict
+            kill_on_error (bool, optional): Kill Blender on the first uncaught Python error
+            limits (ResourceLimits, optional): Limits for this job, defaults to config
+            blend_file (Path, optional): .blend file to open before running the code
+            kind (str): 'build', 'render', 'render_chunk', 'stitch' or 'script',
+                which sizes the CPU budget
+            key (str, optional): Job profile key the render budget is learned per
+            threads (int, optional): Explicit thread budget, e.g. a split-render share
+            
+        Returns:
+            dict: success, returncode, stdout, stderr, output_tail, progress,
+                  error, timed_out, limit, peak_rss_mb and elapsed, plus
+                  'agent' when a cluster agent ran it and 'threads' when
+                  the CPU scheduler sized it
+        """
         mode = mode or Config.DEFAULT_MODE
+        timeout = timeout or Config.BLENDER_TIMEOUT
+        if kill_on_error is None:
+            kill_on_error = self.kill_on_error_default(mode, blend_file)
         
-        if not script_path.exists():
-            raise FileNotFoundError(f"Script not found: {script_path}")
+        # Agents apply their own resource limits
+        if self.coordinator and mode == "background":
+            return await self.coordinator.execute_async(
+                code,
+                timeout,
+                label=label,
+                on_event=on_event,
+                kill_on_error=kill_on_error,
+                blend_file=blend_file,
+                kind=kind,
+                key=key,
+                threads=threads
+            )
+            
+        limits = limits or ResourceLimits()
+        if not self.cpu_scheduler or mode != "background":
+            return await self._run_blender(code, mode, timeout, label, on_event, kill_on_error, limits, blend_file)
+            
+        async with self.cpu_scheduler.lease(kind, key=key, threads=threads) as grant:
+            if Config.CPU_AFFINITY:
+                limits.cpus = grant.cpus
+            result = await self._run_blender(
+                code,
+                mode,
+                timeout,
+                label,
+                on_event,
+                kill_on_error,
+                limits,
+                blend_file,
+                threads=grant.threads
+            )
+        result['threads'] = grant.threads
+        if result['success']:
+            self.cpu_scheduler.record(grant, result['elapsed'])
+        return result
+    
+    async def _run_blender(
+        self,
+        code: str,
+        mode: str,
+        timeout: float,
+        label: str,
+        on_event: Optional[Callable[[Dict[str, any]], None]],
+        kill_on_error: bool,
+        limits: ResourceLimits,
+        blend_file: Optional[Path] = None,
+        threads: Optional[int] = None
+    ) -> Dict[str, any]:
+        """Start Blender, feed it the program and follow it to the end; see execute_code_async"""
+        cmd = self._build_command(mode, blend_file, threads)
         
-        # Build command
-        cmd = [self.blender_path]
+        logger.info(f"Executing script in {mode} mode: {label}")
+        logger.debug(f"Command: {self.blender_path} ({len(code)} bytes on stdin, timeout {timeout:.0f}s)")
         
-        if mode == "background":
-            cmd.append("--background")
+        buffer = OutputBuffer(Config.OUTPUT_BUFFER_LINES)
+        parsers = {'stdout': BlenderOutputParser(), 'stderr': BlenderOutputParser()}
+        stop = asyncio.Event()
+        result = {
+            'success': False,
+            'returncode': None,
+            'stdout': '',
+            'stderr': '',
+            'output_tail': [],
+            'progress': None,
+            'error': None,
+            'timed_out': False,
+            'limit': None,
+            'peak_rss_mb': None,
+            'elapsed': 0.0
+        }
         
-        cmd.extend(["--python", str(script_path)])
+        def handle_line(line: str, stream: str):
+            buffer.append(line, stream)
+            for event in parsers[stream].feed(line, stream):
+                # Tracebacks the script handled itself, or from add-ons, are only reported
+                if event['type'] == 'error' and event['fatal'] and result['error'] is None:
+                    result['error'] = event
+                    if kill_on_error:
+                        stop.set()
+                if on_event:
+                    try:
+                        on_event(event)
+                    except Exception as e:
+                        logger.debug(f"Event callback failed: {e}")
+                        
+        started = time.monotonic()
+        limits.prepare(label)
         
-        logger.info(f"Executing script in {mode} mode: {script_path.name}")
-        logger.debug(f"Command: {' '.join(cmd)}")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=Config.BASE_DIR,
+                **limits.subprocess_kwargs()
+            )
+        except Exception as e:
+            logger.error(f"Script execution error: {e}")
+            limits.cleanup()
+            result['stderr'] = str(e)
+            return result
+            
+        limits.attach(process.pid)
+        monitor = PeakRSSMonitor(process.pid, limit_mb=limits.memory_mb, on_limit=stop.set, cgroup_path=limits.cgroup_path)
+        monitor_task = asyncio.ensure_future(monitor.run())
+        pumps = asyncio.gather(
+            self._feed_stdin(process, code),
+            self._pump_stream(process.stdout, 'stdout', handle_line),
+            self._pump_stream(process.stderr, 'stderr', handle_line)
+        )
+        waiter = asyncio.ensure_future(process.wait())
+        killed = False
+        stop_waiter = asyncio.ensure_future(stop.wait())
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
+            done, _ = await asyncio.wait(
+                {waiter, stop_waiter},
                 timeout=timeout,
-                cwd=Config.BASE_DIR
+                return_when=asyncio.FIRST_COMPLETED
             )
             
-            success = result.returncode == 0
+            if waiter not in done:
+                killed = True
+                if monitor.limit_hit:
+                    result['limit'] = 'memory'
+                elif stop.is_set():
+                    logger.error(f"Killing Blender after fatal error: {result['error']['exception']}")
+                else:
+                    result['timed_out'] = True
+                    result['limit'] = 'timeout'
+                    logger.error(f"Script execution timed out after {timeout:.0f} seconds")
+                limits.kill_group(process)
+                
+            await waiter
+            # Grandchildren may hold the pipes open; don't wait on them forever
+            await asyncio.wait_for(pumps, timeout=5)
+        except asyncio.TimeoutError:
+            pumps.cancel()
+        except asyncio.CancelledError:
+            limits.kill_group(process)
+            pumps.cancel()
+            raise
+        finally:
+            stop_waiter.cancel()
+            monitor_task.cancel()
+            # Make sure nothing from the group outlives the job
+            limits.kill_group(process)
             
-            if success:
-                logger.info(f"✓ Script executed successfully")
-            else:
-                logger.error(f"✗ Script execution failed with code {result.returncode}")
+        result['elapsed'] = time.monotonic() - started
+        result['peak_rss_mb'] = limits.cgroup_peak_mb() or monitor.finalize()
+        result['returncode'] = process.returncode
+        result['stdout'] = buffer.text('stdout')
+        result['stderr'] = buffer.text('stderr')
+        result['output_tail'] = buffer.tail()
+        result['progress'] = parsers['stdout'].last_progress or parsers['stderr'].last_progress
+        result['limit'] = result['limit'] or limits.classify_exit(
+            process.returncode,
+            result['peak_rss_mb'],
+            result['stderr'],
+            killed=killed
+        )
+        result['success'] = process.returncode == 0 and result['limit'] is None and result['error'] is None
+        limits.cleanup()
+        
+        if result['limit']:
+            message = (
+                f"Resource limit exceeded ({result['limit']}): "
+                f"peak RSS {result['peak_rss_mb'] or 0:.1f} MB after {result['elapsed']:.1f} s"
+            )
+            if result['timed_out']:
+                message = f"Execution timed out; peak RSS {result['peak_rss_mb'] or 0:.1f} MB after {result['elapsed']:.1f} s"
+            logger.error(message)
+            result['stderr'] += "\n" + message
+            
+        if result['success']:
+            logger.info(f"✓ Script executed successfully")
+        elif not result['limit']:
+            logger.error(f"✗ Script execution failed with code {process.returncode}")
+            
+        return result
+    
+    async def _feed_stdin(self, process: asyncio.subprocess.Process, code: str):
+        """Write the program to Blender's stdin and close it"""
+        try:
+            process.stdin.write(code.encode('utf-8'))
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # Blender exited before reading the whole script
+            pass
+    
+    async def _pump_stream(
+        self,
+        reader: asyncio.StreamReader,
+        stream: str,
+        handle_line: Callable[[str, str], None]
+    ):
+        """Read a pipe in chunks and dispatch complete lines"""
+        pending = ''
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                break
+            pending += chunk.decode('utf-8', errors='replace')
+            # Blender uses carriage returns for in-place progress updates
+            *lines, pending = re.split(r'\r\n|\r|\n', pending)
+            for line in lines:
+                handle_line(line, stream)
+        if pending:
+            handle_line(pending, stream)
+    
+    def execute_script(
+        self,
+        script_path: Path,
+        mode: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[bool, str, str]:
+        """
+        Execute a Python script file in Blender
+        
+        Args:
+            script_path (Path): Path to the Python script
+            mode (str, optional): Execution mode ('background' or 'gui')
+            timeout (float, optional): Maximum execution time in seconds
+            
+        Returns:
+            Tuple[bool, str, str]: (success, stdout, stderr)
+        """
+        if not script_path.exists():
+            raise FileNotFoundError(f"Script not found: {script_path}")
+            
+        return self.execute_code(
+            script_path.read_text(encoding='utf-8'),
+            mode=mode,
+            timeout=timeout,
+            label=script_path.name
+        )
+    
+    def _load_code(self, script: Union[Path, str]) -> str:
+        """
+        Resolve a script argument to source code
+        
+        Args:
+            script (Path or str): Script file or in-memory source
+            
+        Returns:
+            str: Python source
+        """
+        if isinstance(script, Path):
+            if not script.exists():
+                raise FileNotFoundError(f"Script not found: {script}")
+            return script.read_text(encoding='utf-8')
+        return script
+    
+    def adopt_results(self, results: Dict[str, any], source_job_id: str, plan: Dict[str, any]) -> Dict[str, any]:
+        """
+        Give a job its own copy of the execution results of an identical job
+        
+        The outputs of the job that ran (render, export with LOD files,
+        .blend) are copied to the paths in this job's own plan and stored
+        under this job, so both end up with complete artifacts of their own.
+        
+        Args:
+            results (dict): Results of the job that ran
+            source_job_id (str): Id of the job that ran
+            plan (dict): Plan of the job taking the results over
+            
+        Returns:
+            dict: Results pointing at this job's files
+        """
+        job_id = plan['job_id']
+        adopted = copy.deepcopy(results)
+        copies = []
+        
+        for role in ('render', 'export', 'blend'):
+            key = f"{role}_path"
+            if adopted.get(key):
+                target = plan['results'].get(key)
+                if target:
+                    copies.append((Path(adopted[key]), Path(target)))
+                adopted[key] = target
+            
+        # LOD files are named after the export they belong to
+        source_stem = Path(results['export_path']).stem if results.get('export_path') else None
+        target_export = plan['results'].get('export_path')
+        for lod in adopted.get('lods', []):
+            if not lod.get('path'):
+                continue
+            source = Path(lod['path'])
+            if not (source_stem and target_export and source.name.startswith(source_stem)):
+                lod['path'] = None
+                continue
+            target = Path(target_export).with_name(Path(target_export).stem + source.name[len(source_stem):])
+            copies.append((source, target))
+            lod['path'] = str(target)
+                
+        for source, target in copies:
+            if source == target or not source.exists():
+                continue
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                # The target may still be a link into the artifact store; don't write through it
+                target.unlink(missing_ok=True)
+                shutil.copy2(source, target)
+            except OSError as e:
+                logger.warning(f"Failed to copy {source} of job {source_job_id} for job {job_id}: {e}")
+                adopted['success'] = False
+                adopted['stderr'] = f"{adopted.get('stderr') or ''}\nCould not copy shared output {source}: {e}".strip()
+                
+        adopted['script_path'] = None
+        if plan['persist']:
+            adopted['script_path'] = self.persist_script(plan['combined'], "combined", job_id)
+        self.store_outputs(job_id, adopted, plan['combined'])
+        return adopted
+    
+    def _detach_outputs(self, plan: Dict[str, any], results: Dict[str, any]):
+        """
+        Unlink the files a run is about to write from the artifact store
+        
+        A resumed or repeated job writes to the same paths as its earlier
+        run, which store_outputs() left as links to shared store objects.
+        The .blend being resumed from is kept as a private copy.
+        
+        Args:
+            plan (dict): Plan about to run
+            results (dict): Its results skeleton
+        """
+        if not self.artifact_store:
+            return
+        paths = [results.get('export_path'), results.get('blend_path')]
+        if not results.get('cache_hit'):
+            # A render restored from the cache is kept, not rewritten
+            paths.append(results.get('render_path'))
+        if plan.get('split'):
+            paths.append(plan['split']['blend_file'])
+        if results.get('export_path'):
+            export_path = Path(results['export_path'])
+            paths.extend(export_path.parent.glob(f"{export_path.stem}_lod*"))
+        resume_blend = plan.get('blend_file')
+        for path in {Path(path) for path in paths if path}:
+            try:
+                self.artifact_store.detach(path, keep_content=resume_blend is not None and path == Path(resume_blend))
+            except OSError as e:
+                logger.warning(f"Could not detach {path} from the artifact store: {e}")
+    
+    def persist_script(self, code: str, prefix: str = "combined", job_id: Optional[str] = None) -> Path:
+        """
+        Write an assembled script to the generated directory
+        
+        Only called when persistence is requested or an execution failed.
+        With the artifact store enabled the file is a link to the stored
+        object, so identical scripts are kept once.
+        
+        Args:
+            code (str): Script source
+            prefix (str): File name prefix, also the artifact role
+            job_id (str, optional): Identifier to embed in the file name
             
-            return success, result.stdout, result.stderr
+        Returns:
+            Path: Path of the written file
+        """
+        job_id = job_id or new_job_id()
+        path = Config.GENERATED_DIR / f"{prefix}_{job_id}.py"
+        if self.artifact_store:
+            self.artifact_store.put_bytes(code, prefix, job_id, link_to=path)
+        else:
+            path.write_text(code, encoding='utf-8')
+        logger.debug(f"Persisted script to {path}")
+        return path
+    
+    def store_outputs(self, job_id: str, results: Dict[str, any], combined: Optional[str] = None) -> Dict[str, str]:
+        """
+        Move a job's outputs into the artifact store
+        
+        Render, export (with any LOD files) and .blend files are replaced
+        by links to their stored objects (.blend compressed), and the
+        combined script is indexed so the job's lineage is complete.
+        
+        Args:
+            job_id (str): Job id
+            results (dict): Results with render_path, export_path, blend_path and lods
+            combined (str, optional): Combined program that produced them
             
-        except subprocess.TimeoutExpired:
-            logger.error(f"Script execution timed out after {timeout} seconds")
-            return False, "", "Execution timed out"
+        Returns:
+            dict: Role -> SHA-256 of the stored outputs
+        """
+        hashes = {}
+        if not self.artifact_store:
+            return hashes
+        try:
+            if combined is not None and not results.get('script_path'):
+                self.artifact_store.put_bytes(combined, "combined", job_id)
+            for role in ('render', 'export', 'blend'):
+                path = results.get(f"{role}_path")
+                if path:
+                    sha256 = self.artifact_store.put_file(path, role, job_id)
+                    if sha256:
+                        hashes[role] = sha256
+            lod_paths = {lod['path'] for lod in results.get('lods', []) if lod.get('path')}
+            for path in sorted(lod_paths - {str(results.get('export_path'))}):
+                self.artifact_store.put_file(path, 'lod', job_id)
         except Exception as e:
-            logger.error(f"Script execution error: {e}")
-            return False, "", str(e)
+            logger.warning(f"Failed to store artifacts of job {job_id}: {e}")
+        return hashes
     
     def execute_with_render(
         self,
-        script_path: Path,
+        script: Union[Path, str],
         output_path: Optional[Path] = None,
         mode: str = "background"
     ) -> Tuple[bool, str, str]:
@@ -118,7 +696,7 @@ class BlenderExecutor:
         Execute script and render the result
         
         Args:
-            script_path (Path): Path to the Python script
+            script (Path or str): Python script file or source
             output_path (Path, optional): Path for rendered image
             mode (str): Execution mode
             
@@ -126,19 +704,17 @@ class BlenderExecutor:
             Tuple[bool, str, str]: (success, stdout, stderr)
         """
         if output_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = Config.RENDERS_DIR / f"render_{timestamp}.png"
+            output_path = Config.RENDERS_DIR / f"render_{new_job_id()}.png"
         
-        # Create a combined script that includes rendering
-        render_script = self._create_render_script(script_path, output_path)
+        code = self.assemble_script(self._load_code(script), render_path=output_path)
         
         logger.info(f"Executing with render output to: {output_path}")
         
-        return self.execute_script(render_script, mode=mode)
+        return self.execute_code(code, mode=mode, label=output_path.stem)
     
     def execute_with_export(
         self,
-        script_path: Path,
+        script: Union[Path, str],
         export_path: Optional[Path] = None,
         export_format: Optional[str] = None,
         mode: str = "background"
@@ -147,7 +723,7 @@ class BlenderExecutor:
         Execute script and export the model
         
         Args:
-            script_path (Path): Path to the Python script
+            script (Path or str): Python script file or source
             export_path (Path, optional): Path for exported model
             export_format (str, optional): Export format ('obj', 'fbx', 'gltf', etc.)
             mode (str): Execution mode
@@ -158,19 +734,21 @@ class BlenderExecutor:
         export_format = export_format or Config.EXPORT_FORMAT
         
         if export_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            export_path = Config.MODELS_DIR / f"model_{timestamp}.{export_format}"
+            export_path = Config.MODELS_DIR / f"model_{new_job_id()}.{export_format}"
         
-        # Create a combined script that includes exporting
-        export_script = self._create_export_script(script_path, export_path, export_format)
+        code = self.assemble_script(
+            self._load_code(script),
+            export_path=export_path,
+            export_format=export_format
+        )
         
         logger.info(f"Executing with {export_format.upper()} export to: {export_path}")
         
-        return self.execute_script(export_script, mode=mode)
+        return self.execute_code(code, mode=mode, label=export_path.stem)
     
     def execute_with_save(
         self,
-        script_path: Path,
+        script: Union[Path, str],
         blend_path: Optional[Path] = None,
         mode: str = "background"
     ) -> Tuple[bool, str, str]:
@@ -178,7 +756,7 @@ class BlenderExecutor:
         Execute script and save the .blend file
         
         Args:
-            script_path (Path): Path to the Python script
+            script (Path or str): Python script file or source
             blend_path (Path, optional): Path for .blend file
             mode (str): Execution mode
             
@@ -186,132 +764,301 @@ class BlenderExecutor:
             Tuple[bool, str, str]: (success, stdout, stderr)
         """
         if blend_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            blend_path = Config.BLEND_FILES_DIR / f"scene_{timestamp}.blend"
+            blend_path = Config.BLEND_FILES_DIR / f"scene_{new_job_id()}.blend"
         
-        # Create a combined script that includes saving
-        save_script = self._create_save_script(script_path, blend_path)
+        code = self.assemble_script(self._load_code(script), blend_path=blend_path)
         
         logger.info(f"Executing with save to: {blend_path}")
         
-        return self.execute_script(save_script, mode=mode)
+        return self.execute_code(code, mode=mode, label=blend_path.stem)
     
-    def _create_render_script(self, script_path: Path, output_path: Path) -> Path:
-        """Create a temporary script that includes rendering"""
-        with open(script_path, 'r') as f:
-            original_code = f.read()
-        
-        render_code = f"""
-# Render configuration
-import bpy
-
-bpy.context.scene.render.filepath = r"{output_path}"
+    def _build_render_settings_code(self, render_path: Path) -> str:
+        """Build the snippet that configures a still render"""
+        return f"""
+# Render settings
+bpy.context.scene.render.filepath = r"{render_path}"
 bpy.context.scene.render.image_settings.file_format = 'PNG'
 bpy.context.scene.render.resolution_x = {Config.RENDER_WIDTH}
 bpy.context.scene.render.resolution_y = {Config.RENDER_HEIGHT}
 bpy.context.scene.render.engine = '{Config.RENDER_ENGINE}'
-
 if bpy.context.scene.render.engine == 'CYCLES':
     bpy.context.scene.cycles.samples = {Config.RENDER_SAMPLES}
+"""
 
+    def _build_render_code(self, render_path: Path) -> str:
+        """Build the snippet that runs a still render with the configured settings"""
+        return f"""
 # Render
 bpy.ops.render.render(write_still=True)
-print(f"Rendered to: {output_path}")
+print(r"Rendered to: {render_path}")
 """
         
-        combined_script = original_code + "\n\n" + render_code
+    def _build_export_code(self, export_path: Path, export_format: str) -> str:
+        """Build the snippet that exports the scene"""
+        template = self.EXPORT_OPERATORS.get(export_format.lower())
+        if not template:
+            raise ValueError(f"Unsupported export format: {export_format}")
+            
+        return f"""
+# Export
+{template.format(path=export_path)}
+print(r"Exported to: {export_path}")
+"""
         
-        temp_script = Config.GENERATED_DIR / f"temp_render_{script_path.stem}.py"
-        with open(temp_script, 'w') as f:
-            f.write(combined_script)
+    def _build_save_code(self, blend_path: Path) -> str:
+        """Build the snippet that saves the .blend file"""
+        return f"""
+# Save
+bpy.ops.wm.save_as_mainfile(filepath=r"{blend_path}")
+print(r"Saved to: {blend_path}")
+"""
         
-        return temp_script
-    
-    def _create_export_script(
+    def assemble_script(
         self,
-        script_path: Path,
-        export_path: Path,
-        export_format: str
-    ) -> Path:
-        """Create a temporary script that includes exporting"""
-        with open(script_path, 'r') as f:
-            original_code = f.read()
-        
-        # Map export formats to Blender operators
-        export_ops = {
-            'obj': f"bpy.ops.wm.obj_export(filepath=r'{export_path}')",
-            'fbx': f"bpy.ops.export_scene.fbx(filepath=r'{export_path}')",
-            'gltf': f"bpy.ops.export_scene.gltf(filepath=r'{export_path}')",
-            'stl': f"bpy.ops.export_mesh.stl(filepath=r'{export_path}')",
-            'ply': f"bpy.ops.export_mesh.ply(filepath=r'{export_path}')",
-        }
+        code: str,
+        render_path: Optional[Path] = None,
+        export_path: Optional[Path] = None,
+        blend_path: Optional[Path] = None,
+        export_format: Optional[str] = None,
+        resume: bool = False,
+        render_cached: bool = False,
+        bake: bool = False
+    ) -> str:
+        """
+        Assemble the final program in memory
         
-        export_op = export_ops.get(export_format.lower())
-        if not export_op:
-            raise ValueError(f"Unsupported export format: {export_format}")
+        The .blend file is saved right after the scene is built, its
+        procedural materials baked and the render configured, before the
+        expensive render and export, so it doubles as a checkpoint a
+        resumed job can continue from.
         
-        export_code = f"""
-# Export model
-import bpy
-
-{export_op}
-print(f"Exported to: {export_path}")
-"""
+        Args:
+            code (str): Generated scene-building code
+            render_path (Path, optional): Where to write a render
+            export_path (Path, optional): Where to export the model
+            blend_path (Path, optional): Where to save the .blend file
+            export_format (str, optional): Export format, defaults to config
+            resume (bool): Skip building and saving; the scene comes from an opened .blend
+            render_cached (bool): The image is already in place; configure but don't render
+            bake (bool): Bake procedural materials to image textures before rendering
         
-        combined_script = original_code + "\n\n" + export_code
+        Returns:
+            str: Combined Python source
+        """
+        snippets = []
         
-        temp_script = Config.GENERATED_DIR / f"temp_export_{script_path.stem}.py"
-        with open(temp_script, 'w') as f:
-            f.write(combined_script)
+        if bake and not resume:
+            snippets.append(self.material_baker.build_bake_code())
         
-        return temp_script
+        if render_path and not resume:
+            snippets.append(self._build_render_settings_code(render_path))
+            
+        if blend_path and not resume:
+            snippets.append(self._build_save_code(blend_path))
+        
+        if render_path and not render_cached:
+            if self.render_cache and Config.RENDER_CACHE_SCENE_HASH:
+                snippets.append(self.render_cache.build_render_code(render_path))
+            else:
+                snippets.append(self._build_render_code(render_path))
+            
+        if export_path:
+            snippets.append(self._build_export_code(export_path, export_format or Config.EXPORT_FORMAT))
+            if self.lod_exporter:
+                snippets.append(self.lod_exporter.build_lod_code(export_path, export_format or Config.EXPORT_FORMAT))
+            
+        if self.compat:
+            snippets = [self.compat.rewrite(snippet)[0] for snippet in snippets]
+            
+        parts = ["import bpy\n"] if resume else [code, "\nimport bpy\n"]
+        return "\n".join(parts + snippets)
     
-    def _create_save_script(self, script_path: Path, blend_path: Path) -> Path:
-        """Create a temporary script that includes saving"""
-        with open(script_path, 'r') as f:
-            original_code = f.read()
-        
-        save_code = f"""
-# Save blend file
-import bpy
-
-bpy.ops.wm.save_as_mainfile(filepath=r"{blend_path}")
-print(f"Saved to: {blend_path}")
-"""
+    def _outputs_variant(self, render: bool, export: bool, save: bool, bake: bool = False) -> str:
+        """Name the combination of enabled outputs, e.g. 'render+save'"""
+        steps = (('bake', bake), ('render', render), ('export', export), ('save', save))
+        enabled = [name for name, flag in steps if flag]
+        return '+'.join(enabled) or 'build'
+    
+    def estimate_timeout(
+        self,
+        profile: Optional[Dict[str, any]],
+        render: bool,
+        export: bool,
+        save: bool,
+        bake: bool = False
+    ) -> float:
+        """
+        Pick a timeout from history for similar jobs, or from a static cost estimate
         
-        combined_script = original_code + "\n\n" + save_code
+        Args:
+            profile (dict, optional): Processed prompt info ('category', 'complexity')
+            render (bool): Whether the job renders
+            export (bool): Whether the job exports
+            save (bool): Whether the job saves a .blend
+            bake (bool): Whether the job bakes procedural materials
+            
+        Returns:
+            float: Timeout in seconds
+        """
+        if not Config.ADAPTIVE_TIMEOUT:
+            return Config.BLENDER_TIMEOUT
+            
+        timeout = self.estimate_seconds(profile, render, export, save, bake) * Config.TIMEOUT_SAFETY_FACTOR
+        return max(Config.BLENDER_TIMEOUT_MIN, min(Config.BLENDER_TIMEOUT_MAX, timeout))
+    
+    def estimate_seconds(
+        self,
+        profile: Optional[Dict[str, any]],
+        render: bool,
+        export: bool,
+        save: bool,
+        bake: bool = False,
+        q: float = 0.95
+    ) -> float:
+        """
+        Expected execution time from history for similar jobs, or from a static cost estimate
         
-        temp_script = Config.GENERATED_DIR / f"temp_save_{script_path.stem}.py"
-        with open(temp_script, 'w') as f:
-            f.write(combined_script)
+        Args:
+            profile (dict, optional): Processed prompt info ('category', 'complexity')
+            render (bool): Whether the job renders
+            export (bool): Whether the job exports
+            save (bool): Whether the job saves a .blend
+            bake (bool): Whether the job bakes procedural materials
+            q (float): Quantile of the recorded durations to use
+            
+        Returns:
+            float: Seconds
+        """
+        key = self.timing_history.profile_key(profile, self._outputs_variant(render, export, save, bake))
+        observed = self.timing_history.percentile('execute', key, q)
         
-        return temp_script
+        if observed is not None:
+            estimate = observed
+        else:
+            complexity = (profile or {}).get('complexity', 'medium')
+            estimate = self.BUILD_SECONDS.get(complexity, self.BUILD_SECONDS['medium'])
+            if render:
+                pixel_samples = Config.RENDER_WIDTH * Config.RENDER_HEIGHT * Config.RENDER_SAMPLES
+                estimate += pixel_samples / Config.RENDER_PIXEL_SAMPLES_PER_SECOND
+            if export:
+                estimate += 15
+                if self.lod_exporter:
+                    estimate += 10 * len(self.lod_exporter.levels)
+            if save:
+                estimate += 5
+            if bake:
+                # Roughly one material with color, roughness and normal inputs
+                estimate += 3 * Config.BAKE_RESOLUTION ** 2 * Config.BAKE_SAMPLES / Config.RENDER_PIXEL_SAMPLES_PER_SECOND
+        return estimate
     
     def execute_full_pipeline(
         self,
-        script_path: Path,
+        script: Union[Path, str],
         mode: Optional[str] = None,
         render: Optional[bool] = None,
         export: Optional[bool] = None,
-        save: Optional[bool] = None
+        save: Optional[bool] = None,
+        persist: Optional[bool] = None,
+        job_id: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, any]], None]] = None,
+        profile: Optional[Dict[str, any]] = None,
+        bake: Optional[bool] = None
     ) -> Dict[str, any]:
         """
         Execute the full pipeline based on configuration
         
         Args:
-            script_path (Path): Path to the Python script
+            script (Path or str): Python script file or generated source
             mode (str, optional): Execution mode
             render (bool, optional): Whether to render
             export (bool, optional): Whether to export
             save (bool, optional): Whether to save .blend
+            persist (bool, optional): Whether to keep the combined script on disk
+            job_id (str, optional): Identifier used in artifact names
+            on_event (callable, optional): Receives progress/error events while Blender runs
+            profile (dict, optional): Processed prompt info used to size the timeout
+            bake (bool, optional): Whether to bake procedural materials to textures
             
         Returns:
             dict: Results dictionary with paths and success status
         """
-        mode = mode or Config.DEFAULT_MODE
+        return asyncio.run(self.execute_full_pipeline_async(
+            script,
+            mode=mode,
+            render=render,
+            export=export,
+            save=save,
+            persist=persist,
+            job_id=job_id,
+            on_event=on_event,
+            profile=profile,
+            bake=bake
+        ))
+    
+    async def execute_full_pipeline_async(
+        self,
+        script: Union[Path, str],
+        mode: Optional[str] = None,
+        render: Optional[bool] = None,
+        export: Optional[bool] = None,
+        save: Optional[bool] = None,
+        persist: Optional[bool] = None,
+        job_id: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, any]], None]] = None,
+        profile: Optional[Dict[str, any]] = None,
+        bake: Optional[bool] = None
+    ) -> Dict[str, any]:
+        """
+        Async variant of execute_full_pipeline
+        
+        Args:
+            See execute_full_pipeline
+            
+        Returns:
+            dict: Results dictionary with paths and success status
+        """
+        plan = self.prepare_pipeline(
+            script,
+            render=render,
+            export=export,
+            save=save,
+            persist=persist,
+            job_id=job_id,
+            profile=profile,
+            bake=bake
+        )
+        return await self.run_prepared_async(plan, mode=mode, on_event=on_event)
+    
+    def prepare_pipeline(
+        self,
+        script: Union[Path, str],
+        render: Optional[bool] = None,
+        export: Optional[bool] = None,
+        save: Optional[bool] = None,
+        persist: Optional[bool] = None,
+        job_id: Optional[str] = None,
+        profile: Optional[Dict[str, any]] = None,
+        resume_blend: Optional[Path] = None,
+        bake: Optional[bool] = None
+    ) -> Dict[str, any]:
+        """
+        Decide artifact paths and assemble the combined program without running it
+        
+        Args:
+            See execute_full_pipeline
+            resume_blend (Path, optional): Checkpointed .blend of this job; when
+                given, Blender opens it and only renders/exports
+            
+        Returns:
+            dict: Execution plan with the combined source, timeout and a
+                  results skeleton for run_prepared_async
+        """
         render = render if render is not None else Config.AUTO_RENDER
         export = export if export is not None else Config.AUTO_EXPORT
         save = save if save is not None else Config.AUTO_SAVE
+        persist = persist if persist is not None else Config.PERSIST_SCRIPTS
+        bake = bake if bake is not None else Config.BAKE_MATERIALS
+        job_id = job_id or new_job_id()
         
         results = {
             'success': False,
@@ -319,97 +1066,191 @@ print(f"Saved to: {blend_path}")
             'stderr': '',
             'render_path': None,
             'export_path': None,
-            'blend_path': None
+            'blend_path': None,
+            'script_path': None
         }
         
         # Determine which operations to perform
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
         if render:
-            render_path = Config.RENDERS_DIR / f"render_{timestamp}.png"
-            results['render_path'] = render_path
-        
+            results['render_path'] = Config.RENDERS_DIR / f"render_{job_id}.png"
+            
         if export:
-            export_path = Config.MODELS_DIR / f"model_{timestamp}.{Config.EXPORT_FORMAT}"
-            results['export_path'] = export_path
-        
+            results['export_path'] = Config.MODELS_DIR / f"model_{job_id}.{Config.EXPORT_FORMAT}"
+            
         if save:
-            blend_path = Config.BLEND_FILES_DIR / f"scene_{timestamp}.blend"
-            results['blend_path'] = blend_path
-        
-        # Create combined script with all operations
-        final_script = self._create_combined_script(
-            script_path,
-            results.get('render_path'),
-            results.get('export_path'),
-            results.get('blend_path')
-        )
+            results['blend_path'] = Config.BLEND_FILES_DIR / f"scene_{job_id}.blend"
+            
+        code = self._load_code(script)
         
-        # Execute
-        success, stdout, stderr = self.execute_script(final_script, mode=mode)
+        # An identical script under identical settings renders an identical image
+        cache_key = None
+        cache_hit = False
+        if render and self.render_cache:
+            settings_code = self._build_render_settings_code(Path("render.png"))
+            if bake:
+                settings_code += self.material_baker.build_bake_code()
+            cache_key = self.render_cache.script_key(code, settings_code, self.blender_version or "")
+            sha256 = self.render_cache.lookup('script', cache_key)
+            if sha256 and self.render_cache.restore(sha256, results['render_path'], job_id):
+                cache_hit = True
+                results['cache_hit'] = 'script'
+                logger.info(f"Render cache hit for job {job_id}")
+                
+        # A split still is rendered by workers from the saved scene, which
+        # needs a .blend even when the job doesn't keep one
+        split = None
+        if render and not cache_hit and self.split_renderer:
+            blend_file = resume_blend or results['blend_path']
+            split = {'blend_file': blend_file, 'temporary': blend_file is None}
+            if blend_file is None:
+                split['blend_file'] = Config.BLEND_FILES_DIR / f"split_{job_id}.blend"
+                
+        # Assemble the combined program with all operations in memory
+        combined = self.assemble_script(
+            code,
+            results['render_path'],
+            results['export_path'],
+            results['blend_path'] or (split and split['blend_file']),
+            resume=resume_blend is not None,
+            render_cached=cache_hit or split is not None,
+            bake=bake
+        )
         
-        results['success'] = success
-        results['stdout'] = stdout
-        results['stderr'] = stderr
+        # Size the timeout for this kind of job
+        results['timeout'] = self.estimate_timeout(profile, render, export, save, bake)
+        if resume_blend is not None:
+            results['resumed_from'] = resume_blend
         
-        return results
+        return {
+            'job_id': job_id,
+            'combined': combined,
+            'blend_file': resume_blend,
+            'render_cache_key': cache_key,
+            # Identical concurrent jobs with this key can share one run; a
+            # resumed job's program depends on its own checkpoint
+            'flight_key': None if resume_blend is not None else hashlib.sha256(json.dumps({
+                'code': code,
+                'outputs': self._outputs_variant(render, export, save, bake),
+                'render_cache_key': cache_key,
+                'render_cached': cache_hit,
+            }, sort_keys=True).encode('utf-8')).hexdigest(),
+            # Nothing left for Blender to do if the render was the only output
+            'skip_execution': cache_hit and not export and not save,
+            'persist': persist,
+            'bake': bake,
+            'split': split,
+            # Only a full in-process render is worth more than the build cores
+            'cpu_kind': 'render' if render and not cache_hit and not split else 'build',
+            # The split render happens outside the timed build, so keep its history apart
+            'history_key': self.timing_history.profile_key(
+                profile,
+                self._outputs_variant(render, export, save, bake) + ('+split' if split else '')
+            ),
+            'results': results
+        }
     
-    def _create_combined_script(
+    async def run_prepared_async(
         self,
-        script_path: Path,
-        render_path: Optional[Path],
-        export_path: Optional[Path],
-        blend_path: Optional[Path]
-    ) -> Path:
-        """Create a script with all operations combined"""
-        with open(script_path, 'r') as f:
-            original_code = f.read()
-        
-        additional_code = "\nimport bpy\n"
-        
-        # Add render code
-        if render_path:
-            additional_code += f"""
-# Render
-bpy.context.scene.render.filepath = r"{render_path}"
-bpy.context.scene.render.image_settings.file_format = 'PNG'
-bpy.context.scene.render.resolution_x = {Config.RENDER_WIDTH}
-bpy.context.scene.render.resolution_y = {Config.RENDER_HEIGHT}
-bpy.context.scene.render.engine = '{Config.RENDER_ENGINE}'
-if bpy.context.scene.render.engine == 'CYCLES':
-    bpy.context.scene.cycles.samples = {Config.RENDER_SAMPLES}
-bpy.ops.render.render(write_still=True)
-print(f"Rendered to: {render_path}")
-"""
+        plan: Dict[str, any],
+        mode: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Dict[str, any]:
+        """
+        Run a plan produced by prepare_pipeline
         
-        # Add export code
-        if export_path:
-            export_format = Config.EXPORT_FORMAT
-            export_ops = {
-                'obj': f"bpy.ops.wm.obj_export(filepath=r'{export_path}')",
-                'fbx': f"bpy.ops.export_scene.fbx(filepath=r'{export_path}')",
-                'gltf': f"bpy.ops.export_scene.gltf(filepath=r'{export_path}')",
-                'stl': f"bpy.ops.export_mesh.stl(filepath=r'{export_path}')",
-            }
-            additional_code += f"""
-# Export
-{export_ops.get(export_format)}
-print(f"Exported to: {export_path}")
-"""
+        Args:
+            plan (dict): Execution plan
+            mode (str, optional): Execution mode
+            on_event (callable, optional): Receives progress/error events while Blender runs
+            
+        Returns:
+            dict: Results dictionary with paths and success status
+        """
+        results = dict(plan['results'])
         
-        # Add save code
-        if blend_path:
-            additional_code += f"""
-# Save
-bpy.ops.wm.save_as_mainfile(filepath=r"{blend_path}")
-print(f"Saved to: {blend_path}")
-"""
+        if plan.get('skip_execution'):
+            results.update({
+                'success': True,
+                'returncode': 0,
+                'output_tail': [],
+                'progress': None,
+                'error': None,
+                'timed_out': False,
+                'limit': None,
+                'peak_rss_mb': None,
+                'elapsed': 0.0
+            })
+            if on_event:
+                on_event({'type': 'cache_hit', 'kind': 'script'})
+                on_event({'type': 'artifact', 'kind': 'rendered', 'path': str(results['render_path'])})
+            self.store_outputs(plan['job_id'], results, plan['combined'])
+            return results
+            
+        self._detach_outputs(plan, results)
+        scene = {}
+        
+        def handle_event(event: Dict[str, any]):
+            if event['type'] == 'scene_hash':
+                scene['key'] = event['key']
+            elif event['type'] == 'cache_hit':
+                results['cache_hit'] = event['kind']
+            elif event['type'] == 'bake':
+                results.setdefault('bakes', []).append(event)
+            elif event['type'] == 'lod':
+                results.setdefault('lods', []).append(event)
+            if on_event:
+                on_event(event)
+                
+        execution = await self.execute_code_async(
+            plan['combined'],
+            mode=mode,
+            timeout=results['timeout'],
+            label=f"combined_{plan['job_id']}",
+            on_event=handle_event,
+            blend_file=plan.get('blend_file'),
+            kind=plan['cpu_kind'],
+            key=plan['history_key']
+        )
         
-        combined_script = original_code + "\n" + additional_code
+        results.update(execution)
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        final_script = Config.GENERATED_DIR / f"combined_{timestamp}.py"
-        with open(final_script, 'w') as f:
-            f.write(combined_script)
+        if results.get('bakes'):
+            self.material_baker.prune()
+        
+        if execution['success'] and plan.get('split'):
+            split = plan['split']
+            try:
+                outcome = await self.split_renderer.render_async(
+                    split['blend_file'],
+                    results['render_path'],
+                    plan['job_id'],
+                    results['timeout'],
+                    on_event=on_event
+                )
+            finally:
+                if split['temporary']:
+                    Path(split['blend_file']).unlink(missing_ok=True)
+            if outcome['success']:
+                results['split_render'] = outcome['split_render']
+            else:
+                results['success'] = False
+                results['stderr'] = f"{results['stderr']}\n{outcome['error']}".strip()
+                
+        # A resumed run skips the build, so its duration isn't representative
+        if execution['success'] and not plan.get('blend_file'):
+            self.timing_history.record('execute', plan['history_key'], execution['elapsed'])
+            
+        # Only touch the disk when asked to, or to keep a failing script for debugging
+        if plan['persist'] or (not execution['success'] and Config.SAVE_FAILED_CODE):
+            results['script_path'] = self.persist_script(plan['combined'], "combined", plan['job_id'])
+            
+        hashes = self.store_outputs(plan['job_id'], results, plan['combined'])
         
-        return final_script
\ No newline at end of file
+        # Remember freshly rendered images under both keys
+        if execution['success'] and self.render_cache and hashes.get('render'):
+            if plan.get('render_cache_key') and results.get('cache_hit') != 'script':
+                self.render_cache.record('script', plan['render_cache_key'], hashes['render'])
+            if scene.get('key') and results.get('cache_hit') != 'scene':
+                self.render_cache.record('scene', scene['key'], hashes['render'])
+                
+        return results
\ No newline at end of file
@@ -0,0 +1,607 @@
+import ast
+import gzip
+import json
+import difflib
+import logging
+from pathlib import Path
+from typing import Optional, Dict, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the layout written by tools/dump_bpy_api.py changes
+INDEX_FORMAT = 1
+
+# Context members Blender resolves at run time rather than declaring in RNA
+CONTEXT_MEMBERS = {
+    'object': 'Object',
+    'active_object': 'Object',
+    'edit_object': 'Object',
+    'material': 'Material',
+    'active_node': 'Node',
+}
+CONTEXT_LISTS = {
+    'selected_objects': 'Object',
+    'selected_editable_objects': 'Object',
+    'visible_objects': 'Object',
+    'selectable_objects': 'Object',
+}
+
+
+class ApiType(NamedTuple):
+    """
+    What an expression resolves to
+    
+    kind is 'module' (bpy), 'ops' (name is the operator module, '' for
+    bpy.ops), 'operator', 'types', 'struct', 'collection' (name is the
+    item struct, owner the collection's own struct), 'getter' (the get()
+    of a collection), 'function' (name on owner) or 'list' of name.
+    """
+    kind: str
+    name: str = ''
+    owner: Optional[str] = None
+    sockets: Optional[tuple] = None
+
+
+BPY = ApiType('module', 'bpy')
+
+
+class BpyApiIndex:
+    """Operators, RNA structs and node sockets of one Blender build"""
+    
+    _cache = {}
+    
+    def __init__(self, data: Dict[str, any]):
+        """
+        Initialize Bpy API Index
+        
+        Args:
+            data (dict): Index as written by tools/dump_bpy_api.py
+        """
+        self.version = data.get('blender_version', 'unknown')
+        self.operators = data['operators']
+        self.structs = data['structs']
+        self.nodes = data['nodes']
+        self.collection_members = set(data['collection'])
+        
+        self.operator_modules = {}
+        for name in self.operators:
+            module, operator = name.split('.', 1)
+            self.operator_modules.setdefault(module, []).append(operator)
+            
+        self._subclasses = {}
+        for name, struct in self.structs.items():
+            if struct.get('base'):
+                self._subclasses.setdefault(struct['base'], []).append(name)
+                
+        # Default node names ('Principled BSDF') shared by one node type only
+        labels = {}
+        for node_type, node in self.nodes.items():
+            labels.setdefault(node['name'], []).append(node_type)
+        self.node_names = {label: types[0] for label, types in labels.items() if len(types) == 1}
+        
+        self._members = {}
+        self._in_subclass = {}
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional['BpyApiIndex']:
+        """
+        Load an index file, reusing it while the file is unchanged
+        
+        Args:
+            path (Path): Index written by tools/dump_bpy_api.py (.json or .json.gz)
+            
+        Returns:
+            BpyApiIndex: The index, or None if it is missing or unreadable
+        """
+        path = Path(path)
+        try:
+            key = (str(path), path.stat().st_mtime)
+        except FileNotFoundError:
+            logger.info(f"No bpy API index at {path}; API checks skipped (build one with tools/dump_bpy_api.py)")
+            return None
+            
+        if key not in cls._cache:
+            try:
+                opener = gzip.open if path.suffix == '.gz' else open
+                with opener(path, 'rt', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to read bpy API index {path}: {e}")
+                return None
+            if data.get('format') != INDEX_FORMAT:
+                logger.warning(f"bpy API index {path} has format {data.get('format')}, expected {INDEX_FORMAT}; rebuild it")
+                return None
+            cls._cache = {key: cls(data)}
+            logger.info(f"Loaded bpy API index for Blender {data.get('blender_version')}")
+        return cls._cache[key]
+    
+    @staticmethod
+    def save(path: Path, data: Dict[str, any]):
+        """Write an index compactly, gzipped when the name ends in .gz"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), sort_keys=True)
+    
+    def member(self, struct: str, name: str) -> Optional[tuple]:
+        """
+        Look an attribute up on a struct and its bases
+        
+        Args:
+            struct (str): RNA struct identifier, e.g. 'Object'
+            name (str): Attribute name
+            
+        Returns:
+            tuple: ('property', spec), ('function', [params, returns]) or
+                   ('python', None), None if the struct has no such attribute
+        """
+        key = (struct, name)
+        if key not in self._members:
+            found = None
+            current = struct
+            while found is None and current in self.structs:
+                spec = self.structs[current]
+                if name in spec['properties']:
+                    found = ('property', spec['properties'][name])
+                elif name in spec['functions']:
+                    found = ('function', spec['functions'][name])
+                elif name in spec['python']:
+                    found = ('python', None)
+                current = spec.get('base')
+            self._members[key] = found
+        return self._members[key]
+    
+    def member_names(self, struct: str) -> List[str]:
+        """All attribute names of a struct and its bases"""
+        names = []
+        current = struct
+        while current in self.structs:
+            spec = self.structs[current]
+            names.extend(spec['properties'])
+            names.extend(spec['functions'])
+            current = spec.get('base')
+        return names
+    
+    def in_subclass(self, struct: str, name: str) -> bool:
+        """Whether a subclass of the struct declares the attribute (e.g. Mesh attributes on obj.data, typed ID)"""
+        key = (struct, name)
+        if key not in self._in_subclass:
+            pending = list(self._subclasses.get(struct, ()))
+            found = False
+            while pending and not found:
+                subclass = pending.pop()
+                spec = self.structs[subclass]
+                found = name in spec['properties'] or name in spec['functions'] or name in spec['python']
+                pending.extend(self._subclasses.get(subclass, ()))
+            self._in_subclass[key] = found
+        return self._in_subclass[key]
+    
+    def check(self, code: str) -> List[str]:
+        """
+        Check operator calls, attribute chains and node sockets against the index
+        
+        Args:
+            code (str): Python code
+            
+        Returns:
+            List[str]: Error messages, empty if nothing is wrong or the code doesn't parse
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return []
+        return ApiChecker(self).check(tree)
+
+
+class ApiChecker:
+    """
+    Resolves the bpy expressions of one script against an index
+    
+    Variables are followed through assignments in source order; a name
+    bound to different things in alternative branches becomes unknown,
+    and nothing is reported about unknown values. An attribute missing
+    from a struct is only reported when no subclass declares it either,
+    since pointers such as Object.data are typed by their base (ID).
+    """
+    
+    def __init__(self, index: BpyApiIndex):
+        """
+        Initialize API Checker
+        
+        Args:
+            index (BpyApiIndex): Index to check against
+        """
+        self.index = index
+        self.errors = []
+        self.env = {'bpy': BPY}
+        self._reported = set()
+        
+        # Filled from the script itself before checking
+        self.extra_members = {}
+        self.extra_operators = set()
+        self.extra_types = set()
+        self.enables_addons = False
+    
+    def check(self, tree: ast.AST) -> List[str]:
+        self._collect_registrations(tree)
+        self._block(tree.body)
+        return self.errors
+    
+    def _collect_registrations(self, tree: ast.AST):
+        """Operators, classes and properties the script registers, and add-ons it enables"""
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                self.extra_types.add(node.name)
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name) and target.id == 'bl_idname':
+                        if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                            self.extra_operators.add(node.value.value)
+                    elif isinstance(target, ast.Attribute):
+                        # bpy.types.Scene.my_settings = bpy.props.PointerProperty(...)
+                        owner = target.value
+                        if (
+                            isinstance(owner, ast.Attribute)
+                            and isinstance(owner.value, ast.Attribute)
+                            and owner.value.attr == 'types'
+                        ):
+                            self.extra_members.setdefault(owner.attr, set()).add(target.attr)
+            elif isinstance(node, ast.Attribute) and node.attr == 'addon_enable':
+                self.enables_addons = True
+    
+    def _error(self, node: ast.AST, message: str):
+        key = (getattr(node, 'lineno', 0), message)
+        if key not in self._reported:
+            self._reported.add(key)
+            self.errors.append(f"API Error at line {key[0]}: {message}")
+    
+    @staticmethod
+    def _suggest(name: str, candidates) -> str:
+        matches = difflib.get_close_matches(name, list(candidates), n=1)
+        return f" (did you mean '{matches[0]}'?)" if matches else ""
+        
+    # Statements
+    
+    def _block(self, body: List[ast.stmt]):
+        for statement in body:
+            self._statement(statement)
+    
+    def _branches(self, bodies: List[List[ast.stmt]]):
+        """Visit alternative blocks; names they bind differently lose their type"""
+        before = self.env
+        results = []
+        for body in bodies:
+            self.env = dict(before)
+            self._block(body)
+            results.append(self.env)
+        merged = {}
+        for name in set().union(*results):
+            types = {env.get(name) for env in results}
+            merged[name] = types.pop() if len(types) == 1 else None
+        self.env = merged
+    
+    def _scope(self, node: ast.AST, body: List[ast.stmt]):
+        """Visit a function or class body without leaking its names"""
+        saved = self.env
+        self.env = dict(saved)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args
+            for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+                self.env[argument.arg] = None
+            for argument in (arguments.vararg, arguments.kwarg):
+                if argument:
+                    self.env[argument.arg] = None
+        self._block(body)
+        self.env = saved
+    
+    def _statement(self, node: ast.stmt):
+        if isinstance(node, ast.Assign):
+            value = self._expr(node.value)
+            for target in node.targets:
+                self._assign(target, value)
+        elif isinstance(node, ast.AnnAssign):
+            self._assign(node.target, self._expr(node.value) if node.value else None)
+        elif isinstance(node, ast.AugAssign):
+            self._expr(node.value)
+            self._expr(node.target)
+            if isinstance(node.target, ast.Name):
+                self.env[node.target.id] = None
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            self._import(node)
+        elif isinstance(node, ast.If):
+            self._expr(node.test)
+            self._branches([node.body, node.orelse])
+        elif isinstance(node, ast.While):
+            self._expr(node.test)
+            self._branches([node.body + node.orelse, node.orelse])
+        elif isinstance(node, (ast.For, ast.AsyncFor)):
+            self._assign(node.target, self._item(self._expr(node.iter)))
+            self._branches([node.body + node.orelse, node.orelse])
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            for item in node.items:
+                self._expr(item.context_expr)
+                if item.optional_vars is not None:
+                    self._assign(item.optional_vars, None)
+            self._block(node.body)
+        elif isinstance(node, ast.Try):
+            for handler in node.handlers:
+                if handler.name:
+                    self.env[handler.name] = None
+            self._branches([node.body + node.orelse] + [handler.body for handler in node.handlers])
+            self._block(node.finalbody)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for decorator in node.decorator_list:
+                self._expr(decorator)
+            self.env[node.name] = None
+            self._scope(node, node.body)
+        else:
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.expr):
+                    self._expr(child)
+                elif isinstance(child, ast.stmt):
+                    self._statement(child)
+    
+    def _import(self, node: ast.AST):
+        for alias in node.names:
+            bound = alias.asname or alias.name.split('.')[0]
+            if isinstance(node, ast.Import):
+                if alias.name.split('.')[0] != 'bpy':
+                    self.env[bound] = None
+                elif not alias.asname:
+                    self.env['bpy'] = BPY
+                else:
+                    # import bpy.ops as ops
+                    value = BPY
+                    for part in alias.name.split('.')[1:]:
+                        value = self._attribute(value, part, node)
+                    self.env[bound] = value
+            elif node.module == 'bpy':
+                self.env[bound] = self._attribute(BPY, alias.name, node)
+            else:
+                self.env[bound] = None
+    
+    def _assign(self, target: ast.expr, value: Optional[ApiType]):
+        if isinstance(target, ast.Name):
+            self.env[target.id] = value
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self._assign(element.value if isinstance(element, ast.Starred) else element, None)
+        elif isinstance(target, ast.Attribute):
+            # Blender refuses to set attributes a struct doesn't have
+            self._expr(target)
+        elif isinstance(target, ast.Subscript):
+            self._expr(target.value)
+            self._expr(target.slice)
+            
+    # Expressions
+    
+    def _expr(self, node: Optional[ast.expr]) -> Optional[ApiType]:
+        if node is None:
+            return None
+        if isinstance(node, ast.Name):
+            return self.env.get(node.id)
+        if isinstance(node, ast.Attribute):
+            return self._attribute(self._expr(node.value), node.attr, node)
+        if isinstance(node, ast.Call):
+            func = self._expr(node.func)
+            for argument in node.args:
+                self._expr(argument)
+            for keyword in node.keywords:
+                self._expr(keyword.value)
+            return self._call(func, node)
+        if isinstance(node, ast.Subscript):
+            value = self._expr(node.value)
+            self._expr(node.slice)
+            if value is not None and value.kind == 'collection':
+                return self._keyed(value, node.slice, node)
+            return None
+        if isinstance(node, ast.NamedExpr):
+            value = self._expr(node.value)
+            self._assign(node.target, value)
+            return value
+        if isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)):
+            saved = self.env
+            self.env = dict(saved)
+            for generator in node.generators:
+                self._assign(generator.target, self._item(self._expr(generator.iter)))
+                for condition in generator.ifs:
+                    self._expr(condition)
+            if isinstance(node, ast.DictComp):
+                self._expr(node.key)
+                self._expr(node.value)
+            else:
+                self._expr(node.elt)
+            self.env = saved
+            return None
+        if isinstance(node, ast.Lambda):
+            saved = self.env
+            self.env = dict(saved)
+            for argument in node.args.args + node.args.kwonlyargs:
+                self.env[argument.arg] = None
+            self._expr(node.body)
+            self.env = saved
+            return None
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                self._expr(child)
+        return None
+    
+    def _attribute(self, base: Optional[ApiType], attr: str, node: ast.AST) -> Optional[ApiType]:
+        if base is None:
+            return None
+        index = self.index
+        
+        if base.kind == 'module':
+            return {
+                'context': ApiType('struct', 'Context'),
+                'data': ApiType('struct', 'BlendData'),
+                'ops': ApiType('ops'),
+                'types': ApiType('types'),
+            }.get(attr)
+            
+        if base.kind == 'ops':
+            if not base.name:
+                return ApiType('ops', attr)
+            name = f"{base.name}.{attr}"
+            if name not in index.operators and name not in self.extra_operators and not self.enables_addons:
+                if base.name in index.operator_modules:
+                    hint = self._suggest(attr, index.operator_modules[base.name])
+                else:
+                    hint = self._suggest(base.name, index.operator_modules)
+                self._error(node, f"bpy.ops.{name} doesn't exist in Blender {index.version}{hint}")
+            return ApiType('operator', name)
+            
+        if base.kind == 'types':
+            if attr not in index.structs and attr not in self.extra_types and not self.enables_addons:
+                self._error(node, f"bpy.types.{attr} doesn't exist in Blender {index.version}{self._suggest(attr, index.structs)}")
+            return None
+            
+        if base.kind == 'struct':
+            if base.name == 'Context':
+                if attr in CONTEXT_MEMBERS:
+                    return ApiType('struct', CONTEXT_MEMBERS[attr])
+                if attr in CONTEXT_LISTS:
+                    return ApiType('list', CONTEXT_LISTS[attr])
+                found = index.member('Context', attr)
+                # Other members depend on the editor, so a miss isn't an error
+                return self._member_type('Context', attr, found) if found else None
+                
+            found = index.member(base.name, attr)
+            if found is not None:
+                return self._member_type(base.name, attr, found)
+            if base.name not in index.structs or index.in_subclass(base.name, attr) or self._registered(base.name, attr):
+                return None
+            self._error(
+                node,
+                f"{base.name} has no attribute '{attr}' in Blender {index.version}"
+                f"{self._suggest(attr, index.member_names(base.name))}"
+            )
+            return None
+            
+        if base.kind == 'collection':
+            if base.owner:
+                found = index.member(base.owner, attr)
+                if found is not None:
+                    return self._member_type(base.owner, attr, found)
+            if attr == 'get':
+                return base._replace(kind='getter')
+            if attr in index.collection_members:
+                return None
+            owner = base.owner or f"collection of {base.name}"
+            candidates = index.member_names(base.owner) if base.owner else []
+            self._error(
+                node,
+                f"{owner} has no attribute '{attr}' in Blender {index.version}"
+                f"{self._suggest(attr, list(candidates) + list(index.collection_members))}"
+            )
+            return None
+            
+        return None
+    
+    def _registered(self, struct: str, attr: str) -> bool:
+        """Whether the script adds the attribute to the struct or one of its bases"""
+        current = struct
+        while current in self.index.structs:
+            if attr in self.extra_members.get(current, ()):
+                return True
+            current = self.index.structs[current].get('base')
+        return False
+    
+    def _member_type(self, struct: str, attr: str, found: tuple) -> Optional[ApiType]:
+        kind, spec = found
+        if kind == 'function':
+            return ApiType('function', attr, struct)
+        if kind != 'property' or spec is None:
+            return None
+        if isinstance(spec, str):
+            return ApiType('struct', spec)
+        item, owner = spec
+        sockets = None
+        node = self.index.nodes.get(struct)
+        if attr in ('inputs', 'outputs') and node and not node.get('dynamic'):
+            sockets = (struct, attr)
+        return ApiType('collection', item or '', owner, sockets)
+    
+    def _call(self, func: Optional[ApiType], node: ast.Call) -> Optional[ApiType]:
+        if func is None:
+            return None
+        index = self.index
+        
+        if func.kind == 'operator':
+            params = index.operators.get(func.name)
+            if params is not None:
+                for keyword in node.keywords:
+                    if keyword.arg and keyword.arg not in params:
+                        self._error(
+                            node,
+                            f"bpy.ops.{func.name} has no parameter '{keyword.arg}' in Blender {index.version}"
+                            f"{self._suggest(keyword.arg, params)}"
+                        )
+            return None
+            
+        if func.kind == 'function':
+            params, returns = index.member(func.owner, func.name)[1]
+            for keyword in node.keywords:
+                if keyword.arg and keyword.arg not in params:
+                    self._error(
+                        node,
+                        f"{func.owner}.{func.name}() has no parameter '{keyword.arg}' in Blender {index.version}"
+                        f"{self._suggest(keyword.arg, params)}"
+                    )
+            if func.owner == 'Nodes' and func.name == 'new':
+                node_type = self._constant(node.args[0] if node.args else self._keyword(node, 'type'))
+                if node_type is not None:
+                    if node_type in index.structs:
+                        return ApiType('struct', node_type)
+                    if node_type not in self.extra_types:
+                        self._error(
+                            node,
+                            f"Node type '{node_type}' doesn't exist in Blender {index.version}"
+                            f"{self._suggest(node_type, index.nodes)}"
+                        )
+                        return None
+            return ApiType('struct', returns) if returns else None
+            
+        if func.kind == 'getter':
+            if node.args:
+                return self._keyed(func._replace(kind='collection'), node.args[0], node)
+            return None
+            
+        return None
+    
+    def _keyed(self, collection: ApiType, key: ast.expr, node: ast.AST) -> Optional[ApiType]:
+        """Item of a collection by key, checking socket names and resolving default node names"""
+        name = self._constant(key)
+        if isinstance(name, str):
+            if collection.sockets:
+                node_type, side = collection.sockets
+                names = self.index.nodes[node_type][side]
+                if name not in names:
+                    # get() returns None for a missing socket rather than raising, but it's still a mistake
+                    self._error(
+                        node,
+                        f"{node_type} has no {side[:-1]} '{name}' in Blender {self.index.version}"
+                        f"{self._suggest(name, names)}"
+                    )
+                    return None
+            elif collection.owner == 'Nodes' and name in self.index.node_names:
+                return ApiType('struct', self.index.node_names[name])
+        return ApiType('struct', collection.name) if collection.name else None
+    
+    @staticmethod
+    def _item(iterable: Optional[ApiType]) -> Optional[ApiType]:
+        if iterable is not None and iterable.kind in ('collection', 'list') and iterable.name:
+            return ApiType('struct', iterable.name)
+        return None
+    
+    @staticmethod
+    def _constant(node: Optional[ast.expr]):
+        return node.value if isinstance(node, ast.Constant) else None
+    
+    @staticmethod
+    def _keyword(node: ast.Call, name: str) -> Optional[ast.expr]:
+        for keyword in node.keywords:
+            if keyword.arg == name:
+                return keyword.value
+        return None
\ No newline at end of file
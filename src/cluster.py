@@ -0,0 +1,1080 @@
+import os
+import re
+import json
+import time
+import hmac
+import uuid
+import shutil
+import socket
+import asyncio
+import hashlib
+import logging
+import tempfile
+import ipaddress
+import threading
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Optional, Dict, List, Callable
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from config import Config
+from blender_executor import BlenderExecutor
+
+logger = logging.getLogger(__name__)
+
+# Shared secret every request carries, and the coordinator's HMAC over each JSON reply
+TOKEN_HEADER = 'X-Cluster-Token'
+SIGNATURE_HEADER = 'X-Cluster-Signature'
+
+def is_loopback(host: Optional[str]) -> bool:
+    """Whether a bind address or host name only reaches this machine"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def sign(token: str, data: bytes) -> str:
+    """HMAC-SHA256 of a response body under the cluster token"""
+    return hmac.new(token.encode('utf-8'), data, hashlib.sha256).hexdigest()
+
+
+def major_minor(version: Optional[str]) -> Optional[str]:
+    """'4.2' from 'Blender 4.2.1 LTS', or None"""
+    match = re.search(r'(\d+)\.(\d+)', version or '')
+    return f"{match.group(1)}.{match.group(2)}" if match else None
+
+
+def failed_execution(message: str, **fields) -> Dict[str, any]:
+    """Execution result for a task that never ran to completion on an agent"""
+    result = {
+        'success': False,
+        'returncode': None,
+        'stdout': '',
+        'stderr': message,
+        'output_tail': [],
+        'progress': None,
+        'error': None,
+        'timed_out': False,
+        'limit': None,
+        'peak_rss_mb': None,
+        'elapsed': 0.0
+    }
+    result.update(fields)
+    return result
+
+
+def swap_paths(value: any, pairs: List[tuple]) -> any:
+    """
+    Replace path prefixes throughout strings, dicts and lists
+    
+    All prefixes are replaced in one pass, so a replacement that contains
+    another prefix (an agent work dir inside the project) isn't rewritten
+    again.
+    
+    Args:
+        value: String or JSON-like structure
+        pairs (list): (old prefix, new prefix) tuples
+        
+    Returns:
+        Same structure with the prefixes replaced
+    """
+    mapping = dict(pairs)
+    pattern = re.compile('|'.join(re.escape(old) for old in sorted(mapping, key=len, reverse=True)))
+    
+    def swap(item):
+        if isinstance(item, str):
+            return pattern.sub(lambda match: mapping[match.group(0)], item)
+        if isinstance(item, dict):
+            return {key: swap(entry) for key, entry in item.items()}
+        if isinstance(item, (list, tuple)):
+            return [swap(entry) for entry in item]
+        return item
+        
+    return swap(value)
+
+
+class BlobStore:
+    """Content-addressed files exchanged between the coordinator and agents"""
+    
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Initialize Blob Store
+        
+        Args:
+            root (Path, optional): Directory, defaults to CLUSTER_BLOB_DIR
+        """
+        self.root = Path(root or Config.CLUSTER_BLOB_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def path(self, sha256: str) -> Path:
+        """Location of a blob, fanned out by the first two hex digits"""
+        if not re.fullmatch(r'[0-9a-f]{64}', sha256):
+            raise ValueError(f"Invalid blob id: {sha256}")
+        return self.root / sha256[:2] / sha256
+    
+    def has(self, sha256: str) -> bool:
+        return self.path(sha256).exists()
+    
+    def put_file(self, source: Path) -> str:
+        """
+        Copy a file into the store
+        
+        Args:
+            source (Path): File to store
+            
+        Returns:
+            str: SHA-256 of its content
+        """
+        sha256 = hash_file(source)
+        if not self.has(sha256):
+            with open(source, 'rb') as f:
+                self._write(sha256, lambda size: f.read(size))
+        return sha256
+    
+    def put_stream(self, sha256: str, read: Callable[[int], bytes], length: int) -> bool:
+        """
+        Store length bytes from a stream if they hash to sha256
+        
+        Args:
+            sha256 (str): Expected SHA-256
+            read (callable): Reads up to n bytes
+            length (int): Bytes to read
+            
+        Returns:
+            bool: False if the content didn't match
+        """
+        remaining = [length]
+        
+        def bounded(size: int) -> bytes:
+            chunk = read(min(size, remaining[0])) if remaining[0] > 0 else b''
+            remaining[0] -= len(chunk)
+            return chunk
+            
+        return self._write(sha256, bounded)
+    
+    def copy_to(self, sha256: str, target: Path):
+        """Materialize a blob at target"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self.path(sha256), target)
+    
+    def remove(self, sha256: str):
+        self.path(sha256).unlink(missing_ok=True)
+    
+    def _write(self, sha256: str, read: Callable[[int], bytes]) -> bool:
+        """Write a blob atomically, verifying its hash"""
+        target = self.path(sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: read(1024 * 1024), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+            if digest.hexdigest() != sha256:
+                Path(tmp_name).unlink(missing_ok=True)
+                return False
+            os.replace(tmp_name, target)
+            return True
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TaskBoard:
+    """
+    Tasks waiting for agents, the agents' leases on them, and the agents
+    
+    Thread-safe; the coordinator's HTTP threads, its reaper thread and the
+    pipeline's event loop all use it. A task's 'on_done' and 'on_events'
+    callbacks are called outside the lock.
+    """
+    
+    def __init__(self, lease_seconds: Optional[float] = None, max_attempts: Optional[int] = None):
+        """
+        Initialize Task Board
+        
+        Args:
+            lease_seconds (float, optional): Heartbeat deadline, defaults to CLUSTER_LEASE_SECONDS
+            max_attempts (int, optional): Leases per task, defaults to CLUSTER_MAX_ATTEMPTS
+        """
+        self.lease_seconds = lease_seconds or Config.CLUSTER_LEASE_SECONDS
+        self.max_attempts = max(1, max_attempts or Config.CLUSTER_MAX_ATTEMPTS)
+        self._lock = threading.Lock()
+        self.agents = {}
+        self.tasks = {}
+        # Leased tasks whose waiter went away; reported to the agent on its next heartbeat
+        self._cancelled = {}
+    
+    def register(self, info: Dict[str, any]) -> Dict[str, any]:
+        """
+        Add or refresh an agent
+        
+        Args:
+            info (dict): agent_id, cores, ram_mb, blender_version and slots
+            
+        Returns:
+            dict: The agent record
+        """
+        agent = {
+            'agent_id': str(info['agent_id']),
+            'cores': int(info.get('cores') or 1),
+            'ram_mb': info.get('ram_mb'),
+            'blender_version': info.get('blender_version'),
+            'slots': max(1, int(info.get('slots') or 1)),
+            'running': set(),
+            'completed': 0,
+            'failed': 0,
+            'registered_at': time.time(),
+            'last_seen': time.monotonic(),
+        }
+        with self._lock:
+            previous = self.agents.get(agent['agent_id'])
+            if previous:
+                agent.update(running=previous['running'], completed=previous['completed'], failed=previous['failed'])
+            self.agents[agent['agent_id']] = agent
+        logger.info(
+            f"Agent {agent['agent_id']} registered: {agent['cores']} cores, "
+            f"{agent['ram_mb'] or '?'} MB, {agent['blender_version']}, {agent['slots']} slots"
+        )
+        return agent
+    
+    def add(self, task: Dict[str, any]):
+        """Queue a task; needs task_id, kind, payload, requires, timeout, on_done and on_events"""
+        task.update(state='queued', agent=None, attempts=0, lease_until=None, submitted_at=time.monotonic(), started_at=None)
+        with self._lock:
+            self.tasks[task['task_id']] = task
+    
+    def claim(self, agent_id: str) -> Optional[Dict[str, any]]:
+        """
+        Lease the oldest queued task the agent can run
+        
+        Args:
+            agent_id (str): Claiming agent
+            
+        Returns:
+            dict or None: Task payload, None if unknown agent or nothing fits
+        """
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                return None
+            agent['last_seen'] = time.monotonic()
+            if len(agent['running']) >= agent['slots']:
+                return None
+            for task in self.tasks.values():
+                if task['state'] != 'queued' or not self._fits(task['requires'], agent):
+                    continue
+                now = time.monotonic()
+                task.update(state='leased', agent=agent_id, lease_until=now + self.lease_seconds, started_at=now)
+                task['attempts'] += 1
+                agent['running'].add(task['task_id'])
+                return dict(task['payload'], task_id=task['task_id'], kind=task['kind'], timeout=task['timeout'])
+        return None
+    
+    def heartbeat(self, agent_id: str, task_ids: List[str]) -> Optional[List[str]]:
+        """
+        Renew an agent's leases
+        
+        Args:
+            agent_id (str): Agent
+            task_ids (list): Tasks it is running
+            
+        Returns:
+            list or None: Tasks it should stop, None if the agent must register again
+        """
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                return None
+            now = time.monotonic()
+            agent['last_seen'] = now
+            for task_id in task_ids:
+                task = self.tasks.get(task_id)
+                if task and task['agent'] == agent_id:
+                    task['lease_until'] = now + self.lease_seconds
+            cancel = [task_id for task_id in task_ids if self._cancelled.get(task_id) == agent_id]
+            for task_id in cancel:
+                self._cancelled.pop(task_id)
+                agent['running'].discard(task_id)
+            return cancel
+    
+    def add_events(self, task_id: str, agent_id: str, events: List[Dict[str, any]]):
+        """Pass an agent's events to the task's waiter"""
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if not task or task['agent'] != agent_id:
+                return
+        task['on_events'](events)
+    
+    def finish(self, task_id: str, result: Dict[str, any], agent_id: Optional[str] = None) -> bool:
+        """
+        Complete a task
+        
+        Args:
+            task_id (str): Task
+            result (dict): Execution result, with 'outputs' from the agent
+            agent_id (str, optional): Reporting agent; results from an
+                agent that no longer holds the lease are ignored
+                
+        Returns:
+            bool: True if the result was accepted
+        """
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if not task or (agent_id is not None and task['agent'] != agent_id):
+                if agent_id is not None:
+                    self._cancelled.pop(task_id, None)
+                    if agent_id in self.agents:
+                        self.agents[agent_id]['running'].discard(task_id)
+                return False
+            del self.tasks[task_id]
+            agent = self.agents.get(task['agent'])
+            if agent:
+                agent['running'].discard(task_id)
+                agent['completed' if result.get('success') else 'failed'] += 1
+        task['on_done'](result)
+        return True
+    
+    def cancel(self, task_id: str):
+        """Drop a task whose waiter went away; a leasing agent is told to stop"""
+        with self._lock:
+            task = self.tasks.pop(task_id, None)
+            if task and task['state'] == 'leased':
+                self._cancelled[task_id] = task['agent']
+    
+    def expire(self, queue_timeout: Optional[float] = None):
+        """
+        Re-queue tasks of silent agents and fail tasks that waited or ran too long
+        
+        Args:
+            queue_timeout (float, optional): Max seconds queued, defaults to CLUSTER_QUEUE_TIMEOUT
+        """
+        queue_timeout = queue_timeout or Config.CLUSTER_QUEUE_TIMEOUT
+        now = time.monotonic()
+        failed = []
+        with self._lock:
+            for agent_id, agent in list(self.agents.items()):
+                if now - agent['last_seen'] > self.lease_seconds:
+                    logger.warning(f"Agent {agent_id} stopped responding")
+                    del self.agents[agent_id]
+                    
+            for task in self.tasks.values():
+                if task['state'] == 'queued' and now - task['submitted_at'] > queue_timeout:
+                    failed.append((task, failed_execution(f"No agent took the task within {queue_timeout:.0f}s")))
+                elif task['state'] == 'leased' and task['lease_until'] < now:
+                    self.agents.get(task['agent'], {}).get('running', set()).discard(task['task_id'])
+                    if task['attempts'] < self.max_attempts:
+                        logger.warning(f"Lease of task {task['task_id']} on {task['agent']} expired; re-queued")
+                        task.update(state='queued', agent=None, lease_until=None, started_at=None)
+                    else:
+                        failed.append((task, failed_execution(f"Agent {task['agent']} stopped responding")))
+                elif task['state'] == 'leased' and now - task['started_at'] > task['timeout'] + self.lease_seconds:
+                    # The agent's own timeout should have ended it long ago
+                    self._cancelled[task['task_id']] = task['agent']
+                    failed.append((task, failed_execution(
+                        f"Execution timed out on agent {task['agent']}",
+                        timed_out=True,
+                        limit='timeout'
+                    )))
+                    
+            for task, _ in failed:
+                self.tasks.pop(task['task_id'], None)
+                
+        for task, result in failed:
+            logger.error(f"Task {task['task_id']} ({task['kind']}) failed: {result['stderr']}")
+            task['on_done'](result)
+    
+    def snapshot(self) -> Dict[str, any]:
+        """Agents and task counts for status requests"""
+        with self._lock:
+            agents = [
+                dict(agent, running=sorted(agent['running']), idle_seconds=round(time.monotonic() - agent['last_seen'], 1))
+                for agent in self.agents.values()
+            ]
+            states = {}
+            for task in self.tasks.values():
+                states[task['state']] = states.get(task['state'], 0) + 1
+        for agent in agents:
+            agent.pop('last_seen')
+        return {'agents': agents, 'tasks': states}
+    
+    def _fits(self, requires: Dict[str, any], agent: Dict[str, any]) -> bool:
+        """Whether an agent meets a task's Blender version and memory needs"""
+        version = major_minor(agent['blender_version'])
+        if requires.get('blender') and version and version != requires['blender']:
+            return False
+        if requires.get('ram_mb') and agent['ram_mb'] and agent['ram_mb'] < requires['ram_mb']:
+            return False
+        return True
+
+
+class Coordinator:
+    """
+    Hands Blender executions to agents that pull them over HTTP
+    
+    Each execution becomes a task (build, render chunk or stitch). Files
+    under output/ that the code refers to, and the .blend it opens, go to
+    the agent through the blob store; whatever the agent writes under its
+    copy of output/ comes back the same way and is placed at the same
+    relative path here. Events are streamed back while the task runs, so
+    the pipeline sees progress and errors as it does for local runs.
+    
+    Agents run whatever code they are handed, so with CLUSTER_TOKEN set
+    every request must carry it and every reply is signed with it; the
+    coordinator won't listen beyond loopback without one.
+    """
+    
+    REAP_SECONDS = 1.0
+    
+    def __init__(
+        self,
+        blender_version: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        token: Optional[str] = None
+    ):
+        """
+        Initialize Coordinator
+        
+        Args:
+            blender_version (str, optional): Version the code is written
+                for; agents on another major.minor don't take its tasks
+            host (str, optional): Bind address, defaults to CLUSTER_HOST
+            port (int, optional): Port, defaults to CLUSTER_PORT
+            token (str, optional): Shared secret, defaults to CLUSTER_TOKEN
+        """
+        self.host = host or Config.CLUSTER_HOST
+        self.port = port or Config.CLUSTER_PORT
+        self.token = token if token is not None else Config.CLUSTER_TOKEN
+        self.requires = {
+            'blender': major_minor(blender_version),
+            'ram_mb': Config.BLENDER_MEMORY_LIMIT_MB or None,
+        }
+        self.board = TaskBoard()
+        self.blobs = BlobStore()
+        self._blob_lock = threading.Lock()
+        # Tasks whose blobs haven't been released, finished or not
+        self._holding = {}
+        self._server = None
+        self._stopped = threading.Event()
+    
+    def start(self):
+        """
+        Serve agents and reap expired leases in background threads
+        
+        Raises:
+            ValueError: If asked to listen beyond loopback without a token
+        """
+        if not self.token and not is_loopback(self.host):
+            raise ValueError(f"Refusing to serve agents on {self.host} without CLUSTER_TOKEN")
+        handler = type('BoundClusterRequestHandler', (ClusterRequestHandler,), {'coordinator': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="cluster-http", daemon=True).start()
+        
+        def reap():
+            while not self._stopped.wait(self.REAP_SECONDS):
+                self.board.expire()
+                
+        threading.Thread(target=reap, name="cluster-reaper", daemon=True).start()
+        logger.info(f"Cluster coordinator listening on http://{self.host}:{self.port}")
+    
+    def stop(self):
+        """Stop serving agents"""
+        self._stopped.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+    
+    async def execute_async(
+        self,
+        code: str,
+        timeout: float,
+        label: str = "<memory>",
+        on_event: Optional[Callable[[Dict[str, any]], None]] = None,
+        kill_on_error: Optional[bool] = None,
+        blend_file: Optional[Path] = None,
+        kind: str = 'script',
+        key: Optional[str] = None,
+        threads: Optional[int] = None
+    ) -> Dict[str, any]:
+        """
+        Run a program on an agent
+        
+        Args:
+            code (str): Complete program to run inside Blender
+            timeout (float): Maximum execution time on the agent
+            label (str): Execution label
+            on_event (callable, optional): Called with each event the agent streams
+            kill_on_error (bool, optional): Agent kills Blender on the first traceback
+            blend_file (Path, optional): .blend file to open before running the code
+            kind (str): Task kind, which the agent sizes its CPU budget by
+            key (str, optional): Job profile key for learned render budgets
+            threads (int, optional): Explicit thread budget
+            
+        Returns:
+            dict: Same fields as BlenderExecutor.execute_code_async, plus 'agent'
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def on_done(result: Dict[str, any]):
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(result))
+        
+        def on_events(events: List[Dict[str, any]]):
+            if on_event:
+                loop.call_soon_threadsafe(self._deliver, on_event, events)
+                
+        task = {
+            'task_id': uuid.uuid4().hex[:12],
+            'kind': kind,
+            'timeout': timeout,
+            'requires': self.requires,
+            'on_done': on_done,
+            'on_events': on_events,
+            'blobs': set(),
+        }
+        task['payload'] = {
+            'label': label,
+            'code': code,
+            'kill_on_error': kill_on_error if kill_on_error is not None else BlenderExecutor.kill_on_error_default('background', blend_file),
+            'base_dir': str(Config.BASE_DIR),
+            'output_dir': str(Config.OUTPUT_DIR),
+            'blend_file': self._relative(Path(blend_file)) if blend_file else None,
+            'key': key,
+            'threads': threads,
+        }
+        await asyncio.to_thread(self._submit, task, blend_file)
+        logger.info(f"Queued {task['kind']} task {task['task_id']} ({label}) for cluster agents")
+        
+        try:
+            result = await future
+        except asyncio.CancelledError:
+            self.board.cancel(task['task_id'])
+            await asyncio.to_thread(self._release, task, {})
+            raise
+            
+        outputs = result.pop('outputs', None) or {}
+        missing = await asyncio.to_thread(self._materialize, outputs)
+        await asyncio.to_thread(self._release, task, outputs)
+        if missing:
+            result['success'] = False
+            result['stderr'] = f"{result.get('stderr', '')}\nOutputs missing from the blob store: {', '.join(missing)}".strip()
+        return result
+    
+    def _deliver(self, on_event: Callable[[Dict[str, any]], None], events: List[Dict[str, any]]):
+        """Call the waiter's event callback on its own loop"""
+        for event in events:
+            try:
+                on_event(event)
+            except Exception as e:
+                logger.debug(f"Event callback failed: {e}")
+    
+    def _relative(self, path: Path) -> str:
+        """Path of a file on the agent, relative to its copy of output/"""
+        try:
+            return path.resolve().relative_to(Config.OUTPUT_DIR).as_posix()
+        except ValueError:
+            return f"_inputs/{path.name}"
+    
+    def _submit(self, task: Dict[str, any], blend_file: Optional[Path]):
+        """Store the task's input files and queue it"""
+        output_dir = re.escape(str(Config.OUTPUT_DIR))
+        candidates = {Path(match) for match in re.findall(output_dir + r'''[^'"\n]*''', task['payload']['code'])}
+        if blend_file:
+            candidates.add(Path(blend_file))
+            
+        # Blender doesn't create missing folders for everything it writes
+        task['payload']['directories'] = sorted({
+            path.parent.resolve().relative_to(Config.OUTPUT_DIR).as_posix()
+            for path in candidates if Config.OUTPUT_DIR in path.resolve().parents
+        })
+        
+        with self._blob_lock:
+            task['payload']['inputs'] = {
+                self._relative(path): self.blobs.put_file(path)
+                for path in candidates if path.is_file()
+            }
+            self.board.add(task)
+            self._holding[task['task_id']] = task
+    
+    def announce(self, task_id: str, sha256: str) -> bool:
+        """
+        Record that a task's output is about to be sent
+        
+        Identical outputs of different tasks share a blob, so it has to be
+        referenced before the agent skips or starts its upload, or another
+        task finishing in between could delete it.
+        
+        Args:
+            task_id (str): Task producing the output
+            sha256 (str): Blob id
+            
+        Returns:
+            bool: True if the blob is already in the store
+        """
+        with self._blob_lock:
+            if task_id in self._holding:
+                self._holding[task_id]['blobs'].add(sha256)
+            return self.blobs.has(sha256)
+    
+    def _materialize(self, outputs: Dict[str, str]) -> List[str]:
+        """Copy the agent's outputs into output/; returns the ones not in the store"""
+        missing = []
+        for relative, sha256 in outputs.items():
+            target = (Config.OUTPUT_DIR / relative).resolve()
+            if relative.startswith('_inputs/') or Config.OUTPUT_DIR not in target.parents:
+                continue
+            if not self.blobs.has(sha256):
+                missing.append(relative)
+                continue
+            self.blobs.copy_to(sha256, target)
+        return missing
+    
+    def _release(self, task: Dict[str, any], outputs: Dict[str, str]):
+        """Delete the task's blobs that no other task still holds"""
+        with self._blob_lock:
+            self._holding.pop(task['task_id'], None)
+            live = {
+                sha for other in self._holding.values()
+                for sha in set(other['payload']['inputs'].values()) | other['blobs']
+            }
+            for sha256 in set(task['payload'].get('inputs', {}).values()) | task['blobs'] | set(outputs.values()):
+                if sha256 not in live:
+                    self.blobs.remove(sha256)
+
+
+class ClusterRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/JSON protocol between the coordinator and its agents"""
+    
+    coordinator = None
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+    
+    def _send_json(self, status: int, payload: any = None):
+        data = json.dumps(payload, default=str).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if self.coordinator.token:
+            self.send_header(SIGNATURE_HEADER, sign(self.coordinator.token, data))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _authorized(self) -> bool:
+        """Check the request's cluster token, answering 401 if it is missing or wrong"""
+        token = self.coordinator.token
+        if not token or hmac.compare_digest(self.headers.get(TOKEN_HEADER, '').encode('utf-8'), token.encode('utf-8')):
+            return True
+        logger.warning(f"Rejected {self.command} {self.path} from {self.address_string()}: bad cluster token")
+        if self.command == 'HEAD':
+            self.send_response(HTTPStatus.UNAUTHORIZED)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self._send_json(HTTPStatus.UNAUTHORIZED, {'error': 'Missing or wrong cluster token'})
+        self.close_connection = True
+        return False
+    
+    def _read_json(self) -> Optional[Dict[str, any]]:
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return None
+    
+    def _path_parts(self) -> List[str]:
+        return [part for part in urlparse(self.path).path.split('/') if part]
+    
+    def do_POST(self):
+        if not self._authorized():
+            return
+        parts = self._path_parts()
+        body = self._read_json()
+        if body is None:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': 'Invalid JSON'})
+        board = self.coordinator.board
+        
+        if parts == ['agents']:
+            if not body.get('agent_id'):
+                return self._send_json(HTTPStatus.BAD_REQUEST, {'error': "'agent_id' is required"})
+            board.register(body)
+            return self._send_json(HTTPStatus.OK, {'lease_seconds': board.lease_seconds})
+            
+        if len(parts) == 3 and parts[0] == 'agents' and parts[2] == 'claim':
+            if parts[1] not in board.agents:
+                return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Unknown agent'})
+            task = board.claim(parts[1])
+            if task is None:
+                return self._send_json(HTTPStatus.NO_CONTENT)
+            logger.info(f"Agent {parts[1]} took {task['kind']} task {task['task_id']}")
+            return self._send_json(HTTPStatus.OK, task)
+            
+        if len(parts) == 3 and parts[0] == 'agents' and parts[2] == 'heartbeat':
+            cancel = board.heartbeat(parts[1], body.get('tasks') or [])
+            if cancel is None:
+                return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Unknown agent'})
+            return self._send_json(HTTPStatus.OK, {'cancel': cancel})
+            
+        if len(parts) == 3 and parts[0] == 'tasks' and parts[2] == 'events':
+            board.add_events(parts[1], body.get('agent_id'), body.get('events') or [])
+            return self._send_json(HTTPStatus.OK, {})
+            
+        if len(parts) == 3 and parts[0] == 'tasks' and parts[2] == 'result':
+            result = dict(body.get('execution') or failed_execution('Agent sent no result'))
+            result['outputs'] = body.get('outputs') or {}
+            result['agent'] = body.get('agent_id')
+            accepted = board.finish(parts[1], result, agent_id=body.get('agent_id'))
+            return self._send_json(HTTPStatus.OK if accepted else HTTPStatus.CONFLICT, {'accepted': accepted})
+            
+        self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+    
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts = self._path_parts()
+        
+        if parts == ['health']:
+            return self._send_json(HTTPStatus.OK, dict(self.coordinator.board.snapshot(), status='ok'))
+            
+        if len(parts) == 2 and parts[0] == 'blobs':
+            try:
+                path = self.coordinator.blobs.path(parts[1])
+            except ValueError as e:
+                return self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+            if not path.exists():
+                return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Unknown blob'})
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(path.stat().st_size))
+            self.end_headers()
+            with open(path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, 64 * 1024)
+            return
+            
+        self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+    
+    def do_HEAD(self):
+        if not self._authorized():
+            return
+        parts = self._path_parts()
+        task_id = parse_qs(urlparse(self.path).query).get('task', [None])[0]
+        try:
+            if len(parts) != 2 or parts[0] != 'blobs':
+                exists = False
+            elif task_id:
+                exists = self.coordinator.announce(task_id, parts[1])
+            else:
+                exists = self.coordinator.blobs.has(parts[1])
+        except ValueError:
+            exists = False
+        self.send_response(HTTPStatus.OK if exists else HTTPStatus.NOT_FOUND)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def do_PUT(self):
+        if not self._authorized():
+            return
+        parts = self._path_parts()
+        if len(parts) != 2 or parts[0] != 'blobs':
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+        try:
+            stored = self.coordinator.blobs.put_stream(
+                parts[1],
+                self.rfile.read,
+                int(self.headers.get('Content-Length') or 0)
+            )
+        except ValueError as e:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+        if not stored:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': 'Content does not match its hash'})
+        self._send_json(HTTPStatus.CREATED, {'sha256': parts[1]})
+
+
+class Agent:
+    """
+    Pulls tasks from a coordinator and runs them in the local Blender
+    
+    Each task runs in its own directory that stands in for the
+    coordinator's output/ folder: paths in the code are rewritten to it,
+    inputs are fetched into it, and every file the run leaves there is
+    sent back. Paths in the output and events are rewritten back before
+    they are reported, so the coordinator sees its own paths.
+    
+    With CLUSTER_TOKEN set the agent sends it on every request and only
+    runs tasks whose reply carries the coordinator's signature, and it
+    won't pull from a coordinator beyond loopback without one.
+    """
+    
+    POLL_SECONDS = 0.5
+    EVENT_FLUSH_SECONDS = 0.5
+    
+    def __init__(
+        self,
+        executor,
+        coordinator_url: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        slots: Optional[int] = None,
+        work_dir: Optional[Path] = None,
+        token: Optional[str] = None
+    ):
+        """
+        Initialize Agent
+        
+        Args:
+            executor (BlenderExecutor): Runs tasks in the local Blender
+            coordinator_url (str, optional): Defaults to CLUSTER_COORDINATOR_URL
+            agent_id (str, optional): Defaults to CLUSTER_AGENT_ID or host-pid
+            slots (int, optional): Concurrent tasks, defaults to CLUSTER_AGENT_SLOTS
+            work_dir (Path, optional): Defaults to CLUSTER_WORK_DIR
+            token (str, optional): Shared secret, defaults to CLUSTER_TOKEN
+            
+        Raises:
+            ValueError: If the coordinator is beyond loopback and there is no token
+        """
+        self.executor = executor
+        self.url = (coordinator_url or Config.CLUSTER_COORDINATOR_URL).rstrip('/')
+        self.token = token if token is not None else Config.CLUSTER_TOKEN
+        if not self.token and not is_loopback(urlparse(self.url).hostname):
+            raise ValueError(f"Refusing to run tasks from {self.url} without CLUSTER_TOKEN")
+        self.headers = {TOKEN_HEADER: self.token} if self.token else {}
+        self.agent_id = agent_id or Config.CLUSTER_AGENT_ID or f"{socket.gethostname()}-{os.getpid()}"
+        self.slots = max(1, slots or Config.CLUSTER_AGENT_SLOTS)
+        self.work_dir = Path(work_dir or Config.CLUSTER_WORK_DIR).resolve()
+        self.blobs = BlobStore() if Config.CLUSTER_SHARED_STORE else None
+        self.lease_seconds = Config.CLUSTER_LEASE_SECONDS
+        self._running = {}
+    
+    def capacity(self) -> Dict[str, any]:
+        """What this agent advertises to the coordinator"""
+        try:
+            ram_mb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+        except (AttributeError, ValueError, OSError):
+            ram_mb = None
+        return {
+            'agent_id': self.agent_id,
+            'cores': os.cpu_count() or 1,
+            'ram_mb': ram_mb,
+            'blender_version': self.executor.blender_version,
+            'slots': self.slots,
+        }
+    
+    async def run(self):
+        """Register, then claim and run tasks until cancelled"""
+        await self._register()
+        heartbeat = asyncio.ensure_future(self._heartbeat_loop())
+        try:
+            while True:
+                if len(self._running) < self.slots:
+                    try:
+                        task = await asyncio.to_thread(self._claim)
+                    except requests.RequestException as e:
+                        logger.warning(f"Claim failed: {e}")
+                        task = None
+                    if task:
+                        logger.info(f"Running {task['kind']} task {task['task_id']} ({task['label']})")
+                        self._running[task['task_id']] = asyncio.ensure_future(self._run_task(task))
+                        continue
+                await asyncio.sleep(self.POLL_SECONDS)
+        finally:
+            heartbeat.cancel()
+            for running in list(self._running.values()):
+                running.cancel()
+    
+    async def _register(self):
+        """Register with the coordinator, retrying until it answers"""
+        while True:
+            try:
+                response = await asyncio.to_thread(self._post, '/agents', self.capacity())
+                self.lease_seconds = response.json().get('lease_seconds', self.lease_seconds)
+                logger.info(f"Agent {self.agent_id} registered with {self.url}")
+                return
+            except requests.RequestException as e:
+                logger.warning(f"Coordinator at {self.url} not reachable: {e}")
+                await asyncio.sleep(5)
+    
+    async def _heartbeat_loop(self):
+        """Renew leases and stop tasks the coordinator no longer wants"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                response = await asyncio.to_thread(
+                    self._post,
+                    f'/agents/{self.agent_id}/heartbeat',
+                    {'tasks': list(self._running)},
+                    (HTTPStatus.NOT_FOUND,)
+                )
+            except requests.RequestException as e:
+                logger.warning(f"Heartbeat failed: {e}")
+                continue
+            if response.status_code == HTTPStatus.NOT_FOUND:
+                # The coordinator restarted or dropped us
+                await self._register()
+                continue
+            for task_id in response.json().get('cancel', []):
+                if task_id in self._running:
+                    logger.info(f"Coordinator cancelled task {task_id}")
+                    self._running[task_id].cancel()
+    
+    def _claim(self) -> Optional[Dict[str, any]]:
+        response = self._post(f'/agents/{self.agent_id}/claim', {}, (HTTPStatus.NOT_FOUND,))
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            self._post('/agents', self.capacity())
+            return None
+        if response.status_code != HTTPStatus.OK:
+            return None
+        if self.token and not hmac.compare_digest(
+            response.headers.get(SIGNATURE_HEADER, ''),
+            sign(self.token, response.content)
+        ):
+            # Not from a coordinator holding the token; never run its code
+            logger.error(f"Discarded a task from {self.url} without a valid signature")
+            return None
+        return response.json()
+    
+    def _post(self, path: str, payload: Dict[str, any], allowed: tuple = ()) -> requests.Response:
+        response = requests.post(f"{self.url}{path}", json=payload, headers=self.headers, timeout=30)
+        if response.status_code not in allowed:
+            response.raise_for_status()
+        return response
+    
+    async def _run_task(self, task: Dict[str, any]):
+        """Fetch inputs, run the task, send back outputs and the result"""
+        task_id = task['task_id']
+        output_dir = self.work_dir / "tasks" / task_id / "output"
+        to_local = [(task['output_dir'], str(output_dir)), (task['base_dir'], str(self.work_dir))]
+        to_coordinator = [(local, remote) for remote, local in to_local]
+        events = []
+        
+        async def flush_events():
+            while True:
+                await asyncio.sleep(self.EVENT_FLUSH_SECONDS)
+                if events:
+                    batch = swap_paths(events[:], to_coordinator)
+                    del events[:len(batch)]
+                    try:
+                        await asyncio.to_thread(self._post, f'/tasks/{task_id}/events', {'agent_id': self.agent_id, 'events': batch})
+                    except requests.RequestException as e:
+                        logger.debug(f"Dropped {len(batch)} events of task {task_id}: {e}")
+                        
+        flusher = None
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            for directory in task['directories']:
+                (output_dir / directory).mkdir(parents=True, exist_ok=True)
+            for relative, sha256 in task['inputs'].items():
+                await asyncio.to_thread(self._fetch, sha256, output_dir / relative)
+                
+            flusher = asyncio.ensure_future(flush_events())
+            execution = await self.executor.execute_code_async(
+                swap_paths(task['code'], to_local),
+                mode='background',
+                timeout=task['timeout'],
+                label=f"{task['label']}@{self.agent_id}",
+                on_event=events.append,
+                kill_on_error=task['kill_on_error'],
+                blend_file=output_dir / task['blend_file'] if task['blend_file'] else None,
+                kind=task['kind'],
+                key=task['key'],
+                threads=task['threads']
+            )
+            flusher.cancel()
+            
+            outputs = {}
+            for path in sorted(output_dir.rglob('*')):
+                if not path.is_file():
+                    continue
+                relative = path.relative_to(output_dir).as_posix()
+                sha256 = await asyncio.to_thread(self._send, path, task_id)
+                if task['inputs'].get(relative) != sha256:
+                    outputs[relative] = sha256
+                    
+            if events:
+                await asyncio.to_thread(
+                    self._post, f'/tasks/{task_id}/events',
+                    {'agent_id': self.agent_id, 'events': swap_paths(events, to_coordinator)}
+                )
+            payload = {'agent_id': self.agent_id, 'execution': swap_paths(execution, to_coordinator), 'outputs': outputs}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Task {task_id} failed on this agent: {e}")
+            payload = {'agent_id': self.agent_id, 'execution': failed_execution(f"Agent {self.agent_id}: {e}"), 'outputs': {}}
+        finally:
+            if flusher:
+                flusher.cancel()
+            shutil.rmtree(output_dir.parent, ignore_errors=True)
+            self._running.pop(task_id, None)
+            
+        try:
+            await asyncio.to_thread(self._post, f'/tasks/{task_id}/result', payload, (HTTPStatus.CONFLICT,))
+            logger.info(f"Task {task_id} {'succeeded' if payload['execution']['success'] else 'failed'}")
+        except requests.RequestException as e:
+            logger.error(f"Could not report task {task_id}: {e}")
+    
+    def _fetch(self, sha256: str, target: Path):
+        """Place an input blob at target, from the shared store or over HTTP"""
+        if self.blobs:
+            return self.blobs.copy_to(sha256, target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        with requests.get(f"{self.url}/blobs/{sha256}", headers=self.headers, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            with open(target, 'wb') as f:
+                for chunk in response.iter_content(1024 * 1024):
+                    digest.update(chunk)
+                    f.write(chunk)
+        # The hash came with the signed task, so a matching blob is the one it meant
+        if digest.hexdigest() != sha256:
+            target.unlink()
+            raise ValueError(f"Input blob {sha256[:12]} does not match its hash")
+    
+    def _send(self, path: Path, task_id: str) -> str:
+        """Make a task's file available to the coordinator; returns its SHA-256"""
+        sha256 = hash_file(path)
+        # Announce first, even with a shared store, so the blob can't be collected meanwhile
+        response = requests.head(f"{self.url}/blobs/{sha256}", params={'task': task_id}, headers=self.headers, timeout=30)
+        if response.status_code == HTTPStatus.OK:
+            return sha256
+        if self.blobs:
+            self.blobs.put_file(path)
+        else:
+            with open(path, 'rb') as f:
+                requests.put(f"{self.url}/blobs/{sha256}", data=f, headers=self.headers, timeout=300).raise_for_status()
+        return sha256
+
+
+def run_agent(coordinator_url: Optional[str] = None, slots: Optional[int] = None):
+    """
+    Run a cluster agent until interrupted
+    
+    Args:
+        coordinator_url (str, optional): Defaults to CLUSTER_COORDINATOR_URL
+        slots (int, optional): Concurrent tasks, defaults to CLUSTER_AGENT_SLOTS
+    """
+    agent = Agent(BlenderExecutor(), coordinator_url, slots=slots)
+    capacity = agent.capacity()
+    print(f"\n🛰️  Agent {agent.agent_id} pulling from {agent.url}")
+    print(f"   {capacity['cores']} cores, {capacity['ram_mb'] or '?'} MB, {capacity['blender_version']}, {agent.slots} slots")
+    
+    try:
+        asyncio.run(agent.run())
+    except KeyboardInterrupt:
+        print("\n👋 Agent stopped")
\ No newline at end of file
@@ -4,6 +4,7 @@ import re
 from typing import Tuple, List, Optional
 
 from config import Config
+from bpy_api_index import BpyApiIndex
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,8 @@ class CodeValidator:
     
     def __init__(self):
         """Initialize Code Validator"""
+        # Operators, struct attributes and node sockets of the target Blender build
+        self.api_index = BpyApiIndex.load(Config.BPY_API_INDEX) if Config.BPY_API_CHECK else None
         logger.info("Initialized Code Validator")
     
     def validate(self, code: str) -> Tuple[bool, List[str], List[str]]:
@@ -68,6 +71,10 @@ class CodeValidator:
         api_warnings = self._check_blender_api(code)
         warnings.extend(api_warnings)
         
+        # 5. Check operators, attributes and node sockets against the API index
+        if self.api_index:
+            errors.extend(self.api_index.check(code))
+        
         is_valid = len(errors) == 0
         
         if is_valid:
@@ -0,0 +1,443 @@
+import re
+import ast
+import logging
+from typing import Optional, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Principled BSDF inputs renamed in the 4.0 rewrite: (since, old, new)
+PRINCIPLED_SOCKETS = [
+    ((4, 0), 'Subsurface', 'Subsurface Weight'),
+    ((4, 0), 'Specular', 'Specular IOR Level'),
+    ((4, 0), 'Transmission', 'Transmission Weight'),
+    ((4, 0), 'Clearcoat', 'Coat Weight'),
+    ((4, 0), 'Clearcoat Roughness', 'Coat Roughness'),
+    ((4, 0), 'Clearcoat Normal', 'Coat Normal'),
+    ((4, 0), 'Sheen', 'Sheen Weight'),
+    ((4, 0), 'Emission', 'Emission Color'),
+]
+
+# Principled BSDF inputs removed without an equivalent; assignments to them are dropped
+REMOVED_SOCKETS = [
+    ((4, 0), 'Subsurface Color'),
+    ((4, 0), 'Transmission Roughness'),
+]
+
+# Legacy import/export operators replaced by the C++ ones:
+# (since, old, new, keyword renames, None dropping a keyword)
+AXIS_KEYWORDS = {'axis_forward': 'forward_axis', 'axis_up': 'up_axis'}
+OPERATORS = [
+    ((3, 2), 'export_scene.obj', 'wm.obj_export', {
+        **AXIS_KEYWORDS,
+        'use_selection': 'export_selected_objects',
+        'use_mesh_modifiers': 'apply_modifiers',
+        'use_normals': 'export_normals',
+        'use_uvs': 'export_uv',
+        'use_materials': 'export_materials',
+        'use_triangles': 'export_triangulated_mesh',
+        'use_vertex_groups': 'export_vertex_groups',
+        'use_smooth_groups': 'export_smooth_groups',
+        'group_by_object': 'export_object_groups',
+        'group_by_material': 'export_material_groups',
+        'use_animation': 'export_animation',
+        'use_edges': None,
+        'use_blen_objects': None,
+        'keep_vertex_order': None,
+        'use_nurbs': None,
+    }),
+    ((3, 2), 'import_scene.obj', 'wm.obj_import', {
+        **AXIS_KEYWORDS,
+        'global_clamp_size': 'clamp_size',
+        'use_groups_as_vgroups': 'import_vertex_groups',
+        'use_edges': None,
+        'use_smooth_groups': None,
+        'use_image_search': None,
+        'split_mode': None,
+    }),
+    ((3, 6), 'export_mesh.ply', 'wm.ply_export', {
+        **AXIS_KEYWORDS,
+        'use_selection': 'export_selected_objects',
+        'use_mesh_modifiers': 'apply_modifiers',
+        'use_normals': 'export_normals',
+        'use_uv_coords': 'export_uv',
+        'use_ascii': 'ascii_format',
+        'use_colors': None,
+    }),
+    ((3, 6), 'import_mesh.ply', 'wm.ply_import', {}),
+    ((4, 1), 'export_mesh.stl', 'wm.stl_export', {
+        **AXIS_KEYWORDS,
+        'use_selection': 'export_selected_objects',
+        'use_mesh_modifiers': 'apply_modifiers',
+        'ascii': 'ascii_format',
+        'batch_mode': None,
+    }),
+    ((4, 1), 'import_mesh.stl', 'wm.stl_import', AXIS_KEYWORDS),
+]
+
+# Properties removed without an equivalent; assignments to them are dropped
+REMOVED_PROPERTIES = [
+    ((4, 1), 'use_auto_smooth'),
+    ((4, 1), 'auto_smooth_angle'),
+    ((4, 2), 'use_ssr'),
+    ((4, 2), 'use_ssr_refraction'),
+    ((4, 2), 'use_gtao'),
+    ((4, 2), 'gtao_distance'),
+    ((4, 2), 'use_bloom'),
+    ((4, 2), 'bloom_intensity'),
+    ((4, 2), 'bloom_threshold'),
+    ((4, 2), 'use_soft_shadows'),
+]
+
+EEVEE_ENGINES = ('EEVEE', 'BLENDER_EEVEE', 'BLENDER_EEVEE_NEXT')
+
+
+def parse_version(text: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """
+    Parse a Blender version out of text such as 'Blender 5.0.1' or '4.2'
+    
+    Args:
+        text (str, optional): Version text
+        
+    Returns:
+        tuple: (major, minor, patch), None if there is no version in the text
+    """
+    match = re.search(r'(\d+)\.(\d+)(?:\.(\d+))?', text or '')
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2)), int(match.group(3) or 0)
+
+
+class CompatRewriter:
+    """
+    Rewrites outdated bpy API usage for the Blender version that will run it
+    
+    Rules are tables of (version the change took effect, old, new); every
+    rule at or below the target version is applied. Edits are made in the
+    source text at the positions the AST reports, so comments and layout
+    are kept, and each one is reported.
+    """
+    
+    def __init__(self, version: Tuple[int, ...]):
+        """
+        Initialize Compat Rewriter
+        
+        Args:
+            version (tuple): Target Blender version, e.g. (5, 0, 1)
+        """
+        self.version = tuple(version)
+        self.sockets = {old: (new, since) for since, old, new in PRINCIPLED_SOCKETS if self.version >= since}
+        self.removed_sockets = {old: since for since, old in REMOVED_SOCKETS if self.version >= since}
+        self.operators = {old: (new, keywords, since) for since, old, new, keywords in OPERATORS if self.version >= since}
+        self.removed_properties = {name: since for since, name in REMOVED_PROPERTIES if self.version >= since}
+        # EEVEE Next took the engine id in 4.2 and handed it back to BLENDER_EEVEE in 5.0
+        self.eevee_engine = 'BLENDER_EEVEE_NEXT' if (4, 2) <= self.version < (5, 0) else 'BLENDER_EEVEE'
+    
+    @classmethod
+    def for_version(cls, text: Optional[str]) -> Optional['CompatRewriter']:
+        """
+        Build a rewriter from version text
+        
+        Args:
+            text (str, optional): e.g. the first line of `blender --version`
+            
+        Returns:
+            CompatRewriter: Rewriter, None if the version can't be read
+        """
+        version = parse_version(text)
+        if version is None:
+            logger.warning(f"Unknown Blender version {text!r}; compatibility rewrites disabled")
+            return None
+        return cls(version)
+    
+    @property
+    def version_string(self) -> str:
+        return '.'.join(str(part) for part in self.version)
+    
+    def rewrite(self, code: str) -> Tuple[str, List[Dict[str, any]]]:
+        """
+        Rewrite code for the target version
+        
+        Args:
+            code (str): Python source
+            
+        Returns:
+            Tuple[str, List[dict]]: (rewritten code, rewrites with 'line', 'rule',
+                                    'old', 'new' and 'since'); code that doesn't
+                                    parse is returned unchanged
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return code, []
+            
+        edits = []
+        node_types = self._node_types(tree)
+        removed = []
+        
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+                self._check_removed(node, node_types, removed)
+            elif isinstance(node, ast.Attribute):
+                self._check_operator(node, edits)
+            elif isinstance(node, ast.Call):
+                self._check_keywords(node, edits)
+                self._check_socket_get(node, node_types, edits)
+                self._check_scene_calls(node, edits)
+            elif isinstance(node, ast.Subscript):
+                self._check_socket(node, node.value, node.slice, node_types, edits)
+                
+            if isinstance(node, ast.Assign):
+                self._check_engine(node, edits)
+                
+        # Dropped statements win over edits inside them
+        spans = [(edit['start'], edit['end']) for edit in removed]
+        edits = [edit for edit in edits if not any(start <= edit['start'] and edit['end'] <= end for start, end in spans)]
+        edits.extend(removed)
+        if not edits:
+            return code, []
+            
+        lines = code.splitlines(keepends=True)
+        starts = [0]
+        for line in lines:
+            starts.append(starts[-1] + len(line))
+        
+        def offset(position: Tuple[int, int]) -> int:
+            lineno, col = position
+            line = lines[lineno - 1] if lineno <= len(lines) else ''
+            return starts[lineno - 1] + len(line.encode('utf-8')[:col].decode('utf-8', errors='ignore'))
+            
+        edits.sort(key=lambda edit: edit['start'], reverse=True)
+        rewritten = code
+        for edit in edits:
+            start, end = offset(edit['start']), offset(edit['end'])
+            text = edit['text']
+            if text.startswith("'") and rewritten[start:start + 1] == '"':
+                # Keep the quote style of replaced strings
+                text = '"' + text[1:-1] + '"'
+            rewritten = rewritten[:start] + text + rewritten[end:]
+            
+        rewrites = [
+            {key: edit[key] for key in ('line', 'rule', 'old', 'new', 'since')}
+            for edit in sorted(edits, key=lambda edit: edit['start'])
+        ]
+        for rewrite in rewrites:
+            logger.info(self.describe(rewrite))
+        return rewritten, rewrites
+    
+    @staticmethod
+    def describe(rewrite: Dict[str, any]) -> str:
+        """One-line description of a rewrite"""
+        change = f"{rewrite['old']} -> {rewrite['new']}" if rewrite['new'] else f"dropped {rewrite['old']}"
+        return f"Line {rewrite['line']}: {change} ({rewrite['rule']}, Blender {rewrite['since']}+)"
+        
+    # Rules
+    
+    def _edit(
+        self,
+        edits: List[Dict[str, any]],
+        node: ast.AST,
+        text: str,
+        rule: str,
+        old: str,
+        new: Optional[str],
+        since: Tuple[int, ...],
+        start: Optional[Tuple[int, int]] = None,
+        end: Optional[Tuple[int, int]] = None
+    ):
+        edits.append({
+            'start': start or (node.lineno, node.col_offset),
+            'end': end or (node.end_lineno, node.end_col_offset),
+            'text': text,
+            'line': node.lineno,
+            'rule': rule,
+            'old': old,
+            'new': new,
+            'since': '.'.join(str(part) for part in since),
+        })
+    
+    @staticmethod
+    def _dotted(node: ast.AST) -> Optional[str]:
+        """'bpy.ops.export_mesh.stl' for an attribute chain of names, else None"""
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    
+    def _node_types(self, tree: ast.AST) -> Dict[str, Optional[str]]:
+        """
+        Node type or default name bound to each variable, None when ambiguous
+        
+        nodes.new('ShaderNodeBsdfPrincipled'), nodes['Principled BSDF'] and
+        nodes.get('Principled BSDF') are recognised; socket renames only
+        apply to Principled BSDF nodes and to variables of unknown type.
+        """
+        types = {}
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Assign) or len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+                continue
+            name = node.targets[0].id
+            value = node.value
+            key = None
+            if isinstance(value, ast.Call) and isinstance(value.func, ast.Attribute) and value.func.attr in ('new', 'get'):
+                argument = value.args[0] if value.args else next((k.value for k in value.keywords if k.arg == 'type'), None)
+                if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+                    key = argument.value
+            elif isinstance(value, ast.Subscript) and isinstance(value.slice, ast.Constant):
+                key = value.slice.value if isinstance(value.slice.value, str) else None
+            if key is None:
+                types[name] = None if name in types else ''
+                continue
+            kind = self._node_kind(key)
+            types[name] = kind if types.get(name, kind) == kind else None
+        return types
+    
+    @staticmethod
+    def _node_kind(key: str) -> Optional[str]:
+        """'principled', 'other' or None (unknown) for a node type or name"""
+        if key in ('ShaderNodeBsdfPrincipled', 'Principled BSDF'):
+            return 'principled'
+        if key.startswith(('ShaderNode', 'GeometryNode', 'CompositorNode', 'FunctionNode')):
+            return 'other'
+        return None
+    
+    def _is_other_node(self, receiver: ast.AST, node_types: Dict[str, Optional[str]]) -> bool:
+        """Whether the node owning an inputs/outputs collection is known not to be a Principled BSDF"""
+        if isinstance(receiver, ast.Name):
+            return node_types.get(receiver.id) == 'other'
+        if isinstance(receiver, ast.Subscript) and isinstance(receiver.slice, ast.Constant):
+            return isinstance(receiver.slice.value, str) and self._node_kind(receiver.slice.value) == 'other'
+        return False
+    
+    def _socket_collection(self, node: ast.AST, node_types: Dict[str, Optional[str]]) -> bool:
+        """Whether node is `<principled or unknown node>.inputs`"""
+        return (
+            isinstance(node, ast.Attribute)
+            and node.attr == 'inputs'
+            and not self._is_other_node(node.value, node_types)
+        )
+    
+    def _check_socket(
+        self,
+        node: ast.AST,
+        collection: ast.AST,
+        key: ast.AST,
+        node_types: Dict[str, Optional[str]],
+        edits: List[Dict[str, any]]
+    ):
+        if not (isinstance(key, ast.Constant) and isinstance(key.value, str) and key.value in self.sockets):
+            return
+        if not self._socket_collection(collection, node_types):
+            return
+        new, since = self.sockets[key.value]
+        self._edit(edits, key, repr(new), 'Principled BSDF socket', repr(key.value), repr(new), since)
+    
+    def _check_socket_get(self, node: ast.Call, node_types: Dict[str, Optional[str]], edits: List[Dict[str, any]]):
+        if isinstance(node.func, ast.Attribute) and node.func.attr == 'get' and node.args:
+            self._check_socket(node, node.func.value, node.args[0], node_types, edits)
+    
+    def _check_operator(self, node: ast.Attribute, edits: List[Dict[str, any]]):
+        dotted = self._dotted(node)
+        if not dotted or not dotted.startswith('bpy.ops.'):
+            return
+        operator = dotted[len('bpy.ops.'):]
+        if operator in self.operators:
+            new, _, since = self.operators[operator]
+            self._edit(edits, node, f"bpy.ops.{new}", 'operator', f"bpy.ops.{operator}", f"bpy.ops.{new}", since)
+    
+    def _check_keywords(self, node: ast.Call, edits: List[Dict[str, any]]):
+        dotted = self._dotted(node.func)
+        if not dotted or not dotted.startswith('bpy.ops.') or dotted[len('bpy.ops.'):] not in self.operators:
+            return
+        _, keywords, since = self.operators[dotted[len('bpy.ops.'):]]
+        for keyword in node.keywords:
+            if keyword.arg not in keywords:
+                continue
+            new = keywords[keyword.arg]
+            if new is None:
+                start, end = self._keyword_span(node, keyword)
+                self._edit(edits, keyword, '', 'operator keyword', keyword.arg, None, since, start=start, end=end)
+                continue
+            self._edit(
+                edits, keyword, new, 'operator keyword', keyword.arg, new, since,
+                end=(keyword.lineno, keyword.col_offset + len(keyword.arg.encode('utf-8')))
+            )
+            if new in ('forward_axis', 'up_axis'):
+                value = keyword.value
+                if isinstance(value, ast.Constant) and isinstance(value.value, str) and value.value.startswith('-'):
+                    axis = f"NEGATIVE_{value.value[1:]}"
+                    self._edit(edits, value, repr(axis), 'axis value', repr(value.value), repr(axis), since)
+    
+    @staticmethod
+    def _keyword_span(call: ast.Call, keyword: ast.keyword) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """Span of "name=value" with the comma that separates it from its neighbour"""
+        position = (keyword.lineno, keyword.col_offset)
+        arguments = list(call.args) + list(call.keywords)
+        following = [argument for argument in arguments if (argument.lineno, argument.col_offset) > position]
+        if following:
+            nearest = min(following, key=lambda argument: (argument.lineno, argument.col_offset))
+            return position, (nearest.lineno, nearest.col_offset)
+        preceding = [argument for argument in arguments if (argument.lineno, argument.col_offset) < position]
+        if preceding:
+            nearest = max(preceding, key=lambda argument: (argument.end_lineno, argument.end_col_offset))
+            return (nearest.end_lineno, nearest.end_col_offset), (keyword.end_lineno, keyword.end_col_offset)
+        return position, (keyword.end_lineno, keyword.end_col_offset)
+    
+    def _check_removed(self, node: ast.AST, node_types: Dict[str, Optional[str]], removed: List[Dict[str, any]]):
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        for target in targets:
+            old = since = None
+            if isinstance(target, ast.Attribute) and target.attr in self.removed_properties:
+                old, since = target.attr, self.removed_properties[target.attr]
+            elif (
+                isinstance(target, ast.Attribute)
+                and target.attr == 'default_value'
+                and isinstance(target.value, ast.Subscript)
+                and isinstance(target.value.slice, ast.Constant)
+                and target.value.slice.value in self.removed_sockets
+                and self._socket_collection(target.value.value, node_types)
+            ):
+                old = repr(target.value.slice.value)
+                since = self.removed_sockets[target.value.slice.value]
+            if old is not None:
+                # 'pass' keeps the enclosing block valid
+                self._edit(removed, node, 'pass', 'removed', old, None, since)
+                return
+    
+    def _check_engine(self, node: ast.Assign, edits: List[Dict[str, any]]):
+        value = node.value
+        if not (isinstance(value, ast.Constant) and value.value in EEVEE_ENGINES and value.value != self.eevee_engine):
+            return
+        if any(isinstance(target, ast.Attribute) and target.attr == 'engine' for target in node.targets):
+            since = (5, 0) if self.version >= (5, 0) else (4, 2) if self.version >= (4, 2) else (2, 80)
+            self._edit(edits, value, repr(self.eevee_engine), 'render engine', repr(value.value), repr(self.eevee_engine), since)
+    
+    def _check_scene_calls(self, node: ast.Call, edits: List[Dict[str, any]]):
+        """2.7x scene.objects.link(obj) and scene.update(), still common in generated code"""
+        if self.version < (2, 80) or not isinstance(node.func, ast.Attribute):
+            return
+        func = node.func
+        
+        def is_scene(expr: ast.AST) -> bool:
+            return (isinstance(expr, ast.Name) and expr.id == 'scene') or (isinstance(expr, ast.Attribute) and expr.attr == 'scene')
+            
+        if func.attr in ('link', 'unlink') and isinstance(func.value, ast.Attribute) and func.value.attr == 'objects':
+            scene = func.value.value
+            if is_scene(scene):
+                end = (scene.end_lineno, scene.end_col_offset)
+                self._edit(
+                    edits, scene, '.collection', 'legacy API', f"scene.objects.{func.attr}",
+                    f"scene.collection.objects.{func.attr}", (2, 80), start=end, end=end
+                )
+        elif func.attr == 'update' and not node.args and is_scene(func.value):
+            scene = func.value
+            if isinstance(scene, ast.Name):
+                self._edit(edits, scene, 'bpy.context.view_layer', 'legacy API', 'scene.update()', 'view_layer.update()', (2, 80))
+            else:
+                start = (scene.end_lineno, scene.end_col_offset - len('scene'))
+                self._edit(
+                    edits, scene, 'view_layer', 'legacy API', 'scene.update()', 'view_layer.update()', (2, 80), start=start
+                )
\ No newline at end of file
@@ -46,12 +46,71 @@ class Config:
     LOCAL_LLM_BATCH_SIZE = int(os.getenv("LOCAL_LLM_BATCH_SIZE", "512"))
     LOCAL_LLM_USE_MMAP = os.getenv("LOCAL_LLM_USE_MMAP", "true").lower() == "true"
     LOCAL_LLM_NUM_THREADS = int(os.getenv("LOCAL_LLM_NUM_THREADS", "0"))
+    LOCAL_LLM_TIMEOUT = float(os.getenv("LOCAL_LLM_TIMEOUT", "120"))
+    LOCAL_LLM_KEEP_ALIVE = os.getenv("LOCAL_LLM_KEEP_ALIVE", "30m")
+    LOCAL_LLM_WARMUP = os.getenv("LOCAL_LLM_WARMUP", "true").lower() == "true"
+    LOCAL_LLM_WARMUP_TIMEOUT = float(os.getenv("LOCAL_LLM_WARMUP_TIMEOUT", "600"))
+    LOCAL_LLM_PARALLEL = int(os.getenv("LOCAL_LLM_PARALLEL", "0"))
+    LOCAL_LLM_MAX_PARALLEL = int(os.getenv("LOCAL_LLM_MAX_PARALLEL", "8"))
+    LOCAL_LLM_QUANTIZATION = os.getenv("LOCAL_LLM_QUANTIZATION", "")
+    
+    # ==========================================
+    # PROVIDER ROUTING
+    # ==========================================
+    AI_FALLBACK_PROVIDERS = [
+        provider.strip().lower()
+        for provider in os.getenv("AI_FALLBACK_PROVIDERS", "").split(",")
+        if provider.strip()
+    ]
+    ROUTER_STRATEGY = os.getenv("ROUTER_STRATEGY", "priority").lower()
+    ROUTER_MAX_RETRIES = int(os.getenv("ROUTER_MAX_RETRIES", "4"))
+    ROUTER_BACKOFF_BASE = float(os.getenv("ROUTER_BACKOFF_BASE", "1.0"))
+    ROUTER_BACKOFF_MAX = float(os.getenv("ROUTER_BACKOFF_MAX", "30"))
+    ROUTER_HEDGE = os.getenv("ROUTER_HEDGE", "true").lower() == "true"
+    ROUTER_HEDGE_MIN_SAMPLES = int(os.getenv("ROUTER_HEDGE_MIN_SAMPLES", "20"))
+    ROUTER_HEDGE_DEFAULT_SECONDS = float(os.getenv("ROUTER_HEDGE_DEFAULT_SECONDS", "60"))
+    ROUTER_BREAKER_FAILURES = int(os.getenv("ROUTER_BREAKER_FAILURES", "5"))
+    ROUTER_BREAKER_RESET_SECONDS = float(os.getenv("ROUTER_BREAKER_RESET_SECONDS", "60"))
+    ROUTER_MAX_WORKERS = int(os.getenv("ROUTER_MAX_WORKERS", "8"))
+    
+    # (requests per minute, tokens per minute) per provider, 0 = unlimited
+    PROVIDER_RATE_LIMITS = {
+        'claude': (float(os.getenv("CLAUDE_RPM", "0")), float(os.getenv("CLAUDE_TPM", "0"))),
+        'openai': (float(os.getenv("OPENAI_RPM", "0")), float(os.getenv("OPENAI_TPM", "0"))),
+        'local': (float(os.getenv("LOCAL_LLM_RPM", "0")), float(os.getenv("LOCAL_LLM_TPM", "0"))),
+    }
+    
+    # ==========================================
+    # BATCH API (offline bulk generation)
+    # ==========================================
+    BATCH_API_PROVIDER = os.getenv("BATCH_API_PROVIDER", "").lower()
+    BATCH_API_ANTHROPIC_URL = os.getenv("BATCH_API_ANTHROPIC_URL", "https://api.anthropic.com")
+    BATCH_API_OPENAI_URL = os.getenv("BATCH_API_OPENAI_URL", "https://api.openai.com")
+    BATCH_API_CHUNK_SIZE = int(os.getenv("BATCH_API_CHUNK_SIZE", "1000"))
+    BATCH_API_POLL_SECONDS = float(os.getenv("BATCH_API_POLL_SECONDS", "60"))
+    BATCH_API_HTTP_TIMEOUT = float(os.getenv("BATCH_API_HTTP_TIMEOUT", "120"))
     
     # ==========================================
     # BLENDER CONFIGURATION
     # ==========================================
     BLENDER_PATH = os.getenv("BLENDER_PATH", "blender")
     DEFAULT_MODE = os.getenv("DEFAULT_MODE", "background")
+    BLENDER_TIMEOUT = int(os.getenv("BLENDER_TIMEOUT", "300"))
+    ADAPTIVE_TIMEOUT = os.getenv("ADAPTIVE_TIMEOUT", "true").lower() == "true"
+    BLENDER_TIMEOUT_MIN = int(os.getenv("BLENDER_TIMEOUT_MIN", "30"))
+    BLENDER_TIMEOUT_MAX = int(os.getenv("BLENDER_TIMEOUT_MAX", "3600"))
+    TIMEOUT_SAFETY_FACTOR = float(os.getenv("TIMEOUT_SAFETY_FACTOR", "2.0"))
+    RENDER_PIXEL_SAMPLES_PER_SECOND = float(os.getenv("RENDER_PIXEL_SAMPLES_PER_SECOND", "2000000"))
+    BLENDER_MEMORY_LIMIT_MB = int(os.getenv("BLENDER_MEMORY_LIMIT_MB", "0"))
+    BLENDER_CPU_LIMIT_SECONDS = int(os.getenv("BLENDER_CPU_LIMIT_SECONDS", "0"))
+    BLENDER_CGROUP_ROOT = os.getenv("BLENDER_CGROUP_ROOT", "")
+    KILL_ON_ERROR = os.getenv("KILL_ON_ERROR", "auto").lower()
+    OUTPUT_BUFFER_LINES = int(os.getenv("OUTPUT_BUFFER_LINES", "500"))
+    CPU_SCHEDULER_ENABLED = os.getenv("CPU_SCHEDULER_ENABLED", "true").lower() == "true"
+    CPU_SCHEDULER_CORES = int(os.getenv("CPU_SCHEDULER_CORES", "0"))
+    CPU_BUILD_CORES = int(os.getenv("CPU_BUILD_CORES", "1"))
+    CPU_AFFINITY = os.getenv("CPU_AFFINITY", "true").lower() == "true"
+    CPU_SCHEDULER_MIN_SAMPLES = int(os.getenv("CPU_SCHEDULER_MIN_SAMPLES", "3"))
     
     # ==========================================
     # OUTPUT SETTINGS
@@ -60,12 +119,28 @@ class Config:
     AUTO_SAVE = os.getenv("AUTO_SAVE", "true").lower() == "true"
     AUTO_EXPORT = os.getenv("AUTO_EXPORT", "false").lower() == "true"
     EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "obj").lower()
+    EXPORT_LODS = os.getenv("EXPORT_LODS", "false").lower() == "true"
+    EXPORT_LOD_LEVELS = os.getenv("EXPORT_LOD_LEVELS", "collapse:0.5,collapse:0.25,collapse:0.1")
+    EXPORT_LOD_MODE = os.getenv("EXPORT_LOD_MODE", "files").lower()
+    EXPORT_LOD_MIN_TRIANGLES = int(os.getenv("EXPORT_LOD_MIN_TRIANGLES", "500"))
     
     # Render settings
     RENDER_WIDTH = int(os.getenv("RENDER_WIDTH", "1920"))
     RENDER_HEIGHT = int(os.getenv("RENDER_HEIGHT", "1080"))
     RENDER_SAMPLES = int(os.getenv("RENDER_SAMPLES", "128"))
     RENDER_ENGINE = os.getenv("RENDER_ENGINE", "CYCLES")
+    SPLIT_RENDER_WORKERS = int(os.getenv("SPLIT_RENDER_WORKERS", "0"))
+    SPLIT_RENDER_MODE = os.getenv("SPLIT_RENDER_MODE", "regions").lower()
+    SPLIT_RENDER_THREADS = int(os.getenv("SPLIT_RENDER_THREADS", "0"))
+    
+    # Procedural material baking
+    BAKE_MATERIALS = os.getenv("BAKE_MATERIALS", "false").lower() == "true"
+    BAKE_RESOLUTION = int(os.getenv("BAKE_RESOLUTION", "1024"))
+    BAKE_SAMPLES = int(os.getenv("BAKE_SAMPLES", "16"))
+    BAKE_MARGIN = int(os.getenv("BAKE_MARGIN", "16"))
+    BAKE_MIN_NODES = int(os.getenv("BAKE_MIN_NODES", "6"))
+    BAKE_CACHE_DIR = BASE_DIR / os.getenv("BAKE_CACHE_DIR", "store/bakes")
+    BAKE_CACHE_MAX_MB = float(os.getenv("BAKE_CACHE_MAX_MB", "2048"))
     
     # ==========================================
     # LOGGING SETTINGS
@@ -73,16 +148,104 @@ class Config:
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_TO_FILE = os.getenv("LOG_TO_FILE", "true").lower() == "true"
     LOG_FILE = BASE_DIR / os.getenv("LOG_FILE", "logs/blender_ai.log")
+    TIMING_HISTORY_FILE = BASE_DIR / os.getenv("TIMING_HISTORY_FILE", "logs/stage_timings.json")
+    TIMING_HISTORY_SAMPLES = int(os.getenv("TIMING_HISTORY_SAMPLES", "200"))
+    JOURNAL_ENABLED = os.getenv("JOURNAL_ENABLED", "true").lower() == "true"
+    JOURNAL_FILE = BASE_DIR / os.getenv("JOURNAL_FILE", "logs/job_journal.sqlite")
+    JOURNAL_SYNC_FULL = os.getenv("JOURNAL_SYNC_FULL", "false").lower() == "true"
     
     # ==========================================
     # ADVANCED SETTINGS
     # ==========================================
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", "4000"))
+    TOKEN_BUDGET_ENABLED = os.getenv("TOKEN_BUDGET_ENABLED", "true").lower() == "true"
+    TOKEN_BUDGET_FILE = BASE_DIR / os.getenv("TOKEN_BUDGET_FILE", "logs/token_budget.json")
+    TOKEN_BUDGET_MIN = int(os.getenv("TOKEN_BUDGET_MIN", "512"))
+    TOKEN_BUDGET_MIN_SAMPLES = int(os.getenv("TOKEN_BUDGET_MIN_SAMPLES", "10"))
+    TOKEN_BUDGET_HEADROOM = float(os.getenv("TOKEN_BUDGET_HEADROOM", "1.3"))
+    TOKEN_BUDGET_MAX_CONTINUATIONS = int(os.getenv("TOKEN_BUDGET_MAX_CONTINUATIONS", "2"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
     VALIDATE_CODE = os.getenv("VALIDATE_CODE", "true").lower() == "true"
+    BPY_API_CHECK = os.getenv("BPY_API_CHECK", "true").lower() == "true"
+    BPY_API_INDEX = BASE_DIR / os.getenv("BPY_API_INDEX", "api_index/bpy_api.json.gz")
+    COMPAT_REWRITE = os.getenv("COMPAT_REWRITE", "true").lower() == "true"
+    COMPAT_BLENDER_VERSION = os.getenv("COMPAT_BLENDER_VERSION", "")
     SAVE_FAILED_CODE = os.getenv("SAVE_FAILED_CODE", "true").lower() == "true"
     ARCHIVE_GENERATIONS = os.getenv("ARCHIVE_GENERATIONS", "true").lower() == "true"
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+    PERSIST_SCRIPTS = os.getenv("PERSIST_SCRIPTS", "false").lower() == "true"
+    DRY_RUN_ENABLED = os.getenv("DRY_RUN_ENABLED", "false").lower() == "true"
+    DRY_RUN_WORKERS = int(os.getenv("DRY_RUN_WORKERS", "1"))
+    DRY_RUN_TIMEOUT = float(os.getenv("DRY_RUN_TIMEOUT", "60"))
+    DRY_RUN_START_TIMEOUT = float(os.getenv("DRY_RUN_START_TIMEOUT", "120"))
+    DRY_RUN_MAX_RUNS = int(os.getenv("DRY_RUN_MAX_RUNS", "50"))
+    
+    # ==========================================
+    # ASSET LIBRARY
+    # ==========================================
+    ASSET_LIBRARY_ENABLED = os.getenv("ASSET_LIBRARY_ENABLED", "true").lower() == "true"
+    ASSET_LIBRARY_DIR = BASE_DIR / os.getenv("ASSET_LIBRARY_DIR", "assets")
+    ASSET_PROMPT_LIMIT = int(os.getenv("ASSET_PROMPT_LIMIT", "8"))
+    
+    # ==========================================
+    # PIPELINE SETTINGS
+    # ==========================================
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+    PIPELINE_PROCESS_WORKERS = int(os.getenv("PIPELINE_PROCESS_WORKERS", "1"))
+    PIPELINE_GENERATE_WORKERS = int(os.getenv("PIPELINE_GENERATE_WORKERS", "2"))
+    PIPELINE_VALIDATE_WORKERS = int(os.getenv("PIPELINE_VALIDATE_WORKERS", "1"))
+    PIPELINE_ASSEMBLE_WORKERS = int(os.getenv("PIPELINE_ASSEMBLE_WORKERS", "1"))
+    PIPELINE_EXECUTE_WORKERS = int(os.getenv("PIPELINE_EXECUTE_WORKERS", "1"))
+    PIPELINE_POST_WORKERS = int(os.getenv("PIPELINE_POST_WORKERS", "1"))
+    COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+    
+    # Cost-aware scheduling of the execute stage and the service queue
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_LANES = os.getenv("SCHEDULER_LANES", "fast:1:p50,slow:1")
+    SCHEDULER_SLO = os.getenv("SCHEDULER_SLO", "fast:180,slow:1800")
+    SCHEDULER_AGING = float(os.getenv("SCHEDULER_AGING", "0.5"))
+    SCHEDULER_SLO_WINDOW = int(os.getenv("SCHEDULER_SLO_WINDOW", "200"))
+    
+    # ==========================================
+    # JOB SERVICE SETTINGS
+    # ==========================================
+    SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8765"))
+    SERVICE_QUEUE_FILE = BASE_DIR / os.getenv("SERVICE_QUEUE_FILE", "logs/job_queue.sqlite")
+    SERVICE_MAX_ACTIVE_JOBS = int(os.getenv("SERVICE_MAX_ACTIVE_JOBS", "4"))
+    SERVICE_MAX_JOBS_PER_CLIENT = int(os.getenv("SERVICE_MAX_JOBS_PER_CLIENT", "2"))
+    SERVICE_EVENT_BUFFER = int(os.getenv("SERVICE_EVENT_BUFFER", "1000"))
+    
+    # ==========================================
+    # CLUSTER SETTINGS
+    # ==========================================
+    CLUSTER_ENABLED = os.getenv("CLUSTER_ENABLED", "false").lower() == "true"
+    CLUSTER_HOST = os.getenv("CLUSTER_HOST", "127.0.0.1")
+    CLUSTER_PORT = int(os.getenv("CLUSTER_PORT", "8766"))
+    CLUSTER_TOKEN = os.getenv("CLUSTER_TOKEN", "")
+    CLUSTER_LEASE_SECONDS = float(os.getenv("CLUSTER_LEASE_SECONDS", "30"))
+    CLUSTER_MAX_ATTEMPTS = int(os.getenv("CLUSTER_MAX_ATTEMPTS", "2"))
+    CLUSTER_QUEUE_TIMEOUT = float(os.getenv("CLUSTER_QUEUE_TIMEOUT", "600"))
+    CLUSTER_BLOB_DIR = BASE_DIR / os.getenv("CLUSTER_BLOB_DIR", "store/cluster")
+    CLUSTER_SHARED_STORE = os.getenv("CLUSTER_SHARED_STORE", "false").lower() == "true"
+    CLUSTER_COORDINATOR_URL = os.getenv("CLUSTER_COORDINATOR_URL", "http://127.0.0.1:8766")
+    CLUSTER_AGENT_ID = os.getenv("CLUSTER_AGENT_ID", "")
+    CLUSTER_AGENT_SLOTS = int(os.getenv("CLUSTER_AGENT_SLOTS", "1"))
+    CLUSTER_WORK_DIR = BASE_DIR / os.getenv("CLUSTER_WORK_DIR", "cluster_work")
+    
+    # ==========================================
+    # ARTIFACT STORE SETTINGS
+    # ==========================================
+    ARTIFACT_STORE_ENABLED = os.getenv("ARTIFACT_STORE_ENABLED", "true").lower() == "true"
+    ARTIFACT_STORE_DIR = BASE_DIR / os.getenv("ARTIFACT_STORE_DIR", "store")
+    ARTIFACT_LINK_MODE = os.getenv("ARTIFACT_LINK_MODE", "hardlink").lower()
+    ARTIFACT_COMPRESS_BLEND = os.getenv("ARTIFACT_COMPRESS_BLEND", "true").lower() == "true"
+    ARTIFACT_COMPRESS_LEVEL = int(os.getenv("ARTIFACT_COMPRESS_LEVEL", "6"))
+    ARTIFACT_RETENTION_DAYS = float(os.getenv("ARTIFACT_RETENTION_DAYS", "30"))
+    ARTIFACT_KEEP_LAST = int(os.getenv("ARTIFACT_KEEP_LAST", "100"))
+    ARTIFACT_MAX_SIZE_MB = float(os.getenv("ARTIFACT_MAX_SIZE_MB", "0"))
+    RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+    RENDER_CACHE_SCENE_HASH = os.getenv("RENDER_CACHE_SCENE_HASH", "false").lower() == "true"
     
     @classmethod
     def validate(cls):
@@ -122,12 +285,34 @@ class Config:
         # Check mode
         if cls.DEFAULT_MODE not in ["background", "gui"]:
             errors.append(f"Invalid DEFAULT_MODE: {cls.DEFAULT_MODE}. Must be 'background' or 'gui'")
+            
+        if cls.KILL_ON_ERROR not in ["auto", "true", "false"]:
+            errors.append(f"Invalid KILL_ON_ERROR: {cls.KILL_ON_ERROR}. Must be 'auto', 'true' or 'false'")
         
         # Validate export format
         valid_formats = ["obj", "fbx", "gltf", "stl", "ply"]
         if cls.EXPORT_FORMAT not in valid_formats:
             errors.append(f"Invalid EXPORT_FORMAT: {cls.EXPORT_FORMAT}. Must be one of {valid_formats}")
         
+        if cls.SPLIT_RENDER_MODE not in ["regions", "samples"]:
+            errors.append(f"Invalid SPLIT_RENDER_MODE: {cls.SPLIT_RENDER_MODE}. Must be 'regions' or 'samples'")
+            
+        if cls.EXPORT_LOD_MODE not in ["files", "nodes"]:
+            errors.append(f"Invalid EXPORT_LOD_MODE: {cls.EXPORT_LOD_MODE}. Must be 'files' or 'nodes'")
+            
+        for provider in cls.AI_FALLBACK_PROVIDERS:
+            if provider not in ["claude", "openai", "local"]:
+                errors.append(f"Invalid provider in AI_FALLBACK_PROVIDERS: {provider}")
+                
+        if cls.ROUTER_STRATEGY not in ["priority", "latency"]:
+            errors.append(f"Invalid ROUTER_STRATEGY: {cls.ROUTER_STRATEGY}. Must be 'priority' or 'latency'")
+            
+        if cls.ARTIFACT_LINK_MODE not in ["hardlink", "reflink", "copy"]:
+            errors.append(f"Invalid ARTIFACT_LINK_MODE: {cls.ARTIFACT_LINK_MODE}. Must be 'hardlink', 'reflink' or 'copy'")
+            
+        if cls.BATCH_API_PROVIDER and cls.BATCH_API_PROVIDER not in ["claude", "openai"]:
+            errors.append(f"Invalid BATCH_API_PROVIDER: {cls.BATCH_API_PROVIDER}. Must be 'claude' or 'openai'")
+            
         # Validate render engine
         if cls.RENDER_ENGINE not in ["CYCLES", "EEVEE"]:
             errors.append(f"Invalid RENDER_ENGINE: {cls.RENDER_ENGINE}. Must be 'CYCLES' or 'EEVEE'")
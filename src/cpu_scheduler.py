@@ -0,0 +1,234 @@
+import os
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from config import Config
+from timing_history import TimingHistory
+
+logger = logging.getLogger(__name__)
+
+# Jobs that barely use more than one core: scene building runs Python and
+# operators on the main thread, and stitching is a single NumPy pass
+SERIAL_KINDS = ('build', 'stitch', 'script')
+
+
+def cpu_topology() -> List[List[int]]:
+    """
+    Logical CPUs this process may use, grouped by physical core
+    
+    Returns:
+        list: Lists of SMT siblings, ordered by their first CPU
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+        
+    cores = {}
+    for cpu in cpus:
+        try:
+            siblings = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list").read_text().strip()
+        except OSError:
+            siblings = str(cpu)
+        cores.setdefault(siblings, []).append(cpu)
+    return sorted(cores.values())
+
+
+class CpuGrant:
+    """CPUs leased to one Blender process"""
+    
+    def __init__(self, kind: str, key: Optional[str], cores: List[List[int]]):
+        self.kind = kind
+        self.key = key
+        self.cores = cores
+        self.cpus = sorted(cpu for core in cores for cpu in core)
+    
+    @property
+    def threads(self) -> int:
+        """Blender threads, one per leased logical CPU"""
+        return len(self.cpus)
+
+
+class CpuScheduler:
+    """
+    Leases whole physical cores to concurrent Blender processes
+    
+    Each process gets a thread budget and, where the OS allows it, an
+    affinity to the CPUs behind that budget, so concurrent jobs don't all
+    assume they own the machine. Scene builds and stitches get
+    CPU_BUILD_CORES; split-render chunks get the share their split asks
+    for; full renders get every core until the other budgets (half, a
+    quarter, ...) have been measured CPU_SCHEDULER_MIN_SAMPLES times each,
+    then the one with the most renders per hour for the whole machine,
+    per job profile where it has been measured and across profiles
+    otherwise. Smaller budgets are only measured on cores that would
+    otherwise sit idle: a render arriving while part of the machine is
+    busy runs on the free cores with an under-sampled budget that fits,
+    instead of waiting for all of them. Requests are served in order; a
+    job waits until enough cores are free.
+    """
+    
+    STAGE = 'cpu_render'
+    
+    def __init__(self, timing_history: Optional[TimingHistory] = None, max_cores: Optional[int] = None):
+        """
+        Initialize CPU Scheduler
+        
+        Args:
+            timing_history (TimingHistory, optional): Where render timings per budget are kept
+            max_cores (int, optional): Physical cores to use, defaults to CPU_SCHEDULER_CORES (0 = all)
+        """
+        self.timing_history = timing_history or TimingHistory()
+        self.cores = cpu_topology()
+        max_cores = max_cores if max_cores is not None else Config.CPU_SCHEDULER_CORES
+        if max_cores:
+            self.cores = self.cores[:max_cores]
+        self.cpu_count = sum(len(core) for core in self.cores)
+        
+        self._lock = threading.Lock()
+        self._free = set(range(len(self.cores)))
+        self._waiters = deque()
+        logger.info(f"CPU scheduler: {len(self.cores)} cores, {self.cpu_count} threads")
+    
+    def candidates(self) -> List[int]:
+        """Render budgets in cores worth comparing: all, half, a quarter, ... down to one"""
+        budgets = []
+        cores = len(self.cores)
+        while cores >= 1:
+            budgets.append(cores)
+            cores //= 2
+        return budgets
+    
+    def render_cores(self, key: Optional[str] = None) -> int:
+        """
+        Core budget for a full render
+        
+        Args:
+            key (str, optional): Job profile key
+            
+        Returns:
+            int: Physical cores to lease
+        """
+        candidates = self.candidates()
+        min_samples = Config.CPU_SCHEDULER_MIN_SAMPLES
+        for scope in ([key] if key else []) + ['*']:
+            medians = {}
+            for cores in candidates:
+                samples = sorted(self.timing_history.samples(self.STAGE, f"{scope}@{cores}"))
+                if len(samples) >= min_samples:
+                    medians[cores] = samples[len(samples) // 2]
+            if len(medians) == len(candidates):
+                # Renders per second when the machine is filled with jobs of this budget
+                return max(candidates, key=lambda cores: (len(self.cores) // cores) / max(medians[cores], 1e-3))
+                
+        # Still measuring: a render never waits or slows down for the sake of a
+        # sample, so smaller budgets are only tried on cores nobody else wants
+        with self._lock:
+            idle = 0 if self._waiters else len(self._free)
+        if idle < len(self.cores):
+            unmeasured = [
+                cores for cores in candidates
+                if cores <= idle and len(self.timing_history.samples(self.STAGE, f"*@{cores}")) < min_samples
+            ]
+            if unmeasured:
+                return max(unmeasured)
+        return len(self.cores)
+    
+    def cores_for(self, kind: str, key: Optional[str] = None, threads: Optional[int] = None) -> int:
+        """
+        Core budget for a job, capped to the machine
+        
+        Args:
+            kind (str): Job kind
+            key (str, optional): Job profile key
+            threads (int, optional): Explicit thread budget, rounded to whole cores
+            
+        Returns:
+            int: Physical cores to lease
+        """
+        if threads:
+            budget = round(threads * len(self.cores) / self.cpu_count)
+        elif kind in SERIAL_KINDS:
+            budget = Config.CPU_BUILD_CORES
+        else:
+            budget = self.render_cores(key)
+        return max(1, min(budget, len(self.cores)))
+    
+    @asynccontextmanager
+    async def lease(self, kind: str, key: Optional[str] = None, threads: Optional[int] = None):
+        """
+        Hold CPUs for one Blender process
+        
+        Args:
+            kind (str): 'build', 'render', 'render_chunk', 'stitch' or 'script'
+            key (str, optional): Job profile key, for render budgets
+            threads (int, optional): Explicit budget, e.g. a split-render share
+            
+        Yields:
+            CpuGrant: The leased CPUs
+        """
+        grant = await self._acquire(kind, key, self.cores_for(kind, key, threads))
+        try:
+            yield grant
+        finally:
+            self._release(grant)
+    
+    def record(self, grant: CpuGrant, seconds: float):
+        """Remember how long a full render took with its budget"""
+        if grant.kind != 'render':
+            return
+        if grant.key:
+            self.timing_history.record(self.STAGE, f"{grant.key}@{len(grant.cores)}", seconds)
+        self.timing_history.record(self.STAGE, f"*@{len(grant.cores)}", seconds)
+    
+    def status(self) -> Dict[str, any]:
+        """Free cores and waiting jobs"""
+        with self._lock:
+            return {'cores': len(self.cores), 'free': len(self._free), 'waiting': len(self._waiters)}
+    
+    async def _acquire(self, kind: str, key: Optional[str], cores: int) -> CpuGrant:
+        """Wait in line until enough cores are free"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (kind, key, cores, future, loop)
+        with self._lock:
+            self._waiters.append(waiter)
+            self._grant_waiting()
+        try:
+            grant = await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            raise
+        logger.debug(f"Leased CPUs {grant.cpus} to a {kind} job")
+        return grant
+    
+    def _release(self, grant: CpuGrant):
+        with self._lock:
+            self._free.update(self.cores.index(core) for core in grant.cores)
+            self._grant_waiting()
+    
+    def _grant_waiting(self):
+        """Hand free cores to waiters in order; call with the lock held"""
+        while self._waiters:
+            kind, key, cores, future, loop = self._waiters[0]
+            if len(self._free) < cores:
+                return
+            chosen = sorted(self._free)[:cores]
+            self._waiters.popleft()
+            self._free.difference_update(chosen)
+            grant = CpuGrant(kind, key, [self.cores[index] for index in chosen])
+            loop.call_soon_threadsafe(self._resolve, future, grant)
+    
+    def _resolve(self, future: asyncio.Future, grant: CpuGrant):
+        """Deliver a grant on the waiter's loop, or return it if the waiter gave up"""
+        if future.cancelled():
+            self._release(grant)
+        else:
+            future.set_result(grant)
\ No newline at end of file
@@ -0,0 +1,313 @@
+import json
+import queue
+import atexit
+import logging
+import itertools
+import threading
+import subprocess
+import time
+from collections import deque
+from typing import Optional, Dict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+RESULT_MARKER = "DRY_RUN_RESULT "
+SCRIPT_NAME = "<generated>"
+
+# Loop run by a warm Blender: each request is a JSON header line with the
+# source length in bytes, followed by the source. The scene is reset to
+# factory startup before every script, and exactly one marker line is
+# printed per request.
+WORKER_LOOP = f'''
+import sys
+import json
+import time
+import traceback
+import bpy
+
+sys.path.insert(0, {str(Config.ASSET_LIBRARY_DIR)!r})
+
+def _reply(payload):
+    sys.stdout.write({RESULT_MARKER!r} + json.dumps(payload) + "\\n")
+    sys.stdout.flush()
+
+def _error(exc, source):
+    frames = [frame for frame in traceback.extract_tb(exc.__traceback__) if frame.filename == {SCRIPT_NAME!r}]
+    line_number = frames[-1].lineno if frames else getattr(exc, 'lineno', None)
+    lines = source.splitlines()
+    return {{
+        'exception': type(exc).__name__,
+        'message': str(exc),
+        'line_number': line_number,
+        'line': lines[line_number - 1].strip() if line_number and 0 < line_number <= len(lines) else None,
+        'traceback': ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+    }}
+
+_reply({{'ready': True, 'version': bpy.app.version_string}})
+while True:
+    header = sys.stdin.buffer.readline()
+    if not header:
+        break
+    request = json.loads(header)
+    source = sys.stdin.buffer.read(request['length']).decode('utf-8')
+    
+    error = None
+    started = time.perf_counter()
+    try:
+        bpy.ops.wm.read_homefile(use_factory_startup=True)
+    except Exception as exc:
+        error = _error(exc, source)
+    reset_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if error is None:
+        try:
+            exec(compile(source, {SCRIPT_NAME!r}, 'exec'), {{'__name__': '__main__'}})
+        except BaseException as exc:
+            error = _error(exc, source)
+    _reply({{
+        'id': request['id'],
+        'ok': error is None,
+        'error': error,
+        'seconds': time.perf_counter() - started,
+        'reset_seconds': reset_seconds,
+        'objects': len(bpy.data.objects),
+    }})
+'''
+
+
+class DryRunWorker:
+    """
+    One warm Blender process that runs build scripts on request
+    
+    Blender starts once and then runs scripts back to back, each in a
+    factory-reset scene, answering as soon as the script finishes or
+    raises. A worker that crashes, hangs past its timeout or has run
+    DRY_RUN_MAX_RUNS scripts is replaced on the next request.
+    """
+    
+    def __init__(self, blender_path: Optional[str] = None):
+        """
+        Initialize Dry Run Worker
+        
+        Args:
+            blender_path (str, optional): Blender executable, defaults to BLENDER_PATH
+        """
+        self.blender_path = blender_path or Config.BLENDER_PATH
+        self.process = None
+        self.version = None
+        self.runs = 0
+        self._ids = itertools.count(1)
+        self._results = queue.Queue()
+        self._stderr = deque(maxlen=50)
+        self._exited = False
+    
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+    
+    def start(self):
+        """
+        Launch Blender and wait until the loop is ready
+        
+        Raises:
+            RuntimeError: If Blender exits or doesn't become ready in DRY_RUN_START_TIMEOUT
+        """
+        self.stop()
+        self._results = queue.Queue()
+        self._stderr.clear()
+        self._exited = False
+        started = time.monotonic()
+        self.process = subprocess.Popen(
+            [self.blender_path, "--background", "--factory-startup", "--python-expr", WORKER_LOOP],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        threading.Thread(target=self._read_stdout, args=(self.process, self._results), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.process,), daemon=True).start()
+        
+        ready = self._wait(lambda payload: payload.get('ready'), Config.DRY_RUN_START_TIMEOUT)
+        if not ready:
+            self.stop()
+            raise RuntimeError(f"Dry-run worker did not start: {self._stderr_tail() or 'no output'}")
+        self.version = ready.get('version')
+        self.runs = 0
+        logger.info(f"Dry-run worker ready in {time.monotonic() - started:.1f}s (Blender {self.version})")
+    
+    def _read_stdout(self, process: subprocess.Popen, results: queue.Queue):
+        for raw in process.stdout:
+            line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+            if line.startswith(RESULT_MARKER):
+                try:
+                    results.put(json.loads(line[len(RESULT_MARKER):]))
+                except ValueError:
+                    logger.debug(f"Unreadable dry-run reply: {line[:200]}")
+        # End of output: the process exited
+        results.put(None)
+    
+    def _read_stderr(self, process: subprocess.Popen):
+        for raw in process.stderr:
+            self._stderr.append(raw.decode('utf-8', errors='replace').rstrip('\r\n'))
+    
+    def _stderr_tail(self) -> str:
+        return '\n'.join(self._stderr)
+    
+    def _wait(self, accept, timeout: float) -> Optional[Dict[str, any]]:
+        """Next reply accepted by accept(), or None on exit or timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                payload = self._results.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if payload is None:
+                self._exited = True
+                return None
+            if accept(payload):
+                return payload
+    
+    def run(self, code: str, timeout: Optional[float] = None) -> Dict[str, any]:
+        """
+        Run a build script in a fresh factory scene
+        
+        Args:
+            code (str): Generated scene-building code
+            timeout (float, optional): Seconds to wait, defaults to DRY_RUN_TIMEOUT
+            
+        Returns:
+            dict: 'ok', 'error' (exception, message, line_number, line, traceback),
+                  'seconds' the script ran, 'reset_seconds', 'objects', and
+                  'crashed' / 'timed_out' when the worker was lost
+        """
+        timeout = timeout or Config.DRY_RUN_TIMEOUT
+        if not self.alive or self.runs >= Config.DRY_RUN_MAX_RUNS:
+            self.start()
+            
+        request_id = next(self._ids)
+        data = code.encode('utf-8')
+        started = time.monotonic()
+        try:
+            self.process.stdin.write(json.dumps({'id': request_id, 'length': len(data)}).encode('utf-8') + b"\n" + data)
+            self.process.stdin.flush()
+        except OSError as e:
+            self.stop()
+            return self._lost(f"Dry-run worker unavailable: {e}", crashed=True)
+            
+        reply = self._wait(lambda payload: payload.get('id') == request_id, timeout)
+        self.runs += 1
+        if reply is not None:
+            reply['wall_seconds'] = time.monotonic() - started
+            return reply
+            
+        if not self._exited:
+            self.stop()
+            return self._lost(f"Dry run exceeded {timeout:.0f}s", timed_out=True)
+        exit_code = self.process.wait() if self.process else None
+        self.stop()
+        return self._lost(f"Blender exited with code {exit_code} during the dry run", crashed=True)
+    
+    def _lost(self, message: str, crashed: bool = False, timed_out: bool = False) -> Dict[str, any]:
+        return {
+            'ok': False,
+            'crashed': crashed,
+            'timed_out': timed_out,
+            'error': {
+                'exception': 'Timeout' if timed_out else 'Crash',
+                'message': message,
+                'line_number': None,
+                'line': None,
+                'traceback': self._stderr_tail(),
+            },
+        }
+    
+    def stop(self):
+        """Terminate the Blender process"""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class DryRunner:
+    """Pool of warm dry-run workers shared by concurrent jobs"""
+    
+    def __init__(self, blender_path: Optional[str] = None, workers: Optional[int] = None):
+        """
+        Initialize Dry Runner
+        
+        Args:
+            blender_path (str, optional): Blender executable, defaults to BLENDER_PATH
+            workers (int, optional): Warm Blender processes, defaults to DRY_RUN_WORKERS
+        """
+        self.workers = [DryRunWorker(blender_path) for _ in range(max(1, workers or Config.DRY_RUN_WORKERS))]
+        self._idle = queue.Queue()
+        for worker in self.workers:
+            self._idle.put(worker)
+        atexit.register(self.close)
+    
+    def warm(self):
+        """Start the workers in the background so the first dry run doesn't wait for Blender"""
+        def start(worker: DryRunWorker):
+            try:
+                worker.start()
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"Dry-run worker failed to start: {e}")
+                
+        for worker in self.workers:
+            threading.Thread(target=start, args=(worker,), name="dry-run-warmup", daemon=True).start()
+    
+    def run(self, code: str, timeout: Optional[float] = None) -> Dict[str, any]:
+        """
+        Run a build script on the next idle worker
+        
+        Args:
+            code (str): Generated scene-building code
+            timeout (float, optional): Seconds to wait for the script
+            
+        Returns:
+            dict: See DryRunWorker.run
+        """
+        worker = self._idle.get()
+        try:
+            return worker.run(code, timeout)
+        except (OSError, RuntimeError) as e:
+            return worker._lost(str(e), crashed=True)
+        finally:
+            self._idle.put(worker)
+    
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+    
+    @staticmethod
+    def describe(result: Dict[str, any]) -> str:
+        """
+        One-line description of a failed dry run, pointing at the generated code
+        
+        Args:
+            result (dict): Dry-run result
+            
+        Returns:
+            str: Line number, exception, message and the offending line
+        """
+        error = result.get('error') or {}
+        text = f"{error.get('exception')}: {error.get('message')}"
+        if error.get('line_number'):
+            text = f"Line {error['line_number']}: {text}"
+        if error.get('line'):
+            text += f" ({error['line']})"
+        return text
\ No newline at end of file
@@ -0,0 +1,295 @@
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class JobJournal:
+    """Durable SQLite (WAL) record of jobs, stage transitions and checkpoints"""
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS batches (
+        batch_id TEXT PRIMARY KEY,
+        source TEXT,
+        options TEXT,
+        created_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        batch_id TEXT,
+        item_index INTEGER,
+        prompt TEXT NOT NULL,
+        prompt_hash TEXT NOT NULL,
+        options TEXT NOT NULL,
+        state TEXT NOT NULL,
+        stage TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        results TEXT
+    );
+    CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_id, item_index);
+    CREATE TABLE IF NOT EXISTS transitions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempt INTEGER NOT NULL DEFAULT 0,
+        input_hash TEXT,
+        output_hash TEXT,
+        elapsed REAL,
+        detail TEXT,
+        at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS transitions_job ON transitions (job_id, id);
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        job_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        content TEXT,
+        content_hash TEXT,
+        path TEXT,
+        attempt INTEGER NOT NULL DEFAULT 0,
+        at REAL NOT NULL,
+        PRIMARY KEY (job_id, name)
+    );
+    """
+    
+    # Result fields worth keeping; stdout/stderr and code live in checkpoints or on disk
+    RESULT_FIELDS = [
+        'success', 'error', 'cancelled', 'returncode', 'timed_out', 'limit', 'elapsed',
+        'render_path', 'export_path', 'blend_path', 'script_path', 'failed_code_path',
+        'attempts', 'timings', 'job_id'
+    ]
+    
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize Job Journal
+        
+        Args:
+            path (Path, optional): SQLite database file
+        """
+        self.path = path or Config.JOURNAL_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across process crashes; FULL also survives power loss
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if Config.JOURNAL_SYNC_FULL else 'NORMAL'}")
+        self._conn.executescript(self.SCHEMA)
+    
+    @staticmethod
+    def hash_text(value: any) -> Optional[str]:
+        """
+        SHA-256 of a string, or of the JSON encoding of any other value
+        
+        Args:
+            value: Text or JSON-serializable value
+            
+        Returns:
+            str or None: Hex digest, None for None
+        """
+        if value is None:
+            return None
+        if not isinstance(value, str):
+            value = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+    
+    def start_batch(self, source: Optional[str], options: Dict[str, any]) -> str:
+        """
+        Register a new batch run
+        
+        Args:
+            source (str, optional): Batch file the prompts came from
+            options (dict): Options shared by the batch
+            
+        Returns:
+            str: Batch id
+        """
+        batch_id = hashlib.sha256(f"{source}:{time.time_ns()}".encode('utf-8')).hexdigest()[:16]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO batches (batch_id, source, options, created_at) VALUES (?, ?, ?, ?)",
+                (batch_id, source, json.dumps(options, default=str), time.time())
+            )
+        return batch_id
+    
+    def latest_batch(self, source: str) -> Optional[str]:
+        """
+        Most recent batch started from a source file
+        
+        Args:
+            source (str): Batch file path
+            
+        Returns:
+            str or None: Batch id
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT batch_id FROM batches WHERE source = ? ORDER BY created_at DESC LIMIT 1",
+                (source,)
+            ).fetchone()
+        return row['batch_id'] if row else None
+    
+    def start_job(
+        self,
+        job_id: str,
+        prompt: str,
+        options: Dict[str, any],
+        batch_id: Optional[str] = None,
+        item_index: Optional[int] = None
+    ):
+        """
+        Register a job, or mark an existing one as running again
+        
+        Args:
+            job_id (str): Job id
+            prompt (str): User prompt
+            options (dict): Pipeline options
+            batch_id (str, optional): Batch the job belongs to
+            item_index (int, optional): Position of the prompt in the batch
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, batch_id, item_index, prompt, prompt_hash, options, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'running', ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET state = 'running', updated_at = excluded.updated_at",
+                (job_id, batch_id, item_index, prompt, self.hash_text(prompt),
+                 json.dumps(options, default=str), now, now)
+            )
+    
+    def record(
+        self,
+        job_id: str,
+        stage: str,
+        status: str,
+        attempt: int = 0,
+        input_hash: Optional[str] = None,
+        output_hash: Optional[str] = None,
+        elapsed: Optional[float] = None,
+        detail: Optional[Dict[str, any]] = None
+    ):
+        """
+        Append a stage transition
+        
+        Args:
+            job_id (str): Job id
+            stage (str): Pipeline stage
+            status (str): 'started', 'completed' or 'failed'
+            attempt (int): Generation attempt the transition belongs to
+            input_hash (str, optional): Hash of the stage input
+            output_hash (str, optional): Hash of the stage output
+            elapsed (float, optional): Stage duration in seconds
+            detail (dict, optional): Extra information such as an error message
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO transitions (job_id, stage, status, attempt, input_hash, output_hash, elapsed, detail, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, stage, status, attempt, input_hash, output_hash, elapsed,
+                 json.dumps(detail, default=str) if detail else None, now)
+            )
+            self._conn.execute("UPDATE jobs SET stage = ?, updated_at = ? WHERE job_id = ?", (stage, now, job_id))
+    
+    def checkpoint(
+        self,
+        job_id: str,
+        name: str,
+        content: Optional[str] = None,
+        path: Optional[Path] = None,
+        attempt: int = 0
+    ):
+        """
+        Store a resumable checkpoint, replacing an older one of the same name
+        
+        Args:
+            job_id (str): Job id
+            name (str): 'generated', 'validated' or 'blend'
+            content (str, optional): Checkpointed text such as code
+            path (Path, optional): Checkpointed file
+            attempt (int): Generation attempt that produced it
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, name, content, content_hash, path, attempt, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, name, content, self.hash_text(content), str(path) if path else None, attempt, time.time())
+            )
+    
+    def checkpoints(self, job_id: str) -> Dict[str, Dict[str, any]]:
+        """
+        Checkpoints of a job by name
+        
+        Args:
+            job_id (str): Job id
+            
+        Returns:
+            dict: name -> checkpoint row
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM checkpoints WHERE job_id = ?", (job_id,)).fetchall()
+        return {row['name']: dict(row) for row in rows}
+    
+    def drop_checkpoints(self, job_id: str):
+        """Forget a job's checkpoints so it starts over from generation"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+    
+    def attempts(self, job_id: str) -> int:
+        """Number of generation attempts already made for a job"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM transitions WHERE job_id = ? AND stage = 'generate' AND status = 'started'",
+                (job_id,)
+            ).fetchone()
+        return row[0]
+    
+    def finish_job(self, job_id: str, state: str, results: Dict[str, any]):
+        """
+        Record a job's final state
+        
+        Args:
+            job_id (str): Job id
+            state (str): 'succeeded', 'failed' or 'cancelled'
+            results (dict): Results dictionary
+        """
+        summary = {key: results[key] for key in self.RESULT_FIELDS if key in results}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, updated_at = ?, results = ? WHERE job_id = ?",
+                (state, time.time(), json.dumps(summary, default=str), job_id)
+            )
+    
+    def batch_jobs(self, batch_id: str) -> Dict[int, Dict[str, any]]:
+        """
+        Jobs of a batch by prompt position
+        
+        Args:
+            batch_id (str): Batch id
+            
+        Returns:
+            dict: item_index -> job row
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs WHERE batch_id = ?", (batch_id,)).fetchall()
+        jobs = {}
+        for row in rows:
+            job = dict(row)
+            job['options'] = json.loads(job['options'])
+            job['results'] = json.loads(job['results']) if job['results'] else None
+            jobs[job['item_index']] = job
+        return jobs
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
\ No newline at end of file
@@ -0,0 +1,485 @@
+import ast
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, Dict, List
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Rough seconds per operator call; the heavy ones rebuild or resample whole meshes
+OPERATOR_SECONDS = 0.02
+HEAVY_OPERATOR_SECONDS = 0.5
+HEAVY_OPERATORS = ('subdivide', 'modifier_apply', 'remesh', 'quadriflow', 'voxel', 'bake', 'convert', 'boolean')
+DATA_CALL_SECONDS = 0.002
+
+# Attributes and operator arguments whose value sets the amount of geometry
+SIZE_COSTS = {
+    'levels': lambda value: 0.05 * 4 ** min(value, 8),
+    'render_levels': lambda value: 0.05 * 4 ** min(value, 8),
+    'subdivisions': lambda value: 1e-4 * 4 ** min(value, 10),
+    'number_cuts': lambda value: 1e-3 * value * value,
+    'count': lambda value: 1e-5 * value,
+}
+
+# Loops whose trip count can't be read from the source
+DEFAULT_ITERATIONS = 10
+MAX_MULTIPLIER = 1e6
+
+
+def _dotted_name(node: ast.AST) -> str:
+    """'bpy.ops.mesh.subdivide' for a Name/Attribute chain, '' otherwise"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    return ''
+
+
+def _iterations(node: ast.AST) -> int:
+    """Trip count of a loop over a constant range or literal, DEFAULT_ITERATIONS otherwise"""
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return max(1, len(node.elts))
+    if isinstance(node, ast.Call) and _dotted_name(node.func) == 'range':
+        args = [arg.value for arg in node.args if isinstance(arg, ast.Constant) and isinstance(arg.value, int)]
+        if args and len(args) == len(node.args):
+            try:
+                return max(1, len(range(*args)))
+            except (TypeError, ValueError):
+                pass
+    return DEFAULT_ITERATIONS
+
+
+class _CostVisitor(ast.NodeVisitor):
+    """Sums operator calls and geometry sizes, multiplied by the loops around them"""
+    
+    def __init__(self):
+        self.seconds = 0.0
+        self.multiplier = 1
+    
+    def _loop(self, iterations: int, nodes: List[ast.AST]):
+        outer = self.multiplier
+        self.multiplier = min(MAX_MULTIPLIER, outer * iterations)
+        for node in nodes:
+            self.visit(node)
+        self.multiplier = outer
+    
+    def visit_For(self, node: ast.For):
+        self.visit(node.iter)
+        self._loop(_iterations(node.iter), node.body)
+        for child in node.orelse:
+            self.visit(child)
+            
+    visit_AsyncFor = visit_For
+    
+    def visit_While(self, node: ast.While):
+        self._loop(DEFAULT_ITERATIONS, [node.test] + node.body)
+    
+    def _comprehension(self, node: ast.AST, elements: List[ast.AST]):
+        iterations = 1
+        for generator in node.generators:
+            self.visit(generator.iter)
+            iterations *= _iterations(generator.iter)
+        self._loop(iterations, elements)
+    
+    def visit_ListComp(self, node: ast.ListComp):
+        self._comprehension(node, [node.elt])
+        
+    visit_SetComp = visit_ListComp
+    visit_GeneratorExp = visit_ListComp
+    
+    def visit_DictComp(self, node: ast.DictComp):
+        self._comprehension(node, [node.key, node.value])
+    
+    def _size(self, name: str, value: ast.AST):
+        cost = SIZE_COSTS.get(name)
+        if cost and isinstance(value, ast.Constant) and isinstance(value.value, (int, float)) and value.value > 0:
+            self.seconds += cost(value.value) * self.multiplier
+    
+    def visit_Call(self, node: ast.Call):
+        name = _dotted_name(node.func)
+        if name.startswith('bpy.ops.'):
+            heavy = any(word in name for word in HEAVY_OPERATORS)
+            self.seconds += (HEAVY_OPERATOR_SECONDS if heavy else OPERATOR_SECONDS) * self.multiplier
+        elif name.startswith('bpy.data.') or name.endswith('.new'):
+            self.seconds += DATA_CALL_SECONDS * self.multiplier
+        for keyword in node.keywords:
+            if keyword.arg:
+                self._size(keyword.arg, keyword.value)
+        self.generic_visit(node)
+    
+    def visit_Assign(self, node: ast.Assign):
+        for target in node.targets:
+            if isinstance(target, ast.Attribute):
+                self._size(target.attr, node.value)
+        self.generic_visit(node)
+
+
+def estimate_script_cost(code: str) -> float:
+    """
+    Static cost of a generated build script
+    
+    Counts operator and data-block calls, multiplied by the constant trip
+    counts of the loops around them, plus the geometry implied by
+    subdivision levels, cuts and particle/array counts. The number is a
+    relative weight in rough seconds, not a prediction by itself.
+    
+    Args:
+        code (str): Validated Python source
+        
+    Returns:
+        float: Estimated build seconds, 0 for unparsable code
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return 0.0
+    visitor = _CostVisitor()
+    visitor.visit(tree)
+    return visitor.seconds
+
+
+def parse_lanes(lanes: str, slo: str = "") -> List[Dict[str, any]]:
+    """
+    Parse lane specs such as "fast:2:p50,slow:1" and SLOs such as "fast:120,slow:1800"
+    
+    Args:
+        lanes (str): Comma-separated name:workers[:limit] lanes, fastest first;
+            a job goes to the first lane whose limit covers its predicted
+            execution time, and the last lane takes everything else. The
+            limit is in seconds, or a percentile of recent predictions
+            such as p50
+        slo (str): Comma-separated name:seconds latency objectives
+        
+    Returns:
+        list: Lanes with name, workers, max_seconds, max_quantile and slo_seconds
+        
+    Raises:
+        ValueError: On malformed specs, duplicate names or unknown SLO lanes
+    """
+    parsed = []
+    for spec in filter(None, (part.strip() for part in lanes.split(','))):
+        fields = spec.split(':')
+        if len(fields) not in (2, 3) or not fields[0]:
+            raise ValueError(f"Lane '{spec}' must look like name:workers or name:workers:limit")
+        max_seconds = max_quantile = None
+        try:
+            workers = int(fields[1])
+            if len(fields) == 3 and fields[2].lower().startswith('p'):
+                max_quantile = float(fields[2][1:]) / 100
+            elif len(fields) == 3:
+                max_seconds = float(fields[2])
+        except ValueError:
+            raise ValueError(f"Lane '{spec}' needs a number of workers and a limit in seconds or like p50")
+        if workers < 1:
+            raise ValueError(f"Lane '{spec}' needs at least one worker")
+        if max_quantile is not None and not 0 < max_quantile < 1:
+            raise ValueError(f"Lane '{spec}' needs a percentile between p0 and p100")
+        if any(lane['name'] == fields[0] for lane in parsed):
+            raise ValueError(f"Lane '{fields[0]}' is defined twice")
+        parsed.append({
+            'name': fields[0],
+            'workers': workers,
+            'max_seconds': max_seconds,
+            'max_quantile': max_quantile,
+            'slo_seconds': None
+        })
+    if not parsed:
+        raise ValueError("At least one scheduler lane is required")
+    parsed[-1]['max_seconds'] = parsed[-1]['max_quantile'] = None
+    
+    by_name = {lane['name']: lane for lane in parsed}
+    for spec in filter(None, (part.strip() for part in slo.split(','))):
+        name, _, seconds = spec.partition(':')
+        if name not in by_name:
+            raise ValueError(f"SLO '{spec}' names an unknown lane")
+        try:
+            by_name[name]['slo_seconds'] = float(seconds)
+        except ValueError:
+            raise ValueError(f"SLO '{spec}' needs a number of seconds after ':'")
+    return parsed
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class CostModel:
+    """
+    Predicts how long a job will keep Blender busy
+    
+    The base is the median execution time of similar jobs (same category,
+    complexity from the prompt analysis and enabled outputs) or, without
+    enough history, the executor's static estimate for that complexity.
+    Once the script exists its static cost is compared with the usual
+    cost of scripts for that kind of job, scaling the prediction up for
+    unusually heavy scenes and down for trivial ones. Script costs enter
+    that history through record_script() once a job has run, not on
+    every prediction.
+    """
+    
+    STAGE = 'script_cost'
+    
+    def __init__(self, executor):
+        """
+        Initialize Cost Model
+        
+        Args:
+            executor (BlenderExecutor): Provides the timing history and static estimates
+        """
+        self.executor = executor
+        self.timing_history = executor.timing_history
+    
+    def predict(
+        self,
+        profile: Optional[Dict[str, any]],
+        options: Optional[Dict[str, any]] = None,
+        code: Optional[str] = None
+    ) -> float:
+        """
+        Predicted execution seconds of a job
+        
+        Args:
+            profile (dict, optional): Processed prompt info ('category', 'complexity')
+            options (dict, optional): Job options; unset outputs use the configured defaults
+            code (str, optional): Validated script, once generated
+            
+        Returns:
+            float: Predicted seconds
+        """
+        flags = self._flags(options)
+        seconds = self.executor.estimate_seconds(profile, q=0.5, **flags)
+        
+        if code:
+            typical = self.timing_history.percentile(self.STAGE, self._script_key(profile, flags), 0.5)
+            if typical:
+                seconds *= min(4.0, max(0.25, estimate_script_cost(code) / typical))
+        return seconds
+    
+    def record_script(
+        self,
+        profile: Optional[Dict[str, any]],
+        options: Optional[Dict[str, any]],
+        code: str
+    ):
+        """
+        Add a job's script cost to the history predictions compare against
+        
+        Writes the timing history file, so call it off the event loop.
+        
+        Args:
+            profile (dict, optional): Processed prompt info ('category', 'complexity')
+            options (dict, optional): Job options
+            code (str): Script the job ran
+        """
+        key = self._script_key(profile, self._flags(options))
+        self.timing_history.record(self.STAGE, key, estimate_script_cost(code))
+    
+    def _flags(self, options: Optional[Dict[str, any]]) -> Dict[str, bool]:
+        """Enabled outputs of a job, falling back to the configured defaults"""
+        options = options or {}
+        flags = {
+            'render': Config.AUTO_RENDER,
+            'export': Config.AUTO_EXPORT,
+            'save': Config.AUTO_SAVE,
+            'bake': Config.BAKE_MATERIALS,
+        }
+        flags.update({name: options[name] for name in flags if options.get(name) is not None})
+        return flags
+        
+    def _script_key(self, profile: Optional[Dict[str, any]], flags: Dict[str, bool]) -> str:
+        return self.timing_history.profile_key(profile, self.executor._outputs_variant(**flags))
+
+
+class LaneScheduler:
+    """
+    Cost-ordered execution queue with separate worker lanes
+    
+    Jobs are routed by predicted execution time to the first lane that
+    covers it, so a long render never sits in front of quick builds, and
+    each lane has its own Blender workers. A lane limit given as a
+    percentile follows the recent predictions, so the split holds however
+    far the static estimates are off on a cold start. Within a lane the job with the
+    smallest predicted time runs first; every second a job waits takes
+    SCHEDULER_AGING seconds off its prediction, so long jobs are delayed
+    but never starved. Workers of slower lanes help out with faster lanes
+    when their own is empty, never the other way round. Wait and
+    end-to-end latency are tracked per lane against its SLO.
+    
+    Implements the put/get/task_done subset of asyncio.Queue the pipeline
+    workers use. It is unbounded: jobs are meant to wait here, in cost
+    order, rather than in the FIFO queues of earlier stages.
+    """
+    
+    def __init__(
+        self,
+        cost_model: CostModel,
+        lanes: Optional[List[Dict[str, any]]] = None,
+        aging: Optional[float] = None
+    ):
+        """
+        Initialize Lane Scheduler
+        
+        Args:
+            cost_model (CostModel): Predicts job execution times
+            lanes (list, optional): Parsed lanes, defaults to SCHEDULER_LANES and SCHEDULER_SLO
+            aging (float, optional): Predicted seconds forgiven per second waited
+        """
+        self.cost_model = cost_model
+        self.lanes = lanes or parse_lanes(Config.SCHEDULER_LANES, Config.SCHEDULER_SLO)
+        self.aging = aging if aging is not None else Config.SCHEDULER_AGING
+        self._waiting = {lane['name']: [] for lane in self.lanes}
+        self._changed = None
+        self._waits = {lane['name']: deque(maxlen=Config.SCHEDULER_SLO_WINDOW) for lane in self.lanes}
+        self._latencies = {lane['name']: deque(maxlen=Config.SCHEDULER_SLO_WINDOW) for lane in self.lanes}
+        self._predictions = deque(maxlen=Config.SCHEDULER_SLO_WINDOW)
+    
+    def limit(self, lane: Dict[str, any]) -> Optional[float]:
+        """
+        Current upper bound of a lane in predicted seconds
+        
+        Args:
+            lane (dict): Parsed lane
+            
+        Returns:
+            float or None: Its fixed max_seconds, the percentile of recent
+                predictions, or None for no limit
+        """
+        if lane['max_quantile'] is not None:
+            return _percentile(list(self._predictions), lane['max_quantile'])
+        return lane['max_seconds']
+    
+    def route(self, seconds: float) -> str:
+        """
+        Lane for a predicted execution time
+        
+        The prediction is remembered for percentile limits; jobs with
+        nothing to execute (0 seconds) are not.
+        
+        Args:
+            seconds (float): Predicted seconds
+            
+        Returns:
+            str: Lane name
+        """
+        if seconds > 0:
+            self._predictions.append(seconds)
+        for lane in self.lanes:
+            limit = self.limit(lane)
+            if limit is None or seconds <= limit:
+                return lane['name']
+        return self.lanes[-1]['name']
+    
+    async def put(self, job):
+        """Queue a job in its lane; PipelineJob.cost and .lane must be set"""
+        async with self._condition():
+            self._waiting[job.lane].append((job, time.monotonic()))
+            self._changed.notify_all()
+    
+    async def get(self, lane: str):
+        """
+        Take the next job for a worker of a lane
+        
+        Args:
+            lane (str): The worker's lane
+            
+        Returns:
+            PipelineJob: Job with the lowest aged cost, from the worker's own lane
+                if it has any, else from the nearest faster lane
+        """
+        names = [entry['name'] for entry in self.lanes]
+        order = [lane] + list(reversed(names[:names.index(lane)]))
+        async with self._condition():
+            while True:
+                for name in order:
+                    if self._waiting[name]:
+                        now = time.monotonic()
+                        entry = min(
+                            self._waiting[name],
+                            key=lambda entry: (entry[0].cost - self.aging * (now - entry[1]), entry[1])
+                        )
+                        self._waiting[name].remove(entry)
+                        job, queued_at = entry
+                        job.waited = now - queued_at
+                        return job
+                await self._changed.wait()
+    
+    def task_done(self):
+        """Present for asyncio.Queue compatibility; lanes don't track unfinished tasks"""
+    
+    def record(self, job):
+        """
+        Record the wait and end-to-end latency of a job that went through a lane
+        
+        Args:
+            job (PipelineJob): Finished job with lane, waited and submitted_at set
+        """
+        if job.lane not in self._waits or job.waited is None:
+            return
+        self._waits[job.lane].append(job.waited)
+        if job.submitted_at is not None:
+            self._latencies[job.lane].append(time.monotonic() - job.submitted_at)
+    
+    def report(self) -> Dict[str, Dict[str, any]]:
+        """
+        Per-lane SLO report over the last SCHEDULER_SLO_WINDOW jobs
+        
+        Returns:
+            dict: Per lane: workers, max_seconds, queued, jobs, wait and
+                  latency p50/p95, slo_seconds and the fraction of jobs
+                  that met it
+        """
+        report = {}
+        for lane in self.lanes:
+            name = lane['name']
+            latencies = list(self._latencies[name])
+            waits = list(self._waits[name])
+            slo = lane['slo_seconds']
+            report[name] = {
+                'workers': lane['workers'],
+                'max_seconds': self.limit(lane),
+                'queued': len(self._waiting[name]),
+                'jobs': len(waits),
+                'wait_p50': _percentile(waits, 0.5),
+                'wait_p95': _percentile(waits, 0.95),
+                'latency_p50': _percentile(latencies, 0.5),
+                'latency_p95': _percentile(latencies, 0.95),
+                'slo_seconds': slo,
+                'slo_met': sum(1 for latency in latencies if latency <= slo) / len(latencies) if slo and latencies else None,
+            }
+        return report
+    
+    @staticmethod
+    def describe(name: str, lane: Dict[str, any]) -> str:
+        """
+        One-line description of a lane's report
+        
+        Args:
+            name (str): Lane name
+            lane (dict): Lane entry from report()
+            
+        Returns:
+            str: Job count, latency percentiles and SLO attainment
+        """
+        if not lane['jobs']:
+            return f"Lane {name}: no jobs"
+        text = f"Lane {name}: {lane['jobs']} jobs, wait p50 {lane['wait_p50']:.1f}s"
+        if lane['latency_p50'] is not None:
+            text += f", latency p50 {lane['latency_p50']:.1f}s / p95 {lane['latency_p95']:.1f}s"
+        if lane['slo_met'] is not None:
+            text += f", {lane['slo_met']:.0%} within {lane['slo_seconds']:.0f}s SLO"
+        return text
+    
+    def _condition(self) -> asyncio.Condition:
+        """Condition on the running loop, created on first use"""
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
\ No newline at end of file
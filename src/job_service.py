@@ -0,0 +1,637 @@
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import deque
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Optional, Dict, List
+from urllib.parse import urlparse, parse_qs
+
+from config import Config
+from blender_executor import new_job_id
+from pipeline import Pipeline, PipelineJob
+from job_scheduler import CostModel
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Persistent priority queue of service jobs with per-client fairness"""
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        client TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        prompt TEXT NOT NULL,
+        options TEXT NOT NULL,
+        state TEXT NOT NULL,
+        submitted_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        results TEXT,
+        cost REAL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority, submitted_at);
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize Job Queue
+        
+        Args:
+            path (Path, optional): SQLite database file
+        """
+        self.path = path or Config.SERVICE_QUEUE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        try:
+            # Queues created before jobs carried a predicted cost
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN cost REAL")
+        except sqlite3.OperationalError:
+            pass
+        self._last_served = {}
+        
+        # Jobs that were running when the previous process died go back in line
+        with self._lock, self._conn:
+            recovered = self._conn.execute(
+                "UPDATE jobs SET state = 'queued', started_at = NULL WHERE state = 'running'"
+            ).rowcount
+        if recovered:
+            logger.info(f"Re-queued {recovered} interrupted jobs")
+    
+    def push(
+        self,
+        prompt: str,
+        options: Dict[str, any],
+        client: str,
+        priority: int = 0,
+        cost: Optional[float] = None
+    ) -> str:
+        """
+        Add a job to the queue
+        
+        Args:
+            prompt (str): User prompt
+            options (dict): Pipeline options
+            client (str): Submitting client id
+            priority (int): Higher runs first
+            cost (float, optional): Predicted execution seconds, for shortest-job-first ordering
+            
+        Returns:
+            str: Job id
+        """
+        job_id = new_job_id()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, client, priority, prompt, options, state, submitted_at, cost) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, client, priority, prompt, json.dumps(options), time.time(), cost)
+            )
+        return job_id
+    
+    def pop_next(self, per_client_cap: int = 0) -> Optional[Dict[str, any]]:
+        """
+        Claim the next job to run
+        
+        Highest priority wins; within a priority the client with the fewest
+        running jobs, then the one served longest ago, goes first so a
+        single client can't monopolize the service. Among that client's
+        jobs the cheapest predicted one goes first, with SCHEDULER_AGING
+        seconds of its cost forgiven per second it has waited; without
+        predictions this is arrival order.
+        
+        Args:
+            per_client_cap (int): Max running jobs per client, 0 for no cap
+            
+        Returns:
+            dict or None: Claimed job row
+        """
+        with self._lock, self._conn:
+            running = dict(self._conn.execute(
+                "SELECT client, COUNT(*) FROM jobs WHERE state = 'running' GROUP BY client"
+            ).fetchall())
+            candidates = self._conn.execute(
+                "SELECT * FROM jobs WHERE state = 'queued' ORDER BY priority DESC, submitted_at ASC LIMIT 500"
+            ).fetchall()
+            
+            eligible = [
+                row for row in candidates
+                if not per_client_cap or running.get(row['client'], 0) < per_client_cap
+            ]
+            if not eligible:
+                return None
+                
+            now = time.time()
+            chosen = min(eligible, key=lambda row: (
+                -row['priority'],
+                running.get(row['client'], 0),
+                self._last_served.get(row['client'], 0.0),
+                (row['cost'] or 0.0) - Config.SCHEDULER_AGING * (now - row['submitted_at']),
+                row['submitted_at']
+            ))
+            
+            self._conn.execute(
+                "UPDATE jobs SET state = 'running', started_at = ? WHERE job_id = ?",
+                (now, chosen['job_id'])
+            )
+            self._last_served[chosen['client']] = now
+            return self._row_to_dict(chosen)
+    
+    def finish(self, job_id: str, state: str, results: Dict[str, any]):
+        """
+        Record a job's final state
+        
+        Args:
+            job_id (str): Job id
+            state (str): 'succeeded', 'failed' or 'cancelled'
+            results (dict): Results dictionary
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, results = ? WHERE job_id = ?",
+                (state, time.time(), json.dumps(results, default=str), job_id)
+            )
+    
+    def cancel_queued(self, job_id: str) -> bool:
+        """
+        Cancel a job that hasn't started yet
+        
+        Args:
+            job_id (str): Job id
+            
+        Returns:
+            bool: True if the job was still queued
+        """
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET state = 'cancelled', finished_at = ? WHERE job_id = ? AND state = 'queued'",
+                (time.time(), job_id)
+            ).rowcount > 0
+    
+    def get(self, job_id: str) -> Optional[Dict[str, any]]:
+        """Return one job row, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+    
+    def list(self, client: Optional[str] = None, limit: int = 100) -> List[Dict[str, any]]:
+        """Return recent jobs, optionally for one client, without their results"""
+        query = "SELECT job_id, client, priority, prompt, state, submitted_at, started_at, finished_at, cost FROM jobs"
+        params = []
+        if client:
+            query += " WHERE client = ?"
+            params.append(client)
+        query += " ORDER BY submitted_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params).fetchall()]
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+    
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, any]:
+        """Decode JSON columns of a job row"""
+        record = dict(row)
+        record['options'] = json.loads(record['options'])
+        if record.get('results'):
+            record['results'] = json.loads(record['results'])
+        return record
+
+
+class JobService:
+    """Long-running job runner that keeps the pipeline, providers and Blender warm"""
+    
+    ARTIFACT_KEYS = {
+        'render': 'render_path',
+        'export': 'export_path',
+        'blend': 'blend_path',
+        'script': 'script_path',
+    }
+    
+    def __init__(self, app, queue: Optional[JobQueue] = None):
+        """
+        Initialize Job Service
+        
+        Args:
+            app (BlenderAI): Application whose components the pipeline uses
+            queue (JobQueue, optional): Persistent queue, defaults to config path
+        """
+        self.app = app
+        self.queue = queue or JobQueue()
+        self.max_active = Config.SERVICE_MAX_ACTIVE_JOBS
+        self.per_client_cap = Config.SERVICE_MAX_JOBS_PER_CLIENT
+        self.cost_model = CostModel(app.blender_executor) if Config.SCHEDULER_ENABLED else None
+        
+        self.loop = None
+        self.pipeline = None
+        self._thread = None
+        self._wakeup = None
+        self._dispatcher = None
+        self._stopping = False
+        self._active = {}
+        self._events = {}
+        self._events_lock = threading.Condition()
+    
+    def start(self):
+        """Start the event loop thread running the pipeline and dispatcher"""
+        ready = threading.Event()
+        
+        def run_loop():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self._wakeup = asyncio.Event()
+            self.pipeline = self.app._create_pipeline()
+            self.loop.run_until_complete(self.pipeline.start())
+            self._dispatcher = self.loop.create_task(self._dispatch())
+            ready.set()
+            self.loop.run_forever()
+            # Doesn't wait for worker threads, e.g. an LLM call nobody needs any more
+            self.loop.close()
+            
+        self._thread = threading.Thread(target=run_loop, name="job-service", daemon=True)
+        self._thread.start()
+        ready.wait()
+        logger.info("Job service started")
+    
+    def stop(self):
+        """Stop dispatching, let running jobs store their outcome, then close the loop"""
+        if not self.loop or self.loop.is_closed():
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        future.result(timeout=60)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+        logger.info("Job service stopped")
+    
+    async def _shutdown(self):
+        """End the dispatcher, stop the pipeline and wait for every _run to finish"""
+        # Not cancelled: a job it is claiming would be left 'running' in the queue
+        self._stopping = True
+        self._wakeup.set()
+        await self._dispatcher
+        await self.pipeline.stop()
+        runs = list(self._active.values())
+        if not runs:
+            return
+        # Stopping the pipeline resolves the jobs inside it; a job still
+        # waiting for a slot in the first stage never will, so cancel it
+        _, pending = await asyncio.wait(runs, timeout=10)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+    
+    def submit(self, prompt: str, options: Dict[str, any], client: str, priority: int = 0) -> str:
+        """
+        Queue a job and wake the dispatcher
+        
+        Args:
+            prompt (str): User prompt
+            options (dict): Pipeline options
+            client (str): Submitting client id
+            priority (int): Higher runs first
+            
+        Returns:
+            str: Job id
+        """
+        cost = None
+        if self.cost_model:
+            # The script doesn't exist yet; the prompt analysis and history have to do
+            cost = self.cost_model.predict(self.app.prompt_processor.process(prompt), options)
+        job_id = self.queue.push(prompt, options, client, priority, cost)
+        self._record_event(job_id, {
+            'type': 'submitted',
+            'job_id': job_id,
+            'client': client,
+            'priority': priority,
+            'predicted_seconds': round(cost, 1) if cost is not None else None
+        })
+        self._notify()
+        return job_id
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+        
+        Args:
+            job_id (str): Job id
+            
+        Returns:
+            bool: True if something was cancelled
+        """
+        if self.queue.cancel_queued(job_id):
+            with self._events_lock:
+                self._events.pop(job_id, None)
+                self._events_lock.notify_all()
+            return True
+        if job_id in self._active:
+            self.loop.call_soon_threadsafe(self.pipeline.cancel, job_id)
+            return True
+        return False
+    
+    def status(self, job_id: str) -> Optional[Dict[str, any]]:
+        """Return the stored job, with its current stage if running"""
+        record = self.queue.get(job_id)
+        if record and self.pipeline and job_id in self.pipeline.jobs:
+            record['stage'] = self.pipeline.jobs[job_id].stage
+        return record
+    
+    def artifact_path(self, job_id: str, kind: str) -> Optional[Path]:
+        """
+        Resolve an artifact of a finished job
+        
+        Args:
+            job_id (str): Job id
+            kind (str): 'render', 'export', 'blend' or 'script'
+            
+        Returns:
+            Path or None: Existing artifact file
+        """
+        record = self.queue.get(job_id)
+        key = self.ARTIFACT_KEYS.get(kind)
+        if not record or not key or not record.get('results'):
+            return None
+        value = record['results'].get(key)
+        if not value:
+            return None
+        path = Path(value)
+        return path if path.exists() else None
+    
+    def iter_events(self, job_id: str, timeout: float = 3600):
+        """
+        Yield a job's events as they happen, ending with its 'done' event
+        
+        Args:
+            job_id (str): Job id
+            timeout (float): Maximum seconds to follow the job
+            
+        Yields:
+            dict: Event
+        """
+        record = self.queue.get(job_id)
+        if record and record['state'] in ('succeeded', 'failed', 'cancelled'):
+            yield {'type': 'done', 'job_id': job_id, 'state': record['state'], 'results': record.get('results')}
+            return
+            
+        deadline = time.monotonic() + timeout
+        index = 0
+        while time.monotonic() < deadline:
+            with self._events_lock:
+                if len(self._events.get(job_id, ())) <= index:
+                    self._events_lock.wait(timeout=1.0)
+                events = self._events.get(job_id)
+                events = list(events) if events is not None else None
+                
+            if events is None:
+                # Buffer already released; the stored record is authoritative
+                record = self.queue.get(job_id)
+                if record and record['state'] in ('succeeded', 'failed', 'cancelled'):
+                    yield {'type': 'done', 'job_id': job_id, 'state': record['state'], 'results': record.get('results')}
+                    return
+                continue
+                
+            for event in events[index:]:
+                yield event
+                if event['type'] == 'done':
+                    return
+            index = len(events)
+    
+    def _record_event(self, job_id: str, event: Dict[str, any]):
+        """Buffer an event for streaming clients"""
+        with self._events_lock:
+            self._events.setdefault(job_id, deque(maxlen=Config.SERVICE_EVENT_BUFFER)).append(event)
+            self._events_lock.notify_all()
+    
+    def _notify(self):
+        """Wake the dispatcher from any thread"""
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+    
+    async def _dispatch(self):
+        """Move jobs from the persistent queue into the pipeline"""
+        while not self._stopping:
+            while not self._stopping and len(self._active) < self.max_active:
+                record = await asyncio.to_thread(self.queue.pop_next, self.per_client_cap)
+                if record is None:
+                    break
+                job = PipelineJob(
+                    record['prompt'],
+                    options=record['options'],
+                    job_id=record['job_id'],
+                    on_event=lambda event, job_id=record['job_id']: self._on_job_event(job_id, event)
+                )
+                self._active[job.job_id] = asyncio.ensure_future(self._run(job))
+                
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _on_job_event(self, job_id: str, event: Dict[str, any]):
+        """Buffer a pipeline event; 'done' waits until _run has stored the outcome"""
+        if event['type'] != 'done':
+            self._record_event(job_id, event)
+    
+    async def _run(self, job: PipelineJob):
+        """Run one job, store its outcome, then tell streaming clients it is done"""
+        try:
+            try:
+                results = await self.pipeline.run_job(job)
+                if results.get('cancelled'):
+                    state = 'cancelled'
+                else:
+                    state = 'succeeded' if results.get('success') else 'failed'
+            except asyncio.CancelledError:
+                # Only stop() cancels a run; record it instead of leaving it 'running'
+                state, results = 'cancelled', {'success': False, 'error': 'Service stopped', 'cancelled': True}
+            except Exception as e:
+                logger.error(f"Service job {job.job_id} crashed: {e}")
+                state, results = 'failed', {'success': False, 'error': str(e)}
+            await asyncio.to_thread(self.queue.finish, job.job_id, state, results)
+            # Clients fetch the job and its artifacts on 'done', so it must follow the write
+            self._record_event(job.job_id, {'type': 'done', 'job_id': job.job_id, 'state': state, 'results': results})
+        finally:
+            self._active.pop(job.job_id, None)
+            with self._events_lock:
+                self._events.pop(job.job_id, None)
+                self._events_lock.notify_all()
+            self._wakeup.set()
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/JSON front end for JobService"""
+    
+    # Event streams use chunked encoding, which HTTP/1.0 doesn't have
+    protocol_version = 'HTTP/1.1'
+    service = None
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+    
+    def _client_id(self, body: Optional[Dict[str, any]] = None) -> str:
+        """Client identity from the body, X-Client-Id header or remote address"""
+        if body and body.get('client'):
+            return str(body['client'])
+        return self.headers.get('X-Client-Id') or self.client_address[0]
+    
+    def _send_json(self, status: int, payload: any):
+        data = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _read_json(self) -> Optional[Dict[str, any]]:
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return None
+    
+    def _path_parts(self) -> List[str]:
+        return [part for part in urlparse(self.path).path.split('/') if part]
+    
+    def do_POST(self):
+        # Read the body first so a rejected request doesn't leave it on the kept-alive connection
+        body = self._read_json()
+        parts = self._path_parts()
+        if parts != ['jobs']:
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+            
+        if not body or not str(body.get('prompt', '')).strip():
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': "JSON body with 'prompt' is required"})
+            
+        allowed = {'mode', 'render', 'export', 'save', 'bake', 'validate', 'max_retries'}
+        options = {key: value for key, value in (body.get('options') or {}).items() if key in allowed}
+        # The service has no display; never open the Blender GUI
+        options['mode'] = 'background'
+        
+        try:
+            priority = int(body.get('priority', 0))
+        except (TypeError, ValueError):
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': 'priority must be an integer'})
+            
+        job_id = self.service.submit(body['prompt'].strip(), options, self._client_id(body), priority)
+        self._send_json(HTTPStatus.ACCEPTED, {'job_id': job_id, 'state': 'queued'})
+    
+    def do_GET(self):
+        parts = self._path_parts()
+        
+        if parts == ['health']:
+            health = {'status': 'ok', 'jobs': self.service.queue.counts()}
+            pipeline = self.service.pipeline
+            if pipeline and pipeline.scheduler:
+                health['lanes'] = pipeline.scheduler.report()
+            if pipeline and pipeline.flights:
+                health['coalesced'] = pipeline.flights.stats()
+            return self._send_json(HTTPStatus.OK, health)
+            
+        if parts == ['jobs']:
+            query = parse_qs(urlparse(self.path).query)
+            client = query.get('client', [None])[0]
+            return self._send_json(HTTPStatus.OK, self.service.queue.list(client))
+            
+        if len(parts) == 2 and parts[0] == 'jobs':
+            record = self.service.status(parts[1])
+            if not record:
+                return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Unknown job'})
+            return self._send_json(HTTPStatus.OK, record)
+            
+        if len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            return self._stream_events(parts[1])
+            
+        if len(parts) == 4 and parts[0] == 'jobs' and parts[2] == 'artifacts':
+            return self._send_artifact(parts[1], parts[3])
+            
+        self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+    
+    def do_DELETE(self):
+        parts = self._path_parts()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+        if self.service.cancel(parts[1]):
+            return self._send_json(HTTPStatus.OK, {'job_id': parts[1], 'cancelled': True})
+        self._send_json(HTTPStatus.CONFLICT, {'error': 'Job is not queued or running'})
+    
+    def _stream_events(self, job_id: str):
+        """Stream events as newline-delimited JSON using chunked encoding"""
+        if not self.service.queue.get(job_id):
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': 'Unknown job'})
+            
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        
+        try:
+            for event in self.service.iter_events(job_id):
+                line = (json.dumps(event, default=str) + '\n').encode('utf-8')
+                self.wfile.write(f"{len(line):X}\r\n".encode('ascii') + line + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Event stream for {job_id} closed by client")
+            self.close_connection = True
+    
+    def _send_artifact(self, job_id: str, kind: str):
+        """Send an artifact file of a finished job"""
+        path = self.service.artifact_path(job_id, kind)
+        if not path:
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': f"No {kind} artifact for job"})
+            
+        content_types = {'.png': 'image/png', '.py': 'text/x-python', '.gltf': 'model/gltf+json'}
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_types.get(path.suffix, 'application/octet-stream'))
+        self.send_header('Content-Length', str(path.stat().st_size))
+        self.send_header('Content-Disposition', f'attachment; filename="{path.name}"')
+        self.end_headers()
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(64 * 1024)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+
+
+def serve(app, host: Optional[str] = None, port: Optional[int] = None):
+    """
+    Run the HTTP job service until interrupted
+    
+    Args:
+        app (BlenderAI): Initialized application
+        host (str, optional): Bind address, defaults to config
+        port (int, optional): Port, defaults to config
+    """
+    host = host or Config.SERVICE_HOST
+    port = port or Config.SERVICE_PORT
+    
+    service = JobService(app)
+    service.start()
+    
+    handler = type('BoundJobRequestHandler', (JobRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    
+    print(f"\n🌐 Job service listening on http://{host}:{port}")
+    print("   POST /jobs, GET /jobs/<id>, GET /jobs/<id>/events,")
+    print("   GET /jobs/<id>/artifacts/<render|export|blend|script>, DELETE /jobs/<id>")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down job service")
+    finally:
+        server.server_close()
+        service.stop()
\ No newline at end of file
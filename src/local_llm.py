@@ -0,0 +1,323 @@
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from typing import Optional, Dict, List
+
+import requests
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SlotLimiter:
+    """Concurrency limit that can be changed while requests are in flight"""
+    
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._condition = threading.Condition()
+    
+    def resize(self, limit: int):
+        with self._condition:
+            self.limit = max(1, limit)
+            self._condition.notify_all()
+    
+    def __enter__(self):
+        with self._condition:
+            while self.active >= self.limit:
+                self._condition.wait()
+            self.active += 1
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class LocalLLMManager:
+    """
+    Keeps an Ollama-compatible server ready for generation
+    
+    In the background at startup: checks the model is installed (picking
+    the variant with LOCAL_LLM_QUANTIZATION if set), reads its context
+    length, loads it with the same options generation will use so Ollama
+    doesn't reload it for the first prompt, and probes how many requests
+    the server really runs in parallel. Every request carries keep_alive
+    so the model stays resident between prompts, and requests beyond the
+    server's parallel slots wait here instead of queueing behind the
+    server's timeout.
+    """
+    
+    def __init__(self, url: Optional[str] = None, model: Optional[str] = None):
+        """
+        Initialize Local LLM Manager
+        
+        Args:
+            url (str, optional): Generate endpoint, defaults to LOCAL_LLM_URL
+            model (str, optional): Model name, defaults to LOCAL_LLM_MODEL
+        """
+        self.url = url or Config.LOCAL_LLM_URL
+        parsed = urlparse(self.url)
+        self.base_url = f"{parsed.scheme}://{parsed.netloc}"
+        self.model = model or Config.LOCAL_LLM_MODEL
+        
+        self.parallel = Config.LOCAL_LLM_PARALLEL or None
+        self.slots = SlotLimiter(self.parallel or 1)
+        self.model_details = {}
+        self.context_length = None
+        self.load_seconds = None
+        self.metrics = deque(maxlen=100)
+        self.ready = threading.Event()
+        self._preparing = False
+    
+    @property
+    def max_parallel(self) -> int:
+        """Most requests that will ever be sent at once"""
+        return Config.LOCAL_LLM_PARALLEL or Config.LOCAL_LLM_MAX_PARALLEL
+    
+    def start(self):
+        """Prepare the server in a background thread"""
+        self._preparing = True
+        threading.Thread(target=self.prepare, name="local-llm-warmup", daemon=True).start()
+    
+    def prepare(self):
+        """Select the model, load it and probe parallel slots"""
+        try:
+            self.select_model()
+            self.warmup()
+            if not Config.LOCAL_LLM_PARALLEL:
+                self.probe_parallel()
+        except requests.RequestException as e:
+            logger.warning(f"Local LLM at {self.base_url} not prepared ({e}); requests will load the model on demand")
+        finally:
+            self.ready.set()
+    
+    def select_model(self):
+        """Resolve the model variant to use and read its details"""
+        response = requests.get(f"{self.base_url}/api/tags", timeout=30)
+        response.raise_for_status()
+        installed = response.json().get('models', [])
+        
+        family = self.model.split(':')[0]
+        candidates = [model for model in installed if model['name'].split(':')[0] == family]
+        if not candidates:
+            logger.warning(f"Model {self.model} is not installed on {self.base_url} (ollama pull {self.model})")
+            return
+            
+        quantization = Config.LOCAL_LLM_QUANTIZATION.lower()
+        if quantization:
+            matching = [
+                model for model in candidates
+                if (model.get('details') or {}).get('quantization_level', '').lower() == quantization
+            ]
+            if matching:
+                self.model = matching[0]['name']
+            else:
+                available = ', '.join(
+                    f"{model['name']} ({(model.get('details') or {}).get('quantization_level')})" for model in candidates
+                )
+                logger.warning(f"No {family} variant with quantization {Config.LOCAL_LLM_QUANTIZATION}; installed: {available}")
+        elif not any(model['name'] in (self.model, f"{self.model}:latest") for model in candidates):
+            self.model = candidates[0]['name']
+            
+        response = requests.post(f"{self.base_url}/api/show", json={'model': self.model}, timeout=30)
+        response.raise_for_status()
+        info = response.json()
+        self.model_details = info.get('details') or {}
+        self.context_length = next(
+            (value for key, value in (info.get('model_info') or {}).items() if key.endswith('.context_length')),
+            None
+        )
+        logger.info(
+            f"Local model {self.model}: {self.model_details.get('parameter_size')} "
+            f"{self.model_details.get('quantization_level')}, context {self.context_length}"
+        )
+    
+    def options(self, max_tokens: Optional[int] = None) -> Dict[str, any]:
+        """
+        Ollama options for a request
+        
+        Args:
+            max_tokens (int, optional): Output token limit from the token budget,
+                LOCAL_LLM_MAX_TOKENS if None
+            
+        Returns:
+            dict: Request options
+        """
+        num_ctx = Config.LOCAL_LLM_CONTEXT_SIZE
+        if self.context_length:
+            # Asking for more than the model was trained on only wastes memory
+            num_ctx = min(num_ctx, self.context_length)
+            
+        options = {
+            "temperature": Config.LOCAL_LLM_TEMPERATURE,
+            "num_predict": max_tokens or Config.LOCAL_LLM_MAX_TOKENS,
+            "num_ctx": num_ctx,
+            "num_batch": Config.LOCAL_LLM_BATCH_SIZE,
+            "use_mmap": Config.LOCAL_LLM_USE_MMAP,
+        }
+        if Config.LOCAL_LLM_GPU_LAYERS != 0:
+            options["num_gpu"] = Config.LOCAL_LLM_GPU_LAYERS
+        if Config.LOCAL_LLM_NUM_THREADS > 0:
+            options["num_thread"] = Config.LOCAL_LLM_NUM_THREADS
+        return options
+    
+    def _keep_alive(self):
+        """keep_alive value: a duration string, or seconds (-1 keeps the model loaded forever)"""
+        value = Config.LOCAL_LLM_KEEP_ALIVE
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    
+    def warmup(self):
+        """Load the model with the generation options, so the first prompt doesn't pay for it"""
+        started = time.monotonic()
+        response = requests.post(
+            self.url,
+            json={
+                "model": self.model,
+                "keep_alive": self._keep_alive(),
+                # Options that change the context size make Ollama reload the model
+                "options": self.options(),
+            },
+            timeout=Config.LOCAL_LLM_WARMUP_TIMEOUT
+        )
+        response.raise_for_status()
+        self.load_seconds = response.json().get('load_duration', 0) / 1e9
+        logger.info(
+            f"Local model {self.model} ready in {time.monotonic() - started:.1f}s "
+            f"(load {self.load_seconds:.1f}s, keep_alive {Config.LOCAL_LLM_KEEP_ALIVE})"
+        )
+    
+    def probe_parallel(self):
+        """
+        Find how many requests the server runs concurrently
+        
+        Ollama doesn't report OLLAMA_NUM_PARALLEL, so short requests are
+        sent 1, 2, 4, ... at a time; the slot count is the largest batch
+        that finished in about the time of a single request.
+        """
+        def timed_batch(count: int) -> float:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                for response in pool.map(lambda _: self._raw_generate("Count from 1 to 50.", 32), range(count)):
+                    response.raise_for_status()
+            return time.monotonic() - started
+            
+        single = timed_batch(1)
+        slots = 1
+        count = 2
+        while count <= Config.LOCAL_LLM_MAX_PARALLEL:
+            elapsed = timed_batch(count)
+            if elapsed > single * 1.5:
+                break
+            slots = count
+            count *= 2
+            
+        self.parallel = slots
+        self.slots.resize(slots)
+        logger.info(f"Local LLM serves {slots} requests in parallel (single request {single:.1f}s)")
+    
+    def _raw_generate(self, prompt: str, max_tokens: Optional[int] = None) -> requests.Response:
+        return requests.post(
+            self.url,
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "keep_alive": self._keep_alive(),
+                "options": self.options(max_tokens),
+            },
+            timeout=Config.LOCAL_LLM_TIMEOUT
+        )
+    
+    def generate(self, prompt: str, max_tokens: Optional[int] = None) -> Dict[str, any]:
+        """
+        Generate text, waiting for a free server slot
+        
+        Args:
+            prompt (str): Full prompt
+            max_tokens (int, optional): Output token limit
+            
+        Returns:
+            dict: Ollama response body
+        """
+        if self._preparing:
+            # The model is loading anyway, and probing needs an otherwise idle server
+            self.ready.wait(Config.LOCAL_LLM_WARMUP_TIMEOUT)
+        with self.slots:
+            response = self._raw_generate(prompt, max_tokens)
+        response.raise_for_status()
+        data = response.json()
+        self._record(data)
+        return data
+    
+    def _record(self, data: Dict[str, any]):
+        """Keep and log the throughput of one request"""
+        def rate(count_key: str, duration_key: str) -> Optional[float]:
+            duration = data.get(duration_key)
+            return data.get(count_key, 0) / (duration / 1e9) if duration else None
+            
+        metrics = {
+            'at': time.time(),
+            'output_tokens': data.get('eval_count'),
+            'tokens_per_second': rate('eval_count', 'eval_duration'),
+            'prompt_tokens': data.get('prompt_eval_count'),
+            'prompt_tokens_per_second': rate('prompt_eval_count', 'prompt_eval_duration'),
+            'load_seconds': data.get('load_duration', 0) / 1e9,
+            'total_seconds': data.get('total_duration', 0) / 1e9,
+        }
+        self.metrics.append(metrics)
+        if metrics['tokens_per_second']:
+            logger.info(
+                f"Local LLM: {metrics['output_tokens']} tokens at {metrics['tokens_per_second']:.1f} tok/s, "
+                f"prompt {metrics['prompt_tokens']} at {metrics['prompt_tokens_per_second'] or 0:.0f} tok/s, "
+                f"load {metrics['load_seconds']:.1f}s"
+            )
+        if metrics['load_seconds'] > 1.0 and self.ready.is_set():
+            logger.warning(
+                f"Local model was reloaded ({metrics['load_seconds']:.1f}s); "
+                f"raise LOCAL_LLM_KEEP_ALIVE or check the server's memory"
+            )
+    
+    def status(self) -> Dict[str, any]:
+        """
+        Model, slots, residency and recent throughput
+        
+        Returns:
+            dict: Status summary
+        """
+        loaded = []
+        try:
+            response = requests.get(f"{self.base_url}/api/ps", timeout=10)
+            response.raise_for_status()
+            loaded = response.json().get('models', [])
+        except requests.RequestException as e:
+            logger.debug(f"Could not list loaded models: {e}")
+            
+        recent = [entry['tokens_per_second'] for entry in self.metrics if entry['tokens_per_second']]
+        return {
+            'model': self.model,
+            'quantization': self.model_details.get('quantization_level'),
+            'parameter_size': self.model_details.get('parameter_size'),
+            'context_length': self.context_length,
+            'num_ctx': self.options()['num_ctx'],
+            'parallel': self.parallel,
+            'load_seconds': self.load_seconds,
+            'loaded': [
+                {'name': model['name'], 'size_vram': model.get('size_vram'), 'expires_at': model.get('expires_at')}
+                for model in loaded
+            ],
+            'requests': len(self.metrics),
+            'mean_tokens_per_second': sum(recent) / len(recent) if recent else None,
+        }
+    
+    def recent_metrics(self) -> List[Dict[str, any]]:
+        """Throughput of the most recent requests, oldest first"""
+        return list(self.metrics)
\ No newline at end of file
@@ -0,0 +1,253 @@
+import logging
+from typing import Optional, Dict, List, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+LOD_METHODS = ('collapse', 'planar')
+
+# Formats whose exporters keep object names and custom properties, so all
+# levels can share one file as <name>_LOD<n> nodes tagged with 'lod'
+NODE_FORMATS = ('gltf', 'fbx')
+
+# Runs inside Blender after the regular export: LOD0 is every visible mesh
+# with its modifiers applied, and each further level is LOD0 run through a
+# Decimate modifier. Levels are exported by selecting their objects, so the
+# scene itself is left as it was.
+LOD_CODE = '''
+def _blender_ai_export_lods(export_path, export_format, levels, mode, min_triangles):
+    import os
+    import json
+    import math
+    import time
+    import array
+    
+    EXPORTERS = {
+        'obj': lambda path: bpy.ops.wm.obj_export(filepath=path, export_selected_objects=True, apply_modifiers=False),
+        'fbx': lambda path: bpy.ops.export_scene.fbx(filepath=path, use_selection=True, object_types={'MESH'}, use_custom_props=True),
+        'gltf': lambda path: bpy.ops.export_scene.gltf(filepath=path, use_selection=True, export_extras=True, export_apply=False),
+        'stl': lambda path: bpy.ops.export_mesh.stl(filepath=path, use_selection=True),
+        'ply': lambda path: bpy.ops.export_mesh.ply(filepath=path, use_selection=True),
+    }
+    
+    def report(**event):
+        print("LOD export: " + json.dumps(event))
+    
+    def triangles(mesh):
+        counts = array.array('i', [0]) * len(mesh.polygons)
+        mesh.polygons.foreach_get('loop_total', counts)
+        return sum(counts) - 2 * len(counts)
+    
+    def export(objects, path):
+        for other in view_layer.objects:
+            other.select_set(False)
+        for obj in objects:
+            obj.select_set(True)
+        view_layer.objects.active = objects[0]
+        EXPORTERS[export_format](path)
+        # The glTF exporter picks the extension from its format setting
+        if not os.path.exists(path) and os.path.exists(os.path.splitext(path)[0] + '.glb'):
+            path = os.path.splitext(path)[0] + '.glb'
+        return path
+        
+    scene = bpy.context.scene
+    view_layer = bpy.context.view_layer
+    sources = [obj for obj in scene.objects if obj.type == 'MESH' and obj.visible_get()]
+    if not sources:
+        return
+        
+    stem, extension = os.path.splitext(export_path)
+    collection = bpy.data.collections.new("LODs")
+    scene.collection.children.link(collection)
+    selected = [obj for obj in view_layer.objects if obj.select_get()]
+    active = view_layer.objects.active
+    chain = []
+    meshes = []
+    
+    def place(source, mesh, level):
+        obj = bpy.data.objects.new(f"{source.name}_LOD{level}", mesh)
+        obj.matrix_world = source.matrix_world
+        obj['lod'] = level
+        collection.objects.link(obj)
+        return obj
+        
+    try:
+        started = time.perf_counter()
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        base = []
+        for source in sources:
+            mesh = bpy.data.meshes.new_from_object(source.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+            meshes.append(mesh)
+            base.append((source, mesh, place(source, mesh, 0)))
+        chain.append([obj for _, _, obj in base])
+        report(
+            level=0, method=None, value=None, objects=len(base),
+            triangles=sum(triangles(mesh) for _, mesh, _ in base),
+            path=export_path if mode == 'files' else None,
+            bytes=os.path.getsize(export_path) if mode == 'files' and os.path.exists(export_path) else None,
+            seconds=round(time.perf_counter() - started, 3),
+        )
+        
+        for level, (method, value) in enumerate(levels, 1):
+            started = time.perf_counter()
+            decimating = []
+            for source, mesh, _ in base:
+                if triangles(mesh) < min_triangles:
+                    # Too small to be worth it; the level reuses LOD0
+                    decimating.append((source, mesh, None))
+                    continue
+                work = bpy.data.objects.new(f"{source.name}_LOD{level}_work", mesh)
+                collection.objects.link(work)
+                decimate = work.modifiers.new("Decimate", 'DECIMATE')
+                if method == 'collapse':
+                    decimate.decimate_type = 'COLLAPSE'
+                    decimate.ratio = value
+                else:
+                    decimate.decimate_type = 'DISSOLVE'
+                    decimate.angle_limit = math.radians(value)
+                decimating.append((source, mesh, work))
+                
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            objects = []
+            for source, mesh, work in decimating:
+                if work is not None:
+                    mesh = bpy.data.meshes.new_from_object(work.evaluated_get(depsgraph), depsgraph=depsgraph)
+                    meshes.append(mesh)
+                    bpy.data.objects.remove(work)
+                objects.append(place(source, mesh, level))
+            chain.append(objects)
+            
+            path = None
+            if mode == 'files':
+                path = export(objects, f"{stem}_lod{level}{extension}")
+            report(
+                level=level, method=method, value=value, objects=len(objects),
+                triangles=sum(triangles(obj.data) for obj in objects),
+                path=path,
+                bytes=os.path.getsize(path) if path and os.path.exists(path) else None,
+                seconds=round(time.perf_counter() - started, 3),
+            )
+            
+        if mode == 'nodes':
+            started = time.perf_counter()
+            path = export([obj for objects in chain for obj in objects], f"{stem}_lods{extension}")
+            report(
+                level=None, method=None, value=None, objects=sum(len(objects) for objects in chain),
+                triangles=None, path=path,
+                bytes=os.path.getsize(path) if os.path.exists(path) else None,
+                seconds=round(time.perf_counter() - started, 3),
+            )
+    finally:
+        for obj in list(collection.objects):
+            bpy.data.objects.remove(obj)
+        bpy.data.collections.remove(collection)
+        for mesh in meshes:
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+        for obj in selected:
+            obj.select_set(True)
+        view_layer.objects.active = active
+'''
+
+
+def parse_levels(text: str) -> List[Tuple[str, float]]:
+    """
+    Parse an LOD chain such as "collapse:0.5,collapse:0.25,planar:10"
+    
+    Args:
+        text (str): Comma-separated method:value levels; collapse takes the
+            fraction of LOD0 triangles to keep, planar the angle in degrees
+            below which faces are merged
+            
+    Returns:
+        list: (method, value) per level after LOD0
+        
+    Raises:
+        ValueError: On an unknown method or an out-of-range value
+    """
+    levels = []
+    for spec in filter(None, (part.strip() for part in text.split(','))):
+        method, _, value = spec.partition(':')
+        method = method.strip().lower()
+        if method not in LOD_METHODS:
+            raise ValueError(f"Unknown LOD method '{method}' in '{spec}'; use one of {', '.join(LOD_METHODS)}")
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"LOD level '{spec}' needs a number after ':'")
+        if method == 'collapse' and not 0 < value < 1:
+            raise ValueError(f"Collapse ratio must be between 0 and 1 in '{spec}'")
+        if method == 'planar' and not 0 < value <= 180:
+            raise ValueError(f"Planar angle must be between 0 and 180 degrees in '{spec}'")
+        levels.append((method, value))
+    return levels
+
+
+class LodExporter:
+    """
+    Builds LOD chains of the exported meshes in the same Blender session
+    
+    Generated scenes are often subdivided far beyond what real-time
+    consumers can draw. After the regular export, every mesh is exported
+    again at each configured level of detail, either as separate
+    <model>_lod<n> files or, for glTF and FBX, as <name>_LOD<n> nodes in
+    one <model>_lods file. Triangle counts, file sizes and timings are
+    reported per level.
+    """
+    
+    def __init__(self, levels: Optional[str] = None, mode: Optional[str] = None):
+        """
+        Initialize LOD Exporter
+        
+        Args:
+            levels (str, optional): LOD chain, defaults to EXPORT_LOD_LEVELS
+            mode (str, optional): 'files' or 'nodes', defaults to EXPORT_LOD_MODE
+            
+        Raises:
+            ValueError: If the chain is invalid
+        """
+        self.levels = parse_levels(levels or Config.EXPORT_LOD_LEVELS)
+        self.mode = (mode or Config.EXPORT_LOD_MODE).lower()
+    
+    def build_lod_code(self, export_path, export_format: str) -> str:
+        """
+        Snippet that exports the LOD chain next to the regular export
+        
+        Args:
+            export_path (Path): Regular export file
+            export_format (str): Export format
+            
+        Returns:
+            str: Python source run inside Blender after the export snippet
+        """
+        export_format = export_format.lower()
+        mode = self.mode
+        if mode == 'nodes' and export_format not in NODE_FORMATS:
+            logger.warning(f"LOD nodes need {' or '.join(NODE_FORMATS)} export, not {export_format}; writing separate files")
+            mode = 'files'
+        return f"""
+# Export LOD chain
+{LOD_CODE}
+_blender_ai_export_lods(r"{export_path}", {export_format!r}, {self.levels!r}, {mode!r}, {Config.EXPORT_LOD_MIN_TRIANGLES})
+"""
+
+    @staticmethod
+    def describe(event: Dict[str, any]) -> str:
+        """
+        One-line description of an LOD event
+        
+        Args:
+            event (dict): 'lod' event from the output parser
+            
+        Returns:
+            str: Level, triangle count, file and size
+        """
+        size = f" ({event['bytes'] / (1024 * 1024):.2f} MB)" if event.get('bytes') is not None else ""
+        if event['level'] is None:
+            return f"LOD chain: {event['objects']} objects in {event['seconds']:.1f}s -> {event['path']}{size}"
+        spec = "modifiers applied" if event['level'] == 0 else f"{event['method']} {event['value']:g}"
+        text = f"LOD{event['level']} ({spec}): {event['triangles']:,} triangles in {event['seconds']:.1f}s"
+        if event.get('path'):
+            text += f" -> {event['path']}{size}"
+        return text
\ No newline at end of file
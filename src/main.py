@@ -1,8 +1,8 @@
 import sys
+import asyncio
 import logging
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 import argparse
 
 # Add src directory to path
@@ -13,6 +13,18 @@ from prompt_processor import PromptProcessor
 from ai_generator import AIGenerator
 from code_validator import CodeValidator
 from blender_executor import BlenderExecutor
+from dry_run import DryRunner
+from compat_rewriter import CompatRewriter
+from material_baker import MaterialBaker
+from lod_export import LodExporter
+from split_render import SplitRenderer
+from pipeline import Pipeline, PipelineJob
+from job_scheduler import LaneScheduler
+from single_flight import SingleFlight
+from job_service import serve
+from cluster import Coordinator, run_agent
+from job_journal import JobJournal
+from batch_api import BatchGenerator
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +43,66 @@ class BlenderAI:
         self.ai_generator = AIGenerator()
         self.code_validator = CodeValidator()
         self.blender_executor = BlenderExecutor()
+        self.journal = JobJournal() if Config.JOURNAL_ENABLED else None
+        
+        # Background Blender runs go to agents that pull them from this process
+        self.coordinator = None
+        if Config.CLUSTER_ENABLED:
+            self.coordinator = Coordinator(Config.COMPAT_BLENDER_VERSION or self.blender_executor.blender_version)
+            self.coordinator.start()
+            self.blender_executor.coordinator = self.coordinator
         
         logger.info("Blender AI Automation initialized successfully")
     
+    def _create_pipeline(self) -> Pipeline:
+        """Create a pipeline wired to this application's components"""
+        concurrency = {}
+        local = self.ai_generator.clients.get('local')
+        if local and self.ai_generator.provider == 'local':
+            # Enough generate workers to fill the local server's parallel slots;
+            # the manager holds back anything beyond the slots it found
+            concurrency['generate'] = max(Config.PIPELINE_GENERATE_WORKERS, local.max_parallel)
+        return Pipeline(
+            self.prompt_processor,
+            self.ai_generator,
+            self.code_validator,
+            self.blender_executor,
+            concurrency=concurrency,
+            journal=self.journal
+        )
+    
+    async def _run_jobs(self, jobs: List[PipelineJob]) -> List[dict]:
+        """Run jobs through a pipeline that lives for the duration of the call"""
+        async with self._create_pipeline() as pipeline:
+            results = await pipeline.run_many(jobs)
+            self._print_pipeline_report(pipeline, len(jobs))
+            return results
+    
+    async def _run_jobs_batch_api(self, jobs: List[PipelineJob]) -> List[dict]:
+        """Run jobs with their code generated through the provider's batch API"""
+        batch = BatchGenerator(
+            self.ai_generator,
+            self.prompt_processor,
+            journal=self.journal,
+            on_progress=self._print_batch_api_event
+        )
+        async with self._create_pipeline() as pipeline:
+            results = await batch.run(pipeline, jobs)
+            self._print_pipeline_report(pipeline, len(jobs))
+            return results
+    
+    def _print_pipeline_report(self, pipeline: Pipeline, jobs: int):
+        """Print per-lane latency, SLO attainment and coalesced duplicates after a batch"""
+        if jobs < 2:
+            return
+        if pipeline.scheduler:
+            print("\n🚦 Execution lanes:")
+            for name, lane in pipeline.scheduler.report().items():
+                print(f"   {LaneScheduler.describe(name, lane)}")
+        coalesced = SingleFlight.describe(pipeline.flights.stats()) if pipeline.flights else ""
+        if coalesced:
+            print(f"\n🔗 Coalesced duplicate work: {coalesced}")
+    
     def run(
         self,
         prompt: str,
@@ -41,7 +110,9 @@ class BlenderAI:
         render: Optional[bool] = None,
         export: Optional[bool] = None,
         save: Optional[bool] = None,
+        bake: Optional[bool] = None,
         validate: Optional[bool] = None,
+        dry_run: bool = False,
         max_retries: Optional[int] = None
     ) -> dict:
         """
@@ -53,163 +124,289 @@ class BlenderAI:
             render (bool, optional): Whether to render output
             export (bool, optional): Whether to export model
             save (bool, optional): Whether to save .blend file
+            bake (bool, optional): Whether to bake procedural materials to textures
             validate (bool, optional): Whether to validate code
+            dry_run (bool): Only check that the code builds the scene, without rendering or saving
             max_retries (int, optional): Maximum regeneration attempts
             
         Returns:
             dict: Execution results
         """
-        # Use config defaults if not specified
-        validate = validate if validate is not None else Config.VALIDATE_CODE
-        max_retries = max_retries or Config.MAX_RETRIES
-        
         logger.info(f"Processing prompt: {prompt}")
         print("\n" + "="*60)
         print("BLENDER AI AUTOMATION")
         print("="*60)
         print(f"\n📝 Your prompt: {prompt}\n")
         
-        # Step 1: Process prompt
-        print("🔍 Processing prompt...")
-        processed = self.prompt_processor.process(prompt)
-        print(f"   Category: {processed['category']}")
-        print(f"   Complexity: {processed['complexity']}")
-        
-        if processed['entities']['objects']:
-            print(f"   Objects detected: {', '.join(processed['entities']['objects'])}")
+        job = PipelineJob(
+            prompt,
+            options={
+                'mode': mode,
+                'render': render,
+                'export': export,
+                'save': save,
+                'bake': bake,
+                'validate': validate,
+                'dry_run': dry_run,
+                'max_retries': max_retries
+            },
+            on_event=self._print_event
+        )
         
-        # Step 2: Generate code
-        print("\n🤖 Generating Blender code with AI...")
-        
-        attempt = 0
-        code = None
-        is_valid = False
+        try:
+            return asyncio.run(self._run_jobs([job]))[0]
+        except Exception as e:
+            logger.error(f"Execution error: {e}")
+            print(f"\n❌ Error: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    def run_batch(
+        self,
+        prompts: List[str],
+        source: Optional[str] = None,
+        resume: bool = False,
+        batch_api: bool = False,
+        **options
+    ) -> List[dict]:
+        """
+        Run many prompts concurrently through one pipeline
         
-        while attempt < max_retries:
-            attempt += 1
+        Args:
+            prompts (list): Prompts to process
+            source (str, optional): Batch file the prompts came from, used to find it again on resume
+            resume (bool): Continue the latest journaled batch from the same source
+            batch_api (bool): Generate code through the provider's batch API instead of one call per prompt
+            **options: Same keyword options as run()
             
-            if attempt > 1:
-                print(f"   Retry attempt {attempt}/{max_retries}...")
+        Returns:
+            list: Results in prompt order
+        """
+        if resume and not (self.journal and source):
+            raise ValueError("Resuming a batch requires the job journal and a batch file")
             
-            try:
-                code = self.ai_generator.generate_code(
-                    processed['enhanced'],
-                    prompt_type=processed['prompt_type']
-                )
+        batch_id = self.journal.latest_batch(source) if resume else None
+        previous = self.journal.batch_jobs(batch_id) if batch_id else {}
+        if resume and not batch_id:
+            print(f"\n⚠️  No journaled batch for {source}, starting fresh")
+        if self.journal and not batch_id:
+            batch_id = self.journal.start_batch(source, options)
+            
+        results = [None] * len(prompts)
+        jobs = []
+        for index, prompt in enumerate(prompts):
+            entry = previous.get(index)
+            # A changed prompt at this position is new work, not a resume
+            if entry and entry['prompt_hash'] != JobJournal.hash_text(prompt):
+                entry = None
                 
-                # Step 3: Validate code
-                if validate:
-                    print("\n✅ Validating generated code...")
-                    is_valid, errors, warnings = self.code_validator.validate(code)
-                    
-                    if errors:
-                        print(f"   ❌ Validation errors:")
-                        for error in errors:
-                            print(f"      - {error}")
-                        
-                        if attempt < max_retries:
-                            continue
-                    
-                    if warnings:
-                        print(f"   ⚠️  Warnings:")
-                        for warning in warnings[:3]:  # Show first 3 warnings
-                            print(f"      - {warning}")
-                    
-                    if is_valid:
-                        print("   ✓ Code validation passed")
-                        break
-                else:
-                    is_valid = True
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Code generation failed: {e}")
-                if attempt >= max_retries:
-                    print(f"\n❌ Failed to generate valid code after {max_retries} attempts")
-                    return {'success': False, 'error': str(e)}
-        
-        if not code:
-            return {'success': False, 'error': 'Failed to generate code'}
-        
-        # Step 4: Save generated code
-        print("\n💾 Saving generated code...")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        script_name = f"generated_{timestamp}.py"
-        script_path = Config.GENERATED_DIR / script_name
-        
-        with open(script_path, 'w') as f:
-            f.write(code)
-        
-        print(f"   Saved to: {script_path}")
+            if entry and entry['state'] == 'succeeded':
+                results[index] = dict(entry['results'] or {}, success=True, skipped=True)
+                continue
+                
+            if entry and entry['state'] == 'failed':
+                # Its checkpointed code already failed; resuming would only run it again
+                self.journal.drop_checkpoints(entry['job_id'])
+                
+            job = PipelineJob(
+                prompt,
+                options=options,
+                job_id=entry['job_id'] if entry else None,
+                on_event=self._print_batch_event,
+                batch_id=batch_id,
+                item_index=index,
+                checkpoints=self.journal.checkpoints(entry['job_id']) if entry else None
+            )
+            if entry and entry['state'] != 'failed':
+                # Generation attempts already paid for count against max_retries
+                job.attempt = self.journal.attempts(entry['job_id'])
+            jobs.append((index, job))
+            
+        skipped = len(prompts) - len(jobs)
+        if skipped:
+            print(f"\n⏭️  Skipping {skipped} prompts completed in a previous run")
+        print(f"\n📚 Running batch of {len(jobs)} prompts")
         
-        # Display code preview
-        print("\n📄 Generated Code Preview:")
-        print("-" * 60)
-        lines = code.split('\n')
-        preview_lines = min(15, len(lines))
-        for line in lines[:preview_lines]:
-            print(f"   {line}")
-        if len(lines) > preview_lines:
-            print(f"   ... ({len(lines) - preview_lines} more lines)")
-        print("-" * 60)
+        run_jobs = self._run_jobs_batch_api if batch_api else self._run_jobs
+        for (index, _), result in zip(jobs, asyncio.run(run_jobs([job for _, job in jobs]))):
+            results[index] = result
         
-        # Step 5: Execute in Blender
-        print(f"\n🎨 Executing in Blender ({mode or Config.DEFAULT_MODE} mode)...")
+        succeeded = sum(1 for result in results if result.get('success'))
+        print(f"\n✅ Batch finished: {succeeded}/{len(results)} succeeded")
+        return results
+    
+    def _print_event(self, event: dict):
+        """Print pipeline and Blender events for a single interactive job"""
+        event_type = event['type']
         
-        try:
-            results = self.blender_executor.execute_full_pipeline(
-                script_path,
-                mode=mode,
-                render=render,
-                export=export,
-                save=save
-            )
+        if event_type == 'stage' and event['stage'] == 'process':
+            print("🔍 Processing prompt...")
             
-            if results['success']:
-                print("\n✅ SUCCESS! Blender execution completed\n")
+        elif event_type == 'processed':
+            processed = event['processed']
+            print(f"   Category: {processed['category']}")
+            print(f"   Complexity: {processed['complexity']}")
+            if processed['entities']['objects']:
+                print(f"   Objects detected: {', '.join(processed['entities']['objects'])}")
                 
-                # Show output paths
-                if results.get('render_path'):
-                    print(f"   🖼️  Render: {results['render_path']}")
-                if results.get('export_path'):
-                    print(f"   📦 Export: {results['export_path']}")
-                if results.get('blend_path'):
-                    print(f"   💾 Blend file: {results['blend_path']}")
+        elif event_type == 'generating':
+            if event['attempt'] == 1:
+                print("\n🤖 Generating Blender code with AI...")
+            else:
+                print(f"   Retry attempt {event['attempt']}/{event['max_retries']}...")
                 
-                print(f"\n   📁 Generated script: {script_path}")
+        elif event_type == 'generation_failed':
+            print(f"\n❌ Failed to generate valid code after {event['attempts']} attempts")
+            
+        elif event_type == 'compat_rewrites':
+            print(f"\n🔧 Rewrote {len(event['rewrites'])} outdated API uses for Blender {event['version']}:")
+            for rewrite in event['rewrites']:
+                print(f"   - {CompatRewriter.describe(rewrite)}")
+            
+        elif event_type == 'validation':
+            print("\n✅ Validating generated code...")
+            if event['errors']:
+                print(f"   ❌ Validation errors:")
+                for error in event['errors']:
+                    print(f"      - {error}")
+            if event['warnings']:
+                print(f"   ⚠️  Warnings:")
+                for warning in event['warnings'][:3]:  # Show first 3 warnings
+                    print(f"      - {warning}")
+            if event['valid']:
+                print("   ✓ Code validation passed")
                 
+        elif event_type == 'dry_run':
+            result = event['result']
+            if result['ok']:
+                print(f"\n🧪 Dry run passed in {result['seconds'] * 1000:.0f} ms ({result['objects']} objects)")
             else:
-                print("\n❌ Execution failed")
-                print("\nBlender output:")
-                print(results['stderr'][:500])  # Show first 500 chars of error
+                print(f"\n🧪 Dry run failed: {DryRunner.describe(result)}")
                 
-                # Save failed code if configured
-                if Config.SAVE_FAILED_CODE:
-                    failed_path = Config.GENERATED_DIR / f"failed_{timestamp}.py"
-                    with open(failed_path, 'w') as f:
-                        f.write(code)
-                    print(f"\n   Failed code saved to: {failed_path}")
+        elif event_type == 'script_saved':
+            print("\n💾 Saving generated code...")
+            print(f"   Saved to: {event['path']}")
             
-            # Archive if configured
-            if Config.ARCHIVE_GENERATIONS and results['success']:
-                self._archive_generation(script_path)
+        elif event_type == 'code':
+            # Display code preview
+            print("\n📄 Generated Code Preview:")
+            print("-" * 60)
+            lines = event['code'].split('\n')
+            preview_lines = min(15, len(lines))
+            for line in lines[:preview_lines]:
+                print(f"   {line}")
+            if len(lines) > preview_lines:
+                print(f"   ... ({len(lines) - preview_lines} more lines)")
+            print("-" * 60)
             
-            return results
+        elif event_type == 'executing':
+            print(f"\n🎨 Executing in Blender ({event['mode']} mode)...")
             
-        except Exception as e:
-            logger.error(f"Execution error: {e}")
-            print(f"\n❌ Error: {e}")
-            return {'success': False, 'error': str(e)}
+        elif event_type == 'blender':
+            self._print_blender_event(event['event'])
+            
+        elif event_type == 'done':
+            self._print_results(event['results'])
     
-    def _archive_generation(self, script_path: Path):
-        """Archive a successful generation"""
-        try:
-            archive_path = Config.ARCHIVE_DIR / script_path.name
-            with open(script_path, 'r') as src, open(archive_path, 'w') as dst:
-                dst.write(src.read())
-            logger.debug(f"Archived generation to {archive_path}")
-        except Exception as e:
-            logger.warning(f"Failed to archive generation: {e}")
+    def _print_blender_event(self, event: dict):
+        """Print a live event streamed from Blender"""
+        if event['type'] == 'progress' and event.get('fraction') is not None:
+            print(
+                f"\r   Frame {event['frame']}: sample {event['sample']}/{event['total_samples']} "
+                f"({event['fraction']:.0%})",
+                end='',
+                flush=True
+            )
+        elif event['type'] == 'cache_hit':
+            print(f"\n   ♻️  Render reused from cache ({event['kind']} match)")
+        elif event['type'] == 'bake':
+            print(f"\n   🔥 {MaterialBaker.describe(event)}")
+        elif event['type'] == 'lod':
+            print(f"\n   📐 {LodExporter.describe(event)}")
+        elif event['type'] == 'split_render':
+            print(f"\n   ⚡ {SplitRenderer.describe(event)}")
+        elif event['type'] == 'artifact':
+            print(f"\n   {event['kind'].capitalize()} to: {event['path']}")
+        elif event['type'] == 'error':
+            line = f" (line {event['line_number']})" if event.get('line_number') else ""
+            icon = "❌" if event.get('fatal', True) else "⚠️ "
+            print(f"\n   {icon} {event['exception']}{line}: {event['message']}")
+    
+    def _print_results(self, results: dict):
+        """Print the outcome of a finished job"""
+        if 'stderr' not in results:
+            # Failed or cancelled before reaching Blender
+            if results.get('cancelled'):
+                print(f"\n⚠️  Job cancelled")
+            elif results.get('dry_run') and results['success']:
+                print("\n✅ Dry run only: nothing was rendered, exported or saved")
+            return
+            
+        if results['success']:
+            print("\n✅ SUCCESS! Blender execution completed\n")
+            
+            # Show output paths
+            if results.get('render_path'):
+                print(f"   🖼️  Render: {results['render_path']}")
+            if results.get('export_path'):
+                print(f"   📦 Export: {results['export_path']}")
+            if results.get('blend_path'):
+                print(f"   💾 Blend file: {results['blend_path']}")
+            if results.get('script_path'):
+                print(f"\n   📁 Generated script: {results['script_path']}")
+                
+        else:
+            print("\n❌ Execution failed")
+            if results.get('limit'):
+                print(
+                    f"   Stopped by {results['limit']} limit after {results['elapsed']:.1f}s "
+                    f"(peak RSS {results.get('peak_rss_mb') or 0:.0f} MB); partial output follows"
+                )
+            print("\nBlender output:")
+            print(results['stderr'][-500:])  # Show last 500 chars of error
+            
+            if results.get('failed_code_path'):
+                print(f"\n   Failed code saved to: {results['failed_code_path']}")
+    
+    def _print_batch_event(self, event: dict):
+        """Print one compact line per stage transition for batch jobs"""
+        prefix = f"[{event['job_id']}]"
+        
+        if event['type'] == 'stage':
+            print(f"{prefix} {event['stage']}")
+        elif event['type'] == 'resumed':
+            print(f"{prefix} resuming from {event['checkpoint']} checkpoint")
+        elif event['type'] == 'scheduled':
+            print(f"{prefix} {event['lane']} lane (~{event['predicted_seconds']:.0f}s predicted)")
+        elif event['type'] == 'coalesced':
+            print(f"{prefix} {event['stage']} shared with {event['leader']}")
+        elif event['type'] == 'done':
+            results = event['results']
+            if results.get('success'):
+                outputs = [str(results[key]) for key in ('render_path', 'export_path', 'blend_path') if results.get(key)]
+                print(f"{prefix} ✅ done {' '.join(outputs)}")
+            else:
+                print(f"{prefix} ❌ failed: {results.get('error') or (results.get('stderr') or '')[-200:]}")
+    
+    def _print_batch_api_event(self, event: dict):
+        """Print progress of provider batches"""
+        batch_id = event['batch_id']
+        
+        if event['type'] == 'batch_submitted':
+            print(f"📤 Submitted {event['count']} prompts to {event['provider']} batch {batch_id}")
+        elif event['type'] == 'batch_resumed':
+            print(f"📤 Waiting on {event['count']} prompts already in {event['provider']} batch {batch_id}")
+        elif event['type'] == 'batch_failed':
+            print(f"⚠️  Batch submission failed, generating {event['count']} prompts in real time: {event['error']}")
+        elif event['type'] == 'batch_status':
+            batch = event['batch']
+            status = batch.get('processing_status') or batch.get('status')
+            counts = ', '.join(f"{key} {value}" for key, value in (batch.get('request_counts') or {}).items())
+            print(f"⏳ Batch {batch_id}: {status} ({counts}) after {event['elapsed'] / 60:.0f} min")
+        elif event['type'] == 'batch_ended':
+            print(
+                f"📥 Batch {batch_id} ended after {event['elapsed'] / 60:.0f} min: "
+                f"{event['count'] - event['failed']}/{event['count']} generated"
+            )
     
     def interactive_mode(self):
         """Run in interactive mode with user input loop"""
@@ -294,12 +491,25 @@ def main():
         help='Save as .blend file'
     )
     
+    parser.add_argument(
+        '--bake',
+        action='store_true',
+        default=None,
+        help='Bake procedural materials to image textures before rendering and exporting'
+    )
+    
     parser.add_argument(
         '--no-validate',
         action='store_true',
         help='Skip code validation'
     )
     
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only run the generated code in a warm Blender to check it, without rendering or saving'
+    )
+    
     parser.add_argument(
         '--interactive',
         '-i',
@@ -313,9 +523,87 @@ def main():
         help='AI provider to use'
     )
     
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        help='Run every non-empty line of FILE as a prompt, concurrently'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='With --batch, skip prompts that succeeded in the last run of FILE, regenerate the failed ones and resume the rest from their checkpoints'
+    )
+    
+    parser.add_argument(
+        '--batch-api',
+        action='store_true',
+        help="With --batch, generate code through the provider's batch API (cheaper, results within 24h)"
+    )
+    
+    parser.add_argument(
+        '--token-report',
+        action='store_true',
+        help='Show output-token spend and truncation rate per prompt category'
+    )
+    
+    parser.add_argument(
+        '--local-status',
+        action='store_true',
+        help='Show the local LLM model, parallel slots and residency'
+    )
+    
+    parser.add_argument(
+        '--gc',
+        action='store_true',
+        help='Garbage-collect the artifact store according to the retention settings'
+    )
+    
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run the local HTTP job service'
+    )
+    
+    parser.add_argument(
+        '--host',
+        help='Job service bind address (default: from config)'
+    )
+    
+    parser.add_argument(
+        '--port',
+        type=int,
+        help='Job service port (default: from config)'
+    )
+    
+    parser.add_argument(
+        '--agent',
+        action='store_true',
+        help='Run as a cluster agent that pulls Blender tasks from a coordinator'
+    )
+    
+    parser.add_argument(
+        '--coordinator',
+        metavar='URL',
+        help='Coordinator URL for --agent (default: from config)'
+    )
+    
+    parser.add_argument(
+        '--slots',
+        type=int,
+        help='Concurrent tasks for --agent (default: from config)'
+    )
+    
     args = parser.parse_args()
     
     try:
+        # Agents only run Blender; they need no AI provider
+        if args.agent:
+            Config.create_directories()
+            Config.setup_logging()
+            run_agent(args.coordinator, args.slots)
+            return
+            
         # Override config with command-line args
         if args.provider:
             Config.AI_PROVIDER = args.provider
@@ -323,20 +611,91 @@ def main():
         # Initialize application
         app = BlenderAI()
         
+        # Determine render setting
+        render = None
+        if args.render:
+            render = True
+        elif args.no_render:
+            render = False
+            
         # Run in appropriate mode
-        if args.interactive or not args.prompt:
+        if args.token_report:
+            rows = app.ai_generator.budget.report()
+            if not rows:
+                print("\n📊 No generations recorded yet")
+            else:
+                print(f"\n📊 {'Profile':<28}{'Requests':>9}{'Tokens':>10}{'Mean':>8}{'Budget':>8}{'Truncated':>11}{'Next':>7}")
+                for row in rows:
+                    print(
+                        f"   {row['profile']:<28}{row['requests']:>9}{row['output_tokens']:>10}"
+                        f"{row['mean_output_tokens']:>8.0f}{row['mean_budget']:>8.0f}"
+                        f"{row['truncation_rate']:>11.1%}{row['next_budget']:>7}"
+                    )
+                    
+        elif args.local_status:
+            local = app.ai_generator.clients.get('local')
+            if not local:
+                print("\n⚠️  The local LLM is not in use (AI_PROVIDER / AI_FALLBACK_PROVIDERS)")
+                sys.exit(1)
+            if not Config.LOCAL_LLM_WARMUP:
+                local.prepare()
+            local.ready.wait()
+            status = local.status()
+            print(f"\n🖥️  Local LLM at {local.base_url}")
+            print(f"   Model: {status['model']} ({status['parameter_size']} {status['quantization']})")
+            print(f"   Context: {status['num_ctx']} of {status['context_length']} trained")
+            print(f"   Parallel slots: {status['parallel']}")
+            if status['load_seconds'] is not None:
+                print(f"   Load time: {status['load_seconds']:.1f}s")
+            for model in status['loaded']:
+                print(f"   Resident: {model['name']} ({(model['size_vram'] or 0) / 2**30:.1f} GB VRAM) until {model['expires_at']}")
+                    
+        elif args.gc:
+            store = app.blender_executor.artifact_store
+            if not store:
+                print("\n⚠️  Artifact store is disabled (ARTIFACT_STORE_ENABLED=false)")
+                sys.exit(1)
+            report = store.gc()
+            stats = store.stats()
+            print(
+                f"\n🧹 Removed {report['jobs_removed']} jobs, {report['objects_removed']} objects, "
+                f"{report['bytes_freed'] / (1024 * 1024):.1f} MB"
+            )
+            print(
+                f"   Store: {stats['jobs']} jobs, {stats['objects']} objects, "
+                f"{stats['stored_size'] / (1024 * 1024):.1f} MB on disk "
+                f"({stats['logical_size'] / (1024 * 1024):.1f} MB without dedup/compression)"
+            )
+            
+        elif args.serve:
+            serve(app, args.host, args.port)
+            
+        elif args.batch:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                prompts = [line.strip() for line in f if line.strip()]
+                
+            results = app.run_batch(
+                prompts,
+                source=str(Path(args.batch).resolve()),
+                resume=args.resume,
+                batch_api=args.batch_api,
+                mode=args.mode,
+                render=render,
+                export=args.export,
+                save=args.save,
+                bake=args.bake,
+                validate=not args.no_validate,
+                dry_run=args.dry_run
+            )
+            
+            sys.exit(0 if all(result.get('success') for result in results) else 1)
+            
+        elif args.interactive or not args.prompt:
             app.interactive_mode()
         else:
             # Join prompt words
             prompt = ' '.join(args.prompt)
             
-            # Determine render setting
-            render = None
-            if args.render:
-                render = True
-            elif args.no_render:
-                render = False
-            
             # Run generation
             results = app.run(
                 prompt,
@@ -344,7 +703,9 @@ def main():
                 render=render,
                 export=args.export,
                 save=args.save,
-                validate=not args.no_validate
+                bake=args.bake,
+                validate=not args.no_validate,
+                dry_run=args.dry_run
             )
             
             # Exit with appropriate code
@@ -0,0 +1,378 @@
+import logging
+from pathlib import Path
+from typing import Optional, Dict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Runs inside Blender after the scene is built: bakes procedural
+# Principled BSDF inputs of mesh materials to image textures with CPU
+# Cycles and swaps in materials that only sample those images. Baked
+# textures are cached on disk by node tree, evaluated mesh and UVs and
+# bake settings, so an unchanged material on an unchanged mesh is baked
+# once and reused by later jobs.
+BAKE_CODE = '''
+def _blender_ai_bake_materials(cache_dir, resolution, samples, margin, min_nodes):
+    import os
+    import json
+    import time
+    import array
+    import hashlib
+    
+    STATIC_TEXTURES = {'ShaderNodeTexImage', 'ShaderNodeTexEnvironment'}
+    # Vector inputs an emission bake can't carry
+    UNBAKEABLE_INPUTS = {'Tangent', 'Coat Normal', 'Clearcoat Normal'}
+    # Outputs whose value depends on the view or the light path
+    VIEW_DEPENDENT = {
+        'ShaderNodeTexCoord': {'Camera', 'Window', 'Reflection'},
+        'ShaderNodeNewGeometry': {'Incoming', 'Backfacing'},
+        'ShaderNodeLayerWeight': None,
+        'ShaderNodeFresnel': None,
+        'ShaderNodeLightPath': None,
+        'ShaderNodeCameraData': None,
+    }
+    # Modifiers that lay several copies over the same UVs
+    OVERLAPPING_MODIFIERS = {'ARRAY', 'MIRROR'}
+    LAYOUT_PROPERTIES = {
+        'rna_type', 'location', 'width', 'width_hidden', 'height', 'dimensions', 'select',
+        'show_options', 'show_preview', 'show_texture', 'hide', 'label', 'color', 'use_custom_color',
+    }
+    
+    def report(material, status, detail=None, seconds=None):
+        print("Material bake: " + json.dumps({'material': material.name, 'status': status, 'detail': detail, 'seconds': seconds}))
+    
+    def value_key(value):
+        if isinstance(value, set):
+            return tuple(sorted(value))
+        if isinstance(value, float):
+            return round(value, 5)
+        if isinstance(value, (str, int, bool)) or value is None:
+            return value
+        try:
+            return tuple(round(v, 5) if isinstance(v, float) else v for v in value)
+        except TypeError:
+            return repr(value)
+    
+    def tree_digest(tree):
+        nodes = []
+        for node in tree.nodes:
+            settings = []
+            for prop in node.bl_rna.properties:
+                if prop.is_readonly or prop.identifier in LAYOUT_PROPERTIES or prop.type not in {'BOOLEAN', 'INT', 'FLOAT', 'ENUM', 'STRING'}:
+                    continue
+                settings.append((prop.identifier, value_key(getattr(node, prop.identifier, None))))
+            ramp = getattr(node, 'color_ramp', None)
+            if ramp is not None:
+                settings.append(('ramp', ramp.interpolation, [(round(e.position, 5), value_key(e.color)) for e in ramp.elements]))
+            if getattr(node, 'node_tree', None) is not None:
+                settings.append(('group', tree_digest(node.node_tree)))
+            if getattr(node, 'image', None) is not None:
+                settings.append(('image', node.image.name, node.image.filepath))
+            inputs = [(socket.identifier, value_key(getattr(socket, 'default_value', None)), socket.is_linked) for socket in node.inputs]
+            nodes.append((node.name, node.bl_idname, repr(settings), repr(inputs)))
+        links = sorted(
+            (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+            for link in tree.links
+        )
+        return repr((sorted(nodes), links))
+    
+    def all_nodes(tree):
+        for node in tree.nodes:
+            yield node
+            if getattr(node, 'node_tree', None) is not None:
+                yield from all_nodes(node.node_tree)
+    
+    def all_links(tree):
+        yield from tree.links
+        for node in tree.nodes:
+            if getattr(node, 'node_tree', None) is not None:
+                yield from all_links(node.node_tree)
+    
+    def plan(material):
+        """(output, shader, sockets to bake) or (None, reason); reason None for cheap materials"""
+        tree = material.node_tree if material.use_nodes else None
+        if tree is None:
+            return None, None
+        nodes = list(all_nodes(tree))
+        if len(nodes) < min_nodes or not any(n.bl_idname.startswith('ShaderNodeTex') and n.bl_idname not in STATIC_TEXTURES for n in nodes):
+            return None, None
+        if material.library is not None:
+            return None, "linked from a library"
+        output = next((n for n in tree.nodes if n.bl_idname == 'ShaderNodeOutputMaterial' and n.is_active_output), None)
+        if output is None or not output.inputs['Surface'].is_linked:
+            return None, "no surface output"
+        if output.inputs['Displacement'].is_linked:
+            return None, "uses displacement"
+        shader = output.inputs['Surface'].links[0].from_node
+        if shader.bl_idname != 'ShaderNodeBsdfPrincipled':
+            return None, "surface is not a single Principled BSDF"
+        for link in all_links(tree):
+            outputs = VIEW_DEPENDENT.get(link.from_node.bl_idname, ())
+            if outputs is None or link.from_socket.name in outputs:
+                return None, f"view-dependent {link.from_node.name}"
+        sockets = [socket for socket in shader.inputs if socket.is_linked]
+        blocked = [socket.name for socket in sockets if socket.name in UNBAKEABLE_INPUTS]
+        if blocked:
+            return None, f"{blocked[0]} is linked"
+        return (output, shader, sockets), None
+    
+    def select_only(obj):
+        for other in bpy.context.view_layer.objects:
+            other.select_set(False)
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+    
+    def ensure_uvs(obj):
+        if obj.data.uv_layers:
+            return
+        select_only(obj)
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action='SELECT')
+        bpy.ops.uv.smart_project(island_margin=0.02)
+        bpy.ops.object.mode_set(mode='OBJECT')
+    
+    def bake_key(material, obj, depsgraph):
+        evaluated = obj.evaluated_get(depsgraph)
+        mesh = evaluated.to_mesh()
+        digest = hashlib.sha256(tree_digest(material.node_tree).encode())
+        coords = array.array('f', [0.0]) * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get('co', coords)
+        loops = array.array('i', [0]) * len(mesh.loops)
+        mesh.loops.foreach_get('vertex_index', loops)
+        uvs = array.array('f', [0.0]) * (len(mesh.loops) * 2)
+        mesh.uv_layers.active.data.foreach_get('uv', uvs)
+        for data in (coords, loops, uvs):
+            digest.update(data.tobytes())
+        evaluated.to_mesh_clear()
+        if any(node.bl_idname == 'ShaderNodeNewGeometry' for node in all_nodes(material.node_tree)):
+            # World-space positions and normals depend on where the object is
+            digest.update(repr([round(v, 5) for row in obj.matrix_world for v in row]).encode())
+        digest.update(repr((resolution, samples, margin, bpy.app.version[:2])).encode())
+        return digest.hexdigest()
+    
+    def bake_socket(obj, tree, output, shader, socket, path):
+        color = socket.type == 'RGBA'
+        image = bpy.data.images.new(os.path.basename(path), resolution, resolution, alpha=False)
+        if not color:
+            image.colorspace_settings.name = 'Non-Color'
+        image_node = tree.nodes.new('ShaderNodeTexImage')
+        image_node.image = image
+        tree.nodes.active = image_node
+        temporary = [image_node]
+        try:
+            if socket.name == 'Normal':
+                bpy.ops.object.bake(type='NORMAL', margin=margin, use_clear=True)
+            else:
+                # Route the input through an emission shader and bake what it emits
+                emission = tree.nodes.new('ShaderNodeEmission')
+                temporary.append(emission)
+                tree.links.new(socket.links[0].from_socket, emission.inputs['Color'])
+                tree.links.new(emission.outputs['Emission'], output.inputs['Surface'])
+                bpy.ops.object.bake(type='EMIT', margin=margin, use_clear=True)
+            image.filepath_raw = path
+            image.file_format = 'PNG'
+            image.save()
+        finally:
+            tree.links.new(shader.outputs[0], output.inputs['Surface'])
+            for node in temporary:
+                tree.nodes.remove(node)
+            bpy.data.images.remove(image)
+        return {'socket': socket.identifier, 'name': socket.name, 'file': os.path.basename(path), 'color': color}
+    
+    def baked_material(material, entry_dir, channels):
+        """Copy of the material whose baked inputs sample the cached images"""
+        baked = material.copy()
+        baked.name = material.name + " Baked"
+        tree = baked.node_tree
+        output = next(n for n in tree.nodes if n.bl_idname == 'ShaderNodeOutputMaterial' and n.is_active_output)
+        shader = output.inputs['Surface'].links[0].from_node
+        for channel in channels:
+            socket = shader.inputs[channel['socket']]
+            for link in list(socket.links):
+                tree.links.remove(link)
+            image = bpy.data.images.load(os.path.join(entry_dir, channel['file']), check_existing=True)
+            if not channel['color']:
+                image.colorspace_settings.name = 'Non-Color'
+            image.pack()
+            image_node = tree.nodes.new('ShaderNodeTexImage')
+            image_node.image = image
+            if channel['name'] == 'Normal':
+                normal_map = tree.nodes.new('ShaderNodeNormalMap')
+                tree.links.new(image_node.outputs['Color'], normal_map.inputs['Color'])
+                tree.links.new(normal_map.outputs['Normal'], socket)
+            else:
+                tree.links.new(image_node.outputs['Color'], socket)
+                
+        # Drop the procedural nodes nothing reads any more
+        used = set()
+        pending = [output]
+        while pending:
+            node = pending.pop()
+            if node.name in used:
+                continue
+            used.add(node.name)
+            pending.extend(link.from_node for socket in node.inputs for link in socket.links)
+        for node in [n for n in tree.nodes if n.name not in used]:
+            tree.nodes.remove(node)
+        return baked
+        
+    scene = bpy.context.scene
+    groups = {}
+    for obj in scene.objects:
+        if obj.type != 'MESH' or len(obj.material_slots) != 1 or obj.material_slots[0].material is None:
+            continue
+        material = obj.material_slots[0].material
+        groups.setdefault((material.name, obj.data.name), []).append(obj)
+    if not groups:
+        return
+        
+    saved = (scene.render.engine, scene.cycles.samples, scene.cycles.device, bpy.context.view_layer.objects.active)
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = samples
+    skipped = set()
+    try:
+        for (material_name, _), objects in groups.items():
+            material = bpy.data.materials[material_name]
+            if material_name in skipped:
+                continue
+            steps, reason = plan(material)
+            if steps is None:
+                if reason:
+                    report(material, 'skipped', reason)
+                skipped.add(material_name)
+                continue
+            obj = objects[0]
+            overlapping = [m.type for m in obj.modifiers if m.type in OVERLAPPING_MODIFIERS]
+            if obj.data.library is not None or overlapping:
+                report(material, 'skipped', f"{obj.name} has {overlapping[0].lower()} modifier" if overlapping else f"{obj.name} is linked")
+                continue
+                
+            started = time.perf_counter()
+            ensure_uvs(obj)
+            key = bake_key(material, obj, bpy.context.evaluated_depsgraph_get())
+            entry_dir = os.path.join(cache_dir, key[:2], key)
+            index_path = os.path.join(entry_dir, 'bake.json')
+            try:
+                with open(index_path) as f:
+                    channels = json.load(f)['channels']
+                if not all(os.path.exists(os.path.join(entry_dir, channel['file'])) for channel in channels):
+                    raise OSError("incomplete bake")
+                os.utime(index_path)
+                status = 'cached'
+            except (OSError, ValueError, KeyError):
+                output, shader, sockets = steps
+                os.makedirs(entry_dir, exist_ok=True)
+                select_only(obj)
+                try:
+                    channels = [
+                        bake_socket(obj, material.node_tree, output, shader, socket, os.path.join(entry_dir, socket.identifier.replace(' ', '_') + '.png'))
+                        for socket in sockets
+                    ]
+                except RuntimeError as exc:
+                    # The unbaked material still renders; only the speedup is lost
+                    report(material, 'skipped', str(exc).strip())
+                    continue
+                with open(index_path + '.tmp', 'w') as f:
+                    json.dump({'material': material.name, 'channels': channels}, f)
+                os.replace(index_path + '.tmp', index_path)
+                status = 'baked'
+                
+            baked = baked_material(material, entry_dir, channels)
+            for target in objects:
+                target.material_slots[0].material = baked
+            report(material, status, ', '.join(channel['name'] for channel in channels), round(time.perf_counter() - started, 2))
+    finally:
+        scene.render.engine, scene.cycles.samples, scene.cycles.device, bpy.context.view_layer.objects.active = saved
+'''
+
+
+class MaterialBaker:
+    """
+    Bakes procedural materials to cached image textures before rendering
+    
+    Materials built from procedural texture nodes are evaluated per
+    sample on every render, and export formats (glTF, FBX, OBJ) drop
+    them altogether. The bake snippet runs after the scene is built and
+    replaces each such material with a copy that samples baked images,
+    so the render and the exported files use plain textures. The images
+    are packed into the saved .blend and kept in BAKE_CACHE_DIR, keyed by
+    the node tree, the mesh and the bake settings, for later jobs.
+    """
+    
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize Material Baker
+        
+        Args:
+            cache_dir (Path, optional): Baked texture cache, defaults to BAKE_CACHE_DIR
+        """
+        self.cache_dir = Path(cache_dir or Config.BAKE_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def build_bake_code(self) -> str:
+        """
+        Snippet that bakes the scene's procedural materials
+        
+        Returns:
+            str: Python source run inside Blender right after the scene is built
+        """
+        return f"""
+# Bake procedural materials
+{BAKE_CODE}
+_blender_ai_bake_materials(r"{self.cache_dir}", {Config.BAKE_RESOLUTION}, {Config.BAKE_SAMPLES}, {Config.BAKE_MARGIN}, {Config.BAKE_MIN_NODES})
+"""
+
+    def prune(self, max_mb: Optional[float] = None) -> int:
+        """
+        Delete the least recently used bakes until the cache fits
+        
+        Args:
+            max_mb (float, optional): Cache size limit, defaults to BAKE_CACHE_MAX_MB (0 = unlimited)
+            
+        Returns:
+            int: Number of bakes deleted
+        """
+        max_mb = Config.BAKE_CACHE_MAX_MB if max_mb is None else max_mb
+        if max_mb <= 0:
+            return 0
+            
+        entries = []
+        for index_path in self.cache_dir.glob("*/*/bake.json"):
+            try:
+                size = sum(path.stat().st_size for path in index_path.parent.iterdir())
+                entries.append((index_path.stat().st_mtime, size, index_path.parent))
+            except OSError:
+                continue
+                
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        # Bakes are touched on every reuse, so the oldest mtime is the least recently used
+        for _, size, entry_dir in sorted(entries):
+            if total <= max_mb * 1024 * 1024:
+                break
+            for path in entry_dir.iterdir():
+                path.unlink(missing_ok=True)
+            entry_dir.rmdir()
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"Pruned {removed} baked materials from {self.cache_dir}")
+        return removed
+    
+    @staticmethod
+    def describe(event: Dict[str, any]) -> str:
+        """
+        One-line description of a bake event
+        
+        Args:
+            event (dict): 'bake' event from the output parser
+            
+        Returns:
+            str: What happened to the material
+        """
+        if event['status'] == 'skipped':
+            return f"Not baked: {event['material']} ({event['detail']})"
+        verb = "Reused baked" if event['status'] == 'cached' else "Baked"
+        return f"{verb} {event['material']}: {event['detail']} ({event['seconds']:.1f}s)"
\ No newline at end of file
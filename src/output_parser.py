@@ -0,0 +1,241 @@
+import re
+import json
+import logging
+from collections import deque
+from typing import Optional, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class BlenderOutputParser:
+    """Turns Blender stdout/stderr lines into progress and error events"""
+    
+    # "Fra:1 Mem:12.00M (Peak 15.00M) | Time:00:01.23 | Remaining:00:10.00 | ... | Sample 32/128"
+    FRAME_PATTERN = re.compile(r'^Fra:(\d+)\b')
+    SAMPLE_PATTERN = re.compile(r'\bSample (\d+)/(\d+)')
+    EEVEE_SAMPLE_PATTERN = re.compile(r'\bRendering (\d+) / (\d+) samples')
+    TIME_PATTERN = re.compile(r'\bTime:\s*([\d:.]+)')
+    REMAINING_PATTERN = re.compile(r'\bRemaining:\s*([\d:.]+)')
+    PEAK_MEMORY_PATTERN = re.compile(r'Peak[: ]\s*([\d.]+)M')
+    
+    # "Saved: '/path/to/render.png'" and our own snippet markers
+    SAVED_PATTERN = re.compile(r"^Saved: '?(.+?)'?\s*$")
+    ARTIFACT_PATTERN = re.compile(r'^(Rendered|Exported|Saved) to: (.+)$')
+    
+    # Render cache markers printed by the scene-hash render snippet
+    SCENE_HASH_PATTERN = re.compile(r'^Scene hash: ([0-9a-f]{64})$')
+    CACHE_HIT_PATTERN = re.compile(r'^Render cache hit: (\w+)$')
+    
+    # One JSON line per material from the bake snippet, per level from the
+    # LOD snippet and per tile from split render workers
+    BAKE_PATTERN = re.compile(r'^Material bake: (\{.*\})$')
+    LOD_PATTERN = re.compile(r'^LOD export: (\{.*\})$')
+    SPLIT_PATTERN = re.compile(r'^Split render: (\{.*\})$')
+    
+    # Python tracebacks, possibly prefixed by Blender's "Error: Python: "
+    TRACEBACK_START = 'Traceback (most recent call last):'
+    EXCEPTION_PATTERN = re.compile(r'^([A-Za-z_][\w.]*)(?::\s*(.*))?$')
+    TRACEBACK_FRAME_PATTERN = re.compile(r'^\s*File "(.+?)", line (\d+)')
+    SCRIPT_FILENAME = '<blender_ai>'
+    
+    def __init__(self):
+        """Initialize Blender Output Parser"""
+        self._in_traceback = False
+        self._traceback_lines = []
+        self.last_progress = None
+    
+    def feed(self, line: str, stream: str = 'stdout') -> List[Dict[str, any]]:
+        """
+        Parse one line of Blender output
+        
+        Args:
+            line (str): Line without its terminator
+            stream (str): 'stdout' or 'stderr'
+            
+        Returns:
+            list: Events recognized in this line (may be empty)
+        """
+        events = []
+        stripped = line.strip()
+        
+        if self.TRACEBACK_START in stripped:
+            self._in_traceback = True
+            self._traceback_lines = [stripped[stripped.index(self.TRACEBACK_START):]]
+            return events
+            
+        if self._in_traceback:
+            self._traceback_lines.append(line)
+            # Frame lines are indented; the exception line is not
+            if line and not line[0].isspace():
+                match = self.EXCEPTION_PATTERN.match(stripped)
+                if match:
+                    events.append({
+                        'type': 'error',
+                        'stream': stream,
+                        'exception': match.group(1),
+                        'message': match.group(2) or '',
+                        'traceback': '\n'.join(self._traceback_lines),
+                        'line_number': self._last_script_line(),
+                        'fatal': self._uncaught()
+                    })
+                self._in_traceback = False
+                self._traceback_lines = []
+            return events
+            
+        progress = self._parse_progress(stripped)
+        if progress:
+            self.last_progress = progress
+            events.append(progress)
+            return events
+            
+        scene_hash = self.SCENE_HASH_PATTERN.match(stripped)
+        if scene_hash:
+            events.append({'type': 'scene_hash', 'key': scene_hash.group(1)})
+            return events
+            
+        cache_hit = self.CACHE_HIT_PATTERN.match(stripped)
+        if cache_hit:
+            events.append({'type': 'cache_hit', 'kind': cache_hit.group(1)})
+            return events
+            
+        reports = ((self.BAKE_PATTERN, 'bake'), (self.LOD_PATTERN, 'lod'), (self.SPLIT_PATTERN, 'split'))
+        for pattern, event_type in reports:
+            report = pattern.match(stripped)
+            if report:
+                try:
+                    events.append(dict(json.loads(report.group(1)), type=event_type))
+                except ValueError:
+                    logger.debug(f"Unreadable {event_type} report: {stripped[:200]}")
+                return events
+            
+        artifact = self.ARTIFACT_PATTERN.match(stripped)
+        if artifact:
+            events.append({'type': 'artifact', 'kind': artifact.group(1).lower(), 'path': artifact.group(2)})
+            return events
+            
+        saved = self.SAVED_PATTERN.match(stripped)
+        if saved:
+            events.append({'type': 'saved', 'path': saved.group(1)})
+            
+        return events
+    
+    def _parse_progress(self, line: str) -> Optional[Dict[str, any]]:
+        """
+        Parse a render status line
+        
+        Args:
+            line (str): Stripped output line
+            
+        Returns:
+            dict or None: Progress event
+        """
+        frame = self.FRAME_PATTERN.match(line)
+        if not frame:
+            return None
+            
+        progress = {
+            'type': 'progress',
+            'frame': int(frame.group(1)),
+            'sample': None,
+            'total_samples': None,
+            'fraction': None,
+            'elapsed': None,
+            'remaining': None,
+            'peak_memory_mb': None,
+            'status': line.rsplit('|', 1)[-1].strip()
+        }
+        
+        sample = self.SAMPLE_PATTERN.search(line) or self.EEVEE_SAMPLE_PATTERN.search(line)
+        if sample:
+            progress['sample'] = int(sample.group(1))
+            progress['total_samples'] = int(sample.group(2))
+            if progress['total_samples']:
+                progress['fraction'] = progress['sample'] / progress['total_samples']
+                
+        elapsed = self.TIME_PATTERN.search(line)
+        if elapsed:
+            progress['elapsed'] = self._parse_clock(elapsed.group(1))
+            
+        remaining = self.REMAINING_PATTERN.search(line)
+        if remaining:
+            progress['remaining'] = self._parse_clock(remaining.group(1))
+            
+        peak = self.PEAK_MEMORY_PATTERN.search(line)
+        if peak:
+            progress['peak_memory_mb'] = float(peak.group(1))
+            
+        return progress
+    
+    def _parse_clock(self, value: str) -> Optional[float]:
+        """Convert Blender's 'HH:MM:SS.ss' / 'MM:SS.ss' clock to seconds"""
+        try:
+            seconds = 0.0
+            for part in value.split(':'):
+                seconds = seconds * 60 + float(part)
+            return seconds
+        except ValueError:
+            return None
+    
+    def _frames(self) -> List[str]:
+        """File names of the traceback's frames, outermost first"""
+        frames = []
+        for line in self._traceback_lines:
+            match = self.TRACEBACK_FRAME_PATTERN.match(line)
+            if match:
+                frames.append(match.group(1))
+        return frames
+    
+    def _uncaught(self) -> bool:
+        """
+        Whether the exception escaped the generated program
+        
+        An uncaught error unwinds through the bootstrap that exec'd the
+        program, so the outermost frame is outside it. Tracebacks the
+        program printed itself (traceback.print_exc() in a handler) start
+        inside the program, and add-on errors never enter it.
+        """
+        frames = self._frames()
+        return self.SCRIPT_FILENAME in frames and frames[0] != self.SCRIPT_FILENAME
+    
+    def _last_script_line(self) -> Optional[int]:
+        """Line number of the innermost frame in the generated program"""
+        for line in reversed(self._traceback_lines):
+            match = self.TRACEBACK_FRAME_PATTERN.match(line)
+            if match and match.group(1) == self.SCRIPT_FILENAME:
+                return int(match.group(2))
+        return None
+
+
+class OutputBuffer:
+    """Bounded ring buffer of Blender output lines"""
+    
+    def __init__(self, max_lines: int = 500):
+        """
+        Initialize Output Buffer
+        
+        Args:
+            max_lines (int): Number of lines kept per stream
+        """
+        self.max_lines = max_lines
+        self.streams = {
+            'stdout': deque(maxlen=max_lines),
+            'stderr': deque(maxlen=max_lines),
+        }
+        self.combined = deque(maxlen=max_lines)
+        self.dropped = 0
+    
+    def append(self, line: str, stream: str = 'stdout'):
+        """Add a line, evicting the oldest if the buffer is full"""
+        buffer = self.streams[stream]
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append(line)
+        self.combined.append(f"[{stream}] {line}")
+    
+    def text(self, stream: str) -> str:
+        """Return the retained lines of one stream as text"""
+        return '\n'.join(self.streams[stream])
+    
+    def tail(self) -> List[str]:
+        """Return the retained interleaved output"""
+        return list(self.combined)
\ No newline at end of file
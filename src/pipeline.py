@@ -0,0 +1,732 @@
+import copy
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Optional, Dict, List, Callable
+
+from config import Config
+from blender_executor import new_job_id
+from dry_run import DryRunner
+from job_scheduler import CostModel, LaneScheduler
+from job_journal import JobJournal
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineJob:
+    """One prompt travelling through the pipeline stages"""
+    
+    def __init__(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, any]] = None,
+        job_id: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, any]], None]] = None,
+        batch_id: Optional[str] = None,
+        item_index: Optional[int] = None,
+        checkpoints: Optional[Dict[str, Dict[str, any]]] = None
+    ):
+        """
+        Initialize Pipeline Job
+        
+        Args:
+            prompt (str): User's natural language prompt
+            options (dict, optional): mode, render, export, save, bake, validate, dry_run, max_retries
+            job_id (str, optional): Identifier used in artifact names
+            on_event (callable, optional): Receives stage and Blender events
+            batch_id (str, optional): Journal batch the job belongs to
+            item_index (int, optional): Position of the prompt in its batch
+            checkpoints (dict, optional): Journal checkpoints to resume from
+        """
+        self.job_id = job_id or new_job_id()
+        self.prompt = prompt
+        self.options = dict(options or {})
+        self.on_event = on_event
+        self.batch_id = batch_id
+        self.item_index = item_index
+        self.checkpoints = dict(checkpoints or {})
+        
+        self.processed = None
+        self.code = None
+        self.plan = None
+        self.results = None
+        self.attempt = 0
+        self.errors = []
+        self.warnings = []
+        self.rewrites = []
+        self.stage = None
+        self.timings = {}
+        self.cost = None
+        self.lane = None
+        self.waited = None
+        self.submitted_at = None
+        self.flight = None
+        self.cancelled = False
+        self.future = None
+        self.task = None
+    
+    @property
+    def max_retries(self) -> int:
+        """Maximum generation attempts for this job"""
+        return self.options.get('max_retries') or Config.MAX_RETRIES
+    
+    @property
+    def done(self) -> bool:
+        """Whether a final result has been set"""
+        return self.future is not None and self.future.done()
+    
+    def emit(self, event_type: str, **fields):
+        """
+        Send an event to the job's listener
+        
+        Args:
+            event_type (str): Event type ('stage', 'processed', 'validation', ...)
+            **fields: Event payload
+        """
+        if not self.on_event:
+            return
+        event = {'type': event_type, 'job_id': self.job_id}
+        event.update(fields)
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.debug(f"Event callback failed: {e}")
+    
+    def finish(self, results: Dict[str, any]):
+        """
+        Resolve the job with its final results
+        
+        Args:
+            results (dict): Results dictionary
+        """
+        results.setdefault('job_id', self.job_id)
+        results.setdefault('attempts', self.attempt)
+        results.setdefault('timings', dict(self.timings))
+        self.results = results
+        if self.future is not None and not self.future.done():
+            self.future.set_result(results)
+        self.emit('done', results=results)
+    
+    def cancel(self):
+        """Cancel the job wherever it currently is"""
+        if self.done:
+            return
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+
+class Pipeline:
+    """
+    Asyncio pipeline: process -> generate -> validate -> assemble -> execute -> post_process
+    
+    Stages are connected by bounded queues, so a slow stage pushes back on
+    the ones before it, and each stage has its own worker pool so a slow
+    LLM call doesn't keep Blender workers idle. With the scheduler enabled
+    the execute stage is a LaneScheduler instead: jobs wait there by
+    predicted cost, in fast and slow lanes with their own workers.
+    
+    Identical jobs in flight at the same time share their generation,
+    validation and Blender execution: a job entering one of those stages
+    with the same input as a job already queued or running there waits
+    for that job's outcome instead of repeating the work.
+    """
+    
+    STAGES = ['process', 'generate', 'validate', 'assemble', 'execute', 'post_process']
+    
+    def __init__(
+        self,
+        prompt_processor,
+        ai_generator,
+        code_validator,
+        blender_executor,
+        concurrency: Optional[Dict[str, int]] = None,
+        queue_size: Optional[int] = None,
+        journal=None
+    ):
+        """
+        Initialize Pipeline
+        
+        Args:
+            prompt_processor (PromptProcessor): Prompt analysis component
+            ai_generator (AIGenerator): Code generation component
+            code_validator (CodeValidator): Static validation component
+            blender_executor (BlenderExecutor): Blender execution component
+            concurrency (dict, optional): Workers per stage, defaults to config
+            queue_size (int, optional): Capacity of each stage queue
+            journal (JobJournal, optional): Durable record of transitions and checkpoints
+        """
+        self.prompt_processor = prompt_processor
+        self.ai_generator = ai_generator
+        self.code_validator = code_validator
+        self.blender_executor = blender_executor
+        self.timing_history = blender_executor.timing_history
+        self.journal = journal
+        
+        self.concurrency = {
+            'process': Config.PIPELINE_PROCESS_WORKERS,
+            'generate': Config.PIPELINE_GENERATE_WORKERS,
+            'validate': Config.PIPELINE_VALIDATE_WORKERS,
+            'assemble': Config.PIPELINE_ASSEMBLE_WORKERS,
+            'execute': Config.PIPELINE_EXECUTE_WORKERS,
+            'post_process': Config.PIPELINE_POST_WORKERS,
+        }
+        self.concurrency.update(concurrency or {})
+        self.queue_size = queue_size or Config.PIPELINE_QUEUE_SIZE
+        self.scheduler = LaneScheduler(CostModel(blender_executor)) if Config.SCHEDULER_ENABLED else None
+        self.flights = SingleFlight() if Config.COALESCE_ENABLED else None
+        
+        self.handlers = {
+            'process': self._process,
+            'generate': self._generate,
+            'validate': self._validate,
+            'assemble': self._assemble,
+            'execute': self._execute,
+            'post_process': self._post_process,
+        }
+        
+        self.queues = {}
+        self.jobs = {}
+        self._workers = []
+        self._requeues = set()
+        self._running = False
+    
+    async def start(self):
+        """Create the stage queues and start the worker pools"""
+        if self._running:
+            return
+        self.queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in self.STAGES}
+        pools = [(stage, None, self.concurrency[stage]) for stage in self.STAGES]
+        if self.scheduler:
+            # Execute workers belong to lanes instead of sharing one queue
+            self.queues['execute'] = self.scheduler
+            pools = [pool for pool in pools if pool[0] != 'execute']
+            pools += [('execute', lane['name'], lane['workers']) for lane in self.scheduler.lanes]
+        for stage, lane, workers in pools:
+            for index in range(max(1, workers)):
+                worker = asyncio.ensure_future(self._worker(stage, lane))
+                worker.set_name(f"{stage}-{lane}-{index}" if lane else f"{stage}-{index}")
+                self._workers.append(worker)
+        self._running = True
+        lanes = {lane['name']: lane['workers'] for lane in self.scheduler.lanes} if self.scheduler else None
+        logger.info(f"Pipeline started with concurrency {self.concurrency}" + (f", execute lanes {lanes}" if lanes else ""))
+    
+    async def stop(self):
+        """Cancel all workers and fail jobs that are still in flight"""
+        if not self._running:
+            return
+        self._running = False
+        for task in list(self._workers) + list(self._requeues):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._requeues, return_exceptions=True)
+        self._workers = []
+        self._requeues = set()
+        for job in self.jobs.values():
+            if not job.done:
+                job.finish({'success': False, 'error': 'Pipeline stopped', 'cancelled': True})
+        logger.info("Pipeline stopped")
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+    
+    async def submit(self, job: PipelineJob) -> PipelineJob:
+        """
+        Queue a job at the first stage
+        
+        Waits while the first stage is full (backpressure).
+        
+        Args:
+            job (PipelineJob): Job to run
+            
+        Returns:
+            PipelineJob: The same job, with its future attached
+        """
+        if not self._running:
+            await self.start()
+        job.future = asyncio.get_running_loop().create_future()
+        job.submitted_at = time.monotonic()
+        self.jobs[job.job_id] = job
+        if self.journal:
+            self.journal.start_job(job.job_id, job.prompt, job.options, job.batch_id, job.item_index)
+            job.future.add_done_callback(lambda future: self._journal_finish(job))
+        job.emit('queued')
+        await self.queues['process'].put(job)
+        return job
+    
+    async def run_job(self, job: PipelineJob) -> Dict[str, any]:
+        """
+        Submit a job and wait for its results
+        
+        Args:
+            job (PipelineJob): Job to run
+            
+        Returns:
+            dict: Execution results
+        """
+        await self.submit(job)
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            job.cancel()
+            raise
+        finally:
+            self.jobs.pop(job.job_id, None)
+    
+    async def run_many(self, jobs: List[PipelineJob]) -> List[Dict[str, any]]:
+        """
+        Run several jobs concurrently through the pipeline
+        
+        Args:
+            jobs (list): Jobs to run
+            
+        Returns:
+            list: Results in the same order as jobs
+        """
+        return await asyncio.gather(*(self.run_job(job) for job in jobs))
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+        
+        Args:
+            job_id (str): Job identifier
+            
+        Returns:
+            bool: True if the job was found and not yet finished
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.cancel()
+        return True
+    
+    async def _worker(self, stage: str, lane: Optional[str] = None):
+        """Take jobs from a stage queue, or a scheduler lane, run the stage and forward the job"""
+        queue = self.queues[stage]
+        handler = self.handlers[stage]
+        
+        while True:
+            job = await queue.get(lane) if lane else await queue.get()
+            try:
+                if job.cancelled:
+                    self._land(job, stage, {'abandoned': True})
+                    job.finish({'success': False, 'error': 'Cancelled', 'cancelled': True})
+                    continue
+                    
+                job.stage = stage
+                job.emit('stage', stage=stage)
+                started = time.monotonic()
+                input_hash = self._journal_hash(job, stage, 'input')
+                self._journal_record(job, stage, 'started', input_hash=input_hash)
+                job.task = asyncio.ensure_future(handler(job))
+                
+                try:
+                    next_stage = await job.task
+                except asyncio.CancelledError:
+                    if not job.cancelled:
+                        raise
+                    logger.info(f"Job {job.job_id} cancelled during {stage}")
+                    self._journal_record(job, stage, 'failed', input_hash=input_hash, detail={'error': 'Cancelled'})
+                    self._land(job, stage, {'abandoned': True})
+                    job.finish({'success': False, 'error': 'Cancelled', 'cancelled': True})
+                    continue
+                except Exception as e:
+                    logger.error(f"Stage {stage} failed for job {job.job_id}: {e}")
+                    self._journal_record(job, stage, 'failed', input_hash=input_hash, detail={'error': str(e)})
+                    self._land(job, stage, {'error': str(e)})
+                    job.finish({'success': False, 'error': str(e)})
+                    continue
+                finally:
+                    job.task = None
+                    
+                self._land(job, stage, {'next': next_stage, 'state': self._flight_state(job, stage)})
+                elapsed = time.monotonic() - started
+                job.timings[stage] = job.timings.get(stage, 0.0) + elapsed
+                self._journal_record(
+                    job,
+                    stage,
+                    'completed',
+                    input_hash=input_hash,
+                    output_hash=self._journal_hash(job, stage, 'output'),
+                    elapsed=elapsed,
+                    detail={'next': next_stage}
+                )
+                
+                if next_stage is None:
+                    continue
+                if next_stage == 'generate':
+                    # Retries flow backwards or loop on this stage; putting them on
+                    # a full queue from a generate worker could block every worker
+                    self._requeue(job, next_stage)
+                else:
+                    await self._put(job, next_stage)
+            finally:
+                queue.task_done()
+    
+    def _requeue(self, job: PipelineJob, stage: str):
+        """Put a job back on an earlier stage without blocking the caller"""
+        task = asyncio.ensure_future(self._put(job, stage))
+        self._requeues.add(task)
+        task.add_done_callback(self._requeues.discard)
+    
+    async def _put(self, job: PipelineJob, stage: str):
+        """Queue a job for a stage, or have it follow an identical job already there"""
+        flight = self.flights.join(stage, self._flight_key(job, stage), job) if self.flights else None
+        if flight is None:
+            await self.queues[stage].put(job)
+            return
+        job.emit('coalesced', stage=stage, leader=flight.leader.job_id)
+        job.task = asyncio.ensure_future(self._follow(job, stage, flight))
+        self._requeues.add(job.task)
+        job.task.add_done_callback(self._requeues.discard)
+    
+    def _flight_key(self, job: PipelineJob, stage: str) -> Optional[str]:
+        """
+        Hash of everything a stage's work depends on, None where jobs can't share it
+        
+        Generation is keyed like the journal's generate input (the enhanced
+        prompt) plus the attempt, validation by the code and the options
+        that steer it, and execution by the plan's key, which includes the
+        render cache key.
+        """
+        if stage == 'generate':
+            value = {
+                'prompt': job.processed['enhanced'],
+                'prompt_type': job.processed['prompt_type'],
+                'complexity': job.processed.get('complexity'),
+                'attempt': job.attempt,
+            }
+        elif stage == 'validate':
+            value = {
+                'code': job.code,
+                'attempt': job.attempt,
+                'max_retries': job.max_retries,
+                'validate': job.options.get('validate'),
+                'dry_run': job.options.get('dry_run'),
+            }
+        elif stage == 'execute' and job.plan.get('flight_key'):
+            value = {'plan': job.plan['flight_key'], 'mode': job.options.get('mode') or Config.DEFAULT_MODE}
+        else:
+            return None
+        return JobJournal.hash_text(value)
+    
+    def _flight_state(self, job: PipelineJob, stage: str) -> Dict[str, any]:
+        """What a follower takes over from its leader after a stage"""
+        state = {'job_id': job.job_id, 'results': copy.deepcopy(job.results)}
+        if stage in ('generate', 'validate'):
+            state.update(code=job.code, attempt=job.attempt)
+        if stage == 'validate':
+            state.update(errors=list(job.errors), warnings=list(job.warnings), rewrites=list(job.rewrites))
+        return state
+    
+    def _land(self, job: PipelineJob, stage: str, outcome: Dict[str, any]):
+        """Hand a stage outcome to the jobs following this one, if it leads a flight"""
+        if self.flights and job.flight:
+            self.flights.land(job, stage, outcome)
+    
+    async def _follow(self, job: PipelineJob, stage: str, flight):
+        """Wait for a flight's leader, take over its stage outcome and carry on from there"""
+        started = time.monotonic()
+        try:
+            outcome = await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            if job.cancelled:
+                job.finish({'success': False, 'error': 'Cancelled', 'cancelled': True})
+                return
+            raise
+        finally:
+            job.task = None
+            
+        if job.cancelled:
+            job.finish({'success': False, 'error': 'Cancelled', 'cancelled': True})
+            return
+        if outcome.get('abandoned'):
+            # The leader was cancelled; go through the stage after all
+            await self._put(job, stage)
+            return
+            
+        leader = flight.leader.job_id
+        elapsed = time.monotonic() - started
+        job.timings[stage] = job.timings.get(stage, 0.0) + elapsed
+        if outcome.get('error'):
+            self._journal_record(job, stage, 'failed', detail={'error': outcome['error'], 'coalesced_with': leader})
+            job.finish({'success': False, 'error': outcome['error'], 'coalesced_with': leader})
+            return
+            
+        state = outcome['state']
+        if stage in ('generate', 'validate'):
+            job.code = state['code']
+            job.attempt = state['attempt']
+        if stage == 'validate':
+            job.errors, job.warnings, job.rewrites = list(state['errors']), list(state['warnings']), list(state['rewrites'])
+        if stage == 'execute':
+            job.results = await asyncio.to_thread(self.blender_executor.adopt_results, state['results'], leader, job.plan)
+        elif state['results'] is not None:
+            job.results = copy.deepcopy(state['results'])
+            # Bookkeeping of the leader that finish() filled in
+            for key in ('job_id', 'attempts', 'timings'):
+                job.results.pop(key, None)
+        if job.results is not None:
+            job.results['coalesced_with'] = leader
+            
+        next_stage = outcome['next']
+        self._journal_record(job, stage, 'completed', elapsed=elapsed, detail={'next': next_stage, 'coalesced_with': leader})
+        if job.code and stage == 'generate':
+            self._journal_checkpoint(job, 'generated', content=job.code)
+        elif job.code and stage == 'validate' and next_stage == 'assemble':
+            self._journal_checkpoint(job, 'validated', content=job.code)
+            
+        if next_stage is None:
+            # The leader finished inside the stage, e.g. out of generation attempts
+            job.finish(job.results or {'success': False, 'error': 'Coalesced job ended without results'})
+            return
+        await self._put(job, next_stage)
+    
+    def _journal_record(self, job: PipelineJob, stage: str, status: str, **fields):
+        """Append a stage transition to the journal, if one is attached"""
+        if not self.journal:
+            return
+        try:
+            self.journal.record(job.job_id, stage, status, attempt=job.attempt, **fields)
+        except Exception as e:
+            logger.warning(f"Failed to journal {stage} {status} for job {job.job_id}: {e}")
+    
+    def _journal_hash(self, job: PipelineJob, stage: str, side: str) -> Optional[str]:
+        """Hash of what a stage consumes ('input') or produces ('output')"""
+        if not self.journal:
+            return None
+        values = {
+            ('process', 'input'): job.prompt,
+            ('process', 'output'): job.processed,
+            ('generate', 'input'): job.processed and job.processed.get('enhanced'),
+            ('generate', 'output'): job.code,
+            ('validate', 'input'): job.code,
+            ('validate', 'output'): {'errors': job.errors, 'warnings': job.warnings},
+            ('assemble', 'input'): job.code,
+            ('assemble', 'output'): job.plan and job.plan['combined'],
+            ('execute', 'input'): job.plan and job.plan['combined'],
+            ('execute', 'output'): job.results and {
+                key: job.results.get(key) for key in ('success', 'returncode', 'render_path', 'export_path', 'blend_path')
+            },
+        }
+        return self.journal.hash_text(values.get((stage, side)))
+    
+    def _journal_checkpoint(self, job: PipelineJob, name: str, content: Optional[str] = None, path=None):
+        """Store a resumable checkpoint, if a journal is attached"""
+        if not self.journal:
+            return
+        try:
+            self.journal.checkpoint(job.job_id, name, content=content, path=path, attempt=job.attempt)
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint {name} for job {job.job_id}: {e}")
+    
+    def _journal_finish(self, job: PipelineJob):
+        """Record the final state of a job"""
+        results = job.results or {}
+        if results.get('cancelled'):
+            state = 'cancelled'
+        else:
+            state = 'succeeded' if results.get('success') else 'failed'
+        try:
+            self.journal.finish_job(job.job_id, state, results)
+        except Exception as e:
+            logger.warning(f"Failed to journal result of job {job.job_id}: {e}")
+    
+    async def _process(self, job: PipelineJob) -> Optional[str]:
+        """Analyze the prompt, then skip ahead past code that already exists"""
+        job.processed = self.prompt_processor.process(job.prompt)
+        job.emit('processed', processed=job.processed)
+        
+        if job.code:
+            # Generated ahead of time, e.g. through a provider batch API
+            job.attempt = max(job.attempt, 1)
+            self._journal_checkpoint(job, 'generated', content=job.code)
+            return 'validate'
+        
+        for name, next_stage in (('validated', 'assemble'), ('generated', 'validate')):
+            checkpoint = job.checkpoints.get(name)
+            if checkpoint and checkpoint.get('content'):
+                job.code = checkpoint['content']
+                job.attempt = max(job.attempt, checkpoint.get('attempt') or 0)
+                job.emit('resumed', checkpoint=name, attempt=job.attempt)
+                return next_stage
+        return 'generate'
+    
+    async def _generate(self, job: PipelineJob) -> Optional[str]:
+        """Ask the AI provider for code"""
+        job.attempt += 1
+        job.emit('generating', attempt=job.attempt, max_retries=job.max_retries)
+        started = time.monotonic()
+        
+        try:
+            job.code = await asyncio.to_thread(
+                self.ai_generator.generate_code,
+                job.processed['enhanced'],
+                prompt_type=job.processed['prompt_type'],
+                profile=job.processed
+            )
+        except Exception as e:
+            logger.error(f"Code generation failed: {e}")
+            if job.attempt >= job.max_retries:
+                job.emit('generation_failed', attempts=job.attempt, error=str(e))
+                job.finish({'success': False, 'error': str(e)})
+                return None
+            return 'generate'
+            
+        self.timing_history.record('generate', self.timing_history.profile_key(job.processed), time.monotonic() - started)
+        
+        if not job.code:
+            job.finish({'success': False, 'error': 'Failed to generate code'})
+            return None
+        self._journal_checkpoint(job, 'generated', content=job.code)
+        return 'validate'
+    
+    async def _validate(self, job: PipelineJob) -> Optional[str]:
+        """Rewrite generated code for the running Blender, then validate it, sending it back for regeneration on errors"""
+        compat = self.blender_executor.compat
+        if compat:
+            job.code, job.rewrites = await asyncio.to_thread(compat.rewrite, job.code)
+            if job.rewrites:
+                job.emit('compat_rewrites', version=compat.version_string, rewrites=job.rewrites)
+                
+        validate = job.options.get('validate')
+        validate = validate if validate is not None else Config.VALIDATE_CODE
+        if validate:
+            is_valid, job.errors, job.warnings = await asyncio.to_thread(self.code_validator.validate, job.code)
+            job.emit('validation', valid=is_valid, errors=job.errors, warnings=job.warnings)
+            
+            if job.errors and job.attempt < job.max_retries:
+                return 'generate'
+        
+        # Out of static retries the dry run has the last word, as the errors may be false positives
+        if job.options.get('dry_run') or (validate and Config.DRY_RUN_ENABLED):
+            next_stage = await self._dry_run(job)
+            if next_stage:
+                return next_stage
+                
+        self._journal_checkpoint(job, 'validated', content=job.code)
+        return 'assemble'
+    
+    async def _dry_run(self, job: PipelineJob) -> Optional[str]:
+        """
+        Run the build code alone in a warm Blender before paying for a full execution
+        
+        Returns:
+            str: 'generate' to retry, 'post_process' when the job ends here,
+                 None to continue to assembly
+        """
+        result = await asyncio.to_thread(self.blender_executor.dry_run, job.code)
+        job.emit('dry_run', result=result)
+        
+        if result['ok']:
+            if job.options.get('dry_run'):
+                # Dry-run only: nothing is rendered, exported or saved
+                job.results = {'success': True, 'dry_run': result}
+                return 'post_process'
+            return None
+            
+        error = DryRunner.describe(result)
+        job.errors = [f"Dry run: {error}"]
+        if job.attempt < job.max_retries:
+            return 'generate'
+        job.results = {'success': False, 'error': f"Dry run failed: {error}", 'dry_run': result}
+        return 'post_process'
+    
+    async def _assemble(self, job: PipelineJob) -> Optional[str]:
+        """Build the combined program and artifact paths in memory"""
+        options = job.options
+        
+        if Config.PERSIST_SCRIPTS:
+            script_path = self.blender_executor.persist_script(job.code, "generated", job.job_id)
+            job.emit('script_saved', path=script_path)
+            
+        job.emit('code', code=job.code)
+        
+        # A .blend saved by an earlier run of this job already holds the built scene
+        resume_blend = None
+        checkpoint = job.checkpoints.get('blend')
+        if checkpoint and checkpoint.get('path') and Path(checkpoint['path']).exists():
+            resume_blend = Path(checkpoint['path'])
+            job.emit('resumed', checkpoint='blend', path=resume_blend)
+            
+        job.plan = self.blender_executor.prepare_pipeline(
+            job.code,
+            render=options.get('render'),
+            export=options.get('export'),
+            save=options.get('save'),
+            job_id=job.job_id,
+            profile=job.processed,
+            resume_blend=resume_blend,
+            bake=options.get('bake')
+        )
+        
+        if self.scheduler:
+            job.cost = 0.0 if job.plan['skip_execution'] else self.scheduler.cost_model.predict(job.processed, options, job.code)
+            job.lane = self.scheduler.route(job.cost)
+            job.emit('scheduled', lane=job.lane, predicted_seconds=round(job.cost, 1))
+        return 'execute'
+    
+    async def _execute(self, job: PipelineJob) -> Optional[str]:
+        """Run the combined program in Blender"""
+        mode = job.options.get('mode') or Config.DEFAULT_MODE
+        job.emit('executing', mode=mode)
+        
+        def on_event(event: Dict[str, any]):
+            # Checkpoint the .blend as soon as Blender reports it, so a crash
+            # during the render that follows can resume from it
+            if event['type'] == 'artifact' and event['kind'] == 'saved':
+                self._journal_checkpoint(job, 'blend', path=event['path'])
+            job.emit('blender', event=event)
+            
+        job.results = await self.blender_executor.run_prepared_async(job.plan, mode=mode, on_event=on_event)
+        return 'post_process'
+    
+    async def _post_process(self, job: PipelineJob) -> Optional[str]:
+        """Keep failed code for debugging, archive successes and resolve the job"""
+        results = job.results
+        results['code'] = job.code
+        results['validation'] = {'errors': job.errors, 'warnings': job.warnings}
+        results['compat_rewrites'] = job.rewrites
+        
+        if not results['success'] and Config.SAVE_FAILED_CODE:
+            results['failed_code_path'] = self.blender_executor.persist_script(job.code, "failed", job.job_id)
+            
+        store = self.blender_executor.artifact_store
+        if store:
+            try:
+                store.put_bytes(job.prompt, 'prompt', job.job_id)
+            except Exception as e:
+                logger.warning(f"Failed to store prompt of job {job.job_id}: {e}")
+                
+        if results['success'] and Config.ARCHIVE_GENERATIONS:
+            self._archive_generation(job.code, job.job_id)
+            
+        if self.scheduler and job.lane:
+            results['lane'] = job.lane
+            results['predicted_seconds'] = round(job.cost, 1)
+            self.scheduler.record(job)
+            if job.code and not job.plan['skip_execution']:
+                await asyncio.to_thread(self.scheduler.cost_model.record_script, job.processed, job.options, job.code)
+            
+        job.finish(results)
+        return None
+    
+    def _archive_generation(self, code: str, job_id: str):
+        """Archive a successful generation"""
+        try:
+            archive_path = Config.ARCHIVE_DIR / f"generated_{job_id}.py"
+            store = self.blender_executor.artifact_store
+            if store:
+                # A link to the stored object rather than another copy
+                store.put_bytes(code, 'generated', job_id, link_to=archive_path)
+            else:
+                archive_path.write_text(code, encoding='utf-8')
+            logger.debug(f"Archived generation to {archive_path}")
+        except Exception as e:
+            logger.warning(f"Failed to archive generation: {e}")
\ No newline at end of file
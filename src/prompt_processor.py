@@ -3,6 +3,7 @@ import re
 from typing import Tuple, Dict, List, Optional
 
 from config import Config
+from asset_library import AssetLibrary
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +53,9 @@ class PromptProcessor:
     
     def __init__(self):
         """Initialize Prompt Processor"""
+        self.asset_library = AssetLibrary() if Config.ASSET_LIBRARY_ENABLED else None
+        if self.asset_library is not None and self.asset_library.available:
+            logger.info(f"Asset library: {len(self.asset_library.assets)} assets")
         logger.info("Initialized Prompt Processor")
     
     def process(self, prompt: str) -> Dict[str, any]:
@@ -315,6 +319,10 @@ class PromptProcessor:
         if measurements:
             enhanced += " (Note: measurements converted to Blender units)"
         
+        # Point at prebuilt library assets instead of rebuilding them
+        if self.asset_library is not None and self.asset_library.available:
+            enhanced += self.asset_library.guidance(prompt)
+            
         return enhanced
     
     def _get_prompt_type(self, category: str) -> str:
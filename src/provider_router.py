@@ -0,0 +1,496 @@
+import math
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, Dict, List, Callable
+
+import requests
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """A provider call failed; retryable errors are worth trying again"""
+    
+    def __init__(
+        self,
+        provider: str,
+        message: str,
+        status: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class Completion:
+    """Text generated by a provider, with why and after how much output it stopped"""
+    
+    def __init__(self, text: str, truncated: Optional[bool] = None, output_tokens: Optional[int] = None):
+        """
+        Initialize Completion
+        
+        Args:
+            text (str): Generated text
+            truncated (bool, optional): The provider stopped at the max_tokens limit, None if it didn't say
+            output_tokens (int, optional): Tokens generated, estimated from the text if not reported
+        """
+        self.text = text or ''
+        self.truncated = truncated
+        self.output_tokens = output_tokens if output_tokens is not None else len(self.text) // 4
+
+
+def classify_error(provider: str, error: Exception) -> ProviderError:
+    """
+    Turn an SDK or HTTP exception into a ProviderError
+    
+    Works on the shape of the exception (status_code / response
+    attributes) so it covers the anthropic and openai SDKs and requests
+    without importing them.
+    
+    Args:
+        provider (str): Provider name
+        error (Exception): Original exception
+        
+    Returns:
+        ProviderError: Classified error
+    """
+    if isinstance(error, ProviderError):
+        return error
+        
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    
+    retry_after = None
+    headers = getattr(response, 'headers', None)
+    if headers:
+        try:
+            retry_after = float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            retry_after = None
+            
+    if status is not None:
+        # 408 timeout, 409 conflict/lock, 429 rate limit, 529 Anthropic overloaded, 5xx server errors
+        retryable = status in (408, 409, 429) or status >= 500
+        return ProviderError(provider, str(error), status=status, retryable=retryable, retry_after=retry_after)
+        
+    name = type(error).__name__
+    transient = isinstance(error, (requests.ConnectionError, requests.Timeout, TimeoutError, ConnectionError))
+    if transient or 'Timeout' in name or 'Connection' in name:
+        return ProviderError(provider, str(error), retryable=True)
+        
+    return ProviderError(provider, str(error))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate"""
+    
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize Token Bucket
+        
+        Args:
+            per_minute (float): Refill rate, 0 means unlimited
+            capacity (float, optional): Burst size, defaults to one minute's worth
+        """
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens would be available"""
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            self._refill()
+            amount = min(amount, self.capacity)
+            missing = amount - self.tokens
+            return 0.0 if missing <= 0 else missing * 60.0 / self.per_minute
+    
+    def acquire(self, amount: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting for the bucket to refill if necessary
+        
+        Args:
+            amount (float): Tokens to take (clamped to the capacity)
+            timeout (float, optional): Give up after this many seconds
+            
+        Returns:
+            bool: True if the tokens were taken
+        """
+        if self.unlimited:
+            return True
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                delay = (amount - self.tokens) * 60.0 / self.per_minute
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+    
+    def refund(self, amount: float):
+        """Return tokens that were reserved but not used"""
+        if self.unlimited or amount <= 0:
+            return
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class LatencyHistogram:
+    """Log-scale latency histogram with percentile estimates"""
+    
+    # Bucket upper bounds from 100 ms to ~30 min, 8 per doubling
+    BOUNDS = [0.1 * 2 ** (index / 8) for index in range(116)]
+    
+    def __init__(self):
+        """Initialize Latency Histogram"""
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        """Add one observation"""
+        if seconds <= self.BOUNDS[0]:
+            index = 0
+        else:
+            index = min(len(self.BOUNDS), int(math.ceil(8 * math.log2(seconds / 0.1))))
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-th quantile
+        
+        Args:
+            q (float): Quantile between 0 and 1
+            
+        Returns:
+            float or None: Seconds, None without observations
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            target = q * self.count
+            running = 0
+            for index, bucket in enumerate(self.counts):
+                running += bucket
+                if running >= target:
+                    return self.BOUNDS[min(index, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+    
+    def summary(self) -> Dict[str, any]:
+        """Count, mean, p50 and p95"""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+        }
+
+
+class CircuitBreaker:
+    """Stops sending traffic to a provider after repeated failures"""
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize Circuit Breaker
+        
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds before a trial request is let through
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'"""
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+    
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now
+        
+        In the half-open state only one trial request is allowed at a time.
+        """
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'open':
+            return False
+        with self._lock:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                # A failed trial re-opens the circuit for another full timeout
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Let the next trial through if this one ended without an outcome"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class ProviderState:
+    """Rate limits, breaker and latency statistics for one provider"""
+    
+    def __init__(self, name: str, call: Callable[..., Completion], requests_per_minute: float, tokens_per_minute: float):
+        self.name = name
+        self.call = call
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.breaker = CircuitBreaker(Config.ROUTER_BREAKER_FAILURES, Config.ROUTER_BREAKER_RESET_SECONDS)
+        self.latency = LatencyHistogram()
+        self.successes = 0
+        self.failures = 0
+        self.hedges_won = 0
+
+
+class ProviderRouter:
+    """
+    Routes generation requests across providers
+    
+    Each attempt waits for request and token budget, retries 429/5xx and
+    transport errors with jittered exponential backoff, and counts
+    failures against the provider's circuit breaker. If the first
+    provider hasn't answered by its p95 latency, the same request is sent
+    to the next provider and the first answer wins. Providers whose
+    breaker is open are skipped.
+    """
+    
+    def __init__(self, strategy: Optional[str] = None):
+        """
+        Initialize Provider Router
+        
+        Args:
+            strategy (str, optional): 'priority' keeps the configured order,
+                'latency' prefers the provider with the lowest median latency
+        """
+        self.strategy = strategy or Config.ROUTER_STRATEGY
+        self.providers = {}
+        self.order = []
+        self._pool = ThreadPoolExecutor(max_workers=Config.ROUTER_MAX_WORKERS, thread_name_prefix="provider")
+    
+    def add_provider(self, name: str, call: Callable[..., Completion], requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        """
+        Register a provider
+        
+        Args:
+            name (str): Provider name
+            call (callable): fn(user_prompt, system_prompt, temperature, max_tokens, partial) -> Completion
+            requests_per_minute (float): Request rate limit, 0 for none
+            tokens_per_minute (float): Token rate limit, 0 for none
+        """
+        self.providers[name] = ProviderState(name, call, requests_per_minute, tokens_per_minute)
+        self.order.append(name)
+    
+    def candidates(self) -> List[ProviderState]:
+        """Providers in the order they should be tried"""
+        states = [self.providers[name] for name in self.order]
+        if self.strategy == 'latency':
+            min_samples = Config.ROUTER_HEDGE_MIN_SAMPLES
+            
+            def expected_latency(state: ProviderState) -> float:
+                p50 = state.latency.percentile(0.5)
+                return p50 if p50 is not None and state.latency.count >= min_samples else math.inf
+                
+            # Stable sort keeps configured order among providers without enough history
+            states.sort(key=expected_latency)
+        # Providers with an open circuit go last; they're only tried if nothing else is left
+        states.sort(key=lambda state: state.breaker.state == 'open')
+        return states
+    
+    def hedge_delay(self, state: ProviderState) -> Optional[float]:
+        """Seconds to wait on a provider before hedging, None to never hedge"""
+        if not Config.ROUTER_HEDGE:
+            return None
+        if state.latency.count >= Config.ROUTER_HEDGE_MIN_SAMPLES:
+            return state.latency.percentile(0.95)
+        return Config.ROUTER_HEDGE_DEFAULT_SECONDS or None
+    
+    def generate(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        partial: str = ''
+    ) -> Completion:
+        """
+        Generate text through the best available provider
+        
+        Args:
+            user_prompt (str): User message
+            system_prompt (str): System prompt
+            temperature (float): Sampling temperature
+            max_tokens (int): Output token limit
+            partial (str): Earlier output that was cut off; the provider continues it
+            
+        Returns:
+            Completion: Generated text
+            
+        Raises:
+            ProviderError: If every provider failed
+        """
+        estimated_tokens = (len(system_prompt) + len(user_prompt) + len(partial)) / 4 + max_tokens
+        args = (user_prompt, system_prompt, temperature, max_tokens, partial)
+        
+        remaining = self.candidates()
+        pending = {}
+        errors = []
+        
+        def launch() -> bool:
+            while remaining:
+                state = remaining.pop(0)
+                if not state.breaker.allow():
+                    logger.info(f"Skipping {state.name}: circuit open")
+                    errors.append(ProviderError(state.name, "circuit open"))
+                    continue
+                future = self._pool.submit(self._attempt, state, args, estimated_tokens)
+                pending[future] = (state, time.monotonic())
+                return True
+            return False
+            
+        if not launch():
+            raise ProviderError("router", "No provider available: " + "; ".join(str(e) for e in errors))
+        first = next(iter(pending.values()))[0]
+        
+        while pending:
+            # Hedge once the newest request has run past its provider's p95
+            newest_state, newest_started = max(pending.values(), key=lambda item: item[1])
+            delay = self.hedge_delay(newest_state) if remaining else None
+            timeout = None if delay is None else max(0.0, newest_started + delay - time.monotonic())
+            
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(f"{newest_state.name} slower than {delay:.1f}s, hedging to next provider")
+                launch()
+                continue
+                
+            for future in done:
+                state, _ = pending.pop(future)
+                try:
+                    result = future.result()
+                except ProviderError as e:
+                    errors.append(e)
+                    continue
+                if state is not first:
+                    state.hedges_won += 1
+                # Slower duplicates finish in the background and still feed the statistics
+                return result
+                
+            # Everything in flight failed: fail over to the next provider
+            if not pending:
+                launch()
+                
+        raise ProviderError("router", "All providers failed: " + "; ".join(str(e) for e in errors))
+    
+    def _attempt(self, state: ProviderState, args: tuple, estimated_tokens: float) -> Completion:
+        """Call one provider with rate limiting and retries"""
+        max_retries = Config.ROUTER_MAX_RETRIES
+        
+        try:
+            for retry in range(max_retries + 1):
+                state.requests.acquire(1)
+                state.tokens.acquire(estimated_tokens)
+                started = time.monotonic()
+                
+                try:
+                    result = state.call(*args)
+                except Exception as e:
+                    error = classify_error(state.name, e)
+                    state.failures += 1
+                    if error.retryable or error.status is None:
+                        state.breaker.record_failure()
+                    else:
+                        # The provider answered, it just refused this request (e.g. 400)
+                        state.breaker.record_success()
+                        
+                    if not error.retryable or retry == max_retries or state.breaker.state == 'open':
+                        logger.warning(f"{state.name} failed: {error}")
+                        raise error
+                        
+                    # Full jitter: uniform in [0, base * 2^retry], capped
+                    backoff = random.uniform(0, min(Config.ROUTER_BACKOFF_MAX, Config.ROUTER_BACKOFF_BASE * 2 ** retry))
+                    delay = max(backoff, error.retry_after or 0)
+                    logger.info(f"{state.name} returned {error.status or 'transport error'}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                    
+                elapsed = time.monotonic() - started
+                state.latency.record(elapsed)
+                state.breaker.record_success()
+                state.successes += 1
+                # Give back the part of the output reservation that wasn't used
+                state.tokens.refund(estimated_tokens - (len(args[0]) + len(args[1]) + len(args[4])) / 4 - result.output_tokens)
+                return result
+        finally:
+            # A half-open trial must never stay claimed, whatever ended the attempt
+            state.breaker.release()
+            
+        raise ProviderError(state.name, "retries exhausted")
+    
+    def stats(self) -> Dict[str, Dict[str, any]]:
+        """Per-provider latency, outcome counts and breaker state"""
+        return {
+            name: dict(
+                state.latency.summary(),
+                successes=state.successes,
+                failures=state.failures,
+                hedges_won=state.hedges_won,
+                breaker=state.breaker.state
+            )
+            for name, state in self.providers.items()
+        }
\ No newline at end of file
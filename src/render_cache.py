@@ -0,0 +1,401 @@
+import re
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Dict
+
+from config import Config
+from asset_library import AssetLibrary
+
+logger = logging.getLogger(__name__)
+
+
+# Runs inside Blender: hashes what will actually be rendered (evaluated
+# geometry and shading, transforms, visibility, materials and every node
+# property, lights, camera, world, render and color management settings)
+# so that different scripts building the same scene share a key. Settings
+# are read generically from bl_rna, so properties the hash doesn't name
+# still count; only names, UI state and output paths are left out. If
+# anything can't be read the hash is None and the scene renders uncached.
+SCENE_HASH_CODE = '''
+def _blender_ai_scene_hash():
+    import array
+    import hashlib
+    
+    # Identity, bookkeeping and editor-only state that doesn't change the image
+    skipped = {
+        'rna_type', 'name', 'name_full', 'id_data', 'bl_idname', 'bl_label', 'bl_description', 'bl_icon',
+        'bl_static_type', 'bl_width_default', 'bl_width_min', 'bl_width_max', 'bl_height_default',
+        'bl_height_min', 'bl_height_max', 'users', 'session_uid', 'tag', 'is_evaluated', 'original',
+        'preview', 'use_fake_user', 'use_extra_user', 'is_runtime_data', 'is_missing', 'asset_data',
+        'library_weak_reference', 'override_library', 'animation_data', 'filepath', 'filepath_raw',
+        'inputs', 'outputs', 'internal_links', 'nodes', 'links', 'interface', 'parent', 'location',
+        'location_absolute', 'width', 'height', 'dimensions', 'select', 'label', 'show_options', 'show_preview',
+        'show_texture', 'hide', 'pixels', 'packed_file', 'packed_files',
+    }
+    seen = {}
+    
+    def plain(value):
+        if isinstance(value, float):
+            return round(value, 5) + 0.0
+        if isinstance(value, (set, frozenset)):
+            return tuple(sorted(value))
+        if isinstance(value, (bool, int, str)) or value is None:
+            return value
+        try:
+            return tuple(plain(item) for item in value)
+        except TypeError:
+            return repr(value)
+    
+    def rna_digest(struct, depth):
+        if struct is None:
+            return None
+        values = []
+        for prop in struct.bl_rna.properties:
+            identifier = prop.identifier
+            if identifier in skipped:
+                continue
+            try:
+                value = getattr(struct, identifier)
+            except (AttributeError, RuntimeError, TypeError):
+                continue
+            if prop.type in {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}:
+                values.append((identifier, plain(value)))
+            elif prop.type == 'POINTER':
+                if isinstance(value, bpy.types.ID):
+                    values.append((identifier, id_digest(value)))
+                elif depth > 0:
+                    values.append((identifier, rna_digest(value, depth - 1)))
+            elif prop.type == 'COLLECTION' and depth > 0:
+                values.append((identifier, [rna_digest(item, depth - 1) for item in value]))
+        return repr(values)
+    
+    def image_digest(image):
+        digest = hashlib.sha256(rna_digest(image, 2).encode())
+        if image.packed_file is not None:
+            digest.update(bytes(image.packed_file.data))
+        elif image.source in {'FILE', 'SEQUENCE', 'TILED'}:
+            path = bpy.path.abspath(image.filepath, library=image.library)
+            try:
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+            except OSError:
+                digest.update(repr(('missing', path)).encode())
+        if image.is_dirty or image.source == 'GENERATED':
+            # Painted or filled in by the script
+            pixels = array.array('f', [0.0]) * len(image.pixels)
+            image.pixels.foreach_get(pixels)
+            digest.update(pixels.tobytes())
+        return digest.hexdigest()
+    
+    def id_digest(value):
+        key = (type(value).__name__, value.name_full)
+        if key in seen:
+            return seen[key]
+        seen[key] = key
+        if isinstance(value, bpy.types.Image):
+            result = image_digest(value)
+        elif isinstance(value, bpy.types.NodeTree):
+            result = node_tree_digest(value)
+        elif isinstance(value, bpy.types.Object):
+            # Referenced by a node or constraint, e.g. texture coordinates from an empty
+            result = plain(value.matrix_world)
+        else:
+            result = (key[0], rna_digest(value, 1))
+        seen[key] = result
+        return result
+    
+    def node_tree_digest(tree):
+        if tree is None:
+            return None
+        nodes = []
+        for node in tree.nodes:
+            inputs = []
+            for socket in node.inputs:
+                value = getattr(socket, 'default_value', None)
+                if isinstance(value, bpy.types.ID):
+                    value = id_digest(value)
+                inputs.append((socket.identifier, repr(plain(value)), socket.is_linked, socket.enabled))
+            # Non-socket settings: Math operation, Mix blend_type, ColorRamp
+            # elements, Image Texture image, curve points, group node tree...
+            nodes.append((node.bl_idname, node.mute, rna_digest(node, 4), repr(inputs)))
+        links = sorted(
+            (link.from_node.bl_idname, link.from_socket.identifier, link.to_node.bl_idname, link.to_socket.identifier, link.is_muted)
+            for link in tree.links
+        )
+        return repr((sorted(nodes), links))
+    
+    def mesh_digest(digest, mesh):
+        coords = array.array('f', [0.0]) * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get('co', coords)
+        loops = array.array('i', [0]) * len(mesh.loops)
+        mesh.loops.foreach_get('vertex_index', loops)
+        digest.update(coords.tobytes())
+        digest.update(loops.tobytes())
+        
+        material_indices = array.array('i', [0]) * len(mesh.polygons)
+        mesh.polygons.foreach_get('material_index', material_indices)
+        smooth = [False] * len(mesh.polygons)
+        mesh.polygons.foreach_get('use_smooth', smooth)
+        digest.update(material_indices.tobytes())
+        digest.update(repr(smooth).encode())
+        
+        # Shading normals, which also carry sharp edges, auto smooth and custom normals
+        normals = array.array('f', [0.0]) * (len(mesh.loops) * 3)
+        if hasattr(mesh, 'corner_normals'):
+            mesh.corner_normals.foreach_get('vector', normals)
+        else:
+            mesh.calc_normals_split()
+            mesh.loops.foreach_get('normal', normals)
+        digest.update(array.array('f', (round(value, 4) for value in normals)).tobytes())
+        
+        for layer in mesh.uv_layers:
+            uvs = array.array('f', [0.0]) * (len(layer.data) * 2)
+            layer.data.foreach_get('uv', uvs)
+            digest.update(repr((layer.name, layer.active_render)).encode())
+            digest.update(uvs.tobytes())
+        for attribute in mesh.color_attributes:
+            colors = array.array('f', [0.0]) * (len(attribute.data) * 4)
+            attribute.data.foreach_get('color', colors)
+            digest.update(repr((attribute.name, attribute.domain)).encode())
+            digest.update(colors.tobytes())
+    
+    def data_digest(obj):
+        digest = hashlib.sha256(obj.type.encode())
+        if obj.type in {'MESH', 'CURVE', 'FONT', 'SURFACE', 'META'}:
+            mesh = obj.to_mesh()
+            if mesh is not None:
+                mesh_digest(digest, mesh)
+            obj.to_mesh_clear()
+        else:
+            # Lights (shadow_soft_size, spot_size, spot_blend...), camera, volume
+            digest.update(rna_digest(obj.data, 2).encode())
+        visibility = tuple(
+            plain(getattr(obj, name, None))
+            for name in (
+                'hide_render', 'visible_camera', 'visible_diffuse', 'visible_glossy', 'visible_transmission',
+                'visible_volume_scatter', 'visible_shadow', 'is_shadow_catcher', 'is_holdout', 'pass_index', 'color'
+            )
+        )
+        digest.update(repr(visibility).encode())
+        for slot in getattr(obj, 'material_slots', []):
+            material = slot.material
+            digest.update(repr((slot.link, id_digest(material) if material is not None else None)).encode())
+        return digest.hexdigest()
+        
+    try:
+        scene = bpy.context.scene
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        instances = []
+        for instance in depsgraph.object_instances:
+            obj = instance.object
+            if obj.type not in {'MESH', 'LIGHT', 'CAMERA', 'CURVE', 'FONT', 'SURFACE', 'META', 'VOLUME'}:
+                continue
+            matrix = tuple(round(value, 5) + 0.0 for row in instance.matrix_world for value in row)
+            instances.append((data_digest(obj), matrix, obj == scene.camera))
+        
+        state = (
+            bpy.app.version,
+            scene.frame_current,
+            rna_digest(scene.render, 2),
+            rna_digest(scene.view_settings, 3),
+            rna_digest(scene.display_settings, 1),
+            rna_digest(scene.sequencer_colorspace_settings, 1),
+            rna_digest(getattr(scene, 'cycles', None), 1),
+            rna_digest(getattr(scene, 'eevee', None), 1),
+            rna_digest(bpy.context.view_layer, 0),
+            id_digest(scene.world) if scene.world is not None else None,
+            sorted(instances),
+        )
+    except Exception as e:
+        print(f"Scene hash unavailable: {e}")
+        return None
+    return hashlib.sha256(repr(state).encode()).hexdigest()
+
+
+def _blender_ai_cached_render(key, keys_dir, render_path):
+    import os
+    import json
+    import shutil
+    if key is None:
+        return False
+    try:
+        with open(os.path.join(keys_dir, 'scene-' + key + '.json')) as f:
+            source = json.load(f)['object']
+        if os.path.exists(render_path):
+            os.remove(render_path)
+        try:
+            os.link(source, render_path)
+        except OSError:
+            shutil.copyfile(source, render_path)
+        return True
+    except (OSError, ValueError, KeyError):
+        return False
+'''
+
+
+class RenderCache:
+    """
+    Render outputs keyed by what determines the image
+    
+    The script key hashes the generated code, the render settings, the
+    Blender version and any referenced asset files, and is checked before
+    Blender starts. The optional scene key is computed inside Blender from
+    the evaluated scene, and is checked right before rendering. Images
+    live in the artifact store; this class only keeps the key index.
+    """
+    
+    # Quoted paths to files a script may load
+    ASSET_PATTERN = re.compile(
+        r'''["']([^"'\n]+\.(?:png|jpe?g|exr|hdr|tiff?|tga|webp|blend|obj|fbx|gltf|glb|stl|ply|abc|usd[acz]?|vdb))["']''',
+        re.IGNORECASE
+    )
+    
+    def __init__(self, store, keys_dir: Optional[Path] = None):
+        """
+        Initialize Render Cache
+        
+        Args:
+            store (ArtifactStore): Store holding the cached images
+            keys_dir (Path, optional): Directory of key index files
+        """
+        self.store = store
+        self.keys_dir = keys_dir or store.root / "render_cache"
+        self.keys_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+    
+    def asset_hashes(self, code: str) -> Dict[str, Optional[str]]:
+        """
+        Hash the asset files a script refers to
+        
+        Args:
+            code (str): Generated code
+            
+        Returns:
+            dict: Referenced path -> SHA-256, None for files that don't exist
+        """
+        assets = {}
+        for match in self.ASSET_PATTERN.finditer(code):
+            reference = match.group(1)
+            path = Path(reference)
+            if not path.is_absolute():
+                path = Config.BASE_DIR / path
+            try:
+                digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+                assets[reference] = digest.hexdigest()
+            except OSError:
+                assets[reference] = None
+        return assets
+    
+    def script_key(self, code: str, settings_code: str, blender_version: str) -> str:
+        """
+        Cache key of a render before anything runs
+        
+        Args:
+            code (str): Generated scene-building code
+            settings_code (str): Render settings snippet (without job-specific paths)
+            blender_version (str): Blender version string
+            
+        Returns:
+            str: Hex key
+        """
+        material = {
+            'code': code,
+            'settings': settings_code,
+            'engine': Config.RENDER_ENGINE,
+            'resolution': [Config.RENDER_WIDTH, Config.RENDER_HEIGHT],
+            'samples': Config.RENDER_SAMPLES,
+            'blender': blender_version,
+            'assets': self.asset_hashes(code),
+        }
+        if AssetLibrary.uses_library(code):
+            # Linked assets change with the library, not the script
+            material['library'] = AssetLibrary().sha256
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def lookup(self, kind: str, key: str) -> Optional[str]:
+        """
+        Find a cached render
+        
+        Args:
+            kind (str): 'script' or 'scene'
+            key (str): Cache key
+            
+        Returns:
+            str or None: SHA-256 of the stored image
+        """
+        try:
+            with open(self._key_path(kind, key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if not Path(entry['object']).exists():
+            # Garbage collected since; forget the key
+            self._key_path(kind, key).unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['sha256']
+    
+    def record(self, kind: str, key: str, sha256: str):
+        """
+        Remember which stored image a key produced
+        
+        Args:
+            kind (str): 'script' or 'scene'
+            key (str): Cache key
+            sha256 (str): Stored image hash
+        """
+        entry = {'sha256': sha256, 'object': str(self.store.object_path(sha256)), 'created_at': time.time()}
+        path = self._key_path(kind, key)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(entry), encoding='utf-8')
+        tmp_path.replace(path)
+    
+    def restore(self, sha256: str, render_path: Path, job_id: str) -> bool:
+        """
+        Put a cached image at a job's render path
+        
+        Args:
+            sha256 (str): Stored image hash
+            render_path (Path): Job's render output path
+            job_id (str): Job id
+            
+        Returns:
+            bool: False if the image has been garbage collected
+        """
+        return self.store.link_existing(sha256, 'render', job_id, render_path)
+    
+    def build_render_code(self, render_path: Path) -> str:
+        """
+        Render snippet that hashes the evaluated scene and reuses a cached image
+        
+        Args:
+            render_path (Path): Job's render output path
+            
+        Returns:
+            str: Python source run inside Blender in place of the plain render call
+        """
+        return f"""
+# Render (scene-hash cache)
+{SCENE_HASH_CODE}
+_scene_key = _blender_ai_scene_hash()
+if _scene_key:
+    print(f"Scene hash: {{_scene_key}}")
+if _blender_ai_cached_render(_scene_key, r"{self.keys_dir}", r"{render_path}"):
+    print("Render cache hit: scene")
+else:
+    bpy.ops.render.render(write_still=True)
+print(r"Rendered to: {render_path}")
+"""
+
+    def _key_path(self, kind: str, key: str) -> Path:
+        return self.keys_dir / f"{kind}-{key}.json"
\ No newline at end of file
@@ -0,0 +1,315 @@
+import os
+import sys
+import signal
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, List, Callable
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class ResourceLimits:
+    """Memory/CPU limits and process-group control for one Blender job"""
+    
+    def __init__(
+        self,
+        memory_mb: Optional[int] = None,
+        cpu_seconds: Optional[int] = None,
+        cgroup_root: Optional[str] = None,
+        cpus: Optional[List[int]] = None
+    ):
+        """
+        Initialize Resource Limits
+        
+        Args:
+            memory_mb (int, optional): Address-space / cgroup memory cap, 0 disables
+            cpu_seconds (int, optional): CPU time cap, 0 disables
+            cgroup_root (str, optional): Delegated cgroup v2 directory to create job groups in
+            cpus (list, optional): Logical CPUs to pin the process to, where supported
+        """
+        self.memory_mb = memory_mb if memory_mb is not None else Config.BLENDER_MEMORY_LIMIT_MB
+        self.cpu_seconds = cpu_seconds if cpu_seconds is not None else Config.BLENDER_CPU_LIMIT_SECONDS
+        cgroup_root = cgroup_root if cgroup_root is not None else Config.BLENDER_CGROUP_ROOT
+        self.cgroup_root = Path(cgroup_root) if cgroup_root else None
+        self.cgroup_path = None
+        self.cpus = cpus
+    
+    @property
+    def posix(self) -> bool:
+        """Whether process groups and rlimits are available"""
+        return os.name == 'posix'
+    
+    def cgroup_available(self) -> bool:
+        """
+        Check that a writable cgroup v2 hierarchy was configured
+        
+        Returns:
+            bool: True if job cgroups can be created
+        """
+        if not self.cgroup_root or not sys.platform.startswith('linux'):
+            return False
+        return (self.cgroup_root / "cgroup.procs").exists() and os.access(self.cgroup_root, os.W_OK)
+    
+    def prepare(self, job_id: str):
+        """
+        Create the job cgroup, if cgroups are in use
+        
+        Args:
+            job_id (str): Job identifier used as the cgroup name
+        """
+        if not self.cgroup_available():
+            return
+            
+        try:
+            path = self.cgroup_root / f"job_{job_id}"
+            path.mkdir(exist_ok=True)
+            if self.memory_mb:
+                (path / "memory.max").write_text(str(self.memory_mb * 1024 * 1024))
+                # Fail hard instead of swapping the render box to death
+                swap_max = path / "memory.swap.max"
+                if swap_max.exists():
+                    swap_max.write_text("0")
+            self.cgroup_path = path
+            logger.debug(f"Created cgroup {path}")
+        except OSError as e:
+            logger.warning(f"Could not create cgroup, falling back to rlimits: {e}")
+            self.cgroup_path = None
+    
+    def subprocess_kwargs(self) -> Dict[str, any]:
+        """
+        Keyword arguments for starting Blender under these limits
+        
+        preexec_fn is only passed when a cgroup or rlimit has to be applied
+        before exec: it isn't safe with other threads running and rules out
+        the faster posix_spawn path. CPU pinning happens in attach().
+        
+        Returns:
+            dict: Extra arguments for asyncio.create_subprocess_exec
+        """
+        if not self.posix:
+            return {}
+        kwargs = {'start_new_session': True}
+        if self.cgroup_path or (resource is not None and (self.memory_mb or self.cpu_seconds)):
+            kwargs['preexec_fn'] = self._preexec()
+        return kwargs
+    
+    def attach(self, pid: int):
+        """
+        Pin a freshly started process to its CPUs
+        
+        Args:
+            pid (int): Blender's process id
+        """
+        if not self.cpus or not hasattr(os, 'sched_setaffinity'):
+            return
+        try:
+            os.sched_setaffinity(pid, set(self.cpus))
+        except OSError as e:
+            logger.debug(f"Could not pin process {pid} to CPUs {self.cpus}: {e}")
+    
+    def _preexec(self) -> Callable[[], None]:
+        """Build the function run in the child between fork and exec"""
+        memory_bytes = self.memory_mb * 1024 * 1024 if self.memory_mb else 0
+        cpu_seconds = self.cpu_seconds
+        cgroup_procs = str(self.cgroup_path / "cgroup.procs") if self.cgroup_path else None
+        
+        def apply_limits():
+            if cgroup_procs:
+                with open(cgroup_procs, 'w') as f:
+                    f.write(str(os.getpid()))
+            elif memory_bytes and resource is not None:
+                resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+            if cpu_seconds and resource is not None:
+                # Soft limit sends SIGXCPU, the hard limit a second later SIGKILL
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+                
+        return apply_limits
+    
+    def kill_group(self, process):
+        """
+        Kill Blender together with any processes it spawned
+        
+        Args:
+            process: asyncio or subprocess process object
+        """
+        try:
+            if self.posix:
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+    
+    def oom_killed(self) -> bool:
+        """
+        Check whether the kernel OOM-killed anything in the job cgroup
+        
+        Returns:
+            bool: True if memory.events reports an oom_kill
+        """
+        if not self.cgroup_path:
+            return False
+        try:
+            for line in (self.cgroup_path / "memory.events").read_text().splitlines():
+                key, value = line.split()
+                if key == "oom_kill" and int(value) > 0:
+                    return True
+        except (OSError, ValueError):
+            pass
+        return False
+    
+    def cgroup_peak_mb(self) -> Optional[float]:
+        """Peak memory of the job cgroup in MB, if the kernel reports it"""
+        if not self.cgroup_path:
+            return None
+        try:
+            return int((self.cgroup_path / "memory.peak").read_text()) / (1024 * 1024)
+        except (OSError, ValueError):
+            return None
+    
+    def cleanup(self):
+        """Remove the job cgroup once all its processes have exited"""
+        if not self.cgroup_path:
+            return
+        try:
+            self.cgroup_path.rmdir()
+        except OSError as e:
+            logger.debug(f"Could not remove cgroup {self.cgroup_path}: {e}")
+        self.cgroup_path = None
+    
+    def classify_exit(
+        self,
+        returncode: Optional[int],
+        peak_rss_mb: Optional[float],
+        output: str,
+        killed: bool = False
+    ) -> Optional[str]:
+        """
+        Work out whether a failed run was stopped by a resource limit
+        
+        Args:
+            returncode (int): Process return code
+            peak_rss_mb (float): Peak resident memory observed
+            output (str): Retained stderr text
+            killed (bool): Whether the executor itself killed the process
+            
+        Returns:
+            str or None: 'memory', 'cpu' or None
+        """
+        if returncode in (None, 0):
+            return None
+        if self.posix and returncode == -signal.SIGXCPU:
+            return 'cpu'
+        if self.oom_killed():
+            return 'memory'
+        if self.memory_mb:
+            if 'MemoryError' in output or 'Memory allocation failed' in output or 'malloc' in output.lower():
+                return 'memory'
+            if peak_rss_mb and peak_rss_mb >= self.memory_mb * 0.95:
+                return 'memory'
+        # RLIMIT_CPU escalates to SIGKILL at the hard limit
+        if self.cpu_seconds and self.posix and returncode == -signal.SIGKILL and not killed:
+            return 'cpu'
+        return None
+
+
+class PeakRSSMonitor:
+    """Samples the resident memory of a Blender process group"""
+    
+    def __init__(
+        self,
+        pid: int,
+        interval: float = 0.5,
+        limit_mb: int = 0,
+        on_limit: Optional[Callable[[], None]] = None,
+        cgroup_path: Optional[Path] = None
+    ):
+        """
+        Initialize Peak RSS Monitor
+        
+        Args:
+            pid (int): Process (and process group) id
+            interval (float): Seconds between samples
+            limit_mb (int): Kill threshold, 0 disables the watchdog
+            on_limit (callable, optional): Called once when the threshold is crossed
+            cgroup_path (Path, optional): Job cgroup whose memory.current is read instead of /proc
+        """
+        self.pid = pid
+        self.interval = interval
+        self.limit_mb = limit_mb
+        self.on_limit = on_limit
+        self.cgroup_path = cgroup_path
+        self.peak_mb = 0.0
+        self.limit_hit = False
+    
+    def sample(self) -> float:
+        """
+        Current memory of the job, in MB
+        
+        Reads the job cgroup's memory.current when there is one; otherwise
+        sums VmRSS over /proc for the processes in the group, which walks
+        every process on the machine and so runs off the event loop.
+        
+        Returns:
+            float: Resident memory, 0 if neither source is available
+        """
+        if self.cgroup_path:
+            try:
+                return int((self.cgroup_path / "memory.current").read_text()) / (1024 * 1024)
+            except (OSError, ValueError):
+                pass
+                
+        proc = Path("/proc")
+        if not proc.exists():
+            return 0.0
+            
+        total_kb = 0
+        for entry in proc.iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                # Field 5 of /proc/<pid>/stat is the process group id
+                stat = (entry / "stat").read_text()
+                fields = stat[stat.rindex(')') + 2:].split()
+                if int(fields[2]) != self.pid:
+                    continue
+                for line in (entry / "status").read_text().splitlines():
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            except (OSError, ValueError, IndexError):
+                continue
+        return total_kb / 1024
+    
+    async def run(self):
+        """Sample until cancelled, firing on_limit if the cap is exceeded"""
+        while True:
+            current = await asyncio.to_thread(self.sample)
+            self.peak_mb = max(self.peak_mb, current)
+            if self.limit_mb and current > self.limit_mb and not self.limit_hit:
+                self.limit_hit = True
+                logger.error(f"Blender exceeded memory limit: {current:.0f} MB > {self.limit_mb} MB")
+                if self.on_limit:
+                    self.on_limit()
+            await asyncio.sleep(self.interval)
+    
+    def finalize(self) -> Optional[float]:
+        """
+        Peak memory sampled for this job
+        
+        RUSAGE_CHILDREN isn't a fallback: it covers every child this
+        process ever reaped, so with concurrent workers it would report
+        another job's peak.
+        
+        Returns:
+            float or None: Peak resident memory in MB, None if nothing was sampled
+        """
+        return self.peak_mb or None
\ No newline at end of file
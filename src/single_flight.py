@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# Stages whose work is worth sharing between identical jobs
+COALESCED_STAGES = ('generate', 'validate', 'execute')
+
+
+class Flight:
+    """One job's pass through a stage that identical jobs can subscribe to"""
+    
+    def __init__(self, stage: str, key: str, leader):
+        self.stage = stage
+        self.key = key
+        self.leader = leader
+        self.followers = 0
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class SingleFlight:
+    """
+    In-flight coalescing of identical stage work
+    
+    The first job to enter a stage with a given key leads the flight and
+    does the work; jobs entering the same stage with the same key while
+    it is queued or running follow it and receive its outcome instead of
+    repeating the LLM call or Blender run. Outcomes fan out whether they
+    succeed or fail; if the leader is cancelled the flight is abandoned
+    and its followers go through the stage themselves.
+    """
+    
+    def __init__(self):
+        """Initialize Single Flight"""
+        self._flights = {}
+        self.counts = {stage: {'led': 0, 'coalesced': 0, 'failed': 0, 'abandoned': 0} for stage in COALESCED_STAGES}
+    
+    def join(self, stage: str, key: Optional[str], job) -> Optional[Flight]:
+        """
+        Lead a new flight, or find the one to follow
+        
+        Args:
+            stage (str): Stage the job is entering
+            key (str, optional): Hash of the stage input, None to never coalesce
+            job (PipelineJob): Job entering the stage
+            
+        Returns:
+            Flight or None: Flight to follow, None if the job leads (or runs alone)
+        """
+        if key is None or stage not in self.counts:
+            return None
+        flight = self._flights.get((stage, key))
+        if flight is None or flight.leader is job:
+            self._flights[(stage, key)] = Flight(stage, key, job)
+            job.flight = (stage, key)
+            self.counts[stage]['led'] += 1
+            return None
+        flight.followers += 1
+        self.counts[stage]['coalesced'] += 1
+        return flight
+    
+    def land(self, job, stage: str, outcome: Dict[str, any]):
+        """
+        Publish the outcome of a flight the job leads through this stage
+        
+        Args:
+            job (PipelineJob): Possible leader
+            stage (str): Stage the job just left
+            outcome (dict): 'next' and 'state' on success, 'error' on failure,
+                or 'abandoned' when the leader was cancelled
+        """
+        if not job.flight or job.flight[0] != stage:
+            return
+        flight = self._flights.pop(job.flight, None)
+        job.flight = None
+        if flight is None or flight.leader is not job:
+            return
+        results = (outcome.get('state') or {}).get('results')
+        if outcome.get('abandoned'):
+            self.counts[stage]['abandoned'] += 1
+        elif outcome.get('error') or (results is not None and not results.get('success')):
+            self.counts[stage]['failed'] += 1
+        if flight.followers:
+            logger.info(f"Fanning out {stage} of job {job.job_id} to {flight.followers} coalesced jobs")
+        flight.future.set_result(outcome)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Coalescing counts per stage
+        
+        Returns:
+            dict: Per stage: flights led, jobs coalesced onto them, flights
+                  that failed and flights abandoned by a cancelled leader,
+                  plus 'in_flight'
+        """
+        stats = {stage: dict(counts) for stage, counts in self.counts.items()}
+        stats['in_flight'] = len(self._flights)
+        return stats
+    
+    @staticmethod
+    def describe(stats: Dict[str, Dict[str, int]]) -> str:
+        """
+        One-line summary of stats(), e.g. 'generate 3, execute 2'
+        
+        Args:
+            stats (dict): Result of stats()
+            
+        Returns:
+            str: Coalesced jobs per stage, empty if none were
+        """
+        return ', '.join(
+            f"{stage} {stats[stage]['coalesced']}" for stage in COALESCED_STAGES if stats[stage]['coalesced']
+        )
\ No newline at end of file
@@ -0,0 +1,231 @@
+import os
+import time
+import shutil
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Callable
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SPLIT_MODES = ('regions', 'samples')
+
+# Runs in each worker on the saved scene: renders one horizontal band
+# (regions) or a share of the samples with its own seed (samples) to a
+# full-frame linear EXR. Outside a band the frame stays zero.
+WORKER_CODE = '''
+import json
+import time
+import bpy
+
+def _blender_ai_split_worker(index, count, mode, threads, tile_path):
+    scene = bpy.context.scene
+    render = scene.render
+    if mode == 'samples' and render.engine != 'CYCLES':
+        mode = 'regions'
+    weight = 1
+    if mode == 'regions':
+        render.use_border = True
+        render.use_crop_to_border = False
+        render.border_min_x = 0.0
+        render.border_max_x = 1.0
+        # Neighbouring bands share the same float edge, so no row is skipped or doubled
+        render.border_min_y = index / count
+        render.border_max_y = (index + 1) / count
+    else:
+        total = scene.cycles.samples
+        weight = max(1, total // count + (1 if index < total % count else 0))
+        scene.cycles.samples = weight
+        scene.cycles.seed = index
+        scene.cycles.use_animated_seed = False
+    if threads:
+        render.threads_mode = 'FIXED'
+        render.threads = threads
+    render.image_settings.file_format = 'OPEN_EXR'
+    render.image_settings.color_mode = 'RGBA'
+    render.image_settings.color_depth = '32'
+    render.filepath = tile_path
+    started = time.perf_counter()
+    bpy.ops.render.render(write_still=True)
+    print("Split render: " + json.dumps({
+        'index': index, 'mode': mode, 'weight': weight, 'path': tile_path,
+        'seconds': round(time.perf_counter() - started, 3),
+    }))
+'''
+
+# Runs once on the saved scene after the workers: combines the tiles with
+# Blender's bundled NumPy (bands by maximum, sample shares by weighted mean)
+# and writes the job's image with the scene's own view transform and
+# output format.
+STITCH_CODE = '''
+import numpy
+import bpy
+
+def _blender_ai_split_stitch(tiles, render_path):
+    scene = bpy.context.scene
+    combined = None
+    total_weight = 0
+    for tile in tiles:
+        image = bpy.data.images.load(tile['path'])
+        pixels = numpy.empty(len(image.pixels), dtype=numpy.float32)
+        image.pixels.foreach_get(pixels)
+        width, height = image.size
+        bpy.data.images.remove(image)
+        if tile['mode'] == 'regions':
+            combined = pixels if combined is None else numpy.maximum(combined, pixels)
+        else:
+            pixels *= tile['weight']
+            combined = pixels if combined is None else combined + pixels
+            total_weight += tile['weight']
+    if total_weight:
+        combined /= total_weight
+    result = bpy.data.images.new("split_render", width, height, alpha=True, float_buffer=True)
+    result.pixels.foreach_set(combined)
+    result.save_render(render_path, scene=scene)
+    print("Rendered to: " + render_path)
+'''
+
+
+class SplitRenderer:
+    """
+    Renders one still with several Blender processes
+    
+    The scene is built and saved once; SPLIT_RENDER_WORKERS processes
+    then open the .blend and each render a horizontal band of the frame
+    (regions) or a share of the Cycles samples with a different seed
+    (samples). A last process stitches the linear EXR tiles into the
+    job's image. The reported speedup compares the summed worker render
+    time to the wall time of the whole split, stitching included.
+    """
+    
+    def __init__(self, executor, workers: Optional[int] = None, mode: Optional[str] = None):
+        """
+        Initialize Split Renderer
+        
+        Args:
+            executor (BlenderExecutor): Runs the worker and stitch processes
+            workers (int, optional): Processes per still, defaults to SPLIT_RENDER_WORKERS
+            mode (str, optional): 'regions' or 'samples', defaults to SPLIT_RENDER_MODE
+        """
+        self.executor = executor
+        self.workers = workers or Config.SPLIT_RENDER_WORKERS
+        self.mode = (mode or Config.SPLIT_RENDER_MODE).lower()
+        if self.mode not in SPLIT_MODES:
+            raise ValueError(f"Unknown split render mode '{self.mode}'; use one of {', '.join(SPLIT_MODES)}")
+    
+    @property
+    def threads(self) -> int:
+        """Render threads per worker so the workers share the cores instead of oversubscribing them"""
+        if Config.SPLIT_RENDER_THREADS:
+            return Config.SPLIT_RENDER_THREADS
+        scheduler = self.executor.cpu_scheduler
+        cpus = scheduler.cpu_count if scheduler else os.cpu_count() or 1
+        return max(1, cpus // self.workers)
+    
+    async def render_async(
+        self,
+        blend_file: Path,
+        render_path: Path,
+        job_id: str,
+        timeout: float,
+        on_event: Optional[Callable[[Dict[str, any]], None]] = None
+    ) -> Dict[str, any]:
+        """
+        Render a saved scene in parallel and stitch the result
+        
+        Args:
+            blend_file (Path): Saved scene with the render already configured
+            render_path (Path): Where to write the final image
+            job_id (str): Job id used in tile and log names
+            timeout (float): Timeout of each worker
+            on_event (callable, optional): Receives worker errors, the
+                stitched artifact and a 'split_render' summary
+                
+        Returns:
+            dict: success and error, plus 'split_render' with workers, mode,
+                  per-worker seconds, wall seconds, speedup and efficiency
+        """
+        tiles_dir = Path(render_path).parent / f"split_{job_id}"
+        tiles_dir.mkdir(parents=True, exist_ok=True)
+        tiles = {}
+        
+        def worker_events(event: Dict[str, any]):
+            if event['type'] == 'split':
+                tiles[event['index']] = event
+            elif on_event and event['type'] != 'progress':
+                on_event(event)
+                
+        started = time.monotonic()
+        try:
+            executions = await asyncio.gather(*(
+                self.executor.execute_code_async(
+                    WORKER_CODE + f"\n_blender_ai_split_worker({index}, {self.workers}, {self.mode!r}, "
+                    f"{self.threads}, r\"{tiles_dir / f'tile_{index}.exr'}\")\n",
+                    mode='background',
+                    timeout=timeout,
+                    label=f"split{index}_{job_id}",
+                    on_event=worker_events,
+                    blend_file=blend_file,
+                    kind='render_chunk',
+                    threads=self.threads
+                )
+                for index in range(self.workers)
+            ))
+            failed = next((execution for execution in executions if not execution['success']), None)
+            if failed is None and len(tiles) < self.workers:
+                failed = {'error': None, 'stderr': 'A worker finished without writing its tile'}
+            if failed is None:
+                ordered = [tiles[index] for index in range(self.workers)]
+                failed = await self.executor.execute_code_async(
+                    STITCH_CODE + f"\n_blender_ai_split_stitch({ordered!r}, r\"{render_path}\")\n",
+                    mode='background',
+                    timeout=timeout,
+                    label=f"stitch_{job_id}",
+                    on_event=on_event,
+                    blend_file=blend_file,
+                    kind='stitch'
+                )
+                if failed['success']:
+                    failed = None
+        finally:
+            shutil.rmtree(tiles_dir, ignore_errors=True)
+            
+        wall = time.monotonic() - started
+        if failed is not None:
+            error = failed.get('error') or {}
+            message = error.get('message') or (failed.get('stderr') or '').strip()[-500:] or 'unknown error'
+            return {'success': False, 'error': f"Split render failed: {message}"}
+            
+        seconds = [tiles[index]['seconds'] for index in range(self.workers)]
+        speedup = sum(seconds) / wall if wall > 0 else None
+        summary = {
+            'workers': self.workers,
+            'mode': tiles[0]['mode'],
+            'threads': self.threads,
+            'worker_seconds': seconds,
+            'wall_seconds': round(wall, 3),
+            'speedup': round(speedup, 2) if speedup else None,
+            'efficiency': round(speedup / self.workers, 2) if speedup else None,
+        }
+        logger.info(f"Split render of job {job_id}: {summary}")
+        if on_event:
+            on_event(dict(summary, type='split_render'))
+        return {'success': True, 'split_render': summary}
+    
+    @staticmethod
+    def describe(summary: Dict[str, any]) -> str:
+        """
+        One-line description of a split render
+        
+        Args:
+            summary (dict): 'split_render' result or event
+            
+        Returns:
+            str: Workers, mode, wall time and speedup
+        """
+        text = f"Split render: {summary['workers']} workers ({summary['mode']}), {summary['wall_seconds']:.1f}s wall"
+        if summary.get('speedup'):
+            text += f", ~{summary['speedup']:.1f}x speedup ({summary['efficiency']:.0%} efficiency)"
+        return text
\ No newline at end of file
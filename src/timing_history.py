@@ -0,0 +1,105 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class TimingHistory:
+    """Persistent record of stage durations grouped by job profile"""
+    
+    def __init__(self, path: Optional[Path] = None, max_samples: Optional[int] = None):
+        """
+        Initialize Timing History
+        
+        Args:
+            path (Path, optional): JSON file the history is stored in
+            max_samples (int, optional): Samples kept per stage and profile
+        """
+        self.path = path or Config.TIMING_HISTORY_FILE
+        self.max_samples = max_samples or Config.TIMING_HISTORY_SAMPLES
+        self._lock = threading.Lock()
+        self._data = self._load()
+    
+    def _load(self) -> Dict[str, Dict[str, List[float]]]:
+        """Load history from disk, starting empty if missing or corrupt"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable timing history {self.path}: {e}")
+            return {}
+    
+    def _save(self):
+        """Write history atomically"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save timing history: {e}")
+    
+    @staticmethod
+    def profile_key(profile: Optional[Dict[str, any]], variant: str = "") -> str:
+        """
+        Key grouping similar jobs
+        
+        Args:
+            profile (dict, optional): Processed prompt info with 'category' and 'complexity'
+            variant (str): Extra discriminator such as the enabled outputs
+            
+        Returns:
+            str: Key like 'scene/simple/render+save'
+        """
+        profile = profile or {}
+        parts = [profile.get('category', 'unknown'), profile.get('complexity', 'unknown')]
+        if variant:
+            parts.append(variant)
+        return '/'.join(parts)
+    
+    def record(self, stage: str, key: str, seconds: float):
+        """
+        Record one stage duration
+        
+        Args:
+            stage (str): Stage name ('generate', 'execute', ...)
+            key (str): Profile key
+            seconds (float): Duration
+        """
+        with self._lock:
+            samples = self._data.setdefault(stage, {}).setdefault(key, [])
+            samples.append(round(seconds, 3))
+            del samples[:-self.max_samples]
+            self._save()
+    
+    def samples(self, stage: str, key: str) -> List[float]:
+        """Return recorded durations for a stage and profile"""
+        with self._lock:
+            return list(self._data.get(stage, {}).get(key, []))
+    
+    def percentile(self, stage: str, key: str, q: float = 0.95, min_samples: int = 5) -> Optional[float]:
+        """
+        Percentile of recorded durations
+        
+        Args:
+            stage (str): Stage name
+            key (str): Profile key
+            q (float): Quantile between 0 and 1
+            min_samples (int): Minimum history required to answer
+            
+        Returns:
+            float or None: Duration in seconds, None without enough history
+        """
+        samples = sorted(self.samples(stage, key))
+        if len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(q * (len(samples) - 1))))
+        return samples[index]
\ No newline at end of file
@@ -0,0 +1,186 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from config import Config
+from timing_history import TimingHistory
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBudget:
+    """
+    Output-token limits predicted per prompt profile, with spend statistics
+    
+    A request's max_tokens is the p95 of the output lengths seen for its
+    category and complexity, plus headroom, instead of one fixed ceiling.
+    Until a profile has enough history the limit comes from its
+    complexity. Output that runs into the limit anyway is continued rather
+    than regenerated, so the cost of guessing low is one extra call.
+    """
+    
+    # Starting limits per complexity, before any history exists
+    DEFAULTS = {
+        'simple': 1500,
+        'medium': 3000,
+    }
+    
+    def __init__(self, path: Optional[Path] = None, max_samples: Optional[int] = None):
+        """
+        Initialize Token Budget
+        
+        Args:
+            path (Path, optional): JSON file the statistics are stored in
+            max_samples (int, optional): Output lengths kept per profile
+        """
+        self.path = path or Config.TOKEN_BUDGET_FILE
+        self.max_samples = max_samples or Config.TIMING_HISTORY_SAMPLES
+        self._lock = threading.Lock()
+        self._data = self._load()
+    
+    def _load(self) -> Dict[str, Dict[str, any]]:
+        """Load statistics from disk, starting empty if missing or corrupt"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token budget {self.path}: {e}")
+            return {}
+    
+    def _save(self):
+        """Write statistics atomically"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save token budget: {e}")
+    
+    @staticmethod
+    def ceiling(provider: Optional[str] = None) -> int:
+        """
+        Hard output-token limit of a provider
+        
+        Args:
+            provider (str, optional): Provider the request goes to
+            
+        Returns:
+            int: LOCAL_LLM_MAX_TOKENS for the local server, MAX_TOKENS otherwise
+        """
+        return Config.LOCAL_LLM_MAX_TOKENS if provider == 'local' else Config.MAX_TOKENS
+    
+    def max_tokens(
+        self,
+        profile: Optional[Dict[str, any]],
+        ceiling: Optional[int] = None,
+        provider: Optional[str] = None
+    ) -> int:
+        """
+        Output-token limit for a prompt
+        
+        Args:
+            profile (dict, optional): Processed prompt info with 'category' and 'complexity'
+            ceiling (int, optional): Hard upper bound, defaults to the provider's ceiling()
+            provider (str, optional): Provider the request goes to
+            
+        Returns:
+            int: max_tokens to request
+        """
+        ceiling = ceiling or self.ceiling(provider)
+        if not Config.TOKEN_BUDGET_ENABLED or not profile:
+            return ceiling
+            
+        with self._lock:
+            samples = sorted(self._data.get(TimingHistory.profile_key(profile), {}).get('samples', []))
+        if len(samples) >= Config.TOKEN_BUDGET_MIN_SAMPLES:
+            index = min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))
+            budget = samples[index] * Config.TOKEN_BUDGET_HEADROOM
+        else:
+            budget = self.DEFAULTS.get(profile.get('complexity'), ceiling)
+        return int(min(ceiling, max(Config.TOKEN_BUDGET_MIN, budget)))
+    
+    @staticmethod
+    def is_truncated(text: str, truncated: Optional[bool] = None) -> bool:
+        """
+        Whether generated output was cut off
+        
+        Args:
+            text (str): Output so far
+            truncated (bool, optional): Stop reason reported by the provider, None if unknown
+            
+        Returns:
+            bool: True if the output needs a continuation
+        """
+        if truncated is not None:
+            return truncated
+        # Without a stop reason, an odd number of fences means a code block
+        # was opened and never closed
+        return text.count("```") % 2 == 1
+    
+    def record(
+        self,
+        profile: Optional[Dict[str, any]],
+        output_tokens: int,
+        budgeted: int,
+        truncated: bool,
+        continuations: int
+    ):
+        """
+        Record one generation
+        
+        Args:
+            profile (dict, optional): Processed prompt info
+            output_tokens (int): Tokens generated, including continuations
+            budgeted (int): max_tokens of the first request
+            truncated (bool): The first request hit its limit
+            continuations (int): Continuation requests made
+        """
+        with self._lock:
+            entry = self._data.setdefault(TimingHistory.profile_key(profile), {
+                'requests': 0,
+                'truncated': 0,
+                'continuations': 0,
+                'output_tokens': 0,
+                'budgeted_tokens': 0,
+                'samples': [],
+            })
+            entry['requests'] += 1
+            entry['truncated'] += int(truncated)
+            entry['continuations'] += continuations
+            entry['output_tokens'] += output_tokens
+            entry['budgeted_tokens'] += budgeted
+            entry['samples'].append(output_tokens)
+            del entry['samples'][:-self.max_samples]
+            self._save()
+    
+    def report(self) -> List[Dict[str, any]]:
+        """
+        Token spend and truncation rate per profile
+        
+        Returns:
+            list: One dict per 'category/complexity' key, most tokens first
+        """
+        with self._lock:
+            data = {key: dict(entry) for key, entry in self._data.items()}
+            
+        rows = []
+        for key, entry in data.items():
+            requests = entry['requests'] or 1
+            rows.append({
+                'profile': key,
+                'requests': entry['requests'],
+                'output_tokens': entry['output_tokens'],
+                'mean_output_tokens': entry['output_tokens'] / requests,
+                'mean_budget': entry['budgeted_tokens'] / requests,
+                'truncation_rate': entry['truncated'] / requests,
+                'continuations': entry['continuations'],
+                'next_budget': self.max_tokens(dict(zip(('category', 'complexity'), key.split('/'))), provider=Config.AI_PROVIDER),
+            })
+        rows.sort(key=lambda row: row['output_tokens'], reverse=True)
+        return rows
\ No newline at end of file
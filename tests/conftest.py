@@ -0,0 +1,77 @@
+"""
+Shared fixtures
+
+Tests run the real components against the stand-ins in tools/: the
+recorded LLM in place of the providers and tools/fake_blender.py in
+place of Blender, each in a scratch directory.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from config import Config
+from recorded_llm import RecordedLLM
+
+FAKE_BLENDER = ROOT / "tools" / "fake_blender.py"
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Point Config at the Blender stand-in and a scratch directory"""
+    output = tmp_path / "output"
+    generated = tmp_path / "generated"
+    settings = {
+        'AI_PROVIDER': 'local',
+        'AI_FALLBACK_PROVIDERS': [],
+        'LOCAL_LLM_WARMUP': False,
+        'BLENDER_PATH': str(FAKE_BLENDER),
+        'DEFAULT_MODE': 'background',
+        'LOG_TO_FILE': False,
+        'ARCHIVE_GENERATIONS': False,
+        'SAVE_FAILED_CODE': False,
+        'GENERATED_DIR': generated,
+        'ARCHIVE_DIR': generated / "archive",
+        'OUTPUT_DIR': output,
+        'RENDERS_DIR': output / "renders",
+        'MODELS_DIR': output / "models",
+        'BLEND_FILES_DIR': output / "blend_files",
+        'LOGS_DIR': tmp_path / "logs",
+        'TIMING_HISTORY_FILE': tmp_path / "logs" / "stage_timings.json",
+        'JOURNAL_FILE': tmp_path / "logs" / "job_journal.sqlite",
+        'TOKEN_BUDGET_FILE': tmp_path / "logs" / "token_budget.json",
+        'SERVICE_QUEUE_FILE': tmp_path / "logs" / "job_queue.sqlite",
+        'ARTIFACT_STORE_DIR': tmp_path / "store",
+        'BAKE_CACHE_DIR': tmp_path / "store" / "bakes",
+    }
+    for key, value in settings.items():
+        monkeypatch.setattr(Config, key, value)
+    monkeypatch.setenv('FAKE_BLENDER_STARTUP', '0')
+    monkeypatch.setenv('FAKE_BLENDER_RENDER_SECONDS', '0')
+    Config.create_directories()
+    return Config
+
+
+@pytest.fixture
+def llm():
+    """Recorded LLM answering instantly"""
+    return RecordedLLM()
+
+
+@pytest.fixture
+def app(config, llm):
+    """BlenderAI wired to the recorded LLM and the Blender stand-in"""
+    from main import BlenderAI
+    
+    app = BlenderAI()
+    llm.install(app.ai_generator)
+    yield app
+    if app.coordinator:
+        app.coordinator.stop()
+    if app.journal:
+        app.journal.close()
\ No newline at end of file
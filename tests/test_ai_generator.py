@@ -1 +1,17 @@
- pass
+def test_clean_code_strips_markdown_fences(app):
+    raw = "Here is the script:\n```python\nimport bpy\nbpy.ops.mesh.primitive_cube_add()\n```\nEnjoy!"
+
+    code = app.ai_generator._clean_code(raw)
+    
+    assert code.startswith("import bpy")
+    assert "```" not in code
+    assert "Enjoy" not in code
+
+
+def test_generate_code_returns_the_recorded_completion(app, llm):
+    processed = app.prompt_processor.process("Create a red cube")
+    
+    code = app.ai_generator.generate_code(processed['enhanced'], prompt_type=processed['prompt_type'], profile=processed)
+    
+    assert "import bpy" in code
+    assert llm.stats()['calls'] == 1
@@ -0,0 +1,117 @@
+import gzip
+import os
+import time
+
+import pytest
+
+from artifact_store import ArtifactStore
+
+
+@pytest.fixture
+def store(config):
+    store = ArtifactStore(link_mode='hardlink')
+    yield store
+    store.close()
+
+
+def test_identical_content_is_stored_once(store, tmp_path):
+    first = store.put_bytes("import bpy", 'generated', "job-1", link_to=tmp_path / "a.py")
+    second = store.put_bytes("import bpy", 'generated', "job-2", link_to=tmp_path / "b.py")
+    
+    assert first == second
+    assert store.stats()['objects'] == 1
+    assert store.stats()['logical_size'] == 2 * len("import bpy")
+    assert sorted(store.jobs_with(first)) == ["job-1", "job-2"]
+    assert os.path.samefile(tmp_path / "a.py", store.object_path(first))
+    assert (tmp_path / "b.py").read_text() == "import bpy"
+
+
+def test_blend_files_are_compressed_and_linked_back(store, tmp_path):
+    blend = tmp_path / "scene.blend"
+    blend.write_bytes(b"BLENDER" + b"\0" * 4096)
+    
+    sha256 = store.put_file(blend, 'blend', "job-1")
+    [row] = store.lineage("job-1")
+    
+    assert row['compressed'] and row['stored_size'] < row['size']
+    assert store.read(sha256) == b"BLENDER" + b"\0" * 4096
+    # The output left behind is the stored object, which Blender reads as gzip
+    assert gzip.decompress(blend.read_bytes()) == store.read(sha256)
+    assert store.put_file(tmp_path / "missing.blend", 'blend', "job-1") is None
+
+
+def test_lineage_follows_pipeline_order(store, tmp_path):
+    render = tmp_path / "render.png"
+    render.write_bytes(b"png")
+    store.put_file(render, 'render', "job-1")
+    store.put_bytes("import bpy", 'generated', "job-1")
+    store.put_bytes("a red cube", 'prompt', "job-1")
+    
+    assert [row['role'] for row in store.lineage("job-1")] == ['prompt', 'generated', 'render']
+
+
+def test_gc_drops_old_jobs_and_their_unshared_objects(store, tmp_path):
+    shared = store.put_bytes("import bpy", 'generated', "old")
+    store.put_bytes("a red cube", 'prompt', "old", link_to=tmp_path / "old.txt")
+    store.put_bytes("import bpy", 'generated', "new")
+    with store._conn:
+        store._conn.execute("UPDATE artifacts SET created_at = ? WHERE job_id = 'old'", (time.time() - 10 * 86400,))
+        
+    assert store.gc(retention_days=5, keep_last=0, max_size_mb=0, dry_run=True)['objects_removed'] == 0
+    report = store.gc(retention_days=5, keep_last=0, max_size_mb=0)
+    
+    assert report['jobs_removed'] == 1 and report['objects_removed'] == 1
+    assert store.jobs_with(shared) == ["new"]
+    assert store.read(shared) == b"import bpy"
+    assert not (tmp_path / "old.txt").exists()
+
+
+def test_keep_last_protects_recent_jobs(store):
+    store.put_bytes("a red cube", 'prompt', "job-1")
+    with store._conn:
+        store._conn.execute("UPDATE artifacts SET created_at = 0")
+        
+    assert store.gc(retention_days=1, keep_last=1, max_size_mb=0)['jobs_removed'] == 0
+
+def test_detach_protects_stored_objects_from_in_place_writes(store, tmp_path):
+    render = tmp_path / "render.png"
+    render.write_bytes(b"first render")
+    sha256 = store.put_file(render, 'render', "job-1")
+    
+    store.detach(render)
+    render.write_bytes(b"second render")
+    
+    assert store.read(sha256) == b"first render"
+
+
+def test_detach_can_keep_a_private_copy(store, tmp_path):
+    blend = tmp_path / "scene.blend"
+    blend.write_bytes(b"BLENDER")
+    sha256 = store.put_file(blend, 'blend', "job-1", compress=False)
+    
+    store.detach(blend, keep_content=True)
+    with open(blend, 'ab') as f:
+        f.write(b" resumed")
+        
+    assert store.read(sha256) == b"BLENDER"
+    assert blend.read_bytes() == b"BLENDER resumed"
+
+
+def test_resumed_run_writes_no_output_through_a_store_link(app, monkeypatch):
+    executor = app.blender_executor
+    # A cached render would be restored rather than rewritten
+    monkeypatch.setattr(executor, 'render_cache', None)
+    first = executor.execute_full_pipeline("import bpy\n", render=True, export=False, save=True, job_id="resumed")
+    assert first['success'], first['stderr']
+    objects = [executor.artifact_store.object_path(row['sha256']) for row in executor.artifact_store.lineage("resumed")]
+    assert os.stat(first['blend_path']).st_nlink > 1
+    
+    plan = executor.prepare_pipeline(
+        "import bpy\n", render=True, export=False, save=True, job_id="resumed", resume_blend=first['blend_path']
+    )
+    executor._detach_outputs(plan, dict(plan['results']))
+    
+    # The render is rewritten from scratch, the .blend being resumed from is a private copy
+    assert not first['render_path'].exists()
+    assert os.stat(first['blend_path']).st_nlink == 1
+    assert all(path.exists() for path in objects)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from config import Config
+from batch_api import BatchGenerator
+from batch_api_server import BatchState, BatchAPIHandler
+from pipeline import PipelineJob
+from tests.test_pipeline import create_pipeline, run
+
+OPTIONS = {'render': False, 'export': False, 'save': False}
+PROMPTS = ["a red cube", "a wooden table", "a glass sphere"]
+
+
+class MarkedState(BatchState):
+    """Batch replies that say where they came from"""
+    
+    def answer(self, index: int, user_prompt: str):
+        text = super().answer(index, user_prompt)
+        return text and text.replace("import bpy", "import bpy\n# batch reply", 1)
+
+
+@pytest.fixture
+def batch_server(config, monkeypatch):
+    """tools/batch_api_server.py failing every second request of a batch"""
+    state = MarkedState(delay=0.2, fail_every=2)
+    handler = type('BoundBatchAPIHandler', (BatchAPIHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(Config, 'BATCH_API_ANTHROPIC_URL', url)
+    monkeypatch.setattr(Config, 'BATCH_API_OPENAI_URL', url)
+    monkeypatch.setattr(Config, 'BATCH_API_POLL_SECONDS', 0.05)
+    yield state
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def generator(app, provider, events):
+    return BatchGenerator(app.ai_generator, app.prompt_processor, journal=app.journal, provider=provider, on_progress=events.append)
+
+
+def run_batch(app, batch, jobs):
+    async def main():
+        async with create_pipeline(app) as pipeline:
+            return await batch.run(pipeline, jobs)
+            
+    return run(main())
+
+
+@pytest.mark.parametrize("provider", ['claude', 'openai'])
+def test_failed_batch_requests_fall_back_to_real_time(app, llm, batch_server, provider):
+    events = []
+    jobs = [PipelineJob(prompt, OPTIONS) for prompt in PROMPTS]
+    
+    results = run_batch(app, generator(app, provider, events), jobs)
+    
+    assert all(result['success'] for result in results), results
+    # The second request of the batch failed and was generated by the real-time provider
+    assert llm.calls == 1
+    assert ["# batch reply" in job.code for job in jobs] == [True, False, True]
+    ended = [event for event in events if event['type'] == 'batch_ended']
+    assert [(event['count'], event['failed']) for event in ended] == [(3, 1)]
+    assert len(batch_server.batches) == 1
+
+
+def test_resumed_jobs_poll_their_journaled_batch(app, llm, batch_server):
+    events = []
+    batch = generator(app, 'claude', events)
+    submitted = [PipelineJob(prompt, OPTIONS) for prompt in PROMPTS[:1]]
+    batch_id = batch._submit(submitted)
+    # A later run restores the job from the journal
+    job = PipelineJob(PROMPTS[0], OPTIONS, job_id=submitted[0].job_id, checkpoints=app.journal.checkpoints(submitted[0].job_id))
+    
+    [result] = run_batch(app, batch, [job])
+    
+    assert result['success'], result
+    assert [event['type'] for event in events if event['type'] != 'batch_status'] == ['batch_resumed', 'batch_ended']
+    assert events[0]['batch_id'] == batch_id
+    assert len(batch_server.batches) == 1
+    assert llm.calls == 0
+    assert "# batch reply" in job.code
+
+
+def test_unreachable_batch_api_generates_in_real_time(app, llm, monkeypatch):
+    monkeypatch.setattr(Config, 'BATCH_API_ANTHROPIC_URL', "http://127.0.0.1:9")
+    events = []
+    jobs = [PipelineJob(prompt, OPTIONS) for prompt in PROMPTS[:2]]
+    
+    results = run_batch(app, generator(app, 'claude', events), jobs)
+    
+    assert all(result['success'] for result in results), results
+    assert llm.calls == 2
+    assert [(event['type'], event['count']) for event in events] == [('batch_failed', 2)]
\ No newline at end of file
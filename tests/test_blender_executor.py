@@ -1 +1,81 @@
- pass
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from config import Config
+from blender_executor import BlenderExecutor
+
+
+SCRIPT = """
+import bpy
+bpy.ops.mesh.primitive_cube_add(size=2)
+"""
+
+
+def test_full_pipeline_writes_requested_outputs(app):
+    results = app.blender_executor.execute_full_pipeline(SCRIPT, render=True, export=False, save=True, job_id="test")
+    
+    assert results['success'], results.get('stderr')
+    assert results['render_path'].exists()
+    assert results['blend_path'].exists()
+    assert results['export_path'] is None
+
+
+def test_uncaught_error_fails_the_run(app):
+    results = app.blender_executor.execute_full_pipeline(
+        SCRIPT + "raise ValueError('broken scene')\n",
+        render=False,
+        export=False,
+        save=False,
+        job_id="broken"
+    )
+    
+    assert not results['success']
+    assert "broken scene" in results['stderr']
+
+
+def test_command_reports_uncaught_errors_in_the_exit_code(app):
+    command = app.blender_executor._build_command('background', threads=2)
+    
+    assert command[:2] == [app.blender_executor.blender_path, '--background']
+    assert command[command.index('--threads') + 1] == '2'
+    assert command[command.index('--python-exit-code') + 1] == '1'
+
+
+def test_scene_hash_render_still_renders_when_the_hash_is_unavailable(app, monkeypatch):
+    monkeypatch.setattr(Config, 'RENDER_CACHE_SCENE_HASH', True)
+    
+    results = app.blender_executor.execute_full_pipeline(SCRIPT, render=True, export=False, save=False, job_id="hashed")
+    
+    assert results['success'], results.get('stderr')
+    assert results['render_path'].exists()
+
+
+def test_traceback_the_script_handles_does_not_fail_the_run(app):
+    script = SCRIPT + (
+        "import traceback\n"
+        "try:\n"
+        "    raise KeyError('missing material')\n"
+        "except KeyError:\n"
+        "    traceback.print_exc()\n"
+    )
+    
+    result = asyncio.run(app.blender_executor.execute_code_async(script, mode='background', kill_on_error=True))
+    
+    assert result['success'], result['stderr']
+    assert "missing material" in result['stderr']
+    assert result['error'] is None
+
+
+@pytest.mark.parametrize("setting, mode, blend_file, kill", [
+    ('auto', 'background', None, False),
+    ('auto', 'gui', None, True),
+    ('auto', 'background', Path("scene.blend"), True),
+    ('true', 'background', None, True),
+    ('false', 'gui', Path("scene.blend"), False),
+])
+def test_kill_on_error_defaults_to_runs_that_would_linger(monkeypatch, setting, mode, blend_file, kill):
+    monkeypatch.setattr(Config, 'KILL_ON_ERROR', setting)
+    
+    assert BlenderExecutor.kill_on_error_default(mode, blend_file) is kill
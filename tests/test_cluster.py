@@ -0,0 +1,90 @@
+import socket
+
+import pytest
+import requests
+
+from config import Config
+from cluster import Coordinator, Agent, TOKEN_HEADER, SIGNATURE_HEADER, sign
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def start_coordinator(config, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'CLUSTER_BLOB_DIR', tmp_path / "blobs")
+    coordinators = []
+    
+    def start(token: str) -> Coordinator:
+        coordinator = Coordinator(host='127.0.0.1', port=free_port(), token=token)
+        coordinator.start()
+        coordinators.append(coordinator)
+        return coordinator
+        
+    yield start
+    for coordinator in coordinators:
+        coordinator.stop()
+
+
+def url(coordinator: Coordinator) -> str:
+    return f"http://127.0.0.1:{coordinator.port}"
+
+
+def queue_task(coordinator: Coordinator):
+    coordinator.board.add({
+        'task_id': 'task-1',
+        'kind': 'build',
+        'payload': {'code': "import bpy\n", 'label': 'test'},
+        'requires': {},
+        'timeout': 60,
+        'on_done': lambda result: None,
+        'on_events': lambda events: None,
+    })
+
+
+def test_coordinator_refuses_to_listen_beyond_loopback_without_a_token(config):
+    with pytest.raises(ValueError, match="CLUSTER_TOKEN"):
+        Coordinator(host='0.0.0.0', port=free_port(), token='').start()
+
+
+def test_agent_refuses_a_remote_coordinator_without_a_token(app):
+    with pytest.raises(ValueError, match="CLUSTER_TOKEN"):
+        Agent(app.blender_executor, "http://10.0.0.5:8766", token='')
+
+
+def test_requests_without_the_token_are_rejected(start_coordinator):
+    coordinator = start_coordinator('secret')
+    
+    assert requests.get(f"{url(coordinator)}/health", timeout=5).status_code == 401
+    assert requests.post(f"{url(coordinator)}/agents", json={'agent_id': 'intruder'}, timeout=5).status_code == 401
+    assert requests.head(f"{url(coordinator)}/blobs/{'0' * 64}", headers={TOKEN_HEADER: 'guess'}, timeout=5).status_code == 401
+    assert 'intruder' not in coordinator.board.agents
+    
+    response = requests.get(f"{url(coordinator)}/health", headers={TOKEN_HEADER: 'secret'}, timeout=5)
+    assert response.status_code == 200
+    assert response.headers[SIGNATURE_HEADER] == sign('secret', response.content)
+
+
+def test_agent_with_the_token_claims_signed_tasks(app, start_coordinator):
+    coordinator = start_coordinator('secret')
+    queue_task(coordinator)
+    agent = Agent(app.blender_executor, url(coordinator), agent_id='agent-1', token='secret')
+    
+    agent._post('/agents', agent.capacity())
+    task = agent._claim()
+    
+    assert task['task_id'] == 'task-1'
+
+
+def test_agent_discards_tasks_not_signed_with_its_token(app, start_coordinator):
+    # A coordinator that doesn't know the token, e.g. a fake one on the network
+    coordinator = start_coordinator('')
+    queue_task(coordinator)
+    agent = Agent(app.blender_executor, url(coordinator), agent_id='agent-1', token='secret')
+    
+    agent._post('/agents', agent.capacity())
+    
+    assert agent._claim() is None
\ No newline at end of file
@@ -0,0 +1,146 @@
+import pytest
+
+from config import Config
+from code_validator import CodeValidator
+from bpy_api_index import BpyApiIndex, INDEX_FORMAT
+
+
+def struct(base=None, properties=None, functions=None, python=()):
+    return {'base': base, 'properties': properties or {}, 'functions': functions or {}, 'python': list(python)}
+
+
+# A few structs, operators and nodes in the layout tools/dump_bpy_api.py writes
+INDEX = {
+    'format': INDEX_FORMAT,
+    'blender_version': '4.2.0',
+    'operators': {
+        'mesh.primitive_cube_add': ['size', 'location', 'rotation'],
+        'object.select_all': ['action'],
+    },
+    'structs': {
+        'ID': struct(properties={'name': None}),
+        'Object': struct('ID', {'data': 'ID', 'location': None, 'active_material': 'Material'}),
+        'Mesh': struct('ID', {'materials': ['Material', 'IDMaterials'], 'vertices': ['MeshVertex', None]}),
+        'IDMaterials': struct(functions={'append': [['material'], None]}),
+        'Material': struct('ID', {'use_nodes': None, 'node_tree': 'NodeTree'}),
+        'NodeTree': struct('ID', {'nodes': ['Node', 'Nodes'], 'links': ['NodeLink', 'NodeLinks']}),
+        'Nodes': struct(functions={'new': [['type'], 'Node']}),
+        'NodeLinks': struct(functions={'new': [['input', 'output', 'verify_limits'], 'NodeLink']}),
+        'NodeLink': struct(),
+        'Node': struct(properties={
+            'name': None,
+            'location': None,
+            'inputs': ['NodeSocket', 'NodeInputs'],
+            'outputs': ['NodeSocket', 'NodeOutputs'],
+        }),
+        'ShaderNode': struct('Node'),
+        'ShaderNodeBsdfPrincipled': struct('ShaderNode'),
+        'ShaderNodeOutputMaterial': struct('ShaderNode'),
+        'NodeSocket': struct(properties={'default_value': None}),
+        'BlendData': struct(properties={
+            'materials': ['Material', 'BlendDataMaterials'],
+            'objects': ['Object', 'BlendDataObjects'],
+        }),
+        'BlendDataMaterials': struct(functions={'new': [['name'], 'Material']}),
+        'Context': struct(properties={'scene': 'Scene'}),
+        'Scene': struct('ID', {'frame_end': None}),
+    },
+    'nodes': {
+        'ShaderNodeBsdfPrincipled': {
+            'name': 'Principled BSDF',
+            'inputs': ['Base Color', 'Roughness', 'Specular IOR Level'],
+            'outputs': ['BSDF'],
+            'dynamic': False,
+        },
+        'ShaderNodeOutputMaterial': {'name': 'Material Output', 'inputs': ['Surface', 'Volume'], 'outputs': [], 'dynamic': False},
+    },
+    'collection': ['find', 'foreach_get', 'foreach_set', 'get', 'items', 'keys', 'new', 'remove', 'values'],
+}
+
+VALID = """
+import bpy
+bpy.ops.object.select_all(action='SELECT')
+bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0))
+obj = bpy.context.active_object
+obj.location.x = 1.0
+mat = bpy.data.materials.new(name="Red")
+mat.use_nodes = True
+nodes = mat.node_tree.nodes
+bsdf = nodes.get("Principled BSDF")
+bsdf.inputs["Base Color"].default_value = (1, 0, 0, 1)
+output = nodes.new('ShaderNodeOutputMaterial')
+mat.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
+# Object.data is typed ID; materials is declared on Mesh
+obj.data.materials.append(mat)
+for other in bpy.data.objects:
+    other.active_material = mat
+bpy.context.scene.frame_end = 1
+"""
+
+
+@pytest.fixture
+def validator(config, tmp_path, monkeypatch):
+    path = tmp_path / "bpy_api.json.gz"
+    BpyApiIndex.save(path, INDEX)
+    monkeypatch.setattr(Config, 'BPY_API_CHECK', True)
+    monkeypatch.setattr(Config, 'BPY_API_INDEX', path)
+    return CodeValidator()
+
+
+def api_errors(validator, code):
+    _, errors, _ = validator.validate(code)
+    return [error for error in errors if error.startswith("API Error")]
+
+
+def test_valid_code_has_no_false_positives(validator):
+    valid, errors, _ = validator.validate(VALID)
+    
+    assert valid, errors
+
+
+def test_unknown_operator_is_reported(validator):
+    errors = api_errors(validator, "import bpy\nbpy.ops.mesh.primitive_cube_ad(size=2)\n")
+    
+    assert errors == [
+        "API Error at line 2: bpy.ops.mesh.primitive_cube_ad doesn't exist in Blender 4.2.0 "
+        "(did you mean 'primitive_cube_add'?)"
+    ]
+
+
+def test_unknown_operator_keyword_is_reported(validator):
+    errors = api_errors(validator, "import bpy\nbpy.ops.mesh.primitive_cube_add(radius=1, location=(0, 0, 0))\n")
+    
+    assert len(errors) == 1
+    assert "bpy.ops.mesh.primitive_cube_add has no parameter 'radius'" in errors[0]
+
+
+def test_renamed_socket_is_reported(validator):
+    code = (
+        "import bpy\n"
+        "mat = bpy.data.materials.new('Red')\n"
+        "bsdf = mat.node_tree.nodes['Principled BSDF']\n"
+        "bsdf.inputs['Specular'].default_value = 0.5\n"
+    )
+    
+    errors = api_errors(validator, code)
+    
+    assert errors == [
+        "API Error at line 4: ShaderNodeBsdfPrincipled has no input 'Specular' in Blender 4.2.0 "
+        "(did you mean 'Specular IOR Level'?)"
+    ]
+
+
+def test_unknown_attribute_is_reported_unless_a_subclass_or_the_script_declares_it(validator):
+    assert api_errors(validator, "import bpy\nbpy.context.scene.frame_ends = 1\n")
+    assert not api_errors(
+        validator,
+        "import bpy\nbpy.types.Scene.my_value = bpy.props.IntProperty()\nbpy.context.scene.my_value = 1\n"
+    )
+
+
+def test_checks_are_skipped_without_an_index(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'BPY_API_INDEX', tmp_path / "missing.json")
+    
+    valid, errors, _ = CodeValidator().validate("import bpy\nbpy.ops.mesh.no_such_operator()\n")
+    
+    assert valid, errors
\ No newline at end of file
@@ -0,0 +1,114 @@
+import ast
+
+import pytest
+
+from compat_rewriter import CompatRewriter, parse_version
+from lod_export import LodExporter
+
+MATERIAL = """
+import bpy
+mat = bpy.data.materials.new("Red")
+mat.use_nodes = True
+bsdf = mat.node_tree.nodes.get("Principled BSDF")
+bsdf.inputs["Specular"].default_value = 0.5
+bsdf.inputs['Emission'].default_value = (1, 0, 0, 1)
+ramp = mat.node_tree.nodes.new('ShaderNodeValToRGB')
+ramp.inputs["Specular"]
+"""
+
+
+def rewrite(version, code):
+    rewritten, rewrites = CompatRewriter(version).rewrite(code)
+    ast.parse(rewritten)
+    return rewritten, rewrites
+
+
+def test_parse_version():
+    assert parse_version("Blender 4.2.3 LTS") == (4, 2, 3)
+    assert parse_version("5.0") == (5, 0, 0)
+    assert parse_version("no version") is None
+    assert CompatRewriter.for_version("garbage") is None
+
+
+def test_principled_sockets_are_renamed_from_4_0_only():
+    assert rewrite((3, 6), MATERIAL) == (MATERIAL, [])
+    
+    rewritten, rewrites = rewrite((4, 0), MATERIAL)
+    
+    assert 'bsdf.inputs["Specular IOR Level"].default_value = 0.5' in rewritten
+    # Quote style is kept
+    assert "bsdf.inputs['Emission Color']" in rewritten
+    # Sockets of other node types keep their names
+    assert 'ramp.inputs["Specular"]' in rewritten
+    assert [(rewrite['old'], rewrite['line']) for rewrite in rewrites] == [("'Specular'", 6), ("'Emission'", 7)]
+
+
+def test_operator_and_keywords_are_mapped_and_dropped_keywords_removed():
+    code = "import bpy\nbpy.ops.export_scene.obj(filepath='a.obj', use_selection=True, use_edges=False, axis_forward='-Z')\n"
+    
+    rewritten, rewrites = rewrite((4, 0), code)
+    
+    assert rewritten == (
+        "import bpy\nbpy.ops.wm.obj_export(filepath='a.obj', export_selected_objects=True, forward_axis='NEGATIVE_Z')\n"
+    )
+    assert {rewrite['rule'] for rewrite in rewrites} == {'operator', 'operator keyword', 'axis value'}
+    assert rewrite((3, 1), code) == (code, [])
+
+
+def test_last_keyword_is_dropped_with_its_comma():
+    code = "import bpy\nbpy.ops.export_mesh.stl(filepath='a.stl', batch_mode='OFF')\n"
+    
+    rewritten, _ = rewrite((4, 1), code)
+    
+    assert rewritten == "import bpy\nbpy.ops.wm.stl_export(filepath='a.stl')\n"
+
+
+def test_assignments_to_removed_properties_are_dropped():
+    code = (
+        "import bpy\n"
+        "for obj in bpy.data.objects:\n"
+        "    obj.data.use_auto_smooth = True\n"
+        "bsdf = bpy.data.materials['Red'].node_tree.nodes['Principled BSDF']\n"
+        "bsdf.inputs['Subsurface Color'].default_value = (1, 1, 1, 1)\n"
+        "bpy.context.scene.eevee.use_bloom = True\n"
+    )
+    
+    rewritten, rewrites = rewrite((4, 2), code)
+    
+    assert "use_auto_smooth" not in rewritten and "Subsurface Color" not in rewritten and "use_bloom" not in rewritten
+    # The loop body stays valid
+    assert "for obj in bpy.data.objects:\n    pass\n" in rewritten
+    assert all(rewrite['new'] is None for rewrite in rewrites)
+    
+    # Still valid in 4.1: only auto smooth and the removed socket go
+    rewritten, _ = rewrite((4, 1), code)
+    assert "use_bloom = True" in rewritten
+
+
+@pytest.mark.parametrize("version, engine", [
+    ((3, 6), 'BLENDER_EEVEE'),
+    ((4, 2), 'BLENDER_EEVEE_NEXT'),
+    ((4, 4), 'BLENDER_EEVEE_NEXT'),
+    ((5, 0), 'BLENDER_EEVEE'),
+])
+def test_eevee_engine_id_follows_the_version(version, engine):
+    for written in ('BLENDER_EEVEE', 'BLENDER_EEVEE_NEXT'):
+        rewritten, _ = rewrite(version, f"import bpy\nbpy.context.scene.render.engine = '{written}'\n")
+        assert rewritten == f"import bpy\nbpy.context.scene.render.engine = '{engine}'\n"
+
+
+@pytest.mark.parametrize("export_format, legacy, current, since", [
+    ('stl', 'bpy.ops.export_mesh.stl', 'bpy.ops.wm.stl_export', (4, 1)),
+    ('ply', 'bpy.ops.export_mesh.ply', 'bpy.ops.wm.ply_export', (3, 6)),
+])
+def test_lod_snippet_exporters_are_rewritten(config, export_format, legacy, current, since):
+    code = "import bpy\n" + LodExporter(levels="collapse:0.5", mode='files').build_lod_code("model.stl", export_format)
+    assert legacy in code
+    
+    older, _ = rewrite(since[:1] + (since[1] - 1,), code)
+    rewritten, rewrites = rewrite(since, code)
+    
+    assert legacy in older
+    assert legacy not in rewritten
+    assert f"{current}(filepath=path, export_selected_objects=True)" in rewritten
+    assert {rewrite['old'] for rewrite in rewrites} >= {legacy, 'use_selection'}
\ No newline at end of file
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from config import Config
+from cpu_scheduler import CpuScheduler
+from timing_history import TimingHistory
+
+
+@pytest.fixture
+def scheduler(config, monkeypatch):
+    monkeypatch.setattr(Config, 'CPU_SCHEDULER_MIN_SAMPLES', 2)
+    monkeypatch.setattr(Config, 'CPU_BUILD_CORES', 1)
+    scheduler = CpuScheduler(TimingHistory(config.LOGS_DIR / "cpu_timings.json"))
+    # Eight single-thread cores, whatever this machine has
+    scheduler.cores = [[cpu] for cpu in range(8)]
+    scheduler.cpu_count = 8
+    scheduler._free = set(range(8))
+    return scheduler
+
+
+def measure(scheduler, budgets):
+    for cores, seconds in budgets.items():
+        for _ in range(Config.CPU_SCHEDULER_MIN_SAMPLES):
+            scheduler.timing_history.record(CpuScheduler.STAGE, f"*@{cores}", seconds)
+
+
+def test_unmeasured_render_on_an_idle_machine_gets_every_core(scheduler):
+    assert scheduler.candidates() == [8, 4, 2, 1]
+    assert scheduler.cores_for('render') == 8
+
+
+def test_builds_and_explicit_shares(scheduler):
+    assert scheduler.cores_for('build') == 1
+    assert scheduler.cores_for('render_chunk', threads=4) == 4
+    assert scheduler.cores_for('render_chunk', threads=64) == 8
+
+
+def test_smaller_budgets_are_measured_only_on_idle_cores(scheduler):
+    async def main():
+        async with scheduler.lease('build'):
+            # Seven cores idle next to the build: measure the largest unmeasured budget that fits
+            first = scheduler.cores_for('render')
+            measure(scheduler, {4: 10.0})
+            second = scheduler.cores_for('render')
+        return first, second, scheduler.cores_for('render')
+        
+    assert asyncio.run(main()) == (4, 2, 8)
+
+
+def test_measured_budgets_pick_the_best_throughput(scheduler):
+    # Halving the cores costs little here, so four renders on two cores each win
+    measure(scheduler, {8: 10.0, 4: 12.0, 2: 14.0, 1: 40.0})
+    
+    assert scheduler.render_cores() == 2
+
+
+def test_leases_wait_for_free_cores(scheduler):
+    async def main():
+        order = []
+        
+        async def job(name, cores):
+            async with scheduler.lease('render_chunk', threads=cores) as grant:
+                order.append((name, len(grant.cpus)))
+                await asyncio.sleep(0.01)
+                
+        await asyncio.gather(job('a', 6), job('b', 4), job('c', 2))
+        return order
+        
+    order = asyncio.run(main())
+    
+    assert order[0] == ('a', 6)
+    assert sorted(order) == [('a', 6), ('b', 4), ('c', 2)]
+    assert scheduler.status() == {'cores': 8, 'free': 8, 'waiting': 0}
\ No newline at end of file
@@ -0,0 +1,87 @@
+import pytest
+
+from config import Config
+from dry_run import DryRunner
+
+BUILD = """import bpy
+bpy.ops.mesh.primitive_cube_add(size=2)
+"""
+
+# The NameError is raised in a helper's body, not on the line that calls it
+BROKEN = BUILD + """
+def add_material(obj):
+    obj.active_material = materal
+
+def finish():
+    add_material(bpy.context.object)
+
+finish()
+"""
+
+
+@pytest.fixture
+def runner(config):
+    runner = DryRunner(workers=1)
+    yield runner
+    runner.close()
+
+
+def test_build_runs_in_a_warm_worker(runner):
+    first = runner.run(BUILD)
+    pid = runner.workers[0].process.pid
+    second = runner.run(BUILD)
+    
+    assert first['ok'] and second['ok'], (first, second)
+    assert first['error'] is None
+    assert runner.workers[0].version == "5.0.1"
+    assert runner.workers[0].process.pid == pid
+    assert runner.workers[0].runs == 2
+
+
+def test_error_points_at_the_failing_line_of_the_generated_code(runner):
+    result = runner.run(BROKEN)
+    
+    assert not result['ok']
+    error = result['error']
+    assert error['exception'] == 'NameError'
+    assert error['line_number'] == 5
+    assert error['line'] == "obj.active_material = materal"
+    assert DryRunner.describe(result) == (
+        "Line 5: NameError: name 'materal' is not defined (obj.active_material = materal)"
+    )
+    # The worker survives a script error
+    assert runner.run(BUILD)['ok']
+
+
+def test_syntax_error_is_mapped_to_its_line(runner):
+    result = runner.run(BUILD + "bpy.ops.object.shade_smooth(\n")
+    
+    assert result['error']['exception'] == 'SyntaxError'
+    assert result['error']['line_number'] == 3
+
+
+def test_crashed_worker_is_replaced(runner):
+    result = runner.run(BUILD + "import os\nos._exit(3)\n")
+    
+    assert result['crashed'] and not result['ok']
+    assert DryRunner.describe(result) == "Crash: Blender exited with code 3 during the dry run"
+    assert runner.run(BUILD)['ok']
+
+
+def test_hung_worker_times_out_and_is_replaced(runner):
+    result = runner.run(BUILD + "import time\ntime.sleep(30)\n", timeout=1)
+    
+    assert result['timed_out'] and not result['ok']
+    assert result['error']['message'] == "Dry run exceeded 1s"
+    assert runner.run(BUILD)['ok']
+
+
+def test_worker_is_recycled_after_max_runs(runner, monkeypatch):
+    monkeypatch.setattr(Config, 'DRY_RUN_MAX_RUNS', 2)
+    runner.run(BUILD)
+    pid = runner.workers[0].process.pid
+    runner.run(BUILD)
+    
+    assert runner.run(BUILD)['ok']
+    assert runner.workers[0].process.pid != pid
+    assert runner.workers[0].runs == 1
\ No newline at end of file
@@ -0,0 +1,91 @@
+from job_journal import JobJournal
+from pipeline import PipelineJob
+from tests.test_pipeline import create_pipeline, run
+
+
+def test_jobs_transitions_and_checkpoints_survive_reopening(config):
+    journal = JobJournal()
+    batch_id = journal.start_batch("prompts.txt", {'render': False})
+    journal.start_job("job-1", "a red cube", {'render': False}, batch_id, 0)
+    journal.record("job-1", 'generate', 'started', attempt=1, input_hash=JobJournal.hash_text("a red cube"))
+    journal.record("job-1", 'generate', 'failed', attempt=1, detail={'error': 'timeout'})
+    journal.record("job-1", 'generate', 'started', attempt=2)
+    journal.checkpoint("job-1", 'generated', content="import bpy", attempt=2)
+    journal.checkpoint("job-1", 'generated', content="import bpy\nbpy.ops.mesh.primitive_cube_add()", attempt=2)
+    journal.close()
+    
+    journal = JobJournal()
+    try:
+        assert journal.latest_batch("prompts.txt") == batch_id
+        assert journal.attempts("job-1") == 2
+        checkpoint = journal.checkpoints("job-1")['generated']
+        # Newer checkpoints of the same name replace older ones
+        assert checkpoint['content'].endswith("primitive_cube_add()")
+        assert checkpoint['content_hash'] == JobJournal.hash_text(checkpoint['content'])
+        job = journal.batch_jobs(batch_id)[0]
+        assert job['state'] == 'running' and job['stage'] == 'generate'
+    finally:
+        journal.close()
+
+
+def test_finish_keeps_only_the_result_summary(config):
+    journal = JobJournal()
+    try:
+        batch_id = journal.start_batch(None, {})
+        journal.start_job("job-1", "a red cube", {}, batch_id, 3)
+        journal.finish_job("job-1", 'succeeded', {'success': True, 'stdout': "x" * 10000, 'render_path': "out.png"})
+        
+        job = journal.batch_jobs(batch_id)[3]
+        assert job['state'] == 'succeeded'
+        assert job['results'] == {'success': True, 'render_path': "out.png"}
+        
+        # Starting it again, e.g. on resume, marks it running without losing its row
+        journal.start_job("job-1", "a red cube", {}, batch_id, 3)
+        assert journal.batch_jobs(batch_id)[3]['state'] == 'running'
+    finally:
+        journal.close()
+
+
+def test_hash_text_is_stable_for_json_values():
+    assert JobJournal.hash_text({'b': 1, 'a': 2}) == JobJournal.hash_text({'a': 2, 'b': 1})
+    assert JobJournal.hash_text(None) is None
+
+
+def test_pipeline_resumes_from_a_validated_checkpoint(app, llm):
+    code = "import bpy\nbpy.ops.mesh.primitive_cube_add()\n"
+    events = []
+    job = PipelineJob(
+        "a red cube",
+        {'render': False, 'export': False, 'save': False},
+        on_event=events.append,
+        checkpoints={'validated': {'content': code, 'attempt': 1}}
+    )
+    
+    async def main():
+        async with create_pipeline(app, journal=app.journal) as pipeline:
+            return await pipeline.run_job(job)
+            
+    results = run(main())
+    
+    assert results['success'], results
+    assert llm.calls == 0
+    assert 'generate' not in results['timings']
+    assert any(event['type'] == 'resumed' and event['checkpoint'] == 'validated' for event in events)
+
+def test_resume_regenerates_failed_jobs_and_continues_interrupted_ones(app, llm, tmp_path):
+    source = str(tmp_path / "prompts.txt")
+    prompts = ["a red cube", "a blue sphere"]
+    batch_id = app.journal.start_batch(source, {})
+    for index, prompt in enumerate(prompts):
+        app.journal.start_job(f"job-{index}", prompt, {}, batch_id, index)
+        app.journal.record(f"job-{index}", 'generate', 'started', attempt=1)
+    app.journal.checkpoint("job-0", 'validated', content="raise RuntimeError('broken')\n", attempt=1)
+    app.journal.finish_job("job-0", 'failed', {'success': False, 'error': 'broken'})
+    app.journal.checkpoint("job-1", 'validated', content="import bpy\nbpy.ops.mesh.primitive_uv_sphere_add()\n", attempt=1)
+    
+    results = app.run_batch(prompts, source=source, resume=True, render=False, export=False, save=False)
+    
+    assert all(result['success'] for result in results), results
+    # Only the failed job went back to the LLM
+    assert llm.calls == 1
+    assert "RuntimeError" not in app.journal.checkpoints("job-0")['validated']['content']
\ No newline at end of file
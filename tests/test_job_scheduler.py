@@ -0,0 +1,86 @@
+import asyncio
+import types
+
+import pytest
+
+from config import Config
+from job_scheduler import CostModel, LaneScheduler, parse_lanes, estimate_script_cost
+
+CUBE = "import bpy\nbpy.ops.mesh.primitive_cube_add()\n"
+GRID = "import bpy\nfor i in range(100):\n    bpy.ops.mesh.primitive_cube_add(location=(i, 0, 0))\n"
+
+
+def job(cost: float, name: str = ''):
+    return types.SimpleNamespace(job_id=name, cost=cost, lane=None, waited=None, submitted_at=None)
+
+
+def test_parse_lanes_with_seconds_and_percentiles():
+    lanes = parse_lanes("fast:2:p50,medium:1:600,slow:1:900", "fast:120")
+    
+    assert [lane['name'] for lane in lanes] == ['fast', 'medium', 'slow']
+    assert lanes[0]['max_quantile'] == 0.5 and lanes[0]['max_seconds'] is None
+    assert lanes[1]['max_seconds'] == 600
+    # The last lane takes everything
+    assert lanes[2]['max_seconds'] is None and lanes[2]['max_quantile'] is None
+    assert lanes[0]['slo_seconds'] == 120
+
+
+@pytest.mark.parametrize("spec", ["fast", "fast:0", "fast:1:soon", "fast:1:p0,slow:1", "fast:1,fast:1", ""])
+def test_parse_lanes_rejects_malformed_specs(spec):
+    with pytest.raises(ValueError):
+        parse_lanes(spec)
+
+
+def test_script_cost_follows_loops():
+    assert estimate_script_cost(GRID) == pytest.approx(100 * estimate_script_cost(CUBE))
+    assert estimate_script_cost("not python (") == 0.0
+
+
+def test_percentile_lane_splits_uncalibrated_predictions():
+    # Static estimates far above any fixed limit still split by rank
+    scheduler = LaneScheduler(cost_model=None, lanes=parse_lanes("fast:1:p50,slow:1"))
+    
+    assert scheduler.route(158.0) == 'fast'
+    assert scheduler.route(400.0) == 'slow'
+    assert scheduler.route(150.0) == 'fast'
+    assert scheduler.route(0.0) == 'fast'
+    assert scheduler.report()['fast']['max_seconds'] == 158.0
+
+
+def test_fixed_lane_limit():
+    scheduler = LaneScheduler(cost_model=None, lanes=parse_lanes("fast:1:60,slow:1"))
+    
+    assert scheduler.route(59) == 'fast'
+    assert scheduler.route(61) == 'slow'
+
+
+def test_lane_hands_out_the_cheapest_job_first():
+    scheduler = LaneScheduler(cost_model=None, lanes=parse_lanes("fast:1:60,slow:1"), aging=0)
+    
+    async def main():
+        for cost, name in ((30, 'b'), (10, 'a'), (50, 'c')):
+            queued = job(cost, name)
+            queued.lane = 'fast'
+            await scheduler.put(queued)
+        # The slow lane's worker helps out with the fast lane when its own is empty
+        return [(await scheduler.get(lane)).job_id for lane in ('fast', 'slow', 'fast')]
+        
+    assert asyncio.run(main()) == ['a', 'b', 'c']
+
+
+def test_prediction_reads_but_does_not_write_the_history(app):
+    model = CostModel(app.blender_executor)
+    profile = app.prompt_processor.process("Create a red cube")
+    options = {'render': False, 'export': False, 'save': True, 'bake': False}
+    history = app.blender_executor.timing_history
+    
+    base = model.predict(profile, options)
+    assert model.predict(profile, options, GRID) == base
+    assert history.percentile(CostModel.STAGE, model._script_key(profile, model._flags(options)), 0.5) is None
+    
+    for _ in range(5):
+        model.record_script(profile, options, CUBE)
+        
+    # A script far heavier than the usual ones for this kind of job is predicted longer
+    assert model.predict(profile, options, GRID) == pytest.approx(4 * base)
+    assert model.predict(profile, options, CUBE) == pytest.approx(base)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import json
+import threading
+import http.client
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from job_service import JobService, JobQueue, JobRequestHandler
+
+OPTIONS = {'mode': 'background', 'render': True, 'export': False, 'save': False}
+
+
+@pytest.fixture
+def service(app, config):
+    service = JobService(app, JobQueue(config.SERVICE_QUEUE_FILE))
+    service.start()
+    yield service
+    service.stop()
+
+
+@pytest.fixture
+def server(service):
+    handler = type('BoundJobRequestHandler', (JobRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_done_is_streamed_after_the_outcome_is_stored(service):
+    job_id = service.submit("a red cube", OPTIONS, 'tests')
+    
+    for event in service.iter_events(job_id, timeout=60):
+        if event['type'] == 'done':
+            record = service.queue.get(job_id)
+            break
+            
+    assert event['state'] == 'succeeded'
+    assert record['state'] == 'succeeded'
+    assert record['results']['success']
+    assert service.artifact_path(job_id, 'render') is not None
+
+
+def test_event_stream_over_http(server):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=60)
+    connection.request('POST', '/jobs', json.dumps({'prompt': "a red cube", 'options': OPTIONS}))
+    response = connection.getresponse()
+    job_id = json.loads(response.read())['job_id']
+    
+    # Same connection: the service speaks HTTP/1.1 and keeps it alive
+    connection.request('GET', f"/jobs/{job_id}/events")
+    response = connection.getresponse()
+    assert response.version == 11
+    assert response.getheader('Transfer-Encoding') == 'chunked'
+    events = [json.loads(line) for line in response.read().decode().splitlines()]
+    assert events[-1]['type'] == 'done'
+    
+    connection.request('GET', f"/jobs/{job_id}")
+    record = json.loads(connection.getresponse().read())
+    assert record['state'] == events[-1]['state'] == 'succeeded'
+    
+    connection.request('GET', f"/jobs/{job_id}/artifacts/render")
+    response = connection.getresponse()
+    assert response.status == 200
+    assert response.read().startswith(b'\x89PNG')
+    connection.close()
+
+
+def test_stop_records_running_jobs_and_closes_the_loop(app, config, llm):
+    llm.latency = 30.0
+    service = JobService(app, JobQueue(config.SERVICE_QUEUE_FILE))
+    service.start()
+    job_ids = [service.submit(f"a red cube number {index}", OPTIONS, 'tests') for index in range(3)]
+    for event in service.iter_events(job_ids[0], timeout=60):
+        if event['type'] == 'generating':
+            break
+            
+    service.stop()
+    
+    assert service.loop.is_closed()
+    for job_id in job_ids:
+        assert service.queue.get(job_id)['state'] in ('cancelled', 'queued')
+    assert service.queue.get(job_ids[0])['state'] == 'cancelled'
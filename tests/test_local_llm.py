@@ -0,0 +1,116 @@
+import time
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from config import Config
+from local_llm import LocalLLMManager, SlotLimiter
+from fake_ollama_server import FakeOllama, FakeOllamaHandler
+
+MODELS = {'codellama:latest': 'Q4_0', 'codellama:7b-instruct-q8_0': 'Q8_0', 'llama3:latest': 'Q4_0'}
+
+
+def wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def start_ollama(config, monkeypatch):
+    """Starts tools/fake_ollama_server.py with a given number of slots and returns its generate URL"""
+    monkeypatch.setattr(Config, 'LOCAL_LLM_PARALLEL', 0)
+    monkeypatch.setattr(Config, 'LOCAL_LLM_MAX_PARALLEL', 4)
+    monkeypatch.setattr(Config, 'LOCAL_LLM_QUANTIZATION', '')
+    servers = []
+    
+    def start(parallel: int) -> str:
+        # About 0.2s per probe request, so one more than the server's slots takes visibly longer
+        state = FakeOllama(dict(MODELS), context=4096, parallel=parallel, load_seconds=0.0, tokens_per_second=100)
+        handler = type('BoundFakeOllamaHandler', (FakeOllamaHandler,), {'server_state': state})
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+        
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_slot_limiter_caps_concurrency_and_can_grow():
+    limiter = SlotLimiter(2)
+    gate = threading.Event()
+    
+    def hold():
+        with limiter:
+            gate.wait(5)
+            
+    threads = [threading.Thread(target=hold) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: limiter.active == 2)
+    time.sleep(0.05)
+    assert limiter.active == 2
+    
+    # Waiters take the new slots without any request finishing
+    limiter.resize(3)
+    wait_until(lambda: limiter.active == 3)
+    gate.set()
+    for thread in threads:
+        thread.join()
+        
+    assert limiter.active == 0
+    assert SlotLimiter(0).limit == 1
+
+
+@pytest.mark.parametrize("slots", [1, 2])
+def test_probe_finds_the_servers_parallel_slots(start_ollama, slots):
+    manager = LocalLLMManager(url=start_ollama(slots), model='codellama')
+    
+    manager.probe_parallel()
+    
+    assert manager.parallel == slots
+    assert manager.slots.limit == slots
+
+
+def test_prepare_picks_the_quantization_and_trims_the_context(start_ollama, monkeypatch):
+    monkeypatch.setattr(Config, 'LOCAL_LLM_QUANTIZATION', 'q8_0')
+    monkeypatch.setattr(Config, 'LOCAL_LLM_CONTEXT_SIZE', 8192)
+    manager = LocalLLMManager(url=start_ollama(2), model='codellama')
+    
+    manager.prepare()
+    
+    assert manager.ready.is_set()
+    assert manager.model == 'codellama:7b-instruct-q8_0'
+    assert manager.context_length == 4096
+    assert manager.options()['num_ctx'] == 4096
+    assert manager.parallel == 2
+
+
+def test_fixed_parallel_skips_the_probe(start_ollama, monkeypatch):
+    monkeypatch.setattr(Config, 'LOCAL_LLM_PARALLEL', 3)
+    manager = LocalLLMManager(url=start_ollama(1), model='codellama')
+    
+    manager.prepare()
+    
+    assert manager.parallel == 3 and manager.slots.limit == 3
+
+
+def test_generate_records_throughput(start_ollama):
+    manager = LocalLLMManager(url=start_ollama(2), model='codellama')
+    manager.prepare()
+    
+    data = manager.generate("a red cube", max_tokens=5)
+    
+    assert data['done_reason'] == 'length'
+    [metrics] = manager.recent_metrics()[-1:]
+    assert metrics['output_tokens'] == 5
+    assert metrics['tokens_per_second'] == pytest.approx(100, rel=0.01)
+    status = manager.status()
+    assert [model['name'] for model in status['loaded']] == ['codellama:latest']
+    assert manager.slots.active == 0
\ No newline at end of file
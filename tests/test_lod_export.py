@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+
+from config import Config
+from lod_export import LodExporter, parse_levels
+
+# The stand-in's scene is empty; give it one mesh for the LOD snippet to find
+SCENE = """
+import bpy
+cube = bpy.data.objects['Cube']
+cube.type = 'MESH'
+bpy.context.scene.objects = [cube]
+"""
+
+
+def test_parse_levels():
+    assert parse_levels(" collapse:0.5, planar:10,") == [('collapse', 0.5), ('planar', 10.0)]
+    for text in ("shrink:0.5", "collapse:half", "collapse:1.5", "planar:200"):
+        with pytest.raises(ValueError):
+            parse_levels(text)
+
+
+def test_build_lod_code_falls_back_to_files_for_formats_without_nodes(config):
+    exporter = LodExporter(levels="collapse:0.5,planar:10", mode='nodes')
+    
+    code = exporter.build_lod_code(Path("model.obj"), 'OBJ')
+    
+    compile(code, '<lod>', 'exec')
+    assert code.rstrip().endswith(
+        "_blender_ai_export_lods(r\"model.obj\", 'obj', [('collapse', 0.5), ('planar', 10.0)], 'files', "
+        f"{Config.EXPORT_LOD_MIN_TRIANGLES})"
+    )
+    assert ", 'nodes', " in exporter.build_lod_code(Path("model.glb"), 'gltf')
+
+
+def test_describe():
+    base = {'level': 0, 'method': None, 'value': None, 'objects': 2, 'triangles': 12000, 'seconds': 0.25}
+    
+    assert LodExporter.describe(dict(base, path=None, bytes=None)) == "LOD0 (modifiers applied): 12,000 triangles in 0.2s"
+    assert LodExporter.describe(dict(base, level=2, method='collapse', value=0.25, triangles=3000, path="m_lod2.obj", bytes=2**20)) == (
+        "LOD2 (collapse 0.25): 3,000 triangles in 0.2s -> m_lod2.obj (1.00 MB)"
+    )
+    assert LodExporter.describe(dict(base, level=None, objects=6, triangles=None, path="m_lods.glb", bytes=None, seconds=1.5)) == (
+        "LOD chain: 6 objects in 1.5s -> m_lods.glb"
+    )
+
+
+@pytest.mark.parametrize("export_format, mode, names", [
+    ('obj', 'files', ["{stem}_lod1.obj", "{stem}_lod2.obj"]),
+    ('gltf', 'nodes', ["{stem}_lods.gltf"]),
+])
+def test_lod_chain_is_exported_and_reported(app, monkeypatch, export_format, mode, names):
+    monkeypatch.setattr(Config, 'EXPORT_FORMAT', export_format)
+    monkeypatch.setattr(Config, 'EXPORT_LOD_MIN_TRIANGLES', 0)
+    executor = app.blender_executor
+    executor.lod_exporter = LodExporter(levels="collapse:0.5,planar:10", mode=mode)
+    
+    results = executor.execute_full_pipeline(SCENE, render=False, export=True, save=False, job_id="lods")
+    
+    assert results['success'], results['stderr']
+    export_path = Path(results['export_path'])
+    lods = results['lods']
+    assert [lod['level'] for lod in lods] == ([0, 1, 2] if mode == 'files' else [0, 1, 2, None])
+    assert [lod['method'] for lod in lods[1:3]] == ['collapse', 'planar']
+    written = [Path(lod['path']) for lod in lods[1:] if lod['path']]
+    assert written == [export_path.with_name(name.format(stem=export_path.stem)) for name in names]
+    assert all(path.exists() and lod['bytes'] for path, lod in zip(written, lods[-len(names):]))
+    roles = [row['role'] for row in executor.artifact_store.lineage("lods")]
+    assert roles.count('lod') == len(names)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import time
+
+import pytest
+
+from config import Config
+from material_baker import MaterialBaker
+
+MB = 1024 * 1024
+
+
+def add_bake(cache_dir, key: str, size_mb: float, age: float):
+    """Cached bake of `size_mb` whose index was last touched `age` seconds ago"""
+    entry_dir = cache_dir / key[:2] / key
+    entry_dir.mkdir(parents=True)
+    (entry_dir / "Base_Color.png").write_bytes(b"\0" * int(size_mb * MB))
+    index_path = entry_dir / "bake.json"
+    index_path.write_text('{"channels": []}')
+    os.utime(index_path, (time.time() - age, time.time() - age))
+    return entry_dir
+
+
+@pytest.fixture
+def baker(config):
+    return MaterialBaker()
+
+
+def test_prune_deletes_least_recently_used_bakes_first(baker):
+    oldest = add_bake(baker.cache_dir, "aa01", 1, age=300)
+    reused = add_bake(baker.cache_dir, "bb02", 1, age=200)
+    newest = add_bake(baker.cache_dir, "cc03", 1, age=100)
+    # Reusing a bake touches its index
+    os.utime(reused / "bake.json")
+    
+    assert baker.prune(max_mb=2.5) == 1
+    assert not oldest.exists()
+    assert reused.exists() and newest.exists()
+    assert baker.prune(max_mb=1.5) == 1
+    assert not newest.exists() and reused.exists()
+
+
+def test_prune_keeps_a_cache_within_its_limit(baker, monkeypatch):
+    add_bake(baker.cache_dir, "aa01", 1, age=300)
+    add_bake(baker.cache_dir, "bb02", 1, age=200)
+    
+    assert baker.prune(max_mb=3) == 0
+    assert baker.prune(max_mb=0) == 0
+    monkeypatch.setattr(Config, 'BAKE_CACHE_MAX_MB', 1.5)
+    assert baker.prune() == 1
+
+
+def test_prune_ignores_unfinished_bakes(baker):
+    # A bake still being written has no index yet
+    unfinished = baker.cache_dir / "dd" / "dd04"
+    unfinished.mkdir(parents=True)
+    (unfinished / "Base_Color.png").write_bytes(b"\0" * 2 * MB)
+    
+    assert baker.prune(max_mb=1) == 0
+    assert unfinished.exists()
+
+
+def test_runs_that_bake_prune_the_cache(app, monkeypatch):
+    monkeypatch.setattr(Config, 'BAKE_CACHE_MAX_MB', 1.5)
+    executor = app.blender_executor
+    stale = add_bake(executor.material_baker.cache_dir, "aa01", 1, age=300)
+    fresh = add_bake(executor.material_baker.cache_dir, "bb02", 1, age=0)
+    # The stand-in's scene has no meshes to bake, so the script reports one itself
+    script = (
+        "import bpy\n"
+        "print('Material bake: {\"material\": \"Wood\", \"status\": \"baked\", \"detail\": \"Base Color\", \"seconds\": 1.5}')\n"
+    )
+    
+    results = executor.execute_full_pipeline(script, render=False, export=False, save=False, job_id="baked", bake=True)
+    
+    assert results['success'], results['stderr']
+    assert [MaterialBaker.describe(event) for event in results['bakes']] == ["Baked Wood: Base Color (1.5s)"]
+    assert not stale.exists() and fresh.exists()
+
+
+def test_describe():
+    event = {'material': 'Wood', 'status': 'cached', 'detail': 'Base Color, Roughness', 'seconds': 0.04}
+    
+    assert MaterialBaker.describe(event) == "Reused baked Wood: Base Color, Roughness (0.0s)"
+    assert MaterialBaker.describe(dict(event, status='skipped', detail="Cube has mirror modifier")) == (
+        "Not baked: Wood (Cube has mirror modifier)"
+    )
\ No newline at end of file
@@ -0,0 +1,75 @@
+from output_parser import BlenderOutputParser
+
+
+def feed(*lines, stream='stderr'):
+    parser = BlenderOutputParser()
+    events = []
+    for line in lines:
+        events.extend(parser.feed(line, stream))
+    return events
+
+
+def test_render_progress():
+    events = feed("Fra:1 Mem:12.00M (Peak 15.00M) | Time:00:01.50 | Remaining:00:10.00 | Sample 32/128", stream='stdout')
+    
+    assert events == [{
+        'type': 'progress',
+        'frame': 1,
+        'sample': 32,
+        'total_samples': 128,
+        'fraction': 0.25,
+        'elapsed': 1.5,
+        'remaining': 10.0,
+        'peak_memory_mb': 15.0,
+        'status': 'Sample 32/128',
+    }]
+
+
+def test_uncaught_error_in_the_script_is_fatal():
+    events = feed(
+        "Traceback (most recent call last):",
+        '  File "<string>", line 4, in <module>',
+        '  File "<blender_ai>", line 12, in <module>',
+        '  File "<blender_ai>", line 7, in build',
+        "ValueError: bad size",
+    )
+    
+    assert len(events) == 1
+    assert events[0]['exception'] == 'ValueError'
+    assert events[0]['message'] == 'bad size'
+    assert events[0]['line_number'] == 7
+    assert events[0]['fatal']
+
+
+def test_traceback_printed_by_the_script_is_not_fatal():
+    events = feed(
+        "Traceback (most recent call last):",
+        '  File "<blender_ai>", line 20, in <module>',
+        '  File "/opt/blender/scripts/modules/bpy/ops.py", line 109, in __call__',
+        "RuntimeError: Error: Object not found",
+    )
+    
+    assert events[0]['line_number'] == 20
+    assert not events[0]['fatal']
+
+
+def test_add_on_traceback_is_not_fatal():
+    events = feed(
+        "Error: Python: Traceback (most recent call last):",
+        '  File "/home/user/.config/blender/addons/tool.py", line 3, in register',
+        "ImportError: No module named 'numpy'",
+    )
+    
+    assert events[0]['exception'] == 'ImportError'
+    assert events[0]['line_number'] is None
+    assert not events[0]['fatal']
+
+
+def test_artifact_and_cache_markers():
+    events = feed("Rendered to: /tmp/render.png", "Render cache hit: scene", "Saved: '/tmp/scene.blend'", stream='stdout')
+    
+    assert events == [
+        {'type': 'artifact', 'kind': 'rendered', 'path': '/tmp/render.png'},
+        {'type': 'cache_hit', 'kind': 'scene'},
+        {'type': 'saved', 'path': '/tmp/scene.blend'},
+    ]
\ No newline at end of file
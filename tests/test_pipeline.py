@@ -0,0 +1,79 @@
+import asyncio
+
+from config import Config
+from pipeline import Pipeline, PipelineJob
+
+
+def create_pipeline(app, **kwargs) -> Pipeline:
+    return Pipeline(
+        app.prompt_processor,
+        app.ai_generator,
+        app.code_validator,
+        app.blender_executor,
+        **kwargs
+    )
+
+
+def run(coroutine, timeout: float = 60):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout))
+
+
+def test_job_runs_through_every_stage(app):
+    async def main():
+        async with create_pipeline(app) as pipeline:
+            return await pipeline.run_job(PipelineJob("a red cube", {'render': False, 'export': False, 'save': True}))
+            
+    results = run(main())
+    
+    assert results['success'], results
+    assert results['attempts'] == 1
+    assert set(results['timings']) >= {'process', 'generate', 'validate', 'assemble', 'execute'}
+
+
+def test_failing_generation_retries_without_filling_its_own_queue(app, llm, monkeypatch):
+    monkeypatch.setattr(Config, 'ROUTER_MAX_RETRIES', 0)
+    monkeypatch.setattr(Config, 'MAX_RETRIES', 3)
+    llm.fail_rate = 1.0
+    jobs = [PipelineJob(f"a red cube number {index}") for index in range(8)]
+    
+    async def main():
+        # One generate worker and a one-slot queue: retries that waited for
+        # space in the generate queue would block the only worker for good
+        async with create_pipeline(app, concurrency={'generate': 1}, queue_size=1) as pipeline:
+            return await pipeline.run_many(jobs)
+            
+    results = run(main())
+    
+    assert len(results) == len(jobs)
+    assert all(not result['success'] for result in results)
+    assert all(result['attempts'] == 3 for result in results)
+
+
+def test_cancel_stops_a_job_during_generation(app, llm):
+    llm.latency = 5.0
+    events = []
+    job = PipelineJob("a red cube", on_event=events.append)
+    
+    async def main():
+        async with create_pipeline(app) as pipeline:
+            run_job = asyncio.ensure_future(pipeline.run_job(job))
+            while not any(event['type'] == 'generating' for event in events):
+                await asyncio.sleep(0.01)
+            assert pipeline.cancel(job.job_id)
+            return await run_job
+            
+    results = run(main(), timeout=4)
+    
+    assert not results['success']
+    assert results['cancelled']
+
+
+def test_cancel_of_a_finished_job_is_refused(app):
+    async def main():
+        async with create_pipeline(app) as pipeline:
+            job = PipelineJob("a red cube", {'render': False, 'export': False, 'save': False})
+            await pipeline.submit(job)
+            await job.future
+            return pipeline.cancel(job.job_id)
+            
+    assert run(main()) is False
\ No newline at end of file
@@ -0,0 +1,102 @@
+import pytest
+
+from config import Config
+from provider_router import ProviderRouter, ProviderError, CircuitBreaker, Completion
+
+ARGS = ("a red cube", "system", 0.2, 100, '')
+
+
+class Scripted:
+    """Provider call that raises or answers from a list of outcomes"""
+    
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        
+    def __call__(self, *args) -> Completion:
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return Completion(outcome)
+
+
+@pytest.fixture
+def router(config, monkeypatch):
+    monkeypatch.setattr(Config, 'ROUTER_MAX_RETRIES', 2)
+    monkeypatch.setattr(Config, 'ROUTER_BACKOFF_BASE', 0.0)
+    monkeypatch.setattr(Config, 'ROUTER_HEDGE', False)
+    monkeypatch.setattr(Config, 'ROUTER_BREAKER_FAILURES', 2)
+    monkeypatch.setattr(Config, 'ROUTER_BREAKER_RESET_SECONDS', 60)
+    return ProviderRouter()
+
+
+def overloaded():
+    return ProviderError('primary', 'overloaded', status=529, retryable=True)
+
+
+def test_retryable_errors_are_retried(router):
+    call = Scripted(overloaded(), "import bpy")
+    router.add_provider('primary', call)
+    
+    assert router.generate(*ARGS).text == "import bpy"
+    assert call.calls == 2
+
+
+def test_bad_request_is_not_retried(router):
+    call = Scripted(ProviderError('primary', 'bad request', status=400))
+    router.add_provider('primary', call)
+    
+    with pytest.raises(ProviderError):
+        router.generate(*ARGS)
+    assert call.calls == 1
+    assert router.providers['primary'].breaker.state == 'closed'
+
+
+def test_open_circuit_fails_over_to_the_next_provider(router):
+    primary = Scripted(overloaded())
+    router.add_provider('primary', primary)
+    router.add_provider('fallback', Scripted("import bpy"))
+    
+    assert router.generate(*ARGS).text == "import bpy"
+    assert router.providers['primary'].breaker.state == 'open'
+    
+    calls = primary.calls
+    assert router.generate(*ARGS).text == "import bpy"
+    assert primary.calls == calls
+
+
+def test_rejected_trial_request_closes_the_circuit(router):
+    call = Scripted(overloaded())
+    router.add_provider('primary', call)
+    breaker = router.providers['primary'].breaker
+    with pytest.raises(ProviderError):
+        router.generate(*ARGS)
+    assert breaker.state == 'open'
+    
+    # The trial after the reset timeout is rejected as a bad request:
+    # the provider is up, so later requests must go through again
+    breaker.opened_at -= Config.ROUTER_BREAKER_RESET_SECONDS
+    call.outcomes = [ProviderError('primary', 'bad request', status=400)]
+    with pytest.raises(ProviderError):
+        router.generate(*ARGS)
+    call.outcomes = ["import bpy"]
+    
+    assert router.generate(*ARGS).text == "import bpy"
+    assert breaker.state == 'closed'
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+    assert not breaker.allow()
+    
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_failure()
+    breaker.reset_timeout = 60
+    assert breaker.state == 'open'
+    assert not breaker.allow()
@@ -0,0 +1,129 @@
+import types
+
+import pytest
+
+from render_cache import SCENE_HASH_CODE
+
+
+class Struct:
+    """Minimal bpy struct: bl_rna lists its attributes with RNA property types"""
+    
+    def __init__(self, **values):
+        self.__dict__.update(values)
+    
+    @property
+    def bl_rna(self):
+        def kind(value):
+            if isinstance(value, bool):
+                return 'BOOLEAN'
+            if isinstance(value, int):
+                return 'INT'
+            if isinstance(value, (float, tuple)):
+                return 'FLOAT'
+            if isinstance(value, str):
+                return 'ENUM'
+            if isinstance(value, list):
+                return 'COLLECTION'
+            return 'POINTER'
+        properties = [types.SimpleNamespace(identifier=name, type=kind(value)) for name, value in self.__dict__.items()]
+        return types.SimpleNamespace(properties=properties)
+
+
+class ID(Struct):
+    pass
+
+
+class NodeTree(ID):
+    pass
+
+
+class Image(ID):
+    pass
+
+
+class Object(ID):
+    pass
+
+
+class Values(list):
+    """Mesh element collection with foreach_get over flat per-element values"""
+    
+    def __init__(self, count: int, **fields):
+        super().__init__(range(count))
+        self.fields = fields
+    
+    def foreach_get(self, name, target):
+        target[:] = type(target)(target.typecode, self.fields[name]) if hasattr(target, 'typecode') else self.fields[name]
+
+
+class Mesh:
+    """Evaluated single-triangle mesh"""
+    
+    def __init__(self, smooth=True, uv=(0.0, 0.0)):
+        self.vertices = Values(3, co=[0.0, 0.0, 0.0] * 3)
+        self.loops = Values(3, vertex_index=[0, 1, 2])
+        self.polygons = Values(1, material_index=[0], use_smooth=[smooth])
+        self.corner_normals = Values(3, vector=[0.0, 0.0, 1.0] * 3)
+        self.uv_layers = [types.SimpleNamespace(name='UVMap', active_render=True, data=Values(3, uv=list(uv) * 3))]
+        self.color_attributes = []
+
+
+def scene_hash(math_operation='ADD', smooth=True, uv=(0.0, 0.0), hide_render=False, spot_size=0.8, view_transform='AgX', name='Cube'):
+    """Hash a scene with one mesh using a material with a Math node, and one spot light"""
+    node = Struct(bl_idname='ShaderNodeMath', mute=False, operation=math_operation, use_clamp=False, inputs=[], name=name)
+    tree = NodeTree(name_full='Shader Nodetree', nodes=[node], links=[])
+    material = ID(name_full=f"{name} Material", node_tree=tree, blend_method='OPAQUE')
+    slot = types.SimpleNamespace(material=material, link='OBJECT')
+    
+    mesh = Mesh(smooth, uv)
+    cube = Object(name_full=name, type='MESH', hide_render=hide_render, material_slots=[slot])
+    cube.to_mesh = lambda: mesh
+    cube.to_mesh_clear = lambda: None
+    light = Object(name_full='Light', type='LIGHT', hide_render=False, material_slots=[])
+    light.data = ID(name_full='Light', type='SPOT', energy=1000.0, shadow_soft_size=0.25, spot_size=spot_size)
+    
+    identity = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+    instances = [types.SimpleNamespace(object=obj, matrix_world=identity) for obj in (cube, light)]
+    scene = types.SimpleNamespace(
+        camera=None,
+        frame_current=1,
+        render=Struct(engine='CYCLES', resolution_x=1920, resolution_y=1080, filepath=f"/tmp/{name}.png"),
+        view_settings=Struct(view_transform=view_transform, look='None', exposure=0.0),
+        display_settings=Struct(display_device='sRGB'),
+        sequencer_colorspace_settings=Struct(name='sRGB'),
+        cycles=Struct(samples=128),
+        world=ID(name_full='World', use_nodes=False, color=(0.05, 0.05, 0.05)),
+    )
+    bpy = types.SimpleNamespace(
+        app=types.SimpleNamespace(version=(4, 2, 0)),
+        types=types.SimpleNamespace(ID=ID, Image=Image, NodeTree=NodeTree, Object=Object),
+        context=types.SimpleNamespace(
+            scene=scene,
+            view_layer=Struct(use_pass_z=False),
+            evaluated_depsgraph_get=lambda: types.SimpleNamespace(object_instances=instances)
+        ),
+    )
+    namespace = {'bpy': bpy}
+    exec(SCENE_HASH_CODE, namespace)
+    return namespace['_blender_ai_scene_hash']()
+
+
+def test_scene_hash_is_stable():
+    assert scene_hash() is not None
+    assert scene_hash() == scene_hash()
+
+
+def test_scene_hash_ignores_names_and_output_paths():
+    assert scene_hash(name='Box') == scene_hash()
+
+
+@pytest.mark.parametrize("change", [
+    {'math_operation': 'MULTIPLY'},
+    {'smooth': False},
+    {'uv': (0.5, 0.5)},
+    {'hide_render': True},
+    {'spot_size': 1.2},
+    {'view_transform': 'Standard'},
+])
+def test_scene_hash_covers_what_changes_the_image(change):
+    assert scene_hash(**change) != scene_hash()
\ No newline at end of file
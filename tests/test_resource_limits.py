@@ -0,0 +1,79 @@
+import os
+import signal
+import asyncio
+
+import pytest
+
+from resource_limits import ResourceLimits, PeakRSSMonitor
+
+posix_only = pytest.mark.skipif(os.name != 'posix', reason="process groups and rlimits are POSIX-only")
+
+
+@posix_only
+def test_no_preexec_fn_without_limits_to_apply():
+    limits = ResourceLimits(memory_mb=0, cpu_seconds=0, cgroup_root='', cpus=[0])
+    
+    assert limits.subprocess_kwargs() == {'start_new_session': True}
+
+
+@posix_only
+def test_rlimits_are_applied_before_exec():
+    limits = ResourceLimits(memory_mb=4096, cpu_seconds=0, cgroup_root='')
+    
+    kwargs = limits.subprocess_kwargs()
+    
+    assert kwargs['start_new_session']
+    assert callable(kwargs['preexec_fn'])
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason="needs sched_setaffinity")
+def test_attach_pins_the_started_process():
+    cpu = min(os.sched_getaffinity(0))
+    limits = ResourceLimits(memory_mb=0, cpu_seconds=0, cgroup_root='', cpus=[cpu])
+    
+    async def main():
+        process = await asyncio.create_subprocess_exec('sleep', '5', **limits.subprocess_kwargs())
+        try:
+            limits.attach(process.pid)
+            return os.sched_getaffinity(process.pid)
+        finally:
+            limits.kill_group(process)
+            await process.wait()
+            
+    assert asyncio.run(main()) == {cpu}
+
+
+def test_monitor_reads_the_job_cgroup(tmp_path):
+    (tmp_path / "memory.current").write_text(str(300 * 1024 * 1024))
+    hits = []
+    monitor = PeakRSSMonitor(os.getpid(), interval=0.01, limit_mb=200, on_limit=lambda: hits.append(1), cgroup_path=tmp_path)
+    
+    async def main():
+        task = asyncio.ensure_future(monitor.run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        
+    asyncio.run(main())
+    
+    assert monitor.finalize() == pytest.approx(300)
+    assert monitor.limit_hit and hits == [1]
+
+
+@pytest.mark.skipif(not os.path.exists('/proc'), reason="needs /proc")
+def test_monitor_sums_the_process_group():
+    assert PeakRSSMonitor(os.getpgrp()).sample() > 0
+
+
+def test_unsampled_peak_is_unknown():
+    # Not the RUSAGE_CHILDREN high-water mark of some other job
+    assert PeakRSSMonitor(os.getpid()).finalize() is None
+
+
+@posix_only
+def test_classify_exit_recognizes_cpu_limit():
+    limits = ResourceLimits(memory_mb=0, cpu_seconds=10, cgroup_root='')
+    
+    assert limits.classify_exit(-signal.SIGXCPU, None, "") == 'cpu'
+    assert limits.classify_exit(-signal.SIGKILL, None, "", killed=False) == 'cpu'
+    assert limits.classify_exit(-signal.SIGKILL, None, "", killed=True) is None
+    assert limits.classify_exit(0, None, "") is None
\ No newline at end of file
@@ -0,0 +1,95 @@
+import asyncio
+import types
+from pathlib import Path
+
+from pipeline import PipelineJob
+from single_flight import SingleFlight
+from tests.test_pipeline import create_pipeline, run
+
+
+def job(name: str):
+    return types.SimpleNamespace(job_id=name, flight=None)
+
+
+def test_followers_receive_the_leaders_outcome():
+    async def main():
+        flights = SingleFlight()
+        leader, follower = job("a"), job("b")
+        
+        assert flights.join('generate', "key", leader) is None
+        flight = flights.join('generate', "key", follower)
+        assert flight.leader is leader
+        # Other stages and keys don't coalesce
+        assert flights.join('validate', "key", follower) is None
+        assert flights.join('generate', None, follower) is None
+        
+        flights.land(leader, 'generate', {'next': 'validate', 'state': {'results': None}})
+        return flights, await flight.future
+        
+    flights, outcome = asyncio.run(main())
+    
+    assert outcome['next'] == 'validate'
+    stats = flights.stats()
+    assert stats['generate'] == {'led': 1, 'coalesced': 1, 'failed': 0, 'abandoned': 0}
+    assert stats['in_flight'] == 1
+    assert SingleFlight.describe(stats) == "generate 1"
+
+
+def test_failures_and_abandoned_flights_are_counted():
+    async def main():
+        flights = SingleFlight()
+        failed, cancelled = job("a"), job("b")
+        flights.join('execute', "render", failed)
+        flights.join('generate', "code", cancelled)
+        flights.land(failed, 'execute', {'next': None, 'state': {'results': {'success': False}}})
+        flights.land(cancelled, 'generate', {'abandoned': True})
+        # Only the leader of the stage it is in can land a flight
+        flights.land(job("c"), 'generate', {'next': 'validate'})
+        return flights.stats()
+        
+    stats = asyncio.run(main())
+    
+    assert stats['execute']['failed'] == 1
+    assert stats['generate']['abandoned'] == 1
+    assert stats['in_flight'] == 0
+
+
+def test_identical_jobs_share_one_generation(app, llm):
+    llm.latency = 0.2
+    options = {'render': False, 'export': False, 'save': False}
+    jobs = [PipelineJob("a red cube", options) for _ in range(3)]
+    
+    async def main():
+        async with create_pipeline(app) as pipeline:
+            results = await pipeline.run_many(jobs)
+            return results, pipeline.flights.stats()
+            
+    results, stats = run(main())
+    
+    assert all(result['success'] for result in results), results
+    assert llm.calls == 1
+    assert stats['generate']['coalesced'] == 2
+    assert sum('coalesced_with' in result for result in results) == 2
+
+def test_follower_outputs_follow_its_own_plan(app, config):
+    executor = app.blender_executor
+    # The leader's id also appears in the output directory's name
+    leader = executor.prepare_pipeline("import bpy\n", render=True, export=True, save=True, persist=False, job_id="out")
+    results = dict(leader['results'], success=True)
+    export_path = Path(results['export_path'])
+    lod_path = export_path.with_name(f"{export_path.stem}_lod1{export_path.suffix}")
+    for path, content in ((results['render_path'], b"png"), (export_path, b"model"), (results['blend_path'], b"blend"), (lod_path, b"lod")):
+        Path(path).write_bytes(content)
+    results['lods'] = [{'level': 1, 'path': str(lod_path)}]
+    follower = executor.prepare_pipeline("import bpy\n", render=True, export=True, save=True, persist=False, job_id="copy")
+    
+    adopted = executor.adopt_results(results, "out", follower)
+    
+    stored = {row['role']: row['sha256'] for row in executor.artifact_store.lineage("copy")}
+    for role, content in (('render', b"png"), ('export', b"model"), ('blend', b"blend")):
+        assert adopted[f"{role}_path"] == follower['results'][f"{role}_path"]
+        assert Path(adopted[f"{role}_path"]).exists()
+        assert executor.artifact_store.read(stored[role]) == content
+    follower_export = Path(follower['results']['export_path'])
+    assert adopted['lods'][0]['path'] == str(follower_export.with_name(f"{follower_export.stem}_lod1{follower_export.suffix}"))
+    assert Path(adopted['lods'][0]['path']).read_bytes() == b"lod"
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import split_render
+from split_render import SplitRenderer
+
+# The stand-in has no NumPy to stitch with; the first tile stands in for the image
+STITCH_CODE = '''
+import shutil
+
+def _blender_ai_split_stitch(tiles, render_path):
+    shutil.copyfile(tiles[0]['path'], render_path)
+    print("Rendered to: " + render_path)
+'''
+
+
+def worker_code(broken: str) -> str:
+    """Worker snippet whose second worker runs `broken` instead of rendering"""
+    return split_render.WORKER_CODE + f'''
+_render_tile = _blender_ai_split_worker
+
+def _blender_ai_split_worker(index, *args):
+    if index == 1:
+        {broken}
+    return _render_tile(index, *args)
+'''
+
+
+@pytest.fixture
+def renderer(app, monkeypatch):
+    monkeypatch.setattr(split_render, 'STITCH_CODE', STITCH_CODE)
+    return SplitRenderer(app.blender_executor, workers=3, mode='regions')
+
+
+def render(renderer, config, job_id="split"):
+    blend = config.BLEND_FILES_DIR / f"{job_id}.blend"
+    blend.write_bytes(b"BLENDER-v500")
+    render_path = config.RENDERS_DIR / f"{job_id}.png"
+    events = []
+    outcome = asyncio.run(renderer.render_async(blend, render_path, job_id, timeout=30, on_event=events.append))
+    return outcome, render_path, events
+
+
+def test_tiles_are_stitched_and_the_speedup_reported(renderer, config):
+    outcome, render_path, events = render(renderer, config)
+    
+    assert outcome['success'], outcome
+    summary = outcome['split_render']
+    assert summary['workers'] == 3 and summary['mode'] == 'regions'
+    assert len(summary['worker_seconds']) == 3
+    assert summary['speedup'] == pytest.approx(sum(summary['worker_seconds']) / summary['wall_seconds'], abs=0.01)
+    assert summary['efficiency'] == pytest.approx(summary['speedup'] / 3, abs=0.01)
+    assert events[-1] == dict(summary, type='split_render')
+    assert render_path.exists()
+    assert not (render_path.parent / "split_split").exists()
+
+
+def test_failed_worker_fails_the_render(renderer, config, monkeypatch):
+    monkeypatch.setattr(split_render, 'WORKER_CODE', worker_code("raise RuntimeError('worker 1 crashed')"))
+    
+    outcome, render_path, events = render(renderer, config)
+    
+    assert not outcome['success']
+    assert outcome['error'].startswith("Split render failed:")
+    assert "worker 1 crashed" in outcome['error']
+    assert not render_path.exists()
+    assert not any(event['type'] == 'split_render' for event in events)
+    assert not (render_path.parent / "split_split").exists()
+
+
+def test_missing_tile_fails_the_render(renderer, config, monkeypatch):
+    monkeypatch.setattr(split_render, 'WORKER_CODE', worker_code("return"))
+    
+    outcome, render_path, _ = render(renderer, config)
+    
+    assert outcome == {'success': False, 'error': "Split render failed: A worker finished without writing its tile"}
+    assert not render_path.exists()
+
+
+def test_pipeline_renders_through_the_split_and_removes_its_scene(app, config, monkeypatch):
+    monkeypatch.setattr(split_render, 'STITCH_CODE', STITCH_CODE)
+    executor = app.blender_executor
+    executor.split_renderer = SplitRenderer(executor, workers=2, mode='samples')
+    executor.render_cache = None
+    
+    results = executor.execute_full_pipeline("import bpy\n", render=True, export=False, save=False, job_id="split")
+    
+    assert results['success'], results['stderr']
+    # The stand-in's engine isn't Cycles, so sample shares fall back to bands
+    assert results['split_render']['mode'] == 'regions'
+    assert Path(results['render_path']).exists()
+    assert not (config.BLEND_FILES_DIR / "split_split.blend").exists()
+
+
+def test_describe():
+    summary = {'workers': 4, 'mode': 'samples', 'wall_seconds': 12.34, 'speedup': 3.1, 'efficiency': 0.775}
+    
+    assert SplitRenderer.describe(summary) == "Split render: 4 workers (samples), 12.3s wall, ~3.1x speedup (78% efficiency)"
+    assert SplitRenderer.describe(dict(summary, speedup=None)) == "Split render: 4 workers (samples), 12.3s wall"
\ No newline at end of file
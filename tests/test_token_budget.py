@@ -0,0 +1,71 @@
+import pytest
+
+from config import Config
+from token_budget import TokenBudget
+
+SIMPLE = {'category': 'object', 'complexity': 'simple'}
+
+
+def test_limit_starts_from_complexity_and_respects_the_ceiling(config):
+    budget = TokenBudget()
+    
+    assert budget.max_tokens(SIMPLE, ceiling=4000) == TokenBudget.DEFAULTS['simple']
+    assert budget.max_tokens({'category': 'scene', 'complexity': 'complex'}, ceiling=4000) == 4000
+    assert budget.max_tokens(SIMPLE, ceiling=1000) == 1000
+    assert budget.max_tokens(None, ceiling=4000) == 4000
+
+
+def test_limit_follows_the_p95_of_recorded_output(config, monkeypatch):
+    monkeypatch.setattr(Config, 'TOKEN_BUDGET_MIN_SAMPLES', 20)
+    monkeypatch.setattr(Config, 'TOKEN_BUDGET_HEADROOM', 1.5)
+    monkeypatch.setattr(Config, 'TOKEN_BUDGET_MIN', 100)
+    budget = TokenBudget()
+    for tokens in range(100, 2100, 100):
+        budget.record(SIMPLE, tokens, budgeted=1500, truncated=tokens > 1500, continuations=int(tokens > 1500))
+        
+    # p95 of 100..2000 is 1900
+    assert budget.max_tokens(SIMPLE, ceiling=8000) == 2850
+    assert budget.max_tokens(SIMPLE, ceiling=2000) == 2000
+
+
+def test_statistics_persist_and_report_truncation(config):
+    budget = TokenBudget()
+    budget.record(SIMPLE, 1800, budgeted=1500, truncated=True, continuations=1)
+    budget.record(SIMPLE, 600, budgeted=1500, truncated=False, continuations=0)
+    
+    [row] = TokenBudget().report()
+    
+    assert row['profile'] == 'object/simple'
+    assert row['requests'] == 2
+    assert row['output_tokens'] == 2400
+    assert row['truncation_rate'] == pytest.approx(0.5)
+    assert row['continuations'] == 1
+
+
+def test_corrupt_statistics_start_empty(config):
+    Config.TOKEN_BUDGET_FILE.write_text("{not json", encoding='utf-8')
+    
+    assert TokenBudget().report() == []
+
+
+@pytest.mark.parametrize("text, reported, expected", [
+    ("```python\nimport bpy\n```", None, False),
+    ("```python\nimport bpy\n", None, True),
+    ("```python\nimport bpy\n```", True, True),
+    ("```python\nimport bpy\n", False, False),
+])
+def test_truncation_prefers_the_stop_reason(text, reported, expected):
+    assert TokenBudget.is_truncated(text, reported) is expected
+
+def test_local_provider_has_its_own_ceiling(config, monkeypatch):
+    from local_llm import LocalLLMManager
+    
+    monkeypatch.setattr(Config, 'MAX_TOKENS', 8000)
+    monkeypatch.setattr(Config, 'LOCAL_LLM_MAX_TOKENS', 2000)
+    budget = TokenBudget()
+    complex_scene = {'category': 'scene', 'complexity': 'complex'}
+    
+    assert budget.max_tokens(complex_scene, provider='anthropic') == 8000
+    assert budget.max_tokens(complex_scene, provider='local') == 2000
+    # The server passes the budget through rather than capping it again
+    assert LocalLLMManager().options(3000)['num_predict'] == 3000
\ No newline at end of file
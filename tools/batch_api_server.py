@@ -0,0 +1,239 @@
+"""
+Local stand-in for the Anthropic Message Batches and OpenAI Batch APIs
+
+Accepts batches, "processes" them after a delay and answers every request
+with a small Blender script, so --batch-api runs can be tested without an
+API key or cost:
+
+    python tools/batch_api_server.py --port 8790 --delay 5
+    BATCH_API_ANTHROPIC_URL=http://127.0.0.1:8790 python src/main.py --batch prompts.txt --batch-api
+"""
+
+import json
+import time
+import uuid
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+SCRIPT = '''```python
+import bpy
+
+# {prompt}
+bpy.ops.object.select_all(action='SELECT')
+bpy.ops.object.delete()
+bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 1))
+bpy.ops.object.light_add(type='SUN', location=(4, -4, 6))
+bpy.ops.object.camera_add(location=(7, -7, 5), rotation=(1.1, 0, 0.785))
+bpy.context.scene.camera = bpy.context.object
+```'''
+
+
+class BatchState:
+    """Batches and files held in memory"""
+    
+    def __init__(self, delay: float, fail_every: int):
+        self.delay = delay
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.batches = {}
+        self.files = {}
+    
+    def answer(self, index: int, user_prompt: str):
+        """Script for one request, or None for a simulated failure"""
+        if self.fail_every and (index + 1) % self.fail_every == 0:
+            return None
+        return SCRIPT.format(prompt=user_prompt.splitlines()[0][:200] if user_prompt else '')
+    
+    def ended(self, batch: dict) -> bool:
+        return time.time() - batch['created'] >= self.delay
+
+
+class BatchAPIHandler(BaseHTTPRequestHandler):
+    """Both providers' batch endpoints on one port"""
+    
+    state = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status: int, payload, content_type: str = 'application/json'):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+    
+    def _parts(self):
+        return [part for part in urlparse(self.path).path.split('/') if part]
+    
+    def do_POST(self):
+        parts = self._parts()
+        state = self.state
+        
+        if parts == ['v1', 'messages', 'batches']:
+            requests = json.loads(self._body())['requests']
+            batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+            with state.lock:
+                state.batches[batch_id] = {'kind': 'anthropic', 'created': time.time(), 'requests': requests}
+            return self._send(HTTPStatus.OK, self._anthropic_batch(batch_id))
+            
+        if parts == ['v1', 'files']:
+            content_type = self.headers.get('Content-Type', '')
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + self._body()
+            )
+            data = next(
+                part.get_payload(decode=True) for part in message.iter_parts()
+                if part.get_param('name', header='content-disposition') == 'file'
+            )
+            file_id = f"file-{uuid.uuid4().hex[:24]}"
+            with state.lock:
+                state.files[file_id] = data
+            return self._send(HTTPStatus.OK, {'id': file_id, 'object': 'file', 'purpose': 'batch'})
+            
+        if parts == ['v1', 'batches']:
+            body = json.loads(self._body())
+            with state.lock:
+                lines = state.files[body['input_file_id']].decode('utf-8').splitlines()
+                batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+                state.batches[batch_id] = {
+                    'kind': 'openai',
+                    'created': time.time(),
+                    'requests': [json.loads(line) for line in lines if line.strip()],
+                }
+            return self._send(HTTPStatus.OK, self._openai_batch(batch_id))
+            
+        self._send(HTTPStatus.NOT_FOUND, {'error': {'message': 'Not found'}})
+    
+    def do_GET(self):
+        parts = self._parts()
+        state = self.state
+        
+        if parts[:3] == ['v1', 'messages', 'batches'] and len(parts) in (4, 5):
+            if parts[3] not in state.batches:
+                return self._send(HTTPStatus.NOT_FOUND, {'error': {'message': 'No such batch'}})
+            if len(parts) == 4:
+                return self._send(HTTPStatus.OK, self._anthropic_batch(parts[3]))
+            return self._send(HTTPStatus.OK, self._anthropic_results(parts[3]), 'application/x-jsonl')
+            
+        if parts[:2] == ['v1', 'batches'] and len(parts) == 3:
+            if parts[2] not in state.batches:
+                return self._send(HTTPStatus.NOT_FOUND, {'error': {'message': 'No such batch'}})
+            return self._send(HTTPStatus.OK, self._openai_batch(parts[2]))
+            
+        if parts[:2] == ['v1', 'files'] and len(parts) == 4 and parts[3] == 'content':
+            with state.lock:
+                data = state.files.get(parts[2])
+            if data is None:
+                return self._send(HTTPStatus.NOT_FOUND, {'error': {'message': 'No such file'}})
+            return self._send(HTTPStatus.OK, data, 'application/jsonl')
+            
+        self._send(HTTPStatus.NOT_FOUND, {'error': {'message': 'Not found'}})
+    
+    def _anthropic_batch(self, batch_id: str) -> dict:
+        batch = self.state.batches[batch_id]
+        ended = self.state.ended(batch)
+        total = len(batch['requests'])
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {
+                'processing': 0 if ended else total,
+                'succeeded': total if ended else 0,
+                'errored': 0,
+                'canceled': 0,
+                'expired': 0,
+            },
+            'results_url': f"http://{self.headers['Host']}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+    
+    def _anthropic_results(self, batch_id: str) -> bytes:
+        lines = []
+        for index, request in enumerate(self.state.batches[batch_id]['requests']):
+            text = self.state.answer(index, request['params']['messages'][-1]['content'])
+            if text is None:
+                result = {'type': 'errored', 'error': {'type': 'overloaded_error', 'message': 'Simulated failure'}}
+            else:
+                result = {
+                    'type': 'succeeded',
+                    'message': {
+                        'role': 'assistant',
+                        'content': [{'type': 'text', 'text': text}],
+                        'stop_reason': 'end_turn',
+                        'usage': {'output_tokens': len(text) // 4},
+                    },
+                }
+            lines.append(json.dumps({'custom_id': request['custom_id'], 'result': result}))
+        return '\n'.join(lines).encode('utf-8')
+    
+    def _openai_batch(self, batch_id: str) -> dict:
+        batch = self.state.batches[batch_id]
+        ended = self.state.ended(batch)
+        total = len(batch['requests'])
+        output_file_id = None
+        if ended:
+            with self.state.lock:
+                if 'output_file_id' not in batch:
+                    batch['output_file_id'] = f"file-{uuid.uuid4().hex[:24]}"
+                    self.state.files[batch['output_file_id']] = self._openai_results(batch)
+            output_file_id = batch['output_file_id']
+        return {
+            'id': batch_id,
+            'object': 'batch',
+            'status': 'completed' if ended else 'in_progress',
+            'request_counts': {'total': total, 'completed': total if ended else 0, 'failed': 0},
+            'output_file_id': output_file_id,
+            'error_file_id': None,
+        }
+    
+    def _openai_results(self, batch: dict) -> bytes:
+        lines = []
+        for index, request in enumerate(batch['requests']):
+            text = self.state.answer(index, request['body']['messages'][-1]['content'])
+            if text is None:
+                response = {'status_code': 500, 'body': {'error': {'message': 'Simulated failure'}}}
+            else:
+                response = {
+                    'status_code': 200,
+                    'body': {
+                        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                        'usage': {'completion_tokens': len(text) // 4},
+                    },
+                }
+            lines.append(json.dumps({'custom_id': request['custom_id'], 'response': response, 'error': None}))
+        return '\n'.join(lines).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for provider batch APIs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8790)
+    parser.add_argument('--delay', type=float, default=5.0, help='Seconds until a batch ends')
+    parser.add_argument('--fail-every', type=int, default=0, help='Fail every Nth request of a batch (0 = never)')
+    args = parser.parse_args()
+    
+    handler = type('BoundBatchAPIHandler', (BatchAPIHandler,), {'state': BatchState(args.delay, args.fail_every)})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"Batch API stand-in listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
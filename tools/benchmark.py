@@ -0,0 +1,488 @@
+"""
+Benchmarks for the orchestration layer
+
+Drives the real pipeline with recorded completions (tools/recorded_llm.py)
+and the Blender stand-in (tools/fake_blender.py), so throughput, latency
+and memory can be tracked without a GPU, Blender or an API key. Every
+suite gets a fresh working directory, so caches and histories start cold
+and runs are comparable:
+
+    python tools/benchmark.py                                  # all suites
+    python tools/benchmark.py --suite batch run --count 20 --llm-latency 1.5
+    python tools/benchmark.py --compare logs/benchmarks/baseline.json --tolerance 0.2
+    python tools/benchmark.py --record my_prompts.txt          # capture real completions
+
+Suites:
+    process   PromptProcessor.process
+    validate  CodeValidator.validate on the recorded completions
+    generate  AIGenerator.generate_code through the router
+    execute   BlenderExecutor.execute_full_pipeline on the recorded completions
+    run       BlenderAI.run, one prompt at a time
+    batch     BlenderAI.run_batch
+
+Results are written as JSON (logs/benchmarks/<timestamp>.json by
+default). --compare reports the change against an earlier result file
+and exits with status 1 if any suite lost more than --tolerance of its
+throughput or gained more than that in p95 latency or peak memory.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import contextlib
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Callable
+
+TOOLS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TOOLS_DIR.parent / "src"))
+sys.path.insert(0, str(TOOLS_DIR))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FAKE_BLENDER = TOOLS_DIR / ("fake_blender.cmd" if os.name == 'nt' else "fake_blender.py")
+
+# Config validates and sets up logging on import
+os.environ['BLENDER_PATH'] = str(FAKE_BLENDER)
+os.environ['LOG_TO_FILE'] = 'false'
+os.environ['LOG_LEVEL'] = 'ERROR'
+
+from config import Config
+from recorded_llm import RecordedLLM, record, RECORDINGS_FILE
+
+SUITES = ['process', 'validate', 'generate', 'execute', 'run', 'batch']
+RESULTS_DIR = Config.LOGS_DIR / "benchmarks"
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def peak_rss_mb(who) -> Optional[float]:
+    """Peak resident set size so far of this process or its largest child"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+class Measurement:
+    """Latencies and outcomes of one suite"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.succeeded = 0
+        self.failed = 0
+        self.extra = {}
+        self._started = None
+        self.wall_seconds = None
+        self.python_peak_mb = None
+    
+    def __enter__(self):
+        tracemalloc.start()
+        self._started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_seconds = time.perf_counter() - self._started
+        self.python_peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        return False
+    
+    def add(self, seconds: float, success: bool):
+        self.latencies.append(seconds)
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+    
+    def timed(self, fn: Callable, *args, **kwargs):
+        """Call fn, recording its latency and whether it succeeded"""
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.add(time.perf_counter() - started, False)
+            return e
+        success = result.get('success', True) if isinstance(result, dict) else bool(result)
+        self.add(time.perf_counter() - started, bool(success))
+        return result
+    
+    def summary(self) -> Dict[str, any]:
+        count = len(self.latencies)
+        return {
+            'count': count,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'wall_seconds': self.wall_seconds,
+            'throughput': count / self.wall_seconds if self.wall_seconds else None,
+            'latency': {
+                'mean': sum(self.latencies) / count if count else None,
+                'p50': percentile(self.latencies, 0.50),
+                'p95': percentile(self.latencies, 0.95),
+                'p99': percentile(self.latencies, 0.99),
+                'max': max(self.latencies) if count else None,
+            },
+            'memory': {
+                'python_peak_mb': self.python_peak_mb,
+                'process_rss_peak_mb': peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+                'child_rss_peak_mb': peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            },
+            **self.extra,
+        }
+
+
+def coerce(current, value: str):
+    """Convert a --set value to the type of the setting it replaces"""
+    if isinstance(current, bool):
+        return value.lower() == 'true'
+    if isinstance(current, int):
+        return int(value)
+    if isinstance(current, float):
+        return float(value)
+    if isinstance(current, Path):
+        return Path(value)
+    if isinstance(current, list):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return value
+
+
+def configure(workdir: Path, args: argparse.Namespace):
+    """Point Config at the stand-ins and a scratch directory"""
+    workdir.mkdir(parents=True, exist_ok=True)
+    output = workdir / "output"
+    generated = workdir / "generated"
+    settings = {
+        'AI_PROVIDER': 'local',
+        'AI_FALLBACK_PROVIDERS': [],
+        'LOCAL_LLM_WARMUP': False,
+        'BLENDER_PATH': str(FAKE_BLENDER),
+        'DEFAULT_MODE': 'background',
+        'LOG_LEVEL': args.log_level,
+        'LOG_TO_FILE': False,
+        'GENERATED_DIR': generated,
+        'ARCHIVE_DIR': generated / "archive",
+        'OUTPUT_DIR': output,
+        'RENDERS_DIR': output / "renders",
+        'MODELS_DIR': output / "models",
+        'BLEND_FILES_DIR': output / "blend_files",
+        'LOGS_DIR': workdir / "logs",
+        'TIMING_HISTORY_FILE': workdir / "logs" / "stage_timings.json",
+        'JOURNAL_FILE': workdir / "logs" / "job_journal.sqlite",
+        'TOKEN_BUDGET_FILE': workdir / "logs" / "token_budget.json",
+        'SERVICE_QUEUE_FILE': workdir / "logs" / "job_queue.sqlite",
+        'ARTIFACT_STORE_DIR': workdir / "store",
+    }
+    for assignment in args.set:
+        key, _, value = assignment.partition('=')
+        if not hasattr(Config, key):
+            raise SystemExit(f"Unknown setting in --set: {key}")
+        settings[key] = coerce(getattr(Config, key), value)
+        
+    for key, value in settings.items():
+        setattr(Config, key, value)
+    root = logging.getLogger()
+    root.setLevel(args.log_level)
+    for handler in root.handlers:
+        handler.setLevel(args.log_level)
+        
+    os.environ.update({
+        'FAKE_BLENDER_STARTUP': str(args.blender_startup),
+        'FAKE_BLENDER_OP_COST': str(args.blender_op_cost),
+        'FAKE_BLENDER_RENDER_SECONDS': str(args.blender_render),
+        'FAKE_BLENDER_FAIL_RATE': str(args.blender_fail_rate),
+        'FAKE_BLENDER_CRASH_RATE': str(args.blender_crash_rate),
+        'FAKE_BLENDER_SEED': str(args.seed),
+    })
+
+
+def create_app(llm: RecordedLLM):
+    """BlenderAI with the recorded LLM installed, printing into a buffer"""
+    from main import BlenderAI
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = BlenderAI()
+    llm.install(app.ai_generator)
+    return app
+
+
+def job_options(args: argparse.Namespace) -> Dict[str, any]:
+    return {'render': args.render, 'export': args.export, 'save': True}
+
+
+def bench_process(app, prompts: List[str], args, measurement: Measurement):
+    for _ in range(args.iterations):
+        for prompt in prompts:
+            measurement.timed(app.prompt_processor.process, prompt)
+
+
+def bench_validate(app, prompts: List[str], args, measurement: Measurement):
+    codes = [app.ai_generator._clean_code(recording['completion']) for recording in app_llm(app).recordings]
+    for _ in range(args.iterations):
+        for code in codes:
+            measurement.timed(lambda: app.code_validator.validate(code)[0])
+
+
+def bench_generate(app, prompts: List[str], args, measurement: Measurement):
+    processed = [app.prompt_processor.process(prompt) for prompt in prompts]
+    
+    def generate(item):
+        return measurement.timed(
+            app.ai_generator.generate_code,
+            item['enhanced'],
+            prompt_type=item['prompt_type'],
+            profile=item
+        )
+        
+    with ThreadPoolExecutor(max_workers=Config.PIPELINE_GENERATE_WORKERS) as pool:
+        list(pool.map(generate, processed))
+    measurement.extra['router'] = app.ai_generator.router.stats()
+
+
+def bench_execute(app, prompts: List[str], args, measurement: Measurement):
+    codes = [app.ai_generator._clean_code(recording['completion']) for recording in app_llm(app).recordings]
+    options = job_options(args)
+    for index in range(args.count):
+        measurement.timed(
+            app.blender_executor.execute_full_pipeline,
+            codes[index % len(codes)],
+            render=options['render'],
+            export=options['export'],
+            save=options['save']
+        )
+
+
+def bench_run(app, prompts: List[str], args, measurement: Measurement):
+    options = job_options(args)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for prompt in prompts:
+            measurement.timed(app.run, prompt, **options)
+
+
+def bench_batch(app, prompts: List[str], args, measurement: Measurement):
+    """Latency of a batch job is from the start of the batch until it is done"""
+    finished = {}
+    
+    def on_event(event: dict):
+        if event['type'] == 'done':
+            finished[event['job_id']] = (time.perf_counter(), bool(event['results'].get('success')))
+            
+    app._print_batch_event = on_event
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.run_batch(prompts, **job_options(args))
+    for done_at, success in finished.values():
+        measurement.add(done_at - started, success)
+
+
+BENCHMARKS = {
+    'process': bench_process,
+    'validate': bench_validate,
+    'generate': bench_generate,
+    'execute': bench_execute,
+    'run': bench_run,
+    'batch': bench_batch,
+}
+
+
+def app_llm(app) -> RecordedLLM:
+    return app.ai_generator.router.providers[RecordedLLM.name].call
+
+
+def run_suite(name: str, prompts: List[str], args: argparse.Namespace, workdir: Path) -> Dict[str, any]:
+    """Run one suite against a fresh configuration and working directory"""
+    configure(workdir / name, args)
+    llm = RecordedLLM(
+        args.recordings,
+        latency=args.llm_latency,
+        tokens_per_second=args.llm_tokens_per_second,
+        jitter=args.llm_jitter,
+        fail_rate=args.llm_fail_rate,
+        seed=args.seed
+    )
+    app = create_app(llm)
+    
+    measurement = Measurement(name)
+    with measurement:
+        BENCHMARKS[name](app, prompts, args, measurement)
+    summary = measurement.summary()
+    summary['llm'] = llm.stats()
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=TOOLS_DIR.parent,
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current: Dict[str, any], baseline: Dict[str, any], tolerance: float) -> List[str]:
+    """
+    Print the change of each suite against a baseline run
+    
+    Args:
+        current (dict): Results of this run
+        baseline (dict): Results of an earlier run
+        tolerance (float): Relative change treated as a regression
+        
+    Returns:
+        list: Descriptions of regressions, empty if none
+    """
+    def change(new, old):
+        return (new - old) / old if new is not None and old else None
+        
+    regressions = []
+    print(f"\nCompared with {baseline.get('git_commit') or '?'} ({baseline.get('created')}):")
+    print(f"{'suite':<10} {'throughput':>12} {'p95':>10} {'python peak':>12}")
+    for name, suite in current['suites'].items():
+        old = baseline.get('suites', {}).get(name)
+        if not old:
+            continue
+        checks = (
+            ('throughput', change(suite['throughput'], old['throughput']), -1),
+            ('p95', change(suite['latency']['p95'], old['latency']['p95']), 1),
+            ('python peak', change(suite['memory']['python_peak_mb'], old['memory']['python_peak_mb']), 1),
+        )
+        cells = [f"{delta:+.1%}" if delta is not None else '-' for _, delta, _ in checks]
+        print(f"{name:<10} {cells[0]:>12} {cells[1]:>10} {cells[2]:>12}")
+        
+        for metric, delta, worse in checks:
+            if delta is not None and delta * worse > tolerance:
+                regressions.append(f"{name} {metric} {delta:+.1%}")
+        if suite['failed'] > old['failed']:
+            regressions.append(f"{name} failures {old['failed']} -> {suite['failed']}")
+    return regressions
+
+
+def print_summary(results: Dict[str, any]):
+    def duration(seconds):
+        if seconds is None:
+            return '-'
+        return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+        
+    print(f"\n{'suite':<10} {'n':>5} {'ok':>5} {'items/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'py MB':>7}")
+    for name, suite in results['suites'].items():
+        latency = suite['latency']
+        print(
+            f"{name:<10} {suite['count']:>5} {suite['succeeded']:>5} {suite['throughput'] or 0:>9.2f} "
+            f"{duration(latency['p50']):>8} {duration(latency['p95']):>8} {duration(latency['p99']):>8} "
+            f"{suite['memory']['python_peak_mb']:>7.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline with a recorded LLM and a fake Blender")
+    parser.add_argument('--suite', nargs='+', choices=SUITES, default=SUITES, help='Suites to run')
+    parser.add_argument('--prompts', type=Path, help='Prompt file, one per line (default: the recorded prompts)')
+    parser.add_argument('--count', type=int, default=8, help='Prompts per suite, cycling through the prompt list')
+    parser.add_argument('--iterations', type=int, default=50, help='Repetitions for the in-process suites')
+    parser.add_argument('--recordings', type=Path, default=RECORDINGS_FILE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--render', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--export', action=argparse.BooleanOptionalAction, default=False)
+    
+    llm = parser.add_argument_group('recorded LLM')
+    llm.add_argument('--llm-latency', type=float, default=0.5, help='Seconds before the first token')
+    llm.add_argument('--llm-tokens-per-second', type=float, default=200.0)
+    llm.add_argument('--llm-jitter', type=float, default=0.1)
+    llm.add_argument('--llm-fail-rate', type=float, default=0.0)
+    
+    blender = parser.add_argument_group('fake Blender')
+    blender.add_argument('--blender-startup', type=float, default=0.5)
+    blender.add_argument('--blender-op-cost', type=float, default=0.002)
+    blender.add_argument('--blender-render', type=float, default=0.5)
+    blender.add_argument('--blender-fail-rate', type=float, default=0.0)
+    blender.add_argument('--blender-crash-rate', type=float, default=0.0)
+    
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE', help='Override a Config setting')
+    parser.add_argument('--log-level', default='ERROR')
+    parser.add_argument('--output', type=Path, help='Results file (default: logs/benchmarks/<timestamp>.json)')
+    parser.add_argument('--compare', type=Path, metavar='BASELINE', help='Earlier results file to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Relative change counted as a regression')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directories')
+    parser.add_argument('--record', type=Path, metavar='PROMPTS', help='Record completions for these prompts from the configured provider')
+    args = parser.parse_args()
+    
+    if args.record:
+        from main import BlenderAI
+        
+        prompts = [line.strip() for line in args.record.read_text(encoding='utf-8').splitlines() if line.strip()]
+        app = BlenderAI()
+        added = record(app.ai_generator, app.prompt_processor, prompts, args.recordings)
+        print(f"Recorded {added} completions from {app.ai_generator.provider} into {args.recordings}")
+        return 0
+        
+    if args.prompts:
+        prompts = [line.strip() for line in args.prompts.read_text(encoding='utf-8').splitlines() if line.strip()]
+    else:
+        prompts = [recording['prompt'] for recording in RecordedLLM.load(args.recordings)]
+    if not prompts:
+        raise SystemExit(f"No prompts: {args.prompts or args.recordings} is empty")
+    prompts = [prompts[index % len(prompts)] for index in range(args.count)]
+    
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'keep', 'record')},
+        'suites': {},
+    }
+    workdir = Path(tempfile.mkdtemp(prefix="blender_ai_bench_"))
+    try:
+        for name in args.suite:
+            print(f"Running {name}...", flush=True)
+            results['suites'][name] = run_suite(name, prompts, args, workdir)
+    finally:
+        if args.keep:
+            print(f"Scratch directories kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+            
+    print_summary(results)
+    
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"\nResults written to {output}")
+    
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(f"  - {regression}" for regression in regressions))
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,394 @@
+"""
+Micro-benchmarks of generated-script patterns inside real Blender
+
+Runs a corpus of scripts in headless Blender (factory settings, CPU
+only), each several times in a fresh process, and records how long the
+script takes to build its scene, how long the dependency graph then
+takes to evaluate and re-evaluate it, peak and added memory, and object,
+instance and polygon counts:
+
+    python tools/blender_bench.py --list
+    python tools/blender_bench.py --repeat 5 --markdown logs/benchmarks/blender_patterns.md
+    python tools/blender_bench.py --filter modifier_stack --threads 4
+
+The corpus is seeded from generated/ (generated_*.py, including the
+archive), templates/*.py and the ```python blocks of examples/*.md, plus
+variant groups in tools/script_variants/<group>/<variant>.py that build
+the same scene in different ways (bpy.ops vs the data API, linked vs
+copied vs instanced, modifier order and levels, material sharing,
+per-polygon loops vs foreach_set, view layer updates). Variants of a
+group are reported relative to the fastest one; those numbers, not
+rules of thumb, should drive the system prompts and code rewriters.
+
+Results are written as JSON (logs/benchmarks/blender_<timestamp>.json
+by default), and optionally as a Markdown summary.
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, List
+
+TOOLS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TOOLS_DIR.parent / "src"))
+
+from config import Config
+from blender_executor import STDIN_BOOTSTRAP
+
+VARIANTS_DIR = TOOLS_DIR / "script_variants"
+RESULTS_DIR = Config.LOGS_DIR / "benchmarks"
+RESULT_MARKER = "BENCH_RESULT "
+
+# Runs inside Blender: measures one script in an empty factory scene
+HARNESS = '''
+import os
+import sys
+import json
+import time
+import bpy
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+bpy.ops.wm.read_factory_settings(use_empty=True)
+if hasattr(bpy.context.preferences.system, 'use_gpu_subdivision'):
+    bpy.context.preferences.system.use_gpu_subdivision = False
+_rss_before = _rss_mb()
+
+_started = time.perf_counter()
+exec(compile(_SOURCE, _NAME, 'exec'), {{'__name__': '__main__'}})
+_build = time.perf_counter() - _started
+
+_started = time.perf_counter()
+_depsgraph = bpy.context.evaluated_depsgraph_get()
+_depsgraph.update()
+_evaluate = time.perf_counter() - _started
+
+# Cost of one more full evaluation, as paid by scripts that update in loops
+for _obj in bpy.data.objects:
+    _obj.update_tag(refresh={{'OBJECT', 'DATA'}})
+_started = time.perf_counter()
+bpy.context.view_layer.update()
+_reevaluate = time.perf_counter() - _started
+
+_instances = _vertices = _polygons = 0
+for _instance in _depsgraph.object_instances:
+    _instances += 1
+    if _instance.object.type == 'MESH':
+        _vertices += len(_instance.object.data.vertices)
+        _polygons += len(_instance.object.data.polygons)
+
+_rss_after = _rss_mb()
+print({marker!r} + json.dumps({{
+    'build_seconds': _build,
+    'evaluate_seconds': _evaluate,
+    'reevaluate_seconds': _reevaluate,
+    'peak_rss_mb': _peak_rss_mb(),
+    'rss_growth_mb': _rss_after - _rss_before if _rss_after is not None and _rss_before is not None else None,
+    'objects': len(bpy.data.objects),
+    'meshes': len(bpy.data.meshes),
+    'materials': len(bpy.data.materials),
+    'modifiers': sum(len(_obj.modifiers) for _obj in bpy.data.objects),
+    'instances': _instances,
+    'vertices': _vertices,
+    'polygons': _polygons,
+}}), flush=True)
+'''
+
+# Medians are reported for these; counts come from the first run
+TIMED_METRICS = ['build_seconds', 'evaluate_seconds', 'reevaluate_seconds', 'process_seconds', 'peak_rss_mb', 'rss_growth_mb']
+COUNT_METRICS = ['objects', 'meshes', 'materials', 'modifiers', 'instances', 'vertices', 'polygons']
+
+PYTHON_BLOCK_PATTERN = re.compile(r'```python\s*\n(.*?)```', re.DOTALL)
+
+
+def description(source: str) -> str:
+    """First comment line of a script"""
+    for line in source.splitlines():
+        if line.startswith('#'):
+            return line.lstrip('# ').strip()
+        if line.strip():
+            break
+    return ''
+
+
+def collect_corpus(base_dir: Optional[Path] = None) -> List[Dict[str, str]]:
+    """
+    Gather the scripts to benchmark
+    
+    Args:
+        base_dir (Path, optional): Project root, defaults to Config.BASE_DIR
+        
+    Returns:
+        list: Entries with 'name', 'group', 'variant', 'description', 'path' and 'source', each script once
+    """
+    base_dir = base_dir or Config.BASE_DIR
+    entries = []
+    
+    def add(group: str, variant: str, path: Path, source: str):
+        if 'import bpy' in source:
+            entries.append({
+                'name': f"{group}/{variant}",
+                'group': group,
+                'variant': variant,
+                'description': description(source),
+                'path': str(path.relative_to(base_dir) if path.is_relative_to(base_dir) else path),
+                'source': source,
+            })
+            
+    for path in sorted(VARIANTS_DIR.glob('*/*.py')):
+        add(path.parent.name, path.stem, path, path.read_text(encoding='utf-8'))
+        
+    generated = base_dir / "generated"
+    for path in sorted(list(generated.glob('generated_*.py')) + list((generated / "archive").glob('generated_*.py'))):
+        add('generated', path.stem, path, path.read_text(encoding='utf-8'))
+        
+    for path in sorted((base_dir / "templates").glob('*.py')):
+        add('templates', path.stem, path, path.read_text(encoding='utf-8'))
+        
+    for path in sorted((base_dir / "examples").glob('*.md')):
+        blocks = PYTHON_BLOCK_PATTERN.findall(path.read_text(encoding='utf-8'))
+        for index, block in enumerate(blocks, 1):
+            add('examples', f"{path.stem}_{index}", path, block)
+            
+    # The archive keeps copies of generations; measure each script once
+    unique = {}
+    for entry in entries:
+        unique.setdefault(hashlib.sha256(entry['source'].encode('utf-8')).hexdigest(), entry)
+    return list(unique.values())
+
+
+def build_program(entry: Dict[str, str]) -> str:
+    """Wrap a script in the measuring harness"""
+    return (
+        f"_SOURCE = {entry['source']!r}\n"
+        f"_NAME = {entry['name']!r}\n"
+        + HARNESS.format(marker=RESULT_MARKER)
+    )
+
+
+def run_once(blender_path: str, program: str, threads: int, timeout: float) -> Dict[str, any]:
+    """
+    Run one measurement in a fresh Blender process
+    
+    Args:
+        blender_path (str): Blender executable
+        program (str): Harnessed script
+        threads (int): Blender threads, 0 for all cores
+        timeout (float): Seconds before the run is abandoned
+        
+    Returns:
+        dict: Metrics, or 'error' with the end of Blender's output
+    """
+    command = [blender_path, "--background", "--factory-startup", "-noaudio"]
+    if threads:
+        command += ["--threads", str(threads)]
+    command += ["--python-exit-code", "1", "--python-expr", STDIN_BOOTSTRAP]
+    
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(command, input=program, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'error': f"timed out after {timeout:.0f}s"}
+    elapsed = time.perf_counter() - started
+    
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            metrics = json.loads(line[len(RESULT_MARKER):])
+            metrics['process_seconds'] = elapsed
+            return metrics
+    output = (result.stderr or result.stdout).strip()
+    return {'error': f"exit code {result.returncode}: {output[-500:]}"}
+
+
+def summarize(runs: List[Dict[str, any]]) -> Dict[str, any]:
+    """Medians and spread of the successful runs of one script"""
+    succeeded = [run for run in runs if 'error' not in run]
+    summary = {'runs': len(runs), 'errors': [run['error'] for run in runs if 'error' in run]}
+    if not succeeded:
+        return summary
+        
+    for metric in TIMED_METRICS:
+        values = [run[metric] for run in succeeded if run.get(metric) is not None]
+        summary[metric] = statistics.median(values) if values else None
+    build = [run['build_seconds'] for run in succeeded]
+    summary['build_min'] = min(build)
+    summary['build_max'] = max(build)
+    for metric in COUNT_METRICS:
+        summary[metric] = succeeded[0].get(metric)
+    return summary
+
+
+def blender_version(blender_path: str) -> Optional[str]:
+    try:
+        result = subprocess.run([blender_path, "--version"], capture_output=True, text=True, timeout=30)
+        return result.stdout.splitlines()[0].strip() if result.stdout else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def scene_seconds(summary: Dict[str, any]) -> Optional[float]:
+    """Build plus first evaluation: the cost a generated script adds to a job"""
+    if summary.get('build_seconds') is None:
+        return None
+    return summary['build_seconds'] + (summary.get('evaluate_seconds') or 0)
+
+
+def group_results(results: Dict[str, Dict[str, any]]) -> Dict[str, List[Dict[str, any]]]:
+    """Entries per group, fastest first, with their cost relative to the fastest"""
+    groups = {}
+    for entry in results.values():
+        groups.setdefault(entry['group'], []).append(entry)
+    
+    def sort_key(entry):
+        seconds = scene_seconds(entry['summary'])
+        return seconds if seconds is not None else float('inf')
+        
+    for entries in groups.values():
+        entries.sort(key=sort_key)
+        fastest = scene_seconds(entries[0]['summary'])
+        for entry in entries:
+            seconds = scene_seconds(entry['summary'])
+            entry['relative'] = seconds / fastest if seconds is not None and fastest else None
+    return groups
+
+
+def format_table(entries: List[Dict[str, any]]) -> List[str]:
+    """Markdown table rows for one group"""
+    def ms(value):
+        return f"{value * 1000:.1f}" if value is not None else '-'
+        
+    rows = [
+        "| variant | build ms | evaluate ms | re-evaluate ms | x fastest | peak MB | objects | instances | polygons |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for entry in entries:
+        summary = entry['summary']
+        if summary.get('build_seconds') is None:
+            rows.append(f"| {entry['variant']} | failed: {summary['errors'][0][:80]} | | | | | | | |")
+            continue
+        rows.append(
+            f"| {entry['variant']} | {ms(summary['build_seconds'])} | {ms(summary['evaluate_seconds'])} | "
+            f"{ms(summary['reevaluate_seconds'])} | {entry['relative']:.2f} | "
+            f"{summary['peak_rss_mb'] or 0:.0f} | {summary['objects']} | {summary['instances']} | {summary['polygons']} |"
+        )
+    return rows
+
+
+def write_markdown(path: Path, results: Dict[str, any]):
+    """Summary per group, for reviewing prompt and rewriter guidance"""
+    lines = [
+        "# Generated-script patterns in Blender",
+        "",
+        f"{results['blender_version']}, {results['settings']['repeat']} runs per script "
+        f"(medians), {results['settings']['threads'] or 'all'} threads, {results['created']}.",
+        "",
+    ]
+    for group, entries in group_results(results['scripts']).items():
+        lines += [f"## {group}", ""]
+        measured = [entry for entry in entries if entry['relative'] is not None]
+        if len(measured) > 1 and group not in ('generated', 'templates', 'examples'):
+            lines += [
+                f"Fastest: **{measured[0]['variant']}** ({measured[0]['description']}), "
+                f"{measured[-1]['relative']:.1f}x faster than {measured[-1]['variant']}.",
+                "",
+            ]
+        lines += format_table(entries) + [""]
+        
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines), encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure generated-script patterns in headless Blender")
+    parser.add_argument('--blender', default=None, help='Blender executable (default: BLENDER_PATH)')
+    parser.add_argument('--repeat', type=int, default=5, help='Measured runs per script')
+    parser.add_argument('--warmup', type=int, default=1, help='Unmeasured runs before the first script')
+    parser.add_argument('--threads', type=int, default=0, help='Blender threads, 0 for all cores')
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--filter', action='append', default=[], help='Only scripts whose name contains this')
+    parser.add_argument('--list', action='store_true', help='List the corpus and exit')
+    parser.add_argument('--output', type=Path, help='Results file (default: logs/benchmarks/blender_<timestamp>.json)')
+    parser.add_argument('--markdown', type=Path, help='Also write a Markdown summary here')
+    args = parser.parse_args()
+    
+    corpus = collect_corpus()
+    if args.filter:
+        corpus = [entry for entry in corpus if any(pattern in entry['name'] for pattern in args.filter)]
+        
+    if args.list:
+        for entry in corpus:
+            print(f"{entry['name']:<40} {entry['path']:<50} {entry['description']}")
+        return 0
+    if not corpus:
+        raise SystemExit("No scripts match")
+        
+    blender_path = args.blender or Config.BLENDER_PATH
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'blender_version': blender_version(blender_path),
+        'settings': {'repeat': args.repeat, 'threads': args.threads, 'warmup': args.warmup},
+        'scripts': {},
+    }
+    print(f"{results['blender_version'] or blender_path}: {len(corpus)} scripts x {args.repeat} runs")
+    
+    if corpus and args.warmup:
+        # Loads Blender and its Python into the OS file cache
+        for _ in range(args.warmup):
+            run_once(blender_path, build_program(corpus[0]), args.threads, args.timeout)
+            
+    for entry in corpus:
+        runs = [run_once(blender_path, build_program(entry), args.threads, args.timeout) for _ in range(args.repeat)]
+        summary = summarize(runs)
+        results['scripts'][entry['name']] = {key: value for key, value in entry.items() if key != 'source'}
+        results['scripts'][entry['name']]['summary'] = summary
+        results['scripts'][entry['name']]['runs'] = runs
+        
+        if summary.get('build_seconds') is None:
+            print(f"  {entry['name']:<40} failed: {summary['errors'][0][:120]}")
+        else:
+            print(
+                f"  {entry['name']:<40} build {summary['build_seconds'] * 1000:8.1f} ms  "
+                f"evaluate {summary['evaluate_seconds'] * 1000:8.1f} ms  "
+                f"{summary['objects']:>5} objects {summary['polygons']:>8} polygons"
+            )
+            
+    output = args.output or RESULTS_DIR / f"blender_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+    
+    if args.markdown:
+        write_markdown(args.markdown, results)
+        print(f"Summary written to {args.markdown}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Build the asset library generated scripts link from
+
+Runs every builder in assets/library_source.py in an empty Blender file,
+writes the resulting materials, node groups and prop collections to
+library.blend with fake users, and lists them in manifest.json with the
+Blender version and the file's SHA-256:
+
+    python tools/build_asset_library.py
+    python tools/build_asset_library.py --blender /opt/blender-4.2/blender
+
+The manifest feeds the prompt (which assets exist and what they are)
+and the render cache key of scripts that use the library. Rebuild after
+editing library_source.py or upgrading Blender.
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import Config
+from asset_library import MANIFEST_FORMAT, LIBRARY_FILE, MANIFEST_FILE
+
+RESULT_MARKER = "ASSET_LIBRARY "
+
+# Runs inside Blender; the library directory and output path follow '--'
+BUILD_PROGRAM = f'''
+import sys
+import json
+import bpy
+
+directory, output = sys.argv[sys.argv.index('--') + 1:][:2]
+sys.path.insert(0, directory)
+bpy.ops.wm.read_factory_settings(use_empty=True)
+import library_source
+
+COLLECTIONS = {{'material': 'materials', 'node_group': 'node_groups', 'prop': 'collections'}}
+
+blocks = set()
+assets = []
+for entry in library_source.ASSETS:
+    # Builders may have created shared assets for each other already
+    block = getattr(bpy.data, COLLECTIONS[entry['type']]).get(entry['name']) or entry['build']()
+    if block.name != entry['name']:
+        raise RuntimeError(f"Builder for {{entry['name']!r}} returned {{block.name!r}}")
+    blocks.add(block)
+    assets.append({{key: value for key, value in entry.items() if key != 'build'}})
+
+bpy.data.libraries.write(output, blocks, fake_user=True, compress=True)
+print({RESULT_MARKER!r} + json.dumps({{'blender_version': bpy.app.version_string, 'assets': assets}}))
+'''
+
+
+def build(blender_path: str, directory: Path, timeout: float) -> dict:
+    """
+    Run the builders in Blender and write library.blend
+    
+    Args:
+        blender_path (str): Blender executable
+        directory (Path): Library directory holding library_source.py
+        timeout (float): Seconds to allow
+        
+    Returns:
+        dict: Blender version and the built assets
+        
+    Raises:
+        RuntimeError: If Blender fails or reports nothing
+    """
+    result = subprocess.run(
+        [
+            blender_path, "--background", "--factory-startup",
+            "--python-exit-code", "1", "--python-expr", BUILD_PROGRAM,
+            "--", str(directory), str(directory / LIBRARY_FILE)
+        ],
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    for line in result.stdout.splitlines():
+        if result.returncode == 0 and line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    tail = '\n'.join((result.stdout + result.stderr).splitlines()[-20:])
+    raise RuntimeError(f"Blender exited with code {result.returncode}:\n{tail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the linked asset library for generated scripts")
+    parser.add_argument('--blender', default=None, help='Blender executable (default: BLENDER_PATH)')
+    parser.add_argument('--directory', type=Path, default=None, help='Library directory (default: ASSET_LIBRARY_DIR)')
+    parser.add_argument('--timeout', type=float, default=600)
+    args = parser.parse_args()
+    
+    directory = (args.directory or Config.ASSET_LIBRARY_DIR).resolve()
+    try:
+        data = build(args.blender or Config.BLENDER_PATH, directory, args.timeout)
+    except (OSError, subprocess.TimeoutExpired, RuntimeError) as e:
+        print(f"❌ Failed to build the asset library: {e}")
+        return 1
+        
+    library = directory / LIBRARY_FILE
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'blender_version': data['blender_version'],
+        'library': LIBRARY_FILE,
+        'sha256': hashlib.sha256(library.read_bytes()).hexdigest(),
+        'assets': data['assets'],
+    }
+    with open(directory / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        
+    counts = {}
+    for entry in data['assets']:
+        counts[entry['type']] = counts.get(entry['type'], 0) + 1
+    summary = ', '.join(f"{count} {kind.replace('_', ' ')}s" for kind, count in sorted(counts.items()))
+    print(f"✅ Built {library} ({library.stat().st_size / 1024:.0f} KB) with {summary} from Blender {data['blender_version']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Build the bpy API index the code validator checks generated code against
+
+Starts a Blender build in the background with factory settings and
+records every operator with its parameters, every RNA struct with its
+properties (and the struct they point to), functions and Python-level
+members, and the input and output socket names of every node type:
+
+    python tools/dump_bpy_api.py
+    python tools/dump_bpy_api.py --blender /opt/blender-4.2/blender --output api_index/bpy_api-4.2.json.gz
+
+The index is written compactly (gzipped for .gz names) with the Blender
+version and the index format, to BPY_API_INDEX by default. Rebuild it
+after upgrading Blender; point BPY_API_INDEX at the file matching the
+Blender the pipeline runs.
+"""
+
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import Config
+from bpy_api_index import BpyApiIndex, INDEX_FORMAT
+
+# Runs inside Blender; the output path follows '--' on the command line
+DUMP_PROGRAM = '''
+import sys
+import json
+import bpy
+
+# Nodes whose sockets depend on their settings or contents
+DYNAMIC_NODES = {
+    'ShaderNodeScript', 'NodeGroupInput', 'NodeGroupOutput',
+    'CompositorNodeImage', 'CompositorNodeRLayers', 'CompositorNodeOutputFile',
+}
+
+def prop_spec(prop):
+    fixed = getattr(prop, 'fixed_type', None)
+    if prop.type == 'POINTER':
+        return fixed.identifier if fixed else None
+    if prop.type == 'COLLECTION':
+        return [fixed.identifier if fixed else None, prop.srna.identifier if prop.srna else None]
+    return None
+
+structs = {}
+for name in dir(bpy.types):
+    cls = getattr(bpy.types, name, None)
+    rna = getattr(cls, 'bl_rna', None)
+    if rna is None:
+        continue
+    properties = {prop.identifier: prop_spec(prop) for prop in rna.properties}
+    functions = {}
+    for function in rna.functions:
+        outputs = [param for param in function.parameters if param.is_output]
+        returns = prop_spec(outputs[0]) if len(outputs) == 1 else None
+        functions[function.identifier] = [
+            [param.identifier for param in function.parameters if not param.is_output],
+            returns if isinstance(returns, str) else None,
+        ]
+    structs[name] = {
+        'base': rna.base.identifier if rna.base else None,
+        'properties': properties,
+        'functions': functions,
+        'python': sorted(member for member in dir(cls) if not member.startswith('_') and member not in properties and member not in functions),
+    }
+
+operators = {}
+for module_name in dir(bpy.ops):
+    module = getattr(bpy.ops, module_name)
+    for operator_name in dir(module):
+        try:
+            rna = getattr(module, operator_name).get_rna_type()
+        except Exception:
+            continue
+        operators[module_name + '.' + operator_name] = [prop.identifier for prop in rna.properties if prop.identifier != 'rna_type']
+
+collection = set()
+for name in ('bpy_prop_collection', 'bpy_prop_collection_idprop'):
+    collection.update(member for member in dir(getattr(bpy.types, name, object)) if not member.startswith('_'))
+
+def node_trees():
+    material = bpy.data.materials.new('bpy_api_index')
+    try:
+        material.use_nodes = True
+    except Exception:
+        pass
+    yield ('ShaderNode',), material.node_tree
+    yield ('GeometryNode', 'FunctionNode', 'Node'), bpy.data.node_groups.new('bpy_api_index', 'GeometryNodeTree')
+    for prefix, tree_type in (('CompositorNode', 'CompositorNodeTree'), ('TextureNode', 'TextureNodeTree')):
+        try:
+            yield (prefix,), bpy.data.node_groups.new('bpy_api_index', tree_type)
+        except Exception:
+            pass
+
+def socket_names(sockets):
+    return sorted({socket.name for socket in sockets} | {socket.identifier for socket in sockets})
+
+nodes = {}
+for prefixes, tree in node_trees():
+    for name in dir(bpy.types):
+        if not name.startswith(prefixes) or name in nodes:
+            continue
+        try:
+            node = tree.nodes.new(name)
+        except Exception:
+            continue
+        sockets = list(node.inputs) + list(node.outputs)
+        nodes[name] = {
+            'name': node.name,
+            'inputs': socket_names(node.inputs),
+            'outputs': socket_names(node.outputs),
+            'dynamic': name in DYNAMIC_NODES or name.endswith('Group') or any(socket.bl_idname == 'NodeSocketVirtual' for socket in sockets),
+        }
+        tree.nodes.remove(node)
+
+with open(sys.argv[sys.argv.index('--') + 1], 'w', encoding='utf-8') as f:
+    json.dump({
+        'blender_version': bpy.app.version_string,
+        'operators': operators,
+        'structs': structs,
+        'nodes': nodes,
+        'collection': sorted(collection),
+    }, f)
+'''
+
+
+def dump(blender_path: str, timeout: float) -> dict:
+    """
+    Run the dump program in Blender
+    
+    Args:
+        blender_path (str): Blender executable
+        timeout (float): Seconds to allow
+        
+    Returns:
+        dict: Raw dump
+        
+    Raises:
+        RuntimeError: If Blender fails or writes nothing
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = Path(tmp) / "bpy_api.json"
+        result = subprocess.run(
+            [
+                blender_path, "--background", "--factory-startup",
+                "--python-exit-code", "1", "--python-expr", DUMP_PROGRAM, "--", str(raw)
+            ],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        if result.returncode != 0 or not raw.exists():
+            tail = '\n'.join((result.stdout + result.stderr).splitlines()[-20:])
+            raise RuntimeError(f"Blender exited with code {result.returncode}:\n{tail}")
+        with open(raw, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index the bpy API of a Blender build for the code validator")
+    parser.add_argument('--blender', default=None, help='Blender executable (default: BLENDER_PATH)')
+    parser.add_argument('--output', type=Path, default=None, help='Index file (default: BPY_API_INDEX)')
+    parser.add_argument('--timeout', type=float, default=600)
+    args = parser.parse_args()
+    
+    output = args.output or Config.BPY_API_INDEX
+    try:
+        data = dump(args.blender or Config.BLENDER_PATH, args.timeout)
+    except (OSError, subprocess.TimeoutExpired, RuntimeError) as e:
+        print(f"❌ Failed to dump the bpy API: {e}")
+        return 1
+        
+    data['format'] = INDEX_FORMAT
+    data['created'] = datetime.now().isoformat(timespec='seconds')
+    BpyApiIndex.save(output, data)
+    
+    sockets = sum(1 for node in data['nodes'].values() if not node['dynamic'])
+    print(
+        f"✅ Indexed {len(data['operators'])} operators, {len(data['structs'])} structs and "
+        f"{len(data['nodes'])} node types ({sockets} with fixed sockets) from Blender "
+        f"{data['blender_version']} into {output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,2 @@
+@echo off
+python "%~dp0fake_blender.py" %*
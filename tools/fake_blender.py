@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Blender stand-in for benchmarks and tests
+
+Accepts the command lines BlenderExecutor builds (--background, an
+optional .blend, --python-exit-code, --python-expr / --python), runs the
+script against an in-process bpy that records nothing but writes the
+files a real run would (renders, exports, .blend), and simulates the
+parts of Blender's cost the orchestration layer sees:
+
+    BLENDER_PATH=tools/fake_blender.py python src/main.py "a red cube"
+
+On Windows point BLENDER_PATH at tools/fake_blender.cmd instead.
+
+Behaviour is set through environment variables, so the executor's
+command line doesn't change:
+
+    FAKE_BLENDER_STARTUP         seconds before the script starts (default 0.5)
+    FAKE_BLENDER_OP_COST         seconds per bpy.ops call (default 0.002)
+    FAKE_BLENDER_RENDER_SECONDS  seconds per still render (default 0.5)
+    FAKE_BLENDER_RENDER_SAMPLES  progress lines printed per render (default 4)
+    FAKE_BLENDER_FAIL_RATE       fraction of scripts that raise in an operator (default 0)
+    FAKE_BLENDER_CRASH_RATE      fraction of scripts that crash the process (default 0)
+    FAKE_BLENDER_MEMORY_MB       memory held while the script runs (default 0)
+    FAKE_BLENDER_SEED            seed for failures and crashes (default 0)
+
+Failures and crashes are chosen from the seed and a hash of the script,
+so the same script fails the same way on every run.
+"""
+
+import os
+import sys
+import time
+import types
+import zlib
+import struct
+import random
+import hashlib
+
+
+VERSION = "Blender 5.0.1 (fake)"
+
+
+def setting(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def png_bytes() -> bytes:
+    """A valid 1x1 grey PNG"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+        
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(b'\x00\x80'))
+        + chunk(b'IEND', b'')
+    )
+
+
+class Stub:
+    """
+    Any bpy or mathutils value
+    
+    Attributes are created on first access and keep what is assigned to
+    them, calls and indexing return new stubs, and arithmetic leaves the
+    stub as it is, so typical scene-building code runs unchanged.
+    """
+    
+    def __init__(self, path: str = ''):
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_attrs', {})
+    
+    def __getattr__(self, name):
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        attrs = object.__getattribute__(self, '_attrs')
+        if name not in attrs:
+            attrs[name] = Stub(f"{self._path}.{name}")
+        return attrs[name]
+    
+    def __setattr__(self, name, value):
+        self._attrs[name] = value
+    
+    def __call__(self, *args, **kwargs):
+        return Stub(f"{self._path}()")
+    
+    def __getitem__(self, key):
+        return self.__getattr__(str(key))
+    
+    def __setitem__(self, key, value):
+        self._attrs[str(key)] = value
+    
+    def __iter__(self):
+        return iter(())
+    
+    def __len__(self):
+        return 0
+    
+    def __bool__(self):
+        return True
+    
+    def __contains__(self, item):
+        return False
+    
+    def __float__(self):
+        return 0.0
+    
+    def __int__(self):
+        return 0
+    
+    def __index__(self):
+        return 0
+    
+    def __str__(self):
+        return self._path
+    
+    def __repr__(self):
+        return f"<fake {self._path}>"
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def _same(self, *args):
+        return self
+        
+    __add__ = __radd__ = __sub__ = __rsub__ = __mul__ = __rmul__ = _same
+    __truediv__ = __rtruediv__ = __floordiv__ = __matmul__ = __rmatmul__ = _same
+    __neg__ = __pos__ = __abs__ = _same
+    __iadd__ = __isub__ = __imul__ = __itruediv__ = _same
+    
+    def __lt__(self, other):
+        return False
+        
+    __le__ = __gt__ = __ge__ = __lt__
+    
+    def __eq__(self, other):
+        return self is other
+    
+    def __hash__(self):
+        return id(self)
+
+
+class FakeBlender:
+    """Operator costs, failures and outputs of one run"""
+    
+    # Operators that leave the object they create active
+    ADD_PREFIXES = (
+        'mesh.primitive_', 'curve.primitive_',
+        'object.light_add', 'object.camera_add', 'object.empty_add', 'object.text_add',
+    )
+    
+    def __init__(self, source: str):
+        seed = os.environ.get('FAKE_BLENDER_SEED', '0')
+        rng = random.Random(f"{seed}:{hashlib.sha256(source.encode('utf-8')).hexdigest()}")
+        
+        self.op_cost = setting('FAKE_BLENDER_OP_COST', 0.002)
+        self.render_seconds = setting('FAKE_BLENDER_RENDER_SECONDS', 0.5)
+        self.render_samples = max(1, int(setting('FAKE_BLENDER_RENDER_SAMPLES', 4)))
+        self.fail_at = rng.randint(1, 3) if rng.random() < setting('FAKE_BLENDER_FAIL_RATE', 0) else None
+        self.crash = rng.random() < setting('FAKE_BLENDER_CRASH_RATE', 0)
+        self.ops_run = 0
+        self.context = Stub('bpy.context')
+        self.data = Stub('bpy.data')
+    
+    def run_operator(self, name: str, kwargs: dict):
+        self.ops_run += 1
+        time.sleep(self.op_cost)
+        
+        if self.fail_at is not None and self.ops_run >= self.fail_at:
+            raise RuntimeError(f"Error: Operator bpy.ops.{name}.poll() failed, context is incorrect")
+            
+        if name == 'render.render':
+            return self.render()
+            
+        filepath = kwargs.get('filepath')
+        if filepath and (name == 'wm.save_as_mainfile' or name.startswith('export') or name.endswith('_export')):
+            with open(filepath, 'wb') as f:
+                f.write(b'BLENDER-v500' if name == 'wm.save_as_mainfile' else f"fake {name}\n".encode('utf-8'))
+            if name == 'wm.save_as_mainfile':
+                print(f"Info: Saved \"{os.path.basename(filepath)}\"")
+                
+        if name.startswith(self.ADD_PREFIXES):
+            created = Stub(f"bpy.data.objects['{name.rsplit('.', 1)[-1]}.{self.ops_run:03d}']")
+            self.context.object = created
+            self.context.active_object = created
+        return {'FINISHED'}
+    
+    def render(self):
+        if self.crash:
+            sys.stdout.flush()
+            sys.stderr.write("Segmentation fault (core dumped)\n")
+            sys.stderr.flush()
+            os._exit(139)
+            
+        started = time.monotonic()
+        for sample in range(1, self.render_samples + 1):
+            time.sleep(self.render_seconds / self.render_samples)
+            elapsed = time.monotonic() - started
+            print(
+                f"Fra:1 Mem:48.00M (Peak 64.00M) | Time:00:{elapsed:05.2f} | "
+                f"Remaining:00:{max(0.0, self.render_seconds - elapsed):05.2f} | "
+                f"Mem:32.00M, Peak:64.00M | Scene, ViewLayer | Sample {sample}/{self.render_samples}",
+                flush=True
+            )
+            
+        filepath = self.context.scene.render.filepath
+        if isinstance(filepath, str) and filepath:
+            with open(filepath, 'wb') as f:
+                f.write(png_bytes())
+            print(f"Saved: '{filepath}'")
+        return {'FINISHED'}
+
+
+class Operators(Stub):
+    """bpy.ops: every call is timed, may fail and may write files"""
+    
+    def __init__(self, blender: FakeBlender, name: str = ''):
+        super().__init__(f"bpy.ops.{name}" if name else 'bpy.ops')
+        object.__setattr__(self, '_blender', blender)
+        object.__setattr__(self, '_name', name)
+    
+    def __getattr__(self, name):
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        return Operators(self._blender, f"{self._name}.{name}" if self._name else name)
+    
+    def __call__(self, *args, **kwargs):
+        return self._blender.run_operator(self._name, kwargs)
+    
+    def poll(self):
+        return True
+
+
+def install_modules(blender: FakeBlender):
+    """Register bpy, mathutils and bmesh in sys.modules"""
+    bpy = types.ModuleType('bpy')
+    bpy.ops = Operators(blender)
+    bpy.context = blender.context
+    bpy.data = blender.data
+    for name in ('types', 'props', 'utils', 'path', 'app'):
+        setattr(bpy, name, Stub(f"bpy.{name}"))
+    bpy.app.version = (5, 0, 1)
+    bpy.app.version_string = "5.0.1"
+    bpy.app.background = '--background' in sys.argv
+    
+    sys.modules['bpy'] = bpy
+    for name in ('types', 'props', 'utils', 'path', 'app', 'ops', 'data', 'context'):
+        sys.modules[f"bpy.{name}"] = getattr(bpy, name)
+    for name in ('mathutils', 'mathutils.noise', 'bmesh', 'bmesh.ops', 'bpy_extras', 'bpy_extras.object_utils'):
+        sys.modules[name] = Stub(name)
+
+
+def main():
+    args = sys.argv[1:]
+    if '--version' in args or '-v' in args:
+        print(VERSION)
+        print("\tbuild date: fake")
+        return 0
+        
+    time.sleep(setting('FAKE_BLENDER_STARTUP', 0.5))
+    print(f"{VERSION}", flush=True)
+    
+    exit_code = 0
+    if '--python-exit-code' in args:
+        exit_code = int(args[args.index('--python-exit-code') + 1])
+        
+    blend_files = [arg for arg in args if arg.endswith('.blend')]
+    if blend_files:
+        if not os.path.exists(blend_files[0]):
+            print(f"Error: Cannot read file \"{blend_files[0]}\": No such file or directory")
+            return 1
+        print(f"Read blend: \"{blend_files[0]}\"")
+        
+    if '--python-expr' in args:
+        source = args[args.index('--python-expr') + 1]
+        # The executor's bootstrap reads the real program from stdin; hash
+        # that, not the bootstrap, so failures follow the program
+        if 'sys.stdin.read()' in source:
+            program = sys.stdin.read()
+            sys.stdin = types.SimpleNamespace(read=lambda: program)
+            seed_source = program
+        else:
+            seed_source = source
+    elif '--python' in args:
+        with open(args[args.index('--python') + 1], 'r', encoding='utf-8') as f:
+            source = seed_source = f.read()
+    else:
+        return 0
+        
+    blender = FakeBlender(seed_source)
+    install_modules(blender)
+    ballast = bytearray(int(setting('FAKE_BLENDER_MEMORY_MB', 0) * 2**20))
+    
+    try:
+        exec(compile(source, '<string>', 'exec'), {'__name__': '__main__'})
+    except SystemExit:
+        raise
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        print("Error: Python script failed, check the message in the system console", flush=True)
+        return exit_code
+    finally:
+        del ballast
+        
+    print("\nBlender quit")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Ollama-compatible stand-in for testing local LLM management
+
+Simulates model loading and unloading (keep_alive, reload on a changed
+context size), a fixed number of parallel slots, generation speed and
+num_predict truncation, and answers every prompt with a small Blender
+script:
+
+    python tools/fake_ollama_server.py --port 11435 --parallel 2 --load-seconds 3
+    LOCAL_LLM_URL=http://127.0.0.1:11435/api/generate python src/main.py --local-status
+"""
+
+import re
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+SCRIPT = '''```python
+import bpy
+
+bpy.ops.object.select_all(action='SELECT')
+bpy.ops.object.delete()
+bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 1))
+bpy.ops.object.light_add(type='SUN', location=(4, -4, 6))
+bpy.ops.object.camera_add(location=(7, -7, 5), rotation=(1.1, 0, 0.785))
+bpy.context.scene.camera = bpy.context.object
+```'''
+
+
+def parse_keep_alive(value) -> float:
+    """Seconds a model stays loaded; negative means forever"""
+    if value is None:
+        return 300.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r'(-?\d+(?:\.\d+)?)([smh]?)', str(value).strip())
+    if not match:
+        return 300.0
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+class FakeOllama:
+    """Models, residency and slots"""
+    
+    def __init__(self, models: dict, context: int, parallel: int, load_seconds: float, tokens_per_second: float):
+        self.models = models
+        self.context = context
+        self.load_seconds = load_seconds
+        self.tokens_per_second = tokens_per_second
+        self.slots = threading.Semaphore(parallel)
+        self.lock = threading.Lock()
+        # name -> (num_ctx, expires_at or None for forever)
+        self.loaded = {}
+    
+    def ensure_loaded(self, name: str, num_ctx: int, keep_alive) -> float:
+        """Load the model if needed; returns seconds spent loading"""
+        seconds = parse_keep_alive(keep_alive)
+        with self.lock:
+            now = time.time()
+            current = self.loaded.get(name)
+            resident = current and current[0] == num_ctx and (current[1] is None or current[1] > now)
+            if not resident:
+                time.sleep(self.load_seconds)
+            self.loaded[name] = (num_ctx, None if seconds < 0 else time.time() + seconds)
+            return 0.0 if resident else self.load_seconds
+    
+    def resident(self) -> list:
+        now = time.time()
+        with self.lock:
+            return [
+                (name, expires) for name, (_, expires) in self.loaded.items()
+                if expires is None or expires > now
+            ]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """/api/generate, /api/tags, /api/show and /api/ps"""
+    
+    server_state = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _body(self) -> dict:
+        return json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+    
+    def _model(self, name: str):
+        models = self.server_state.models
+        return name if name in models else f"{name}:latest" if f"{name}:latest" in models else None
+    
+    def do_GET(self):
+        state = self.server_state
+        path = urlparse(self.path).path
+        
+        if path == '/api/tags':
+            return self._send(HTTPStatus.OK, {'models': [
+                {'name': name, 'details': {'parameter_size': '7B', 'quantization_level': quantization}}
+                for name, quantization in state.models.items()
+            ]})
+            
+        if path == '/api/ps':
+            return self._send(HTTPStatus.OK, {'models': [
+                {
+                    'name': name,
+                    'size_vram': 4 * 2**30,
+                    'expires_at': datetime.fromtimestamp(expires, timezone.utc).isoformat() if expires else '2318-01-01T00:00:00Z',
+                }
+                for name, expires in state.resident()
+            ]})
+            
+        self._send(HTTPStatus.NOT_FOUND, {'error': 'not found'})
+    
+    def do_POST(self):
+        state = self.server_state
+        path = urlparse(self.path).path
+        body = self._body()
+        
+        if path == '/api/show':
+            name = self._model(body.get('model') or body.get('name', ''))
+            if not name:
+                return self._send(HTTPStatus.NOT_FOUND, {'error': 'model not found'})
+            return self._send(HTTPStatus.OK, {
+                'details': {'parameter_size': '7B', 'quantization_level': state.models[name], 'family': 'llama'},
+                'model_info': {'llama.context_length': state.context},
+            })
+            
+        if path != '/api/generate':
+            return self._send(HTTPStatus.NOT_FOUND, {'error': 'not found'})
+            
+        name = self._model(body.get('model', ''))
+        if not name:
+            return self._send(HTTPStatus.NOT_FOUND, {'error': f"model '{body.get('model')}' not found"})
+        options = body.get('options') or {}
+        started = time.monotonic()
+        load = state.ensure_loaded(name, options.get('num_ctx', 2048), body.get('keep_alive'))
+        
+        prompt = body.get('prompt')
+        if not prompt:
+            return self._send(HTTPStatus.OK, {
+                'model': name, 'response': '', 'done': True, 'done_reason': 'load',
+                'load_duration': int(load * 1e9),
+            })
+            
+        words = SCRIPT.split(' ')
+        limit = options.get('num_predict', -1)
+        truncated = 0 < limit < len(words)
+        text = ' '.join(words[:limit] if truncated else words)
+        count = min(len(words), limit) if limit > 0 else len(words)
+        
+        with state.slots:
+            generation = count / state.tokens_per_second
+            time.sleep(generation)
+            
+        prompt_tokens = len(prompt) // 4
+        self._send(HTTPStatus.OK, {
+            'model': name,
+            'response': text,
+            'done': True,
+            'done_reason': 'length' if truncated else 'stop',
+            'total_duration': int((time.monotonic() - started) * 1e9),
+            'load_duration': int(load * 1e9),
+            'prompt_eval_count': prompt_tokens,
+            'prompt_eval_duration': int(prompt_tokens / (state.tokens_per_second * 20) * 1e9),
+            'eval_count': count,
+            'eval_duration': int(generation * 1e9),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ollama-compatible stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--parallel', type=int, default=2, help='Requests generated concurrently')
+    parser.add_argument('--load-seconds', type=float, default=3.0, help='Time to load a model')
+    parser.add_argument('--tokens-per-second', type=float, default=50.0)
+    parser.add_argument('--context', type=int, default=16384, help='Trained context length reported by /api/show')
+    parser.add_argument(
+        '--models',
+        default='codellama:latest=Q4_0,codellama:7b-instruct-q4_K_M=Q4_K_M,codellama:7b-instruct-q8_0=Q8_0',
+        help='Comma-separated name=quantization pairs'
+    )
+    args = parser.parse_args()
+    
+    models = dict(entry.split('=', 1) for entry in args.models.split(','))
+    state = FakeOllama(models, args.context, args.parallel, args.load_seconds, args.tokens_per_second)
+    handler = type('BoundFakeOllamaHandler', (FakeOllamaHandler,), {'server_state': state})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"Fake Ollama listening on http://{args.host}:{args.port} ({args.parallel} slots)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Run several cluster agents on this machine
+
+Stands in for a render farm when developing or testing the coordinator:
+each agent is a separate `main.py --agent` process with its own id and
+work directory, all pulling from the same coordinator.
+
+    python tools/local_cluster.py --agents 3
+    CLUSTER_ENABLED=true python src/main.py --batch prompts.txt --render
+
+With the Blender stand-in the whole cluster runs without Blender:
+
+    BLENDER_PATH=tools/fake_blender.py python tools/local_cluster.py --agents 4
+
+Ctrl+C stops every agent.
+"""
+
+import os
+import sys
+import signal
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from config import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several cluster agents on this machine")
+    parser.add_argument('--agents', type=int, default=2, help='Agent processes to start (default: 2)')
+    parser.add_argument('--slots', type=int, default=1, help='Concurrent tasks per agent (default: 1)')
+    parser.add_argument('--coordinator', default=None, help='Coordinator URL (default: CLUSTER_COORDINATOR_URL)')
+    parser.add_argument('--work-dir', type=Path, default=None, help='Parent of the agent work directories (default: CLUSTER_WORK_DIR)')
+    args = parser.parse_args()
+    
+    work_dir = (args.work_dir or Config.CLUSTER_WORK_DIR).resolve()
+    agents = []
+    for index in range(args.agents):
+        agent_id = f"local-{index}"
+        env = dict(
+            os.environ,
+            CLUSTER_AGENT_ID=agent_id,
+            CLUSTER_WORK_DIR=str(work_dir / agent_id)
+        )
+        command = [sys.executable, str(ROOT / "src" / "main.py"), "--agent", "--slots", str(args.slots)]
+        if args.coordinator:
+            command += ["--coordinator", args.coordinator]
+        agents.append(subprocess.Popen(command, env=env))
+        
+    print(f"🛰️  Started {args.agents} agents with {args.slots} slots each; Ctrl+C to stop")
+    try:
+        for agent in agents:
+            agent.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for agent in agents:
+            if agent.poll() is None:
+                agent.send_signal(signal.SIGINT)
+        for agent in agents:
+            try:
+                agent.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                agent.kill()
+    return 0 if all(agent.returncode == 0 for agent in agents) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Provider stand-in that replays recorded completions
+
+Registers with AIGenerator's router in place of the real providers, so
+generation, continuation and retries run through the same code paths
+without an API key or a GPU:
+
+    from recorded_llm import RecordedLLM
+    llm = RecordedLLM(latency=0.8, tokens_per_second=60)
+    llm.install(app.ai_generator)
+
+Recordings are a JSON list of {"prompt": ..., "completion": ...}. A
+request is answered with the recording for its exact prompt, else the
+one whose prompt it starts with (enhancement appends guidance), else the
+one sharing the most words with it. New recordings can be captured from
+a configured provider with tools/benchmark.py --record.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import Config
+from provider_router import ProviderRouter, ProviderError, Completion
+
+RECORDINGS_FILE = Path(__file__).resolve().parent / "recordings" / "completions.json"
+
+
+class RecordedLLM:
+    """Answers generate calls from recordings, at a configurable latency"""
+    
+    name = 'recorded'
+    
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        jitter: float = 0.0,
+        fail_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Initialize Recorded LLM
+        
+        Args:
+            path (Path, optional): Recordings file, defaults to tools/recordings/completions.json
+            latency (float): Seconds before the first token
+            tokens_per_second (float): Output speed, 0 to return the whole reply at once
+            jitter (float): Relative spread of the latency, e.g. 0.2 for +/-20%
+            fail_rate (float): Fraction of calls that fail with a retryable overload
+            seed (int): Seed for jitter and failures
+        """
+        self.path = Path(path or RECORDINGS_FILE)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.seed = seed
+        self.recordings = self.load(self.path)
+        self.calls = 0
+        self.failures = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def load(path: Path) -> List[Dict[str, str]]:
+        """Read recordings, starting empty if the file doesn't exist"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+    
+    @staticmethod
+    def save(path: Path, recordings: List[Dict[str, str]]):
+        """Write recordings, one prompt per entry"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(recordings, f, indent=2)
+            f.write('\n')
+    
+    @staticmethod
+    def _words(text: str) -> set:
+        return set(re.findall(r'[a-z]+', text.lower()))
+    
+    def match(self, user_prompt: str) -> Dict[str, str]:
+        """
+        Recording that answers a prompt
+        
+        Args:
+            user_prompt (str): Prompt as sent to the provider
+            
+        Returns:
+            dict: Recording with 'prompt' and 'completion'
+            
+        Raises:
+            ValueError: If there are no recordings
+        """
+        if not self.recordings:
+            raise ValueError(f"No recordings in {self.path}")
+            
+        for recording in self.recordings:
+            if recording['prompt'] == user_prompt:
+                return recording
+                
+        prefixed = [recording for recording in self.recordings if user_prompt.startswith(recording['prompt'])]
+        if prefixed:
+            return max(prefixed, key=lambda recording: len(recording['prompt']))
+            
+        words = self._words(user_prompt)
+        return max(self.recordings, key=lambda recording: len(words & self._words(recording['prompt'])))
+    
+    def __call__(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        partial: str = ''
+    ) -> Completion:
+        """Provider call, see ProviderRouter.add_provider"""
+        text = self.match(user_prompt)['completion']
+        if partial:
+            # Continue after what was already returned
+            text = text[len(partial.rstrip()):] if text.startswith(partial.rstrip()) else ''
+            
+        key = hashlib.sha256(f"{user_prompt}\0{len(partial)}".encode('utf-8')).hexdigest()
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts[key] = self._attempts.get(key, 0) + 1
+        # Same prompt, same attempt: same delay and outcome on every run
+        rng = random.Random(f"{self.seed}:{key}:{attempt}")
+        
+        truncated = len(text) // 4 > max_tokens
+        if truncated:
+            text = text[:max_tokens * 4]
+        output_tokens = len(text) // 4
+        
+        delay = self.latency + (output_tokens / self.tokens_per_second if self.tokens_per_second else 0)
+        delay *= 1 + rng.uniform(-self.jitter, self.jitter)
+        
+        if rng.random() < self.fail_rate:
+            with self._lock:
+                self.failures += 1
+            time.sleep(self.latency)
+            raise ProviderError(self.name, "Simulated overload", status=529, retryable=True)
+            
+        time.sleep(max(0.0, delay))
+        return Completion(text, truncated, output_tokens)
+    
+    def install(self, ai_generator):
+        """
+        Route an AIGenerator's requests to this stand-in only
+        
+        Args:
+            ai_generator (AIGenerator): Generator whose router is replaced
+        """
+        ai_generator.router = ProviderRouter()
+        ai_generator.router.add_provider(self.name, self)
+        ai_generator.provider = self.name
+    
+    def stats(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'failures': self.failures}
+
+
+def record(ai_generator, prompt_processor, prompts: List[str], path: Optional[Path] = None) -> int:
+    """
+    Capture completions from a real provider into the recordings file
+    
+    Args:
+        ai_generator (AIGenerator): Generator using the provider to record
+        prompt_processor (PromptProcessor): Processor producing the prompts sent
+        prompts (list): User prompts
+        path (Path, optional): Recordings file
+        
+    Returns:
+        int: Recordings added or replaced
+    """
+    path = Path(path or RECORDINGS_FILE)
+    recordings = {recording['prompt']: recording for recording in RecordedLLM.load(path)}
+    
+    for prompt in prompts:
+        processed = prompt_processor.process(prompt)
+        system_prompt = ai_generator.load_system_prompt(processed['prompt_type'])
+        max_tokens = ai_generator.budget.max_tokens(processed)
+        completion = ai_generator.router.generate(processed['enhanced'], system_prompt, Config.TEMPERATURE, max_tokens)
+        text = ai_generator.complete(completion, processed['enhanced'], system_prompt, Config.TEMPERATURE, max_tokens, processed)
+        recordings[processed['enhanced']] = {'prompt': processed['enhanced'], 'completion': text}
+        
+    RecordedLLM.save(path, list(recordings.values()))
+    return len(prompts)
\ No newline at end of file
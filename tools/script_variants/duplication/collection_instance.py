@@ -0,0 +1,17 @@
+# Collection instances: empties instancing a collection holding the sphere
+import bpy
+
+bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4)
+source = bpy.context.active_object
+
+prototype = bpy.data.collections.new("Prototype")
+prototype.objects.link(source)
+bpy.context.scene.collection.objects.unlink(source)
+
+collection = bpy.context.scene.collection
+for index in range(300):
+    empty = bpy.data.objects.new(f"Instance{index}", None)
+    empty.instance_type = 'COLLECTION'
+    empty.instance_collection = prototype
+    empty.location = (index % 20, index // 20, 0)
+    collection.objects.link(empty)
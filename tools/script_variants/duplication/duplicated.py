@@ -0,0 +1,12 @@
+# Full copies: every object gets its own copy of the mesh
+import bpy
+
+bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4)
+source = bpy.context.active_object
+
+collection = bpy.context.scene.collection
+for index in range(300):
+    copy = source.copy()
+    copy.data = source.data.copy()
+    copy.location = (index % 20, index // 20, 0)
+    collection.objects.link(copy)
@@ -0,0 +1,11 @@
+# Linked duplicates: objects share one mesh
+import bpy
+
+bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4)
+source = bpy.context.active_object
+
+collection = bpy.context.scene.collection
+for index in range(300):
+    copy = source.copy()
+    copy.location = (index % 20, index // 20, 0)
+    collection.objects.link(copy)
@@ -0,0 +1,17 @@
+# One node material shared by every object
+import bpy
+
+bpy.ops.mesh.primitive_cube_add(size=0.5)
+source = bpy.context.active_object
+
+material = bpy.data.materials.new("Shared")
+material.use_nodes = True
+material.node_tree.nodes["Principled BSDF"].inputs["Base Color"].default_value = (0.8, 0.2, 0.2, 1.0)
+
+collection = bpy.context.scene.collection
+for index in range(200):
+    obj = source.copy()
+    obj.data = source.data.copy()
+    obj.location = (index % 20, index // 20, 0)
+    collection.objects.link(obj)
+    obj.data.materials.append(material)
@@ -0,0 +1,9 @@
+# Array of 20, then a level 2 subdivision of the whole array
+import bpy
+
+bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4)
+obj = bpy.context.active_object
+array = obj.modifiers.new("Array", 'ARRAY')
+array.count = 20
+subsurf = obj.modifiers.new("Subdivision", 'SUBSURF')
+subsurf.levels = 2
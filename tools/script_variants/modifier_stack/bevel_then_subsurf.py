@@ -0,0 +1,10 @@
+# Bevel before a level 2 subdivision
+import bpy
+
+bpy.ops.mesh.primitive_cube_add()
+obj = bpy.context.active_object
+bevel = obj.modifiers.new("Bevel", 'BEVEL')
+bevel.width = 0.1
+bevel.segments = 4
+subsurf = obj.modifiers.new("Subdivision", 'SUBSURF')
+subsurf.levels = 2
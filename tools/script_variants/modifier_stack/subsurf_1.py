@@ -0,0 +1,7 @@
+# Subdivision surface, level 1
+import bpy
+
+bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16)
+subsurf = bpy.context.active_object.modifiers.new("Subdivision", 'SUBSURF')
+subsurf.levels = 1
+subsurf.render_levels = 1
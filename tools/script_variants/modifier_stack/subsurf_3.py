@@ -0,0 +1,7 @@
+# Subdivision surface, level 3
+import bpy
+
+bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16)
+subsurf = bpy.context.active_object.modifiers.new("Subdivision", 'SUBSURF')
+subsurf.levels = 3
+subsurf.render_levels = 3
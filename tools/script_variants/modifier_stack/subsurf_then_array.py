@@ -0,0 +1,9 @@
+# Level 2 subdivision of one sphere, then an array of 20
+import bpy
+
+bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4)
+obj = bpy.context.active_object
+subsurf = obj.modifiers.new("Subdivision", 'SUBSURF')
+subsurf.levels = 2
+array = obj.modifiers.new("Array", 'ARRAY')
+array.count = 20
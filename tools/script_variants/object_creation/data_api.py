@@ -0,0 +1,13 @@
+# Data API: a mesh per object built with from_pydata and linked directly
+import bpy
+
+VERTICES = [(x, y, z) for x in (-0.25, 0.25) for y in (-0.25, 0.25) for z in (-0.25, 0.25)]
+FACES = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+
+collection = bpy.context.scene.collection
+for index in range(400):
+    mesh = bpy.data.meshes.new(f"Cube{index}")
+    mesh.from_pydata(VERTICES, [], FACES)
+    obj = bpy.data.objects.new(f"Cube{index}", mesh)
+    obj.location = (index % 20, index // 20, 0)
+    collection.objects.link(obj)
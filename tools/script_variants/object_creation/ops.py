@@ -0,0 +1,5 @@
+# bpy.ops: one primitive_cube_add call per object
+import bpy
+
+for index in range(400):
+    bpy.ops.mesh.primitive_cube_add(size=0.5, location=(index % 20, index // 20, 0))
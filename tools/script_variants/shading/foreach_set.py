@@ -0,0 +1,10 @@
+# use_smooth set for all polygons at once with foreach_set
+import bpy
+
+for index in range(100):
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4, location=(index % 10, index // 10, 0))
+
+for obj in bpy.context.scene.objects:
+    polygons = obj.data.polygons
+    polygons.foreach_set('use_smooth', [True] * len(polygons))
+    obj.data.update()
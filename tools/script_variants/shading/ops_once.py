@@ -0,0 +1,8 @@
+# shade_smooth operator once on all selected objects
+import bpy
+
+for index in range(100):
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4, location=(index % 10, index // 10, 0))
+
+bpy.ops.object.select_all(action='SELECT')
+bpy.ops.object.shade_smooth()
@@ -0,0 +1,11 @@
+# shade_smooth operator, selecting each object in turn
+import bpy
+
+for index in range(100):
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4, location=(index % 10, index // 10, 0))
+
+for obj in list(bpy.context.scene.objects):
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.shade_smooth()
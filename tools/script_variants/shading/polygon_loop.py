@@ -0,0 +1,9 @@
+# use_smooth set polygon by polygon from Python
+import bpy
+
+for index in range(100):
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16, radius=0.4, location=(index % 10, index // 10, 0))
+
+for obj in bpy.context.scene.objects:
+    for polygon in obj.data.polygons:
+        polygon.use_smooth = True
@@ -0,0 +1,11 @@
+# view_layer.update() after every object
+import bpy
+
+collection = bpy.context.scene.collection
+mesh = bpy.data.meshes.new("Plane")
+mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [], [(0, 1, 2, 3)])
+for index in range(300):
+    obj = bpy.data.objects.new(f"Plane{index}", mesh)
+    obj.location = (index % 20, index // 20, 0)
+    collection.objects.link(obj)
+    bpy.context.view_layer.update()